@@ -0,0 +1,91 @@
+"""
+Mesure le démarrage à froid du jeu, du lancement de l'interpréteur jusqu'à la première GameMap prête,
+avec les données lues depuis les JSON puis depuis le paquet binaire (game/asset_bundle.py).
+
+Les données sont multipliées (10x, 100x...) dans un dossier temporaire ; chaque mesure est un
+nouveau processus qui importe main, comme `python main.py`, puis construit la carte.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_asset_bundle [--scales 1 10 100] [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from game.asset_bundle import build_bundle, bundle_path_for
+from game.assets import ITEMS_PATH, ENEMIES_PATH
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Exécuté dans le sous-processus : le registre par défaut pointe vers les données multipliées
+COLD_START = """
+import os, sys, time
+import game.assets as assets
+key = (os.path.abspath(assets.ITEMS_PATH), os.path.abspath(assets.ENEMIES_PATH))
+assets._registries[key] = assets.AssetRegistry(sys.argv[1], sys.argv[2])
+import main
+from game.map import GameMap
+GameMap()
+print("bundle" if assets._registries[key].bundle is not None else "json")
+"""
+
+
+def scaled_records(path, scale):
+    """Copies des enregistrements d'un fichier JSON, renommées pour rester distinctes."""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    return [dict(record, name=f"{record['name']} #{copy}" if copy else record["name"])
+            for copy in range(scale) for record in records]
+
+
+def write_assets(directory, scale):
+    items_path = os.path.join(directory, "items_data.json")
+    enemies_path = os.path.join(directory, "enemies_data.json")
+    for source, target in ((ITEMS_PATH, items_path), (ENEMIES_PATH, enemies_path)):
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(scaled_records(source, scale), f, indent=4)
+    return items_path, enemies_path
+
+
+def cold_start(items_path, enemies_path, runs):
+    """Durée médiane (en s) d'un démarrage complet, et la source de données effectivement utilisée."""
+    timings = []
+    source = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", COLD_START, items_path, enemies_path],
+                                cwd=REPOSITORY, capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - start)
+        source = result.stdout.split()[-1]
+    return statistics.median(timings), source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'items':>6} {'enemies':>8} {'json (ms)':>10} {'bundle (ms)':>12} {'speedup':>8}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as directory:
+            items_path, enemies_path = write_assets(directory, scale)
+            json_time, json_source = cold_start(items_path, enemies_path, args.runs)
+            build_bundle(items_path, enemies_path)
+            bundle_time, bundle_source = cold_start(items_path, enemies_path, args.runs)
+            os.remove(bundle_path_for(items_path))
+            if (json_source, bundle_source) != ("json", "bundle"):
+                print(f"Attention : sources utilisées {json_source}/{bundle_source} au lieu de json/bundle.")
+        items = len(scaled_records(ITEMS_PATH, scale))
+        enemies = len(scaled_records(ENEMIES_PATH, scale))
+        print(f"{scale:>6} {items:>6} {enemies:>8} {json_time * 1e3:>10.1f} {bundle_time * 1e3:>12.1f} "
+              f"{json_time / bundle_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Mesure le débit des combats (Battle.resolve) selon la sortie des événements : NullSink (sans interface),
+JsonLinesSink (journal compact) et ConsoleSink (affichage ANSI historique de Battle.start_battle,
+écrit dans os.devnull). Les trois sorties jouent les mêmes combats avec les mêmes graines ; le script
+vérifie qu'elles donnent les mêmes issues et que le journal JSON se relit à l'identique.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_battle_events [--battles 3000] [--level 3]
+"""
+import argparse
+import io
+import os
+import random
+import time
+
+from game.assets import get_registry
+from game.battle import Battle
+from game.enemy import Enemy
+from game.events import ActionRequest, NullSink, ConsoleSink, JsonLinesSink, read_events, run_events
+from game.player import Player
+from game.simulator import ATTACK, heal_below
+
+POLICY = heal_below(0.4)
+
+
+class Recorder:
+    """Sortie qui garde les événements en mémoire."""
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+def make_battles(count, level):
+    """Prépare `count` couples (joueur, ennemi) neufs, hors de la mesure."""
+    templates = get_registry().enemies()
+    battles = []
+    for index in range(count):
+        template = templates[index % len(templates)]
+        enemy = Enemy(name=template.name, level=template.level, enemy_type=template.type)
+        battles.append((Player("Hero", level), enemy))
+    return battles
+
+
+def actions_for(player):
+    """Réponses aux ActionRequest du joueur, données par la stratégie POLICY."""
+    def choose_action(request):
+        items = [[item.name, item.effect, item.power, item.quantity] for item in player.inventory.items]
+        action = POLICY(request.hp, request.max_hp, request.enemy_hp, items)
+        return action if action == ATTACK else ("use", action + 1)  # Numéro d'objet 1-based
+    return choose_action
+
+
+def run(battles, sink, seed=0):
+    """Joue tous les combats avec la sortie donnée ; retourne (durée, issues)."""
+    outcomes = []
+    random.seed(seed)
+    start = time.perf_counter()
+    for player, enemy in battles:
+        outcomes.append(run_events(Battle(player, enemy).resolve(), sink, actions_for(player)))
+    return time.perf_counter() - start, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--battles", type=int, default=3000)
+    parser.add_argument("--level", type=int, default=3)
+    args = parser.parse_args()
+
+    journal = io.StringIO()
+    with open(os.devnull, "w") as devnull:
+        sinks = (("NullSink", NullSink()), ("JsonLinesSink", JsonLinesSink(journal)),
+                 ("ConsoleSink", ConsoleSink(devnull)))
+        results = {name: run(make_battles(args.battles, args.level), sink) for name, sink in sinks}
+
+    # Même combats, mêmes issues ; le journal JSON se relit en événements identiques
+    recorder = Recorder()
+    _, expected = run(make_battles(args.battles, args.level), recorder)
+    recorded = [event for event in recorder.events if type(event) is not ActionRequest]
+    same_outcomes = all(outcomes == expected for _, outcomes in results.values())
+    same_journal = read_events(journal.getvalue().splitlines()) == recorded
+
+    baseline = results["ConsoleSink"][0]
+    print(f"{args.battles} combats (niveau {args.level}), {len(recorded) / args.battles:.1f} événements par combat")
+    print(f"{'sink':>14} {'battles/s':>10} {'speedup':>8}")
+    for name, (elapsed, _) in results.items():
+        print(f"{name:>14} {args.battles / elapsed:>10.0f} {baseline / elapsed:>7.1f}x")
+    print(f"\nJournal JSON : {len(journal.getvalue()) / args.battles:.0f} octets par combat")
+    print(f"Issues identiques : {'oui' if same_outcomes else 'NON'}, "
+          f"journal relu à l'identique : {'oui' if same_journal else 'NON'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Mesure la mise en veille et la reprise d'une session en jeu (session_manager.py) selon la taille de
+la carte : durée de la mise en veille (carte compactée puis sauvegardée), latence de la reprise
+(sauvegarde relue jusqu'à l'invite d'exploration) et mémoire gardée par la session avant et après.
+Vérifie aussi que la partie reprise est identique : même position, mêmes HP, mêmes ennemis restants.
+
+Les sauvegardes sont écrites dans un dossier temporaire.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_hibernation [--sizes 12 64 256] [--repeat 20]
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import os
+import tempfile
+import time
+import tracemalloc
+
+import save_load
+import ui_manager
+from game.assets import get_registry
+from game.map import GameMap
+from game.player import Player
+from game.rng import SessionRng
+from main import game_loop_flow
+from session_manager import SessionManager
+
+
+class BenchSession:
+    """Session minimale vue par le SessionManager : déroulement, invite, état de veille et contexte."""
+
+    def __init__(self, flow):
+        self.flow = flow
+        self.prompt = next(flow)
+        self.hibernation = None
+        self.context = contextvars.copy_context()
+
+
+def enemies_left(game_map):
+    return sum(game_map.is_enemy_at(position) for position in game_map.locations)
+
+
+async def measure(size, repeat):
+    tracemalloc.start()
+    session_rng = SessionRng(size)
+    player, game_map = Player("Bench"), GameMap(size, rng=session_rng.world)
+    expected = (game_map.start_location, player.hp, enemies_left(game_map))
+    session = BenchSession(game_loop_flow(player, game_map, game_map.start_location, f"bench-{size}", session_rng))
+    del player, game_map
+    hot_memory = tracemalloc.get_traced_memory()[0]
+
+    manager = SessionManager(hibernate_after=None)
+    hibernate_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await manager.hibernate(session)
+        hibernate_times.append(time.perf_counter() - start)
+        cold_memory = tracemalloc.get_traced_memory()[0]
+        await manager.command(session)  # Reprise, comme à l'arrivée d'une commande
+    tracemalloc.stop()
+
+    checkpoint = session.prompt.checkpoint
+    resumed = (checkpoint.position, checkpoint.player.hp, enemies_left(checkpoint.game_map))
+    session.flow.close()
+    stats = manager.stats()
+    first, others = hibernate_times[0], sorted(hibernate_times[1:]) or hibernate_times
+    return first, others[len(others) // 2], stats, hot_memory, cold_memory, resumed == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 64, 256])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    ui_manager.headless = True
+    get_registry()  # Données du jeu chargées avant les mesures de mémoire
+    print(f"{'size':>6} {'1re veille':>11} {'veille ms':>10} {'reprise p50':>12} {'p99 ms':>8} {'en jeu Kio':>11} "
+          f"{'en veille Kio':>14} {'identique':>10}")
+    with tempfile.TemporaryDirectory() as directory, \
+            contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")) as devnull:
+        previous, save_load.SAVE_DIRECTORY = save_load.SAVE_DIRECTORY, directory
+        rows = []
+        try:
+            asyncio.run(measure(12, 2))  # Caches du jeu remplis avant les mesures
+            for size in args.sizes:
+                rows.append((size,) + asyncio.run(measure(size, args.repeat)))
+        finally:
+            save_load.SAVE_DIRECTORY = previous
+            devnull.close()
+    for size, first, hibernate, stats, hot_memory, cold_memory, same in rows:
+        print(f"{f'{size}x{size}':>6} {first * 1000:>11.1f} {hibernate * 1000:>10.1f} "
+              f"{stats['resume_p50_ms']:>12.1f} {stats['resume_p99_ms']:>8.1f} {hot_memory / 1024:>11.0f} {cold_memory / 1024:>14.0f} "
+              f"{'oui' if same else 'NON':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare le tirage de loot historique (un Item et un tirage par objet du catalogue) aux tables
+précalculées de game/loot_table.py : débit en loots par seconde et vérification statistique que
+les deux lois sont identiques (nombre d'objets lâchés et fréquence de chaque objet).
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_loot_table [--levels 3 5 7 10] [--samples 200000] [--scale 1]
+"""
+import argparse
+import random
+import time
+from math import sqrt
+from statistics import NormalDist
+
+from game.assets import get_registry
+from game.enemy import drop_chance
+from game.item import Item
+from game.loot_table import LootTable
+
+RISK = 0.001  # Risque de première espèce des deux vérifications
+CHI_SQUARE_LIMIT = 18.47  # Khi-deux à 4 degrés de liberté au risque 0,1 %
+
+
+def legacy_drop(level, templates):
+    """Copie de l'ancien Enemy.drop_loot, sans les affichages."""
+    number_of_items_to_drop = random.randint(2, 4)
+    possible_items = []
+    for item_data in templates:
+        item = Item(**item_data._asdict())
+        if random.random() < drop_chance(level, item.level):
+            possible_items.append(item)
+    if possible_items:
+        return random.sample(possible_items, min(len(possible_items), number_of_items_to_drop))
+    return []
+
+
+def table_drop(table):
+    """Nouveau tirage : seuls les objets lâchés sont créés."""
+    return [Item(**template._asdict()) for template in table.draw()]
+
+
+def scaled_templates(scale):
+    """Catalogue multiplié, les copies étant renommées pour rester distinctes."""
+    templates = get_registry().items()
+    return tuple(template._replace(name=f"{template.name} #{copy}") if copy else template
+                 for copy in range(scale) for template in templates)
+
+
+def throughput(drop, samples):
+    start = time.perf_counter()
+    for _ in range(samples):
+        drop()
+    return samples / (time.perf_counter() - start)
+
+
+def distribution(drop, samples, keys):
+    """Histogramme du nombre d'objets lâchés et nombre d'apparitions de chaque objet."""
+    counts = [0] * 5
+    frequencies = dict.fromkeys(keys, 0)
+    for _ in range(samples):
+        loot = drop()
+        counts[len(loot)] += 1
+        for item in loot:
+            frequencies[(item.name, item.power)] += 1
+    return counts, frequencies
+
+
+def chi_square(first, second):
+    """Statistique du khi-deux d'homogénéité entre deux histogrammes de même effectif."""
+    statistic = 0.0
+    for a, b in zip(first, second):
+        if a + b:
+            statistic += (a - b) ** 2 / (a + b)
+    return statistic
+
+
+def max_z_score(first, second, samples):
+    """Plus grand écart réduit entre les fréquences d'un même objet dans les deux tirages."""
+    worst = 0.0
+    for key in first:
+        p1, p2 = first[key] / samples, second[key] / samples
+        pooled = (p1 + p2) / 2
+        if 0 < pooled < 1:
+            worst = max(worst, abs(p1 - p2) / sqrt(2 * pooled * (1 - pooled) / samples))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, nargs="+", default=[3, 5, 7, 10])
+    parser.add_argument("--samples", type=int, default=200000, help="Tirages pour la vérification statistique")
+    parser.add_argument("--drops", type=int, default=20000, help="Tirages pour la mesure du débit")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplicateur du catalogue d'objets")
+    args = parser.parse_args()
+
+    templates = scaled_templates(args.scale)
+    keys = {(template.name, template.power) for template in templates}
+    print(f"{len(templates)} objets dans le catalogue")
+    print(f"{'level':>6} {'legacy/s':>10} {'table/s':>10} {'speedup':>8} {'chi2':>7} {'max |z|':>8} {'result':>7}")
+    for level in args.levels:
+        table = LootTable(templates, [drop_chance(level, template.level) for template in templates])
+        legacy_rate = throughput(lambda: legacy_drop(level, templates), args.drops)
+        table_rate = throughput(lambda: table_drop(table), args.drops)
+
+        random.seed(level)
+        legacy_counts, legacy_frequencies = distribution(lambda: legacy_drop(level, templates), args.samples, keys)
+        table_counts, table_frequencies = distribution(lambda: table_drop(table), args.samples, keys)
+        statistic = chi_square(legacy_counts, table_counts)
+        z_score = max_z_score(legacy_frequencies, table_frequencies, args.samples)
+        # Seuil bilatéral sur |z| corrigé (Bonferroni) pour le nombre d'objets comparés
+        z_limit = NormalDist().inv_cdf(1 - RISK / (2 * len(keys)))
+        result = "ok" if statistic < CHI_SQUARE_LIMIT and z_score < z_limit else "ÉCART"
+        print(f"{level:>6} {legacy_rate:>10.0f} {table_rate:>10.0f} {table_rate / legacy_rate:>7.1f}x "
+              f"{statistic:>7.2f} {z_score:>8.2f} {result:>7}")
+
+
+if __name__ == "__main__":
+    main()
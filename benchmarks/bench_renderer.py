@@ -0,0 +1,138 @@
+"""
+Compare l'ancien print_map (un print par case) au MapRenderer (une écriture par image, puis des diffs).
+Mesure les octets envoyés, le nombre d'écritures et le temps par image pendant un déplacement du joueur.
+Mesure aussi le mode vue (viewport) sur de très grandes cartes, pour un terminal de 120x40.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_renderer [--sizes 12 32 64] [--view-sizes 256 100000] [--moves 50]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from game.chunked_map import ChunkedGameMap
+from game.map import GameMap
+from game.renderer import MapRenderer
+
+
+class CountingStream:
+    """Flux de sortie qui compte les écritures, les flushs et les octets."""
+
+    def __init__(self):
+        self.writes = 0
+        self.flushes = 0
+        self.bytes = 0
+
+    def write(self, text):
+        self.writes += 1
+        self.bytes += len(text.encode("utf-8"))
+        return len(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def legacy_print_map(game_map, player_position):
+    """Copie de l'ancien GameMap.print_map, avec un print par case."""
+    print("\nLegend for enemies by level:")
+    print("👺 Level 1 |👹 Level 2 | 🧌 Level 3 |🐉 Level 4 | 🦖 Level 5")
+
+    print("\nEnemies are huge, so you can spot them from far away, but the items are tiny!")
+    print("To find items, you will need to explore every corner of the map.")
+
+    for x in range(game_map.size):
+        for y in range(game_map.size):
+            if (x, y) == player_position:
+                print("🧑", end=" ")
+            elif (x, y) == game_map.boss_location:
+                print("👑", end=" ")
+            elif game_map.locations[(x, y)]['enemy'] is not None:
+                enemy = game_map.locations[(x, y)]['enemy']
+                if enemy.level == 3:
+                    print("👺", end=" ")
+                elif enemy.level == 4:
+                    print("👹", end=" ")
+                elif enemy.level == 5:
+                    print("🧌", end=" ")
+                elif enemy.level == 6:
+                    print("🐉", end=" ")
+                elif enemy.level == 7:
+                    print("🦖", end=" ")
+                else:
+                    print("❓", end=" ")
+            else:
+                if x < game_map.size // 2 and y < game_map.size // 2:
+                    print("🟩", end=" ")
+                elif x < game_map.size // 2 and y >= game_map.size // 2:
+                    print("🟧", end=" ")
+                elif x >= game_map.size // 2 and y < game_map.size // 2:
+                    print("🟪", end=" ")
+                else:
+                    print("🟦", end=" ")
+        print()
+    print()
+
+
+def walk(size, moves):
+    """Chemin du joueur : alternance de pas vers le sud et l'est."""
+    path = [(0, 0)]
+    for i in range(moves):
+        x, y = path[-1]
+        path.append((min(x + (i % 2), size - 1), min(y + 1 - (i % 2), size - 1)))
+    return path
+
+
+def run(label, path, make_draw):
+    """Affiche une image par position du chemin ; make_draw(stream) retourne la fonction de dessin."""
+    stream = CountingStream()
+    draw = make_draw(stream)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(stream):
+        for position in path:
+            draw(position)
+    elapsed = time.perf_counter() - start
+    frames = len(path)
+    print(f"  {label:<22} {stream.bytes / frames:>10.0f} {stream.writes / frames:>9.1f} "
+          f"{stream.flushes / frames:>8.1f} {elapsed / frames * 1e6:>10.0f}")
+
+
+def make_renderer(game_map, stream):
+    renderer = MapRenderer(game_map, stream)
+    # Terminal assez grand pour afficher toute la carte fixe en haut de l'écran
+    renderer.terminal_size = lambda: os.terminal_size((game_map.size * 3 + 10, game_map.size + 30))
+    return renderer
+
+
+def make_view_renderer(game_map, stream):
+    renderer = MapRenderer(game_map, stream, viewport=True, minimap=True)
+    renderer.terminal_size = lambda: os.terminal_size((120, 40))
+    return renderer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 32, 64])
+    parser.add_argument("--view-sizes", type=int, nargs="+", default=[256, 100000])
+    parser.add_argument("--moves", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        random.seed(size)
+        game_map = GameMap(size, compact=True)
+        path = walk(size, args.moves)
+        print(f"size {size}: {'':<15} {'B/frame':>10} {'writes':>9} {'flushes':>8} {'µs/frame':>10}")
+        run("legacy print_map", path, lambda stream: lambda p: legacy_print_map(game_map, p))
+        run("print_map (1 write)", path, lambda stream: game_map.print_map)
+        run("MapRenderer (diff)", path, lambda stream: make_renderer(game_map, stream).render)
+
+    for size in args.view_sizes:
+        game_map = ChunkedGameMap(size, world_seed=size)
+        path = walk(size, args.moves)
+        print(f"viewport, size {size}: {'':<5} {'B/frame':>10} {'writes':>9} {'flushes':>8} {'µs/frame':>10}")
+        run("viewport + minimap", path, lambda stream: make_view_renderer(game_map, stream).render)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Liste des sauvegardes par le catalogue (save_catalog.py) ou en lisant les sauvegardes : temps pour
+afficher une page (plus récentes d'abord, filtrée par joueur, triée par niveau), test d'existence,
+première lecture du catalogue et reconstruction quand il est absent.
+
+Vérifie aussi que le catalogue reste exact quand plusieurs processus sauvegardent dans le même dossier
+(comme les processus de supervisor.py), puis après un catalogue corrompu.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_save_catalog [--saves 2000] [--processes 4] [--games 50]
+"""
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+import save_catalog
+import save_load
+import save_store
+from game.map import GameMap
+from game.player import Player
+
+NAMES = ("Alice", "Bob", "Chloé", "David", "Emma", "Félix", "Gaspard", "Hugo")
+
+
+def create_saves(count, seed, prefix="save"):
+    """Écrit `count` parties (cartes 12x12, joueurs de niveaux variés) ; retourne leurs résumés attendus."""
+    rng = random.Random(seed)
+    expected = {}
+    for index in range(count):
+        save_name = f"{prefix}-{index}"
+        player, game_map = Player(rng.choice(NAMES), rng.randint(1, 20)), GameMap(12, rng=random.Random(index))
+        player.hp = rng.randint(1, player.max_hp)
+        save_load.save_game(player, game_map, save_name)
+        expected[save_name] = (player.name, player.level, player.hp)
+    save_load.flush_saves()
+    return expected
+
+
+def timed(function, repeat=5):
+    """Meilleur temps (millisecondes) de `repeat` appels."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def read_listing(count):
+    """Ancienne liste : os.listdir, puis les `count` premières sauvegardes lues pour afficher joueur, niveau et PV."""
+    names = [name for name, extension in map(os.path.splitext, os.listdir(save_load.SAVE_DIRECTORY))
+             if extension == save_store.BINARY_EXTENSION]
+    return [save_load.read_save(name) for name in names[:count]]
+
+
+def new_catalog():
+    files = save_load.file_store()
+    return save_catalog.SaveCatalog(save_load.SAVE_DIRECTORY, files.scan, files.save_names)
+
+
+def matches(catalog, expected):
+    """Vrai si le catalogue contient exactement les parties attendues, avec leurs valeurs."""
+    entries = {summary.name: (summary.player, summary.level, summary.hp) for summary in catalog.query(page_size=len(expected) + 1)[0]}
+    return entries == expected
+
+
+def check_processes(processes, games):
+    """Sauvegardes simultanées de plusieurs processus (fork) dans le même dossier ; retourne True si le catalogue est exact."""
+    expected, children = {}, []
+    for process in range(processes):
+        expected.update(dict.fromkeys(f"proc{process}-{index}" for index in range(games)))
+        pid = os.fork()
+        if pid == 0:
+            try:
+                create_saves(games, process, prefix=f"proc{process}")
+            finally:
+                os._exit(0)
+        children.append(pid)
+    for pid in children:
+        os.waitpid(pid, 0)
+    catalog = new_catalog()
+    names = {summary.name for summary in catalog.query(page_size=len(catalog))[0]}
+    return expected.keys() <= names and catalog.rebuilds == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--saves", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--read-max", type=int, default=500, help="Sauvegardes lues pour l'ancienne liste")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--games", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    writer_background, previous = save_load.writer.background, save_load.SAVE_DIRECTORY
+    with tempfile.TemporaryDirectory() as directory, \
+            contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")) as devnull:
+        save_load.SAVE_DIRECTORY = directory
+        save_load.writer.background = False
+        try:
+            start = time.perf_counter()
+            expected = create_saves(args.saves, 1)
+            created = time.perf_counter() - start
+            catalog = save_load.file_store().catalog
+            read = min(args.saves, args.read_max)
+            rows.append((f"ancienne liste ({read} sauvegardes lues)", timed(lambda: read_listing(read), 1)))
+            rows.append(("première lecture du catalogue", timed(lambda: new_catalog().refresh())))
+            rows.append(("page 1, plus récentes", timed(lambda: catalog.query(page_size=args.page_size))))
+            rows.append(("page 5, plus récentes", timed(lambda: catalog.query(page=4, page_size=args.page_size))))
+            rows.append(("filtre joueur 'al', par niveau", timed(lambda: catalog.query(player="al", sort="level"))))
+            rows.append(("niveaux 10 à 12, par joueur", timed(lambda: catalog.query(min_level=10, max_level=12, sort="player"))))
+            rows.append(("existence (save_exists)", timed(lambda: save_load.save_exists("save-7"))))
+            exact = matches(catalog, expected)
+
+            os.remove(catalog.path)
+            rows.append(("reconstruction (catalogue absent)", timed(lambda: new_catalog().refresh(), 1)))
+            rebuilt = matches(new_catalog(), expected)
+            with open(catalog.path, "r+b") as file:
+                file.seek(len(save_catalog.MAGIC) + 20)
+                file.write(b"\xff" * 8)  # Catalogue corrompu au milieu d'un enregistrement
+            repaired = new_catalog()
+            repaired = matches(repaired, expected) and repaired.rebuilds == 1
+            concurrent = check_processes(args.processes, args.games)
+        finally:
+            save_load.SAVE_DIRECTORY = previous
+            save_load.writer.background = writer_background
+            devnull.close()
+
+    print(f"{args.saves} sauvegardes créées en {created:.1f} s")
+    for label, milliseconds in rows:
+        print(f"{label:>36} {milliseconds:>10.2f} ms")
+    print(f"Catalogue exact : {'oui' if exact else 'NON'} ; reconstruit : {'oui' if rebuilt else 'NON'} ; "
+          f"réparé après corruption : {'oui' if repaired else 'NON'}")
+    print(f"{args.processes} processus x {args.games} parties dans le même dossier : {'catalogue exact' if concurrent else 'parties MANQUANTES'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Compare les instantanés de partie au format binaire (save_format.py) et en pickle : temps d'écriture,
+temps de chargement, taille du fichier et mémoire allouée par le chargement (tracemalloc), selon la
+taille de la carte.
+
+Le chargement binaire ne copie pas les codes des cases (mmap) : le temps « toutes cases » ajoute la
+lecture de la description de chaque case après le chargement, pour comparer à coût égal.
+
+Les cartes en dictionnaire de cases (carte par défaut) ne sont mesurées que jusqu'à --dict-max ; les
+cartes compactes (TileGrid) à toutes les tailles.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_save_format [--sizes 12 256 1024] [--dict-max 256] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import pickle
+import random
+import tempfile
+import time
+import tracemalloc
+
+import save_format
+from game.map import GameMap
+from game.player import Player
+
+
+def save_pickle(path, player, game_map):
+    with open(path, "wb") as file:
+        pickle.dump({"player": player, "game_map": game_map, "current_position": game_map.get_player_position()}, file)
+
+
+def load_pickle(path):
+    with open(path, "rb") as file:
+        data = pickle.load(file)
+    return data["player"], data["game_map"], data["current_position"]
+
+
+def save_binary(path, player, game_map):
+    with open(path, "wb") as file:
+        file.write(save_format.encode(player, game_map))
+
+
+FORMATS = {"pickle": (save_pickle, load_pickle), "binaire": (save_binary, save_format.load)}
+
+
+def best_time(function, repeat):
+    """Meilleur temps (secondes) de `repeat` appels ; retourne (temps, résultat du dernier appel)."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def read_all_tiles(game_map):
+    """Lit la description de chaque case (coût d'un parcours complet de la carte chargée)."""
+    for cell in game_map.locations.values():
+        cell["description"]
+
+
+def allocated(load):
+    """Mémoire (octets) allouée par un chargement et gardée par la partie chargée."""
+    gc.collect()
+    tracemalloc.start()
+    state = load()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return memory
+
+
+def measure(directory, size, compact, repeat):
+    """Retourne une ligne par format : (format, ms d'écriture, ms de chargement, ms toutes cases, octets, octets alloués)."""
+    player, game_map = Player("Bench", 5), GameMap(size, compact=compact, rng=random.Random(size))
+    game_map.set_player_position(size // 2, size // 2)
+    rows = []
+    for name, (save, load) in FORMATS.items():
+        path = os.path.join(directory, f"bench-{size}.{name}")
+        save_time, _ = best_time(lambda: save(path, player, game_map), repeat)
+        load_time, _ = best_time(lambda: load(path), repeat)
+        full_time, _ = best_time(lambda: read_all_tiles(load(path)[1]), repeat)
+        rows.append((name, save_time * 1000, load_time * 1000, full_time * 1000, os.path.getsize(path),
+                     allocated(lambda: load(path))))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 256, 1024])
+    parser.add_argument("--dict-max", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    GameMap(12)  # Données et tables du jeu chargées avant les mesures
+    print(f"{'carte':>16} {'format':>8} {'écriture ms':>12} {'chargement ms':>14} {'toutes cases ms':>16} "
+          f"{'fichier Kio':>12} {'alloué Kio':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            for compact in (False, True):
+                if not compact and size > args.dict_max:
+                    continue
+                label = f"{size}x{size} {'compacte' if compact else 'dict'}"
+                for name, save_ms, load_ms, full_ms, file_size, memory in measure(directory, size, compact, args.repeat):
+                    print(f"{label:>16} {name:>8} {save_ms:>12.2f} {load_ms:>14.2f} {full_ms:>16.2f} "
+                          f"{file_size / 1024:>12.1f} {memory / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Compare les sauvegardes automatiques de la boucle de jeu avec et sans journal (save_load.journal_saves) :
+octets écrits et temps de sauvegarde par tour, selon la taille de la carte.
+
+Vérifie aussi la reprise après une écriture interrompue : le journal d'une partie est tronqué à des
+positions aléatoires, et la sauvegarde relue doit être exactement l'état d'une sauvegarde précédente
+(celle du dernier enregistrement complet) ; une sauvegarde ajoutée ensuite doit se relire elle aussi.
+
+Les parties sont jouées au hasard et sauvegardées dans un dossier temporaire.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_save_journal [--sizes 12 64 256] [--turns 300] [--truncations 200]
+"""
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import save_load
+import ui_manager
+from game.map import GameMap
+from game.player import Player
+from game.rng import SessionRng
+from main import game_loop_flow
+
+MOVES = ("z", "s", "q", "d")
+TRUNCATION_SIZE = 32  # Taille de la carte de la partie dont le journal est tronqué (joueur de niveau 10)
+
+
+def answer(prompt, rng):
+    """Réponse d'un joueur automatique à une invite de la boucle de jeu."""
+    if "What would you like to do" in prompt.text:
+        return rng.choice(MOVES)
+    if "Choose your action" in prompt.text:
+        return "attack"
+    if "number of the item" in prompt.text:
+        return "cancel"
+    return ""
+
+
+def fingerprint(player, game_map):
+    """État complet d'une partie, comparable entre deux chargements."""
+    fields, inventory = save_load.player_state(player)
+    tiles = tuple((position, save_load.tile_state(game_map, position)[1]) for position in sorted(game_map.locations))
+    return game_map.get_player_position(), fields, inventory, tiles
+
+
+def play(size, turns, seed, on_save=None, level=1):
+    """
+    Joue une partie de `turns` tours au plus (la partie s'arrête à la mort du joueur) ; retourne
+    (secondes passées à sauvegarder, octets écrits, sauvegardes), sans la sauvegarde initiale.
+    """
+    save_name = f"bench-{size}"
+    rng = random.Random(seed)
+    player, game_map = Player("Bench", level), GameMap(size, rng=random.Random(seed))
+    save_load.save_game(player, game_map, save_name)  # Sauvegarde initiale, comme une nouvelle partie
+    files = save_load.file_store()
+    paths = (files.find_save(save_name), files.journal_path(save_name))
+    written = [0, 0]  # Octets écrits, sauvegardes
+    sizes = {}
+
+    def stat(path):
+        try:
+            result = os.stat(path)
+            return result.st_ino, result.st_size
+        except OSError:
+            return None, 0
+
+    def measure(name):
+        (inode, snapshot), (_, journal) = stat(paths[0]), stat(paths[1])
+        if inode != sizes.get("inode"):  # Nouvel instantané (fichier remplacé) et journal recommencé
+            written[0] += snapshot + journal
+        else:
+            written[0] += journal - sizes["journal"]
+        sizes.update(inode=inode, journal=journal)
+        written[1] += 1
+        if on_save is not None:
+            on_save(player, game_map, journal)
+
+    measure(save_name)
+    written[:] = [0, 0]  # Sauvegarde initiale non comptée : seules les sauvegardes des tours
+    elapsed = 0.0
+    save_game = save_load.save_game
+
+    def timed_save(*args, **kwargs):
+        nonlocal elapsed
+        start = time.perf_counter()
+        result = save_game(*args, **kwargs)
+        elapsed += time.perf_counter() - start
+        return result
+
+    save_load.save_hook, save_load.save_game = measure, timed_save
+    try:
+        flow = game_loop_flow(player, game_map, game_map.start_location, save_name, SessionRng(seed))
+        prompt, moves = next(flow), 0
+        while moves < turns:
+            moves += prompt.checkpoint is not None
+            prompt = flow.send(answer(prompt, rng))
+    except StopIteration:
+        pass  # Joueur mort
+    finally:
+        flow.close()
+        save_load.save_hook, save_load.save_game = None, save_game
+    return elapsed, written[0], written[1]
+
+
+def check_truncations(turns, truncations, seed):
+    """
+    Tronque le journal d'une partie à des positions aléatoires ; retourne (vérifications réussies, total,
+    sauvegardes de la partie, taille du journal).
+    """
+    states = []  # (taille du journal après la sauvegarde, état de la partie)
+    previous = save_load.SNAPSHOT_EVERY
+    save_load.SNAPSHOT_EVERY = 10 ** 9  # Un seul instantané : tout le reste est dans le journal
+    try:
+        play(TRUNCATION_SIZE, turns, seed,
+             lambda player, game_map, journal: states.append((journal, fingerprint(player, game_map))), level=10)
+    finally:
+        save_load.SNAPSHOT_EVERY = previous
+    source = save_load.SAVE_DIRECTORY
+    journal_size = states[-1][0]
+    rng = random.Random(seed)
+    passed = 0
+    for _ in range(truncations):
+        offset = rng.randrange(journal_size + 1)
+        with tempfile.TemporaryDirectory() as directory:
+            files = save_load.file_store()
+            for path in (files.find_save(f"bench-{TRUNCATION_SIZE}"), files.journal_path(f"bench-{TRUNCATION_SIZE}")):
+                shutil.copy(path, directory)
+            save_load.SAVE_DIRECTORY = directory
+            try:
+                os.truncate(save_load.file_store().journal_path(f"bench-{TRUNCATION_SIZE}"), offset)
+                player, game_map, _ = save_load.read_save(f"bench-{TRUNCATION_SIZE}")
+                # État attendu : celui de la dernière sauvegarde entièrement écrite avant la coupure
+                expected = next((state for size, state in reversed(states) if size <= offset), states[0][1])
+                loaded_ok = fingerprint(player, game_map) == expected
+                # La fin incomplète est retirée : une nouvelle sauvegarde se relit après les enregistrements complets
+                player.hp -= 1
+                save_load.save_game(player, game_map, f"bench-{TRUNCATION_SIZE}")
+                expected = fingerprint(player, game_map)
+                player, game_map, _ = save_load.read_save(f"bench-{TRUNCATION_SIZE}")
+                passed += loaded_ok and fingerprint(player, game_map) == expected
+            finally:
+                save_load.SAVE_DIRECTORY = source
+    return passed, truncations, len(states), journal_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 64, 256])
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--truncations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    ui_manager.headless = True
+    save_load.writer.background = False  # Fichiers mesurés juste après chaque sauvegarde
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, \
+            contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")) as devnull:
+        previous, save_load.SAVE_DIRECTORY = save_load.SAVE_DIRECTORY, directory
+        try:
+            for size in args.sizes:
+                for journal in (False, True):
+                    save_load.journal_saves = journal
+                    rows.append((size, journal) + play(size, args.turns, args.seed))
+            save_load.journal_saves = True
+            passed, total, journal_saves, journal_size = check_truncations(args.turns, args.truncations, args.seed)
+        finally:
+            save_load.SAVE_DIRECTORY = previous
+            save_load.journal_saves = True
+            save_load.writer.background = True
+            devnull.close()
+
+    print(f"{'size':>8} {'mode':>8} {'sauvegardes':>12} {'octets/tour':>12} {'ms/tour':>9}")
+    for size, journal, elapsed, written, saves in rows:
+        print(f"{f'{size}x{size}':>8} {'journal' if journal else 'complet':>8} {saves:>12} {written / saves:>12.0f} "
+              f"{elapsed / saves * 1000:>9.3f}")
+    print(f"Journal tronqué ({journal_saves} sauvegardes, {journal_size} octets) : {passed}/{total} reprise(s) identique(s) "
+          f"à la dernière sauvegarde complète")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Charge du stockage des sauvegardes (save_load.store) : de nombreuses sessions jouées à tour de rôle,
+comme sur le serveur, avec une sauvegarde automatique à chaque déplacement ; fichiers (FileStore) ou
+base SQLite (SQLiteStore). Mesure le temps de sauvegarde vu par la boucle de jeu, les écritures faites
+et regroupées, les lots validés, la profondeur de la file et le flush final, puis la première page de
+la liste des parties. Après flush_saves, chaque partie relue doit être l'état de la session en mémoire.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_save_store [--sessions 200] [--turns 50] [--size 32] [--stores files sqlite]
+"""
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+
+import save_load
+import save_writer
+import ui_manager
+from benchmarks.bench_save_journal import answer, fingerprint
+from game.map import GameMap
+from game.player import Player
+from game.rng import SessionRng
+from main import game_loop_flow
+from sqlite_store import SQLiteStore
+
+
+def open_store(kind, directory):
+    """Stockage `kind` ("files" ou "sqlite") créé dans `directory`, comme au premier lancement du jeu."""
+    if kind == "sqlite":
+        return SQLiteStore(os.path.join(directory, "saves.db"))
+    return save_load.file_store(os.path.join(directory, "saves"))
+
+
+def run_sessions(sessions, turns, size, seed):
+    """
+    Joue `sessions` parties à tour de rôle, un déplacement chacune ; retourne (secondes passées dans
+    save_game, sauvegardes, {nom: (joueur, carte)}).
+    """
+    games, flows = {}, {}
+    for index in range(sessions):
+        save_name = f"session-{index}"
+        rng = random.Random(seed + index)
+        player, game_map = Player(f"Joueur {index}", 1 + index % 20), GameMap(size, rng=random.Random(seed + index))
+        save_load.save_game(player, game_map, save_name)  # Sauvegarde initiale, comme une nouvelle partie
+        games[save_name] = (player, game_map)
+        flow = game_loop_flow(player, game_map, game_map.start_location, save_name, SessionRng(seed + index))
+        flows[save_name] = (flow, rng, [next(flow)])
+    elapsed, saves = 0.0, 0
+    save_game = save_load.save_game
+
+    def timed_save(*args, **kwargs):
+        nonlocal elapsed, saves
+        start = time.perf_counter()
+        result = save_game(*args, **kwargs)
+        elapsed += time.perf_counter() - start
+        saves += 1
+        return result
+
+    save_load.save_game = timed_save
+    try:
+        for _ in range(turns):
+            for save_name, (flow, rng, prompt) in list(flows.items()):
+                try:
+                    moved = False
+                    while not moved:  # Jusqu'au déplacement suivant (combats et objets compris)
+                        moved = prompt[0].checkpoint is not None
+                        prompt[0] = flow.send(answer(prompt[0], rng))
+                except StopIteration:
+                    del flows[save_name]  # Joueur mort : état sauvegardé par la boucle de jeu
+        for save_name, (flow, _, _) in flows.items():
+            flow.close()
+            save_load.save_game(*games[save_name], save_name)  # Combat ou objet du dernier tour
+    finally:
+        save_load.save_game = save_game
+    return elapsed, saves, games
+
+
+def measure(kind, sessions, turns, size, seed, directory):
+    """Retourne (ms par sauvegarde, sauvegardes, ms du flush final, stats du writer, ms de la première page, relues identiques)."""
+    previous = save_load.store
+    save_load.store = open_store(kind, directory)
+    save_load.writer = save_writer.SaveWriter(on_failure=save_load.forget_journal)
+    try:
+        elapsed, saves, games = run_sessions(sessions, turns, size, seed)
+        start = time.perf_counter()
+        save_load.flush_saves()
+        flushed = time.perf_counter() - start
+        start = time.perf_counter()
+        save_load.current_store().query(page_size=10)
+        listed = time.perf_counter() - start
+        identical = 0
+        for save_name, (player, game_map) in games.items():
+            loaded = save_load.read_save(save_name)
+            identical += loaded is not None and fingerprint(*loaded[:2]) == fingerprint(player, game_map)
+    finally:
+        save_load.store = previous
+    return elapsed / saves * 1000, saves, flushed * 1000, save_load.writer.stats(), listed * 1000, identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=50, help="Déplacements par session")
+    parser.add_argument("--size", type=int, default=32)
+    parser.add_argument("--stores", nargs="+", choices=("files", "sqlite"), default=["files", "sqlite"])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    ui_manager.headless = True
+    rows = []
+    writer = save_load.writer
+    with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")) as devnull:
+        try:
+            for kind in args.stores:
+                with tempfile.TemporaryDirectory() as directory:
+                    rows.append((kind,) + measure(kind, args.sessions, args.turns, args.size, args.seed, directory))
+        finally:
+            save_load.writer = writer
+            devnull.close()
+
+    print(f"{args.sessions} sessions x {args.turns} déplacements, cartes {args.size}x{args.size}")
+    print(f"{'stockage':>8} {'sauvegardes':>12} {'ms/tour':>8} {'écrites':>8} {'regroupées':>11} {'lots':>6} "
+          f"{'file max':>9} {'lot p99 ms':>11} {'flush ms':>9} {'page ms':>8} {'relues':>9}")
+    for kind, per_save, saves, flushed, stats, listed, identical in rows:
+        print(f"{kind:>8} {saves:>12} {per_save:>8.3f} {stats['writes']:>8} {stats['coalesced']:>11} "
+              f"{stats['commits']:>6} {stats['max_pending']:>9} {stats['commit_p99_ms']:>11.2f} {flushed:>9.1f} "
+              f"{listed:>8.2f} {f'{identical}/{args.sessions}':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Sauvegardes écrites sur le thread du SaveWriter (save_load.writer) ou dans la boucle de jeu : temps
+de sauvegarde par tour vu par la boucle de jeu, écritures faites et regroupées, profondeur de la file
+et latence des écritures, avec un disque plus ou moins lent (--disk-delay : millisecondes ajoutées à
+chaque fsync). Après flush_saves, la sauvegarde relue doit être l'état de la partie en mémoire.
+
+Vérifie aussi le remplacement atomique : une partie est jouée dans un processus arrêté brutalement
+(os._exit, sans flush) à un moment aléatoire ; la sauvegarde relue doit être l'état d'une des
+sauvegardes transmises avant l'arrêt.
+
+Usage (depuis la racine du dépôt, Unix) :
+    python -m benchmarks.bench_save_writer [--size 64] [--turns 300] [--disk-delay 0 5 20] [--kills 20]
+"""
+import argparse
+import contextlib
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+import save_load
+import save_writer
+import ui_manager
+from benchmarks.bench_save_journal import answer, fingerprint
+from game.map import GameMap
+from game.player import Player
+from game.rng import SessionRng
+from main import game_loop_flow
+
+SNAPSHOT_EVERY = 20  # Instantanés fréquents : les écritures les plus longues
+KILL_SIZE = 32  # Taille de la carte des parties arrêtées brutalement (joueur de niveau 10)
+
+
+@contextlib.contextmanager
+def slow_disk(delay):
+    """Ajoute `delay` secondes à chaque fsync des sauvegardes."""
+    fsync = save_writer.os.fsync
+
+    def slow_fsync(descriptor):
+        time.sleep(delay)
+        fsync(descriptor)
+
+    save_writer.os.fsync = slow_fsync
+    try:
+        yield
+    finally:
+        save_writer.os.fsync = fsync
+
+
+def play(size, turns, seed, on_save=None, level=1):
+    """
+    Joue une partie de `turns` tours au plus ; retourne (secondes passées dans save_game, sauvegardes,
+    joueur, carte). `on_save(player, game_map)` est appelée après chaque sauvegarde transmise.
+    """
+    save_name = f"bench-{size}"
+    rng = random.Random(seed)
+    player, game_map = Player("Bench", level), GameMap(size, rng=random.Random(seed))
+    save_load.save_game(player, game_map, save_name)  # Sauvegarde initiale, comme une nouvelle partie
+    if on_save is not None:
+        on_save(player, game_map)
+    elapsed, saves = 0.0, 0
+    save_game = save_load.save_game
+
+    def timed_save(*args, **kwargs):
+        nonlocal elapsed, saves
+        start = time.perf_counter()
+        result = save_game(*args, **kwargs)
+        elapsed += time.perf_counter() - start
+        saves += 1
+        if on_save is not None:
+            on_save(player, game_map)
+        return result
+
+    save_load.save_game = timed_save
+    flow = game_loop_flow(player, game_map, game_map.start_location, save_name, SessionRng(seed))
+    try:
+        prompt, moves = next(flow), 0
+        while moves < turns:
+            moves += prompt.checkpoint is not None
+            prompt = flow.send(answer(prompt, rng))
+        save_load.save_game(player, game_map, save_name)  # Combat ou objet du dernier tour
+    except StopIteration:
+        pass  # Joueur mort : état sauvegardé par la boucle de jeu
+    finally:
+        flow.close()
+        save_load.save_game = save_game
+    return elapsed, saves, player, game_map
+
+
+def measure(size, turns, seed, background, delay):
+    """Retourne (ms par sauvegarde dans la boucle de jeu, ms du flush final, stats du writer, relecture identique)."""
+    save_load.writer = save_writer.SaveWriter(background=background, on_failure=save_load.forget_journal)
+    with slow_disk(delay):
+        elapsed, saves, player, game_map = play(size, turns, seed, level=10)
+        start = time.perf_counter()
+        save_load.flush_saves()
+        flushed = time.perf_counter() - start
+    loaded = save_load.read_save(f"bench-{size}")
+    same = loaded is not None and fingerprint(*loaded[:2]) == fingerprint(player, game_map)
+    return elapsed / saves * 1000, flushed * 1000, save_load.writer.stats(), same
+
+
+def digest(player, game_map):
+    return hashlib.md5(repr(fingerprint(player, game_map)).encode()).hexdigest()
+
+
+def check_kill(seed, turns, delay):
+    """
+    Joue dans un processus arrêté après un délai aléatoire ; retourne True si la sauvegarde relue est
+    l'état d'une sauvegarde transmise avant l'arrêt.
+    """
+    rng = random.Random(seed)
+    source = save_load.SAVE_DIRECTORY
+    with tempfile.TemporaryDirectory() as directory:
+        log = os.path.join(directory, "states.log")
+        save_load.SAVE_DIRECTORY = directory
+        try:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    save_load.writer = save_writer.SaveWriter(on_failure=save_load.forget_journal)
+                    deadline = time.perf_counter() + rng.uniform(0.05, 0.5)
+                    with open(log, "w") as states, slow_disk(delay):
+                        def on_save(player, game_map):
+                            states.write(digest(player, game_map) + "\n")
+                            states.flush()
+                            if time.perf_counter() > deadline:
+                                os._exit(0)  # Arrêt brutal : écritures en attente et fichiers temporaires abandonnés
+
+                        play(KILL_SIZE, turns, seed, on_save, level=10)
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            with open(log) as states:
+                saved = set(states.read().split())
+            loaded = save_load.read_save(f"bench-{KILL_SIZE}")
+            return loaded is not None and digest(*loaded[:2]) in saved
+        finally:
+            save_load.SAVE_DIRECTORY = source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--disk-delay", type=float, nargs="+", default=[0, 5, 20])
+    parser.add_argument("--kills", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    ui_manager.headless = True
+    rows, killed = [], 0
+    writer, previous_every = save_load.writer, save_load.SNAPSHOT_EVERY
+    with tempfile.TemporaryDirectory() as directory, \
+            contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")) as devnull:
+        previous, save_load.SAVE_DIRECTORY = save_load.SAVE_DIRECTORY, directory
+        save_load.SNAPSHOT_EVERY = SNAPSHOT_EVERY
+        try:
+            for delay in args.disk_delay:
+                for background in (False, True):
+                    rows.append((delay, background) + measure(args.size, args.turns, args.seed, background, delay / 1000))
+            for kill in range(args.kills):
+                killed += check_kill(args.seed + kill, args.turns, args.disk_delay[-1] / 1000)
+        finally:
+            save_load.SAVE_DIRECTORY = previous
+            save_load.SNAPSHOT_EVERY = previous_every
+            save_load.writer = writer
+            devnull.close()
+
+    print(f"Carte {args.size}x{args.size}, {args.turns} tours, instantané tous les {SNAPSHOT_EVERY} enregistrements")
+    print(f"{'fsync ms':>8} {'mode':>8} {'ms/tour':>8} {'flush ms':>9} {'écrites':>8} {'regroupées':>10} "
+          f"{'file max':>8} {'p50 ms':>7} {'p99 ms':>7} {'relue':>6}")
+    for delay, background, per_save, flushed, stats, same in rows:
+        print(f"{delay:>8.0f} {'thread' if background else 'direct':>8} {per_save:>8.3f} {flushed:>9.1f} "
+              f"{stats['writes']:>8} {stats['coalesced']:>10} {stats['max_pending']:>8} {stats['write_p50_ms']:>7.2f} "
+              f"{stats['write_p99_ms']:>7.2f} {'oui' if same else 'NON':>6}")
+    print(f"Arrêt brutal pendant les écritures : {killed}/{args.kills} sauvegarde(s) relue(s) dans un état sauvegardé")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Mesure le débit du simulateur de combats (game/simulator.py) en combats par seconde, et vérifie qu'il
+reproduit Battle : avec la même graine, chaque combat de Battle.resolve (actions fournies par la même
+stratégie) doit finir avec le même vainqueur, le même nombre de tours et les mêmes HP.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_simulator [--battles 100000] [--checks 300]
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from game.assets import get_registry
+from game.battle import Battle
+from game.enemy import Enemy
+from game.events import Victory, run_events
+from game.player import Player
+from game.simulator import (ATTACK, RUN, PLAYER_WINS, PlayerProfile, EnemyProfile, simulate, simulate_many,
+                            always_attack, always_run, heal_below, best_item)
+
+POLICIES = {
+    "always_attack": always_attack,
+    "heal_below": heal_below(0.4),
+    "best_item": best_item(),
+    "always_run": always_run,
+}
+
+
+class FinalHp:
+    """Sortie qui retient les HP du joueur à la fin du combat, avant la récompense."""
+
+    def __init__(self, player):
+        self.player = player
+        self.hp = None
+
+    def emit(self, event):
+        if type(event) is Victory:
+            self.hp = self.player.hp
+
+
+def interactive_battle(player, enemy, policy):
+    """Joue un vrai Battle (Battle.resolve) avec les actions de la stratégie, et retourne (vainqueur, tours, HP)."""
+    turns = 0
+
+    def choose_action(request):
+        nonlocal turns
+        turns += 1
+        items = [[item.name, item.effect, item.power, item.quantity] for item in player.inventory.items]
+        action = policy(player.hp, player.max_hp, enemy.hp, items)
+        if action == ATTACK or action == RUN:
+            return action
+        return ("use", action + 1)  # Numéro d'objet 1-based
+
+    final = FinalHp(player)
+    winner = run_events(Battle(player, enemy).resolve(), final, choose_action)
+    return winner, turns, player.hp if final.hp is None else final.hp
+
+
+def check(count):
+    """Compare `count` combats simulés aux combats interactifs, pour chaque stratégie."""
+    templates = get_registry().enemies()
+    mismatches = 0
+    for name, policy in POLICIES.items():
+        for seed in range(count):
+            template = templates[seed % len(templates)]
+            level = 1 + seed % 6
+            with contextlib.redirect_stdout(io.StringIO()):
+                player = Player("Hero", level)
+            enemy = Enemy(name=template.name, level=template.level, enemy_type=template.type)
+            profile, enemy_profile = PlayerProfile.from_player(player), EnemyProfile.from_enemy(enemy)
+
+            random.seed(seed)
+            expected = interactive_battle(player, enemy, policy)
+            random.seed(seed)
+            outcome = simulate(profile, enemy_profile, policy)
+            if (outcome.winner, outcome.turns, outcome.player_hp) != expected:
+                mismatches += 1
+                print(f"Écart ({name}, graine {seed}) : Battle {expected}, simulateur {outcome[:3]}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--battles", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=300, help="Combats comparés à Battle par stratégie")
+    args = parser.parse_args()
+
+    mismatches = check(args.checks)
+    print(f"Comparaison avec Battle : {args.checks * len(POLICIES)} combats, {mismatches} écart(s)\n")
+
+    starter_items = (("Noob's Dagger", "damage", 10, 1), ("Minor Health Potion", "health_boost", 20, 1),
+                     ("Wooden Shield", "boost_shield", 15, 1))
+    enemy = EnemyProfile.from_template(get_registry().enemies()[0])
+    print(f"Ennemi : {enemy.name} (niveau {enemy.level}, {enemy.hp} HP, attaque {enemy.attack})")
+    print(f"{'policy':>14} {'level':>6} {'battles/s':>10} {'win rate':>9} {'turns':>6}")
+    for name, policy in POLICIES.items():
+        for level in (1, 5):
+            player = PlayerProfile.for_level(level, starter_items)
+            random.seed(level)
+            start = time.perf_counter()
+            outcomes = simulate_many(player, enemy, args.battles, policy)
+            elapsed = time.perf_counter() - start
+            wins = sum(outcome.winner == PLAYER_WINS for outcome in outcomes)
+            turns = sum(outcome.turns for outcome in outcomes) / len(outcomes)
+            print(f"{name:>14} {level:>6} {args.battles / elapsed:>10.0f} {wins / len(outcomes):>9.3f} {turns:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Mesure le temps de résolution des combats à plusieurs (game/skirmish.py) selon la taille des camps, et
+vérifie que le cas 1 contre 1 est bien celui de Battle : avec la même graine, un duel doit finir comme
+Battle.resolve quand le joueur attaque à chaque tour (même vainqueur, mêmes HP du joueur et de l'ennemi).
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_skirmish [--sizes 1 5 10 50 200] [--repeat 20] [--checks 500]
+"""
+import argparse
+import random
+import time
+
+from game.assets import get_registry
+from game.battle import Battle
+from game.character import Character
+from game.enemy import Enemy
+from game.events import Victory, run_events
+from game.skirmish import HEROES, Skirmish, duel, make_pack
+
+
+class FinalHp:
+    """Sortie d'événements qui garde les HP du joueur et de l'ennemi à la fin du combat (avant la récompense)."""
+
+    def __init__(self, player, enemy):
+        self.player, self.enemy, self.hp = player, enemy, None
+
+    def emit(self, event):
+        if type(event) is Victory and self.hp is None:
+            self.hp = (self.player.hp, self.enemy.hp)
+
+
+def check(count):
+    """Compare `count` duels aux combats de Battle ; retourne le nombre d'écarts."""
+    templates = get_registry().enemies()
+    mismatches = 0
+    for seed in range(count):
+        template = templates[seed % len(templates)]
+        level = 1 + seed % 8
+        hero, player = Character("Hero", level), Character("Hero", level)
+        enemy, opponent = (Enemy(name=template.name, level=template.level, enemy_type=template.type) for _ in range(2))
+
+        outcome = duel(hero, enemy, random.Random(seed))
+        final = FinalHp(player, opponent)
+        winner = run_events(Battle(player, opponent, random.Random(seed)).resolve(), final, lambda request: "attack")
+
+        found, expected = (outcome.winner == HEROES, hero.hp, enemy.hp), (winner == "player",) + final.hp
+        if found != expected:
+            mismatches += 1
+            print(f"Écart (graine {seed}) : duel {found}, Battle {expected}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 50, 200])
+    parser.add_argument("--level", type=int, default=5, help="Niveau des héros")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--checks", type=int, default=500, help="Duels comparés à Battle")
+    args = parser.parse_args()
+
+    mismatches = check(args.checks)
+    print(f"Duels comparés à Battle : {args.checks}, {mismatches} écart(s)\n")
+
+    templates = get_registry().enemies()
+    print(f"{'size':>8} {'median ms':>10} {'actions':>8} {'actions/s':>10} {'hero wins':>10}")
+    for size in args.sizes:
+        timings, actions, wins = [], 0, 0
+        for seed in range(args.repeat):
+            rng = random.Random(seed)
+            skirmish = Skirmish(rng)
+            for number in range(size):
+                skirmish.add_hero(Character(f"Hero {number + 1}", args.level))
+            for enemy in make_pack(templates, size, rng):
+                skirmish.add_monster(enemy)
+            start = time.perf_counter()
+            outcome = skirmish.resolve()
+            timings.append(time.perf_counter() - start)
+            actions += outcome.actions
+            wins += outcome.winner == HEROES
+        timings.sort()
+        median = timings[len(timings) // 2]
+        print(f"{f'{size}v{size}':>8} {median * 1000:>10.2f} {actions // args.repeat:>8} "
+              f"{actions / sum(timings):>10.0f} {wins / args.repeat:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
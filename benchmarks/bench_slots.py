@@ -0,0 +1,81 @@
+"""
+Mémoire des objets du jeu à attributs fixes (__slots__) : octets par ennemi, par objet, par joueur
+(inventaire de départ compris) et par carte 100x100 générée, mesurés avec tracemalloc ; temps d'un
+échange de coups (Combatant.apply_damage, attribut par attribut) et taille de la sauvegarde.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_slots [--size 100] [--count 10000]
+"""
+import argparse
+import gc
+import pickle
+import random
+import time
+import tracemalloc
+
+from game.assets import get_registry
+from game.enemy import Enemy
+from game.item import Item
+from game.map import GameMap
+from game.player import Player
+
+
+def allocated(create, count):
+    """Mémoire moyenne (octets) d'un objet créé par `create(numéro)`, sur `count` objets gardés en même temps."""
+    gc.collect()
+    tracemalloc.start()
+    objects = [create(number) for number in range(count)]
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    gc.collect()
+    return memory / count
+
+
+def exchange_time(rounds):
+    """Temps moyen (ns) d'un échange de coups entre un joueur et un ennemi, sans affichage."""
+    player, enemy = Player("Bench", level=5), Enemy("Goblin Warrior", level=4, enemy_type="terrestre")
+    start = time.perf_counter()
+    for _ in range(rounds):
+        enemy.apply_damage(player.attack)
+        player.apply_damage(enemy.attack)
+        enemy.hp = enemy.max_hp
+        player.hp = player.max_hp
+    return (time.perf_counter() - start) / rounds * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--maps", type=int, default=5)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    enemies, items = registry.enemies(), registry.items()
+    GameMap(12)  # Données et tables du jeu chargées avant les mesures
+
+    def create_enemy(number):
+        template = enemies[number % len(enemies)]
+        return Enemy(name=template.name, level=template.level, enemy_type=template.type)
+
+    def create_map(number):
+        return GameMap(args.size, rng=random.Random(number))
+
+    game_map = create_map(0)
+    rows = [
+        ("ennemi", allocated(create_enemy, args.count)),
+        ("objet", allocated(lambda number: Item(**items[number % len(items)]._asdict()), args.count)),
+        ("joueur", allocated(lambda number: Player(f"Bench {number}"), args.count // 10)),
+        (f"carte {args.size}x{args.size}", allocated(create_map, args.maps)),
+        (f"carte {args.size}x{args.size} compacte",
+         allocated(lambda number: GameMap(args.size, compact=True, rng=random.Random(number)), args.maps)),
+    ]
+    for name, memory in rows:
+        print(f"{name:>22} : {memory:>10.0f} octets")
+    print(f"{'sauvegarde de carte':>22} : {len(pickle.dumps(game_map)):>10} octets")
+    print(f"{'échange de coups':>22} : {exchange_time(200_000):>10.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
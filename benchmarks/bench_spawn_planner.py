@@ -0,0 +1,51 @@
+"""
+Mesure le temps de placement des ennemis et objets avec le SpawnPlanner sur de grandes cartes.
+Le temps par spawn doit rester constant : le placement est linéaire en nombre de spawns,
+indépendamment de la surface de la carte.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_spawn_planner [--sizes 256 1024 4096 16384]
+"""
+import argparse
+import random
+import time
+
+from game.map import GameMap
+from game.spawn_planner import SpawnPlanner
+from game.tile_grid import TileGrid
+
+
+def bare_compact_map(size):
+    """Carte compacte sans descriptions ni spawns, pour ne mesurer que le placement."""
+    game_map = GameMap.__new__(GameMap)
+    game_map.size = size
+    game_map.compact = True
+    game_map.start_location = (0, 0)
+    game_map.boss_location = (size - 1, size - 1)
+    game_map.locations = TileGrid(size)
+    game_map.enemy_data = game_map.load_enemy_data()
+    game_map.item_data = game_map.load_item_data()
+    return game_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024, 4096, 16384])
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'enemies':>8} {'items':>6} {'spawn (ms)':>11} {'µs/spawn':>9}")
+    for size in args.sizes:
+        random.seed(size)
+        game_map = bare_compact_map(size)
+        start = time.perf_counter()
+        planner = SpawnPlanner(size, game_map.start_location)
+        game_map.spawn_enemies(planner)
+        game_map.spawn_items(planner)
+        elapsed = time.perf_counter() - start
+        enemies = len(game_map.locations.enemy_table)
+        items = len(game_map.locations.item_table)
+        print(f"{size:>6} {enemies:>8} {items:>6} {elapsed * 1e3:>11.2f} {elapsed / (enemies + items) * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
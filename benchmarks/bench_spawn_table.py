@@ -0,0 +1,74 @@
+"""
+Compare le tirage d'ennemi historique de place_enemy (un tirage par type d'ennemi et par case) aux
+tables de spawn de game/spawn_table.py : tirage case par case (sample) et par lots (sample_many, avec un
+générateur Python, puis avec un numpy.random.Generator si NumPy est installé).
+Vérifie aussi que les fréquences observées suivent les probabilités exactes calculées par la table.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_spawn_table [--scales 1 10 100] [--tiles 100000]
+"""
+import argparse
+import random
+import time
+
+from game.assets import get_registry
+from game.spawn_table import SpawnTable, np
+
+
+def legacy_sample(templates):
+    """Copie du tirage de l'ancien GameMap.place_enemy."""
+    possible_enemies = [enemy for enemy in templates if random.random() < enemy.spawn_chance]
+    if possible_enemies:
+        return random.choice(possible_enemies)
+    return None
+
+
+def scaled_templates(scale):
+    """Types d'ennemis multipliés, les copies étant renommées pour rester distinctes."""
+    templates = get_registry().enemies()
+    return tuple(template._replace(name=f"{template.name} #{copy}") if copy else template
+                 for copy in range(scale) for template in templates)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def max_deviation(samples, table):
+    """Plus grand écart entre fréquence observée et probabilité exacte, sur toutes les issues."""
+    counts = dict.fromkeys(table.outcomes, 0)
+    for template in samples:
+        counts[template] += 1
+    return max(abs(counts[outcome] / len(samples) - probability)
+               for outcome, probability in zip(table.outcomes, table.probabilities))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--tiles", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'types':>6} {'build (ms)':>11} {'legacy/s':>10} {'sample/s':>10} {'batch/s':>10} "
+          f"{'numpy/s':>10} {'P(none)':>8} {'legacy dev':>11} {'batch dev':>10}")
+    for scale in args.scales:
+        random.seed(scale)
+        templates = scaled_templates(scale)
+        table, build = timed(lambda: SpawnTable(templates, [template.spawn_chance for template in templates]))
+        legacy, legacy_time = timed(lambda: [legacy_sample(templates) for _ in range(args.tiles)])
+        _, sample_time = timed(lambda: [table.sample() for _ in range(args.tiles)])
+        batch, batch_time = timed(lambda: table.sample_many(args.tiles))
+        if np is not None:
+            _, numpy_time = timed(lambda: table.sample_many(args.tiles, np.random.default_rng(scale)))
+            numpy_rate = f"{args.tiles / numpy_time:>10.0f}"
+        else:
+            numpy_rate = f"{'-':>10}"  # NumPy absent
+        print(f"{len(templates):>6} {build * 1e3:>11.2f} {args.tiles / legacy_time:>10.0f} "
+              f"{args.tiles / sample_time:>10.0f} {args.tiles / batch_time:>10.0f} {numpy_rate} {table.nothing:>8.4f} "
+              f"{max_deviation(legacy, table):>11.4f} {max_deviation(batch, table):>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
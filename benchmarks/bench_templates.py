@@ -0,0 +1,73 @@
+"""
+Mesure la mémoire par session des ennemis et des objets de la carte : Enemy et Item ne gardent que
+leur état (HP restants, quantité) et partagent leur modèle immuable (EnemyKind, ItemKind).
+
+Pour chaque taille, crée `--sessions` parties (joueur et carte générée) gardées en même temps et
+mesure avec tracemalloc la mémoire par session, la mémoire par ennemi et par objet, et la taille de
+la sauvegarde (pickle) d'une partie.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_templates [--sizes 12 64] [--sessions 50]
+"""
+import argparse
+import gc
+import pickle
+import random
+import tracemalloc
+
+from game.assets import get_registry
+from game.enemy import Enemy
+from game.item import Item
+from game.map import GameMap
+from game.player import Player
+
+INSTANCES = 10000  # Ennemis et objets créés pour mesurer la taille d'une instance
+
+
+def session_memory(size, sessions):
+    """Retourne (octets par session, taille de la sauvegarde d'une partie en octets)."""
+    gc.collect()
+    tracemalloc.start()
+    games = [(Player(f"Bench {number}"), GameMap(size, rng=random.Random(number))) for number in range(sessions)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    saved = len(pickle.dumps({"player": games[0][0], "map": games[0][1]}, protocol=pickle.HIGHEST_PROTOCOL))
+    del games
+    gc.collect()
+    return allocated / sessions, saved
+
+
+def instance_memory(create):
+    """Mémoire moyenne (octets) d'une instance créée par `create(numéro)`."""
+    gc.collect()
+    tracemalloc.start()
+    instances = [create(number) for number in range(INSTANCES)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return allocated / INSTANCES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 64])
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    enemies, items = registry.enemies(), registry.items()
+    GameMap(12)  # Données et tables du jeu chargées avant les mesures
+    enemy_bytes = instance_memory(lambda number: Enemy(name=enemies[number % len(enemies)].name,
+                                                       level=enemies[number % len(enemies)].level,
+                                                       enemy_type=enemies[number % len(enemies)].type))
+    item_bytes = instance_memory(lambda number: Item(**items[number % len(items)]._asdict()))
+    print(f"Ennemi : {enemy_bytes:.0f} octets par instance ; objet : {item_bytes:.0f} octets par instance")
+
+    print(f"{'size':>6} {'sessions':>9} {'Kio/session':>12} {'sauvegarde Kio':>15}")
+    for size in args.sizes:
+        per_session, saved = session_memory(size, args.sessions)
+        print(f"{f'{size}x{size}':>6} {args.sessions:>9} {per_session / 1024:>12.1f} {saved / 1024:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
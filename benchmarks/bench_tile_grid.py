@@ -0,0 +1,95 @@
+"""
+Compare le stockage dictionnaire de GameMap et la TileGrid compacte : mémoire et vitesse.
+
+Usage (depuis la racine du dépôt) :
+    python -m benchmarks.bench_tile_grid [--sizes 12 256 2048]
+"""
+import argparse
+import contextlib
+import gc
+import io
+import random
+import time
+import tracemalloc
+
+from game.enemy import Enemy
+from game.item import Item
+from game.map import GameMap
+
+
+def bare_map(size, compact):
+    """Construit une carte sans spawn, pour mesurer uniquement le stockage des cases."""
+    game_map = GameMap.__new__(GameMap)
+    game_map.size = size
+    game_map.compact = compact
+    game_map.start_location = (0, 0)
+    game_map.boss_location = (size - 1, size - 1)
+    game_map.current_position = (0, 0)
+    game_map.region_descriptions = {region: region for region in ("forest", "swamp", "plains", "mountain")}
+    game_map.locations = game_map.generate_map()
+    return game_map
+
+
+def measure_memory(size, compact):
+    """Retourne (octets alloués, secondes) pour la génération de la carte."""
+    gc.collect()
+    tracemalloc.start()
+    random.seed(size)
+    start = time.perf_counter()
+    game_map = bare_map(size, compact)
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del game_map
+    gc.collect()
+    return allocated, elapsed
+
+
+def measure_access(size, compact, operations=200_000):
+    """Retourne le temps moyen (ns) par appel des accesseurs de la carte."""
+    random.seed(size)
+    game_map = bare_map(size, compact)
+    enemy = Enemy("Goblin Warrior", level=4, enemy_type="terrestre")
+    item = Item("Minor Health Potion", "health_boost", 20)
+    rng = random.Random(0)
+    positions = [(rng.randrange(size), rng.randrange(size)) for _ in range(1024)]
+    for position in positions[::4]:
+        game_map.locations[position]["enemy"] = enemy
+        game_map.locations[position]["item"] = item
+
+    results = {}
+    directions = ("north", "south", "west", "east")
+    calls = {
+        "is_enemy_at": lambda p: game_map.is_enemy_at(p),
+        "get_enemy": lambda p: game_map.get_enemy(p),
+        "is_item_at": lambda p: game_map.is_item_at(p),
+        "clear_enemy": lambda p: game_map.clear_enemy(p),
+        "move_player": lambda p: game_map.move_player(p, directions[p[0] & 3]),
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, call in calls.items():
+            start = time.perf_counter()
+            for i in range(operations):
+                call(positions[i & 1023])
+            results[name] = (time.perf_counter() - start) / operations * 1e9
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 256, 2048])
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'layout':>8} {'MiB':>10} {'B/tile':>8} {'gen (s)':>9}  accès (ns/appel)")
+    for size in args.sizes:
+        for compact in (False, True):
+            allocated, elapsed = measure_memory(size, compact)
+            access = measure_access(size, compact)
+            layout = "grid" if compact else "dict"
+            access_text = " ".join(f"{name}={value:.0f}" for name, value in access.items())
+            print(f"{size:>6} {layout:>8} {allocated / 2**20:>10.2f} {allocated / size**2:>8.1f} "
+                  f"{elapsed:>9.3f}  {access_text}")
+
+
+if __name__ == "__main__":
+    main()
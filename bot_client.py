@@ -0,0 +1,154 @@
+"""
+Client automatique pour tester la charge de game_server.py.
+
+Ouvre des sessions simultanées : les bots actifs créent une partie, se déplacent au hasard, attaquent
+en combat puis quittent ; les bots inactifs restent au menu principal jusqu'à la fin du test, pour
+mesurer ce que coûtent des milliers de joueurs qui ne font rien. Le temps de réponse est mesuré entre
+l'envoi d'une commande et la fin de l'invite suivante (IAC GA) : le serveur doit être lancé sans
+--no-go-ahead.
+
+Les parties des bots sont sauvegardées par le serveur sous les noms PREFIXE1, PREFIXE2, ...
+
+Usage (depuis la racine du dépôt, serveur lancé) :
+    python bot_client.py [--bots 100] [--idle 1000] [--commands 50] [--think 0.0] [--prefix bot-] [--seed 1]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from game_server import DEFAULT_HOST, DEFAULT_PORT, GO_AHEAD
+
+MOVES = ("z", "s", "q", "d")
+CONNECT_TIMEOUT = 30.0  # Secondes pour se connecter et recevoir le menu
+
+
+class BotStats:
+    def __init__(self):
+        self.latencies = []  # Secondes entre une commande et l'invite suivante
+        self.finished = 0
+        self.failed = 0
+        self.connected = 0
+
+
+async def read_prompt(reader):
+    """Lit l'affichage jusqu'à la fin de l'invite ; retourne la dernière ligne (l'invite)."""
+    data = await reader.readuntil(GO_AHEAD)
+    return data[:-len(GO_AHEAD)].decode("utf-8", errors="replace").rsplit("\n", 1)[-1]
+
+
+def choose_answer(prompt, name, state, rng):
+    """Réponse d'un bot actif à une invite du jeu."""
+    if "character's name" in prompt or "name for your save file" in prompt:
+        return name
+    if "overwrite" in prompt:
+        return "y"
+    if "Choose your action" in prompt:
+        return "attack"
+    if "number of the item" in prompt or "number of the game" in prompt:
+        return "cancel"
+    if "Press Enter" in prompt:
+        return ""
+    if "What would you like to do" in prompt:
+        state["moves"] -= 1
+        return rng.choice(MOVES) if state["moves"] > 0 else "quit"
+    # Menu principal : créer une partie la première fois, quitter ensuite
+    answer = "1" if not state["played"] else "4"
+    state["played"] = True
+    return answer
+
+
+async def connect(host, port):
+    """Ouvre une session et attend le menu principal ; retourne (reader, writer, invite)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return reader, writer, await read_prompt(reader)
+    except BaseException:
+        writer.close()
+        raise
+
+
+async def play(host, port, name, commands, think, rng, stats):
+    """Un bot actif : une partie complète, du menu jusqu'à la déconnexion."""
+    try:
+        reader, writer, prompt = await asyncio.wait_for(connect(host, port), CONNECT_TIMEOUT)
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+        stats.failed += 1
+        return
+    stats.connected += 1
+    state = {"moves": commands, "played": False}
+    try:
+        while True:
+            if think:
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+            writer.write((choose_answer(prompt, name, state, rng) + "\r\n").encode("utf-8"))
+            started = time.perf_counter()
+            try:
+                prompt = await read_prompt(reader)
+            except asyncio.IncompleteReadError:
+                break  # Le serveur a fermé la session : le bot a quitté le jeu
+            stats.latencies.append(time.perf_counter() - started)
+        stats.finished += 1
+    except (OSError, asyncio.IncompleteReadError):
+        stats.failed += 1
+    finally:
+        writer.close()
+
+
+async def idle(host, port, stop, stats):
+    """Un bot inactif : se connecte, attend au menu principal jusqu'à la fin du test."""
+    try:
+        reader, writer, prompt = await asyncio.wait_for(connect(host, port), CONNECT_TIMEOUT)
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+        stats.failed += 1
+        return
+    stats.connected += 1
+    await stop.wait()
+    writer.close()
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    stats = BotStats()
+    stop = asyncio.Event()
+    idlers = [asyncio.create_task(idle(args.host, args.port, stop, stats)) for _ in range(args.idle)]
+    await asyncio.sleep(0)  # Laisser les bots inactifs se connecter en premier
+
+    start = time.perf_counter()
+    await asyncio.gather(*(play(args.host, args.port, f"{args.prefix}{number + 1}", args.commands, args.think,
+                                random.Random(rng.getrandbits(64)), stats)
+                           for number in range(args.bots)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*idlers)
+    return stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bots de test de charge pour game_server.py.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bots", type=int, default=100, help="Bots qui jouent une partie")
+    parser.add_argument("--idle", type=int, default=0, help="Bots qui restent inactifs au menu")
+    parser.add_argument("--commands", type=int, default=50, help="Déplacements par partie avant de quitter")
+    parser.add_argument("--think", type=float, default=0.0, help="Pause moyenne entre deux commandes (secondes)")
+    parser.add_argument("--prefix", default="bot-", help="Préfixe des noms de joueur et de sauvegarde")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stats, elapsed = asyncio.run(run(args))
+    latencies = sorted(stats.latencies)
+    print(f"{stats.connected} connexion(s) ({args.bots} actives, {args.idle} inactives), {stats.finished} partie(s) "
+          f"terminée(s), {stats.failed} échec(s) en {elapsed:.1f} s")
+    if latencies:
+        print(f"{len(latencies)} commandes, {len(latencies) / elapsed:.0f} commandes/s ; réponse p50 "
+              f"{percentile(latencies, 0.5) * 1000:.1f} ms, p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Paquet binaire des données du jeu.
+
+Compile assets/*.json en un fichier versionné contenant des enregistrements déjà validés, des index
+triés par niveau et par effet/type, et les tables de loot précalculées (les tables de spawn dépendent
+de REGION_SPAWN_WEIGHTS et sont calculées au chargement, voir spawn_table.py).
+Le jeu le charge avec mmap, sans analyse JSON ; s'il est absent ou périmé, le registre revient aux JSON.
+
+Compilation (depuis la racine du dépôt) :
+    python -m game.asset_bundle
+"""
+import mmap
+import os
+import struct
+import sys
+
+from game.assets import AssetRegistry, ItemTemplate, EnemyTemplate, ITEMS_PATH, ENEMIES_PATH
+from game.enemy import drop_chance
+
+BUNDLE_NAME = "assets.bundle"
+BUNDLE_MAGIC = b"RPGASSET"
+BUNDLE_VERSION = 2  # 2 : plus de section SPWN
+BOSS_LEVEL = 10  # Niveau du boss créé par GameMap.spawn_boss, inclus dans les tables de loot
+
+# En-tête : magic, version, nombre de sections, empreintes (mtime, taille) des deux fichiers sources
+HEADER = struct.Struct("<8sHHQQQQ")
+SECTION = struct.Struct("<4sII")  # Étiquette, position, longueur
+STRING_REF = struct.Struct("<IH")  # Position et longueur dans la table des chaînes
+ITEM_RECORD = struct.Struct("<IHIHdiid")  # name, effect, power, quantity, level, boost
+ENEMY_RECORD = struct.Struct("<IHIHidddd")  # name, type, level, spawn_chance, base_hp, base_attack, crit_chance
+COUNT = struct.Struct("<I")
+LEVEL_ENTRY = struct.Struct("<iII")  # Niveau, début et longueur dans le tableau d'indices
+NAME_ENTRY = struct.Struct("<IHII")  # Chaîne, début et longueur dans le tableau d'indices
+
+
+def number(value):
+    """Rend leur type entier aux nombres stockés en double qui étaient entiers dans le JSON."""
+    return int(value) if value.is_integer() else value
+
+
+def bundle_path_for(items_path):
+    """Chemin du paquet binaire à côté du fichier des objets."""
+    return os.path.join(os.path.dirname(os.path.abspath(items_path)), BUNDLE_NAME)
+
+
+def source_fingerprint(path):
+    """Empreinte (mtime en ns, taille) d'un fichier source, (0, 0) s'il est absent."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 0, 0
+    return stat.st_mtime_ns, stat.st_size
+
+
+# --- Compilation ---
+class StringTable:
+    """Table des chaînes du paquet, sans doublons."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.refs = {}
+
+    def add(self, text):
+        ref = self.refs.get(text)
+        if ref is None:
+            encoded = text.encode("utf-8")
+            ref = self.refs[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return ref
+
+
+def pack_index(groups, key_packer):
+    """Sérialise un index {clé: [indices d'enregistrements]} trié par clé."""
+    entries = bytearray(COUNT.pack(len(groups)))
+    positions = []
+    for key in sorted(groups):
+        entries += key_packer(key, len(positions), len(groups[key]))
+        positions.extend(groups[key])
+    return bytes(entries) + struct.pack(f"<{len(positions)}H", *positions)
+
+
+def group_by(templates, field):
+    groups = {}
+    for index, template in enumerate(templates):
+        groups.setdefault(getattr(template, field), []).append(index)
+    return groups
+
+
+def build_bundle(items_path=ITEMS_PATH, enemies_path=ENEMIES_PATH, output_path=None):
+    """
+    Compile les deux fichiers JSON en paquet binaire et retourne son chemin.
+
+    :param items_path: Fichier JSON des objets.
+    :param enemies_path: Fichier JSON des ennemis.
+    :param output_path: Fichier de sortie (assets.bundle à côté des objets par défaut).
+    """
+    output_path = output_path or bundle_path_for(items_path)
+    source = AssetRegistry(items_path, enemies_path)
+    source.load()  # Validation complète, une seule fois, au moment de la compilation
+    items, enemies = source.items(), source.enemies()
+    strings = StringTable()
+
+    item_records = b"".join(
+        ITEM_RECORD.pack(*strings.add(item.name), *strings.add(item.effect), item.power, item.quantity, item.level, item.boost)
+        for item in items
+    )
+    enemy_records = b"".join(
+        ENEMY_RECORD.pack(*strings.add(enemy.name), *strings.add(enemy.type), enemy.level, enemy.spawn_chance,
+                          enemy.base_hp, enemy.base_attack, enemy.crit_chance)
+        for enemy in enemies
+    )
+
+    def level_key(level, start, count):
+        return LEVEL_ENTRY.pack(level, start, count)
+
+    def name_key(name, start, count):
+        return NAME_ENTRY.pack(*strings.add(name), start, count)
+
+    items_by_level = pack_index(group_by(items, "level"), level_key)
+    items_by_effect = pack_index(group_by(items, "effect"), name_key)
+    enemies_by_level = pack_index(group_by(enemies, "level"), level_key)
+    enemies_by_type = pack_index(group_by(enemies, "type"), name_key)
+
+    # Chances de loot de chaque objet pour chaque niveau d'ennemi
+    max_level = max([enemy.level for enemy in enemies] + [BOSS_LEVEL])
+    drop_tables = bytearray(COUNT.pack(max_level))
+    for level in range(1, max_level + 1):
+        drop_tables += struct.pack(f"<{len(items)}d", *(drop_chance(level, item.level) for item in items))
+
+    sections = [
+        (b"ITEM", item_records),
+        (b"ENMY", enemy_records),
+        (b"ILVL", items_by_level),
+        (b"IEFF", items_by_effect),
+        (b"ELVL", enemies_by_level),
+        (b"ETYP", enemies_by_type),
+        (b"DROP", bytes(drop_tables)),
+        (b"STRS", bytes(strings.data)),  # En dernier : les index ajoutent des chaînes
+    ]
+
+    header = HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(sections),
+                         *source_fingerprint(items_path), *source_fingerprint(enemies_path))
+    offset = len(header) + SECTION.size * len(sections)
+    table = bytearray()
+    for tag, data in sections:
+        table += SECTION.pack(tag, offset, len(data))
+        offset += len(data)
+
+    temporary_path = output_path + ".tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(header)
+        f.write(table)
+        for _, data in sections:
+            f.write(data)
+    os.replace(temporary_path, output_path)
+    return output_path
+
+
+# --- Chargement ---
+class AssetBundle:
+    """Paquet binaire projeté en mémoire ; les enregistrements sont décodés depuis le mmap."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        magic, self.version, section_count, *fingerprints = HEADER.unpack_from(buffer, 0)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError("Ce fichier n'est pas un paquet de données du jeu.")
+        self.items_fingerprint = tuple(fingerprints[0:2])
+        self.enemies_fingerprint = tuple(fingerprints[2:4])
+        self.sections = {}
+        for i in range(section_count):
+            tag, offset, length = SECTION.unpack_from(buffer, HEADER.size + i * SECTION.size)
+            self.sections[tag] = (offset, length)
+        self.strings_offset = self.sections[b"STRS"][0]
+        self.item_count = self.sections[b"ITEM"][1] // ITEM_RECORD.size
+        self.enemy_count = self.sections[b"ENMY"][1] // ENEMY_RECORD.size
+
+    def string(self, offset, length):
+        start = self.strings_offset + offset
+        return bytes(self.buffer[start:start + length]).decode("utf-8")
+
+    def section(self, tag):
+        offset, length = self.sections[tag]
+        return memoryview(self.buffer)[offset:offset + length]
+
+    def items(self):
+        """Modèles d'objets, dans l'ordre des fichiers sources."""
+        return tuple(
+            ItemTemplate(self.string(name, name_length), self.string(effect, effect_length), number(power), quantity, level,
+                         number(boost))
+            for name, name_length, effect, effect_length, power, quantity, level, boost
+            in ITEM_RECORD.iter_unpack(self.section(b"ITEM"))
+        )
+
+    def enemies(self):
+        """Modèles d'ennemis, dans l'ordre des fichiers sources."""
+        return tuple(
+            EnemyTemplate(self.string(name, name_length), self.string(kind, kind_length), level, spawn_chance,
+                          number(base_hp), number(base_attack), crit_chance)
+            for name, name_length, kind, kind_length, level, spawn_chance, base_hp, base_attack, crit_chance
+            in ENEMY_RECORD.iter_unpack(self.section(b"ENMY"))
+        )
+
+    def index(self, tag, templates, string_keys):
+        """Index {clé: tuple de modèles} lu depuis une section d'index précalculée."""
+        data = self.section(tag)
+        (count,) = COUNT.unpack_from(data, 0)
+        entry = NAME_ENTRY if string_keys else LEVEL_ENTRY
+        positions_offset = COUNT.size + count * entry.size
+        positions = data[positions_offset:].cast("H") if len(data) > positions_offset else ()
+        index = {}
+        for i in range(count):
+            if string_keys:
+                offset, length, start, size = entry.unpack_from(data, COUNT.size + i * entry.size)
+                key = self.string(offset, length)
+            else:
+                key, start, size = entry.unpack_from(data, COUNT.size + i * entry.size)
+            index[key] = tuple(templates[position] for position in positions[start:start + size])
+        return index
+
+    def drop_chances(self, level):
+        """Chances de loot de chaque objet pour un ennemi de ce niveau, ou None si le niveau n'est pas précalculé."""
+        data = self.section(b"DROP")
+        (max_level,) = COUNT.unpack_from(data, 0)
+        if not 1 <= level <= max_level:
+            return None
+        row = COUNT.size + (level - 1) * self.item_count * 8
+        return data[row:row + self.item_count * 8].cast("d")
+
+
+def load_bundle(items_path=ITEMS_PATH, enemies_path=ENEMIES_PATH, bundle_path=None):
+    """
+    Projette le paquet binaire en mémoire s'il est à jour par rapport aux fichiers JSON.
+    Retourne None si le paquet est absent, d'une autre version ou périmé.
+    """
+    bundle_path = bundle_path or bundle_path_for(items_path)
+    try:
+        with open(bundle_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        bundle = AssetBundle(buffer)
+    except (ValueError, KeyError, struct.error):
+        return None
+    if (bundle.version != BUNDLE_VERSION
+            or bundle.items_fingerprint != source_fingerprint(items_path)
+            or bundle.enemies_fingerprint != source_fingerprint(enemies_path)):
+        return None
+    return bundle
+
+
+if __name__ == "__main__":
+    items_file = sys.argv[1] if len(sys.argv) > 1 else ITEMS_PATH
+    enemies_file = sys.argv[2] if len(sys.argv) > 2 else ENEMIES_PATH
+    print(f"Paquet de données écrit dans {build_bundle(items_file, enemies_file)}")
@@ -0,0 +1,228 @@
+import json
+import os
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+ASSETS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+ITEMS_PATH = os.path.join(ASSETS_DIRECTORY, "items_data.json")
+ENEMIES_PATH = os.path.join(ASSETS_DIRECTORY, "enemies_data.json")
+CHECK_INTERVAL = 2.0  # Délai minimal (en secondes) entre deux vérifications des dates de modification
+
+
+# --- Modèles immuables ---
+class ItemTemplate(namedtuple("ItemTemplate", ["name", "effect", "power", "quantity", "level", "boost"])):
+    """Modèle d'objet immuable, tel que décrit dans items_data.json."""
+    __slots__ = ()
+
+
+class EnemyTemplate(namedtuple("EnemyTemplate", ["name", "type", "level", "spawn_chance", "base_hp", "base_attack", "crit_chance"])):
+    """Modèle d'ennemi immuable, tel que décrit dans enemies_data.json."""
+    __slots__ = ()
+
+
+# Champs attendus : nom -> (types acceptés, valeur par défaut ; None si obligatoire)
+ITEM_FIELDS = {
+    "name": (str, None),
+    "effect": (str, None),
+    "power": ((int, float), None),
+    "quantity": (int, 1),
+    "level": (int, 1),
+    "boost": ((int, float), 0),
+}
+ENEMY_FIELDS = {
+    "name": (str, None),
+    "type": (str, "Basic"),
+    "level": (int, 1),
+    "spawn_chance": ((int, float), 0.1),
+    "base_hp": ((int, float), 100),
+    "base_attack": ((int, float), 10),
+    "crit_chance": ((int, float), 0.1),
+}
+ITEM_EFFECTS = ("heal", "health_boost", "boost_attack", "boost_shield", "damage")
+
+
+def validate_record(record, fields, kind):
+    """
+    Vérifie un enregistrement JSON et retourne le dictionnaire de ses champs, ou None s'il est invalide.
+
+    :param record: Enregistrement lu dans le fichier JSON.
+    :param fields: Description des champs attendus.
+    :param kind: Nom du type d'enregistrement, pour les messages d'erreur.
+    """
+    if not isinstance(record, dict):
+        print(f"Erreur : Format des données {kind} incorrect : {record!r}")
+        return None
+    values = {}
+    for field, (expected, default) in fields.items():
+        if field not in record:
+            if default is None:
+                print(f"Erreur dans les données {kind} : clé manquante '{field}' dans {record!r}")
+                return None
+            values[field] = default
+            continue
+        value = record[field]
+        if isinstance(value, bool) or not isinstance(value, expected):
+            print(f"Erreur dans les données {kind} : valeur invalide pour '{field}' dans {record!r}")
+            return None
+        values[field] = value
+    return values
+
+
+def build_index(templates, key):
+    """Regroupe les modèles par valeur d'un champ, dans un index en lecture seule."""
+    index = {}
+    for template in templates:
+        index.setdefault(getattr(template, key), []).append(template)
+    return MappingProxyType({value: tuple(group) for value, group in index.items()})
+
+
+class AssetRegistry:
+    """
+    Registre central des données du jeu : lit et valide une seule fois items_data.json et
+    enemies_data.json, puis expose des modèles immuables indexés par nom, niveau et effet/type.
+
+    Le cache est invalidé lorsque la date de modification d'un fichier change ; cette vérification
+    n'est faite qu'au plus une fois toutes les `check_interval` secondes.
+    """
+
+    def __init__(self, items_path=ITEMS_PATH, enemies_path=ENEMIES_PATH, check_interval=CHECK_INTERVAL):
+        """
+        :param items_path: Chemin du fichier JSON des objets.
+        :param enemies_path: Chemin du fichier JSON des ennemis.
+        :param check_interval: Délai minimal entre deux vérifications des fichiers.
+        """
+        self.items_path = items_path
+        self.enemies_path = enemies_path
+        self.check_interval = check_interval
+        self.generation = 0  # Incrémenté à chaque rechargement, pour invalider les caches dérivés
+        self.bundle = None  # Paquet binaire utilisé pour le dernier chargement, s'il était à jour
+        self._mtimes = None
+        self._last_check = None
+        self._items = ()
+        self._enemies = ()
+
+    # --- Chargement ---
+    def file_mtimes(self):
+        """Dates de modification des deux fichiers et du paquet binaire (None si un fichier est absent)."""
+        from game.asset_bundle import bundle_path_for
+
+        mtimes = []
+        for path in (self.items_path, self.enemies_path, bundle_path_for(self.items_path)):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def refresh(self, force=False):
+        """Recharge les fichiers s'ils ont changé depuis le dernier chargement."""
+        now = time.monotonic()
+        if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        mtimes = self.file_mtimes()
+        if force or mtimes != self._mtimes:
+            self._mtimes = mtimes
+            self.load()
+
+    def load(self):
+        """Charge les données depuis le paquet binaire s'il est à jour, sinon lit, valide et indexe les deux fichiers JSON."""
+        from game.asset_bundle import load_bundle
+
+        self.bundle = load_bundle(self.items_path, self.enemies_path)
+        if self.bundle is not None:
+            # Enregistrements déjà validés et index déjà triés à la compilation du paquet
+            self._items = self.bundle.items()
+            self._enemies = self.bundle.enemies()
+            self._items_by_level = MappingProxyType(self.bundle.index(b"ILVL", self._items, string_keys=False))
+            self._items_by_effect = MappingProxyType(self.bundle.index(b"IEFF", self._items, string_keys=True))
+            self._enemies_by_level = MappingProxyType(self.bundle.index(b"ELVL", self._enemies, string_keys=False))
+            self._enemies_by_type = MappingProxyType(self.bundle.index(b"ETYP", self._enemies, string_keys=True))
+        else:
+            self._items = self.load_templates(self.items_path, ITEM_FIELDS, ItemTemplate, "des objets")
+            self._enemies = self.load_templates(self.enemies_path, ENEMY_FIELDS, EnemyTemplate, "des ennemis")
+            for template in self._items:
+                if template.effect not in ITEM_EFFECTS:
+                    print(f"Attention : effet inconnu '{template.effect}' pour l'objet {template.name}.")
+            self._items_by_level = build_index(self._items, "level")
+            self._items_by_effect = build_index(self._items, "effect")
+            self._enemies_by_level = build_index(self._enemies, "level")
+            self._enemies_by_type = build_index(self._enemies, "type")
+
+        # En cas de noms en double (deux "Noob's Dagger" dans les données), l'index par nom garde le premier
+        self._items_by_name = MappingProxyType({template.name: template for template in reversed(self._items)})
+        self._enemies_by_name = MappingProxyType({template.name: template for template in reversed(self._enemies)})
+        self.generation += 1
+
+    def load_templates(self, path, fields, template_class, kind):
+        """Lit un fichier JSON et retourne le tuple de ses modèles valides."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except FileNotFoundError:
+            print(f"Erreur : Fichier de données {kind} introuvable.")
+            return ()
+        except json.JSONDecodeError as e:
+            print(f"Erreur : Problème de format JSON dans le fichier {kind}. {e}")
+            return ()
+        if not isinstance(records, list):
+            print(f"Erreur : Le fichier {kind} doit contenir une liste.")
+            return ()
+
+        templates = []
+        for record in records:
+            values = validate_record(record, fields, kind)
+            if values is not None:
+                templates.append(template_class(**values))
+        return tuple(templates)
+
+    # --- Accès aux objets ---
+    def items(self):
+        """Tous les modèles d'objets, dans l'ordre du fichier."""
+        self.refresh()
+        return self._items
+
+    def item(self, name):
+        """Modèle d'objet par nom, ou None."""
+        self.refresh()
+        return self._items_by_name.get(name)
+
+    def items_by_level(self, level):
+        self.refresh()
+        return self._items_by_level.get(level, ())
+
+    def items_by_effect(self, effect):
+        self.refresh()
+        return self._items_by_effect.get(effect, ())
+
+    # --- Accès aux ennemis ---
+    def enemies(self):
+        """Tous les modèles d'ennemis, dans l'ordre du fichier."""
+        self.refresh()
+        return self._enemies
+
+    def enemy(self, name):
+        """Modèle d'ennemi par nom, ou None."""
+        self.refresh()
+        return self._enemies_by_name.get(name)
+
+    def enemies_by_level(self, level):
+        self.refresh()
+        return self._enemies_by_level.get(level, ())
+
+    def enemies_by_type(self, enemy_type):
+        self.refresh()
+        return self._enemies_by_type.get(enemy_type, ())
+
+
+_registries = {}
+
+
+def get_registry(items_path=ITEMS_PATH, enemies_path=ENEMIES_PATH):
+    """Retourne le registre partagé pour ces fichiers, en le créant au premier appel."""
+    key = (os.path.abspath(items_path), os.path.abspath(enemies_path))
+    registry = _registries.get(key)
+    if registry is None:
+        registry = _registries[key] = AssetRegistry(*key)
+    return registry
@@ -1,203 +1,304 @@
 import random
 
+from game.events import (HealthStatus, ActionRequest, BoostReset, ShieldAbsorbed, DamageTaken, Defeated, ItemUsed, ItemDepleted, EscapeFailed, Escaped, Victory,
+                         ExperienceGained, LevelUp, Healed, Reward, Prompt, ConsoleSink, run_prompts)
+
 # Définition des constantes globales
 CRIT_BASE_CHANCE = 0.1  # Chance de coup critique de base
 EVASION_BASE_CHANCE = 0.05  # Chance d'esquive de base
 RUN_CHANCE = 0.5  # Chance de réussite de fuite de base
+DAMAGE_VARIATION = (0.9, 1.2)  # Bornes de la variation aléatoire des dégâts
+MAX_RUN_ATTEMPTS = 3  # Après 3 échecs, le monstre laisse fuir le joueur
+VICTORY_HEAL = 20  # HP rendus au joueur après une victoire
+
+
+# --- Règles de combat, sans affichage (partagées avec game/simulator.py) ---
+def damage_variation(roll):
+    """Variation des dégâts pour un tirage `roll` de rng.random() : même calcul que rng.uniform(*DAMAGE_VARIATION)."""
+    low, high = DAMAGE_VARIATION
+    return low + (high - low) * roll
+
+
+def scaled_damage(attack, variation, doubled=False):
+    """Dégâts d'une attaque pour une variation donnée, doublés par un coup critique."""
+    base_damage = attack * 2 if doubled else attack
+    # Minimum damage assurée de l'attaque doit être au moins 1
+    return max(int(base_damage * variation), 1)
+
+
+def roll_damage(attack, crit_chance=0, rng=random):
+    """Tire les dégâts d'une attaque et retourne (dégâts, coup critique)."""
+    variation = damage_variation(rng.random())  # Ajoute de la variation réaliste aux dégâts
+    is_crit = rng.random() < crit_chance
+    return scaled_damage(attack, variation, is_crit), is_crit
+
+
+def damage_table(damage):
+    """
+    Loi exacte d'une fonction croissante `damage` d'un tirage de rng.random() (par exemple les dégâts
+    d'une attaque pour ce tirage) : retourne (seuils, valeurs), où damage(u) vaut
+    valeurs[bisect_right(seuils, u)] pour tout tirage u. rng.random() retourne un multiple de 2**-53 :
+    chaque seuil est le plus petit tirage qui donne la valeur suivante, trouvé par dichotomie.
+    """
+    steps = 2 ** 53
+    bounds, values = [], [damage(0.0)]
+    start, last = 0, steps - 1
+    while damage(last / steps) != values[-1]:
+        low, high = start, last  # damage(low / steps) == valeurs[-1] != damage(high / steps)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if damage(middle / steps) == values[-1]:
+                low = middle
+            else:
+                high = middle
+        bounds.append(high / steps)
+        values.append(damage(high / steps))
+        start = high
+    return bounds, values
+
+
+def critical_chance(attacker_level, attacker_attack, defender_attack):
+    """Chance de coup critique selon le niveau et la différence d'attaque, plafonnée à 50 %."""
+    crit_chance = CRIT_BASE_CHANCE + (attacker_level * 0.01) + (attacker_attack - defender_attack) * 0.005
+    return min(crit_chance, 0.5)
+
+
+def evasion_chance(player_level, player_attack, enemy_attack):
+    """Chance que le joueur esquive une attaque ennemie."""
+    return EVASION_BASE_CHANCE + (player_level * 0.01) + (player_attack - enemy_attack) * 0.005
+
+
+def escape_chance(player_level, enemy_level):
+    """Chance de réussite d'une tentative de fuite."""
+    return RUN_CHANCE + (player_level - enemy_level) * 0.05
+
+
+def escape_damage(enemy_attack, player_defense):
+    """Coup reçu quand une tentative de fuite échoue (avant le bouclier et la défense de take_damage)."""
+    return max(enemy_attack - player_defense, 1)
+
 
 class Battle:
-    def __init__(self, player, enemy):
-        """Initialise le combat entre un joueur et un ennemi."""
+    def __init__(self, player, enemy, rng=random, read_input=None):
+        """
+        Initialise le combat entre un joueur et un ennemi.
+
+        :param rng: Générateur aléatoire du combat (module random par défaut), par exemple un flux
+                    SessionRng.battle_stream() pour un combat reproductible.
+        :param read_input: Fonction de saisie des choix du joueur dans la console (input par défaut).
+        """
+        from game.skirmish import Skirmish  # Import circulaire : game.skirmish applique les règles de ce module
+
         self.player = player
         self.enemy = enemy
+        self.rng = rng
+        # Échanges attaque/riposte : actions d'un combat à 1 contre 1 du moteur de game/skirmish.py
+        self.skirmish = Skirmish(rng)
+        self.player_index = self.skirmish.add_hero(player)
+        self.enemy_index = self.skirmish.add_monster(enemy)
+        self.read_input = read_input or input
         self.temp_attack_boost = 0  # Boost temporaire de l'attaque du joueur
         self.boost_active = False   # État du boost d'attaque du joueur
         self.run_attempts = 0  # Compteur pour suivre les tentatives de fuite
 
     # --- Début du combat ---
-    def start_battle(self):
-        """Démarre le combat jusqu'à ce que le joueur ou l'ennemi soit vaincu."""
-        while self.player.is_alive() and self.enemy.is_alive():
-            self.show_health_status()  # Affiche l'état de santé
-            print()  # Ligne vide pour la clarté
-            valid_action = False  # Indique si une action valide a été effectuée
-
-            while not valid_action:
-                action = input("Choose your action (attack/use/run): ").strip().lower()
-
-                if action == "attack":
-                    self.player_turn()  # Attaque du joueur
-                    valid_action = True
-                elif action == "use":
-                    cancel_action = self.handle_item_use()  # Utilisation d'un objet, retourne True si l'utilisateur annule
-                    if cancel_action:
-                        print("\nReturning to the action menu...\n")
-                        break  # Sortir de la boucle et redonner les choix au joueur
-                    valid_action = True
-                elif action == "run":
-                    if self.run_away():
-                        print(f"\n\033[92m{self.player.name} escaped!\033[0m\n")
-                        return
-                    else:
-                        print(f"\n\033[91m{self.player.name} failed to escape.\033[0m\n")
-                        valid_action = True  # Tentative de fuite valide
-                else:
-                    print("\033[93mInvalid action. Please choose again.\033[0m\n")
-
-            # L'ennemi attaque après l'action du joueur, si le joueur n'a pas annulé
-            if self.enemy.is_alive() and valid_action:
-                self.enemy_turn()
+    def start_battle(self, sink=None):
+        """
+        Démarre le combat dans la console jusqu'à ce que le joueur ou l'ennemi soit vaincu.
+
+        :param sink: Sortie des événements (ConsoleSink par défaut).
+        :return: "player", "enemy" ou "escaped".
+        """
+        return run_prompts(self.console_flow(sink), lambda prompt: self.read_input(prompt.text))
+
+    def resolve(self):
+        """
+        Générateur du déroulement du combat (voir game/events.py) : produit les événements sans rien
+        afficher et reçoit les actions du joueur par send() en réponse à chaque ActionRequest.
+
+        :return: "player", "enemy" ou "escaped" (valeur de StopIteration).
+        """
+        player, enemy = self.player, self.enemy
+        while player.is_alive() and enemy.is_alive():
+            yield HealthStatus(player.name, player.hp, player.max_hp, enemy.name, enemy.hp, enemy.max_hp)
+            action = yield ActionRequest(player.name, player.hp, player.max_hp, enemy.hp)
+
+            if action == "attack":
+                yield from self.player_turn()
+            elif action == "run":
+                if (yield from self.run_away()):
+                    return "escaped"
+            elif isinstance(action, tuple) and action[0] == "use":
+                yield from self.use_item(action[1])
+            else:
+                continue  # Action annulée : redonner les choix au joueur, sans riposte
+
+            # L'ennemi attaque après l'action du joueur
+            if enemy.is_alive():
+                yield from self.enemy_turn()
 
         # Conclusion du combat
-        if self.player.is_alive():
-            print(f"\n\033[92m{self.player.name} has defeated {self.enemy.name}!\033[0m\n")
-            self.reward_player()  # Récompense après victoire
-        else:
-            print(f"\n\033[91m{self.enemy.name} has defeated {self.player.name}!\033[0m\n")
-
-    # --- Actions du joueur ---
-    def player_turn(self):
-        """Effectue l'attaque du joueur avec calcul de coup critique."""
-        attack_with_boost = self.player.attack + self.temp_attack_boost
-        
-        # Chance de coup critique ajustée selon le niveau et la différence d'attaque
-        crit_chance = self.calculate_crit_chance(self.player, self.enemy)
-        is_crit = random.random() < crit_chance
-        
-        damage = self.calculate_damage(attack_with_boost, crit_chance=crit_chance if is_crit else 0)
-
-        self.enemy.take_damage(damage)
-        
-        if is_crit:
-            print(f"\033[93mCritical hit!\033[0m {self.player.name} deals \033[91m{damage}\033[0m damage to {self.enemy.name}!")
-        else:
-            print(f"\n{self.player.name} attacks {self.enemy.name} for \033[91m{damage}\033[0m damage.\n")
-        
-        self.reset_attack_boost()  # Réinitialisation après application
-
+        if player.is_alive():
+            yield Victory(player.name, enemy.name, True)
+            yield from self.reward_player()  # Récompense après victoire
+            return "player"
+        yield Victory(enemy.name, player.name, False)
+        return "enemy"
+
+    # --- Choix du joueur dans la console ---
+    def console_flow(self, sink=None):
+        """
+        Déroulement console du combat : les événements sont affichés par `sink` (ConsoleSink par défaut)
+        et chaque saisie attendue est produite comme un Prompt (voir events.run_prompts).
+
+        :return: "player", "enemy" ou "escaped" (valeur de StopIteration).
+        """
+        sink = sink or ConsoleSink()
+        events = self.resolve()
+        try:
+            event = next(events)
+            while True:
+                if type(event) is ActionRequest:
+                    event = events.send((yield from self.action_prompts()))
+                else:
+                    sink.emit(event)
+                    event = events.send(None)
+        except StopIteration as stop:
+            return stop.value
 
-    def handle_item_use(self):
-        """Permet au joueur d'utiliser un objet pendant le combat ou de revenir en arrière."""
+    def action_prompts(self):
+        """Demande l'action du joueur, en réponse à un ActionRequest."""
+        while True:
+            action = (yield Prompt("Choose your action (attack/use/run): ")).strip().lower()
+
+            if action in ("attack", "run"):
+                return action
+            if action == "use":
+                item_index = yield from self.item_prompts()
+                if item_index is None:  # L'utilisateur annule
+                    print("\nReturning to the action menu...\n")
+                    return "cancel"
+                return ("use", item_index)
+            print("\033[93mInvalid action. Please choose again.\033[0m\n")
+
+    def item_prompts(self):
+        """Demande le numéro de l'objet à utiliser ; retourne None si le joueur annule."""
         while True:
             self.player.inventory.show_inventory()  # Affiche l'inventaire du joueur
             print("\nType 'cancel' to go back to attacking.\n")  # Ajout d'une option pour annuler
 
             try:
-                item_index = input("Enter the number of the item you want to use: ").strip().lower()
+                item_index = (yield Prompt("Enter the number of the item you want to use: ")).strip().lower()
 
                 if item_index == "cancel":  # Si l'utilisateur tape "cancel", on annule l'utilisation de l'objet
                     print("\nReturning to attack...\n")
-                    return True  # Retourne True pour signaler l'annulation
+                    return None
 
                 item_index = int(item_index)  # Convertir l'entrée en entier
 
                 if item_index < 1 or item_index > len(self.player.inventory.items):
                     print("\033[93mInvalid index. Try again.\033[0m\n")
                     continue
-
-                item = self.player.inventory.get_item(item_index)
-                if item:
-                    # Application de l'effet de l'objet
-                    if item.effect == "boost_attack":
-                        print(f"\n\033[94mAttack boosted by {item.power}!\033[0m\n")
-                        self.player.apply_temporary_attack_boost(item.power)
-                        self.temp_attack_boost = item.power
-                    elif item.effect == "damage":
-                        print(f"\nUsing {item.name}! {self.player.name} uses {item.name} and deals {item.power} damage.")
-                        self.enemy.take_damage(item.power)  # dégâts fixes, cohérent via take_damage.
-                    elif item.effect == "health_boost":
-                        print(f"\nUsed \033[94m{item.name}\033[0m to heal \033[92m{item.power}\033[0m HP!")
-                        self.player.hp += item.power  # Restauration de la santé
-
-                    # Mise à jour de l'inventaire
-                    self.player.inventory.use_item(item_index, self.player)  # Utilisation de l'objet
-                    if item.quantity <= 0:
-                        self.player.inventory.remove_item(item.name)  # Retirer l'objet épuisé
-                        print(f"\033[91m{item.name} has been used up and removed.\033[0m\n")
-                    break  # Terminer la boucle une fois l'objet utilisé
+                return item_index
             except ValueError:
                 print("\033[93mInvalid input. Please enter a number or 'cancel' to go back.\033[0m\n")
 
+    # --- Actions du joueur ---
+    def player_turn(self):
+        """Effectue l'attaque du joueur avec calcul de coup critique (boost d'attaque compris)."""
+        yield from self.exchange(self.player_index, self.enemy_index, self.temp_attack_boost)
+        yield from self.reset_attack_boost()  # Réinitialisation après application
+
+    def exchange(self, attacker, target, bonus=0):
+        """Une action de self.skirmish (voir Skirmish.strike), sur les statistiques actuelles du joueur et de l'ennemi."""
+        skirmish, events = self.skirmish, []
+        skirmish.refresh()  # Objets utilisés depuis l'action précédente
+        skirmish.strike(attacker, target, events.append, bonus)
+        skirmish.sync()
+        yield from events
+
+    def use_item(self, item_index):
+        """Utilise l'objet numéro `item_index` (1-based) de l'inventaire du joueur."""
+        player = self.player
+        item = player.inventory.get_item(item_index)
+        boost_applied = False
+
+        # Application de l'effet de l'objet
+        if item.effect == "boost_attack":
+            boost_applied = player.boost_attack(item.power)
+            self.temp_attack_boost = item.power
+        elif item.effect == "damage":
+            self.enemy.take_damage(item.power)  # dégâts fixes, cohérent via take_damage.
+        elif item.effect == "health_boost":
+            player.hp += item.power  # Restauration de la santé
+
+        # Mise à jour de l'inventaire (qui soigne encore et renforce le bouclier)
+        player.inventory.apply_item(item_index, player)
+        yield ItemUsed(player.name, item.name, item.effect, item.power, boost_applied)
+        if item.quantity <= 0:
+            yield ItemDepleted(item.name)
 
     def reset_attack_boost(self):
         """Réinitialise le boost temporaire d'attaque du joueur."""
         if self.temp_attack_boost > 0:
-            print("\033[94mAttack boost reset.\033[0m\n")
+            yield BoostReset(self.player.name)
         self.temp_attack_boost = 0
 
     # --- Actions de l'ennemi ---
     def enemy_turn(self):
         """Effectue l'attaque de l'ennemi avec esquive possible."""
-        if self.player_evades():
-            print(f"\n\033[93m{self.player.name} evades the attack!\033[0m\n")
-        else:
-            attack_power = self.enemy.attack
-            damage = self.calculate_damage(attack_power)
-
-            self.player.take_damage(damage)
-            # print(f"\n{self.enemy.name} attacks {self.player.name} for \033[91m{damage}\033[0m damage.\n")
-
-
-    # --- Calculs de dégâts et autres ---
-    def calculate_damage(self, attack, crit_chance=0):
-        """Calcule les dégâts avec possibilité de coup critique."""
-        base_damage = attack  # attaque d'entrée ou boostée
-        variation = random.uniform(0.9, 1.2)  # Ajoute de la variation réaliste aux dégâts
-
-        # Coup critique
-        if random.random() < crit_chance:
-            base_damage *= 2
-            print("\033[93mCritical hit!\033[0m")
-        
-        # Calcul du total des dégâts avec la variation
-        damage = int(base_damage * variation)
-
-        # Minimum damage assurée de l'attaque doit être au moins 1
-        return max(damage, 1)
-
-    def calculate_crit_chance(self, attacker, defender):
-        """Calcule la chance de coup critique."""
-        crit_chance = CRIT_BASE_CHANCE + (attacker.level * 0.01) + (attacker.attack - defender.attack) * 0.005
-        return min(crit_chance, 0.5)
-
-    def player_evades(self):
-        """Détermine si le joueur esquive l'attaque ennemie.""" 
-        evade_chance = EVASION_BASE_CHANCE + (self.player.level * 0.01) + (self.player.attack - self.enemy.attack) * 0.005
-        return random.random() < evade_chance
-
+        yield from self.exchange(self.enemy_index, self.player_index)
+        if self.player.hp <= 0:
+            yield Defeated(self.player.name)
+
+    def damage_player(self, amount):
+        """Inflige des dégâts au joueur (bouclier puis défense)."""
+        player = self.player
+        damage, absorbed = player.apply_damage(amount)
+        if absorbed:
+            yield ShieldAbsorbed(player.name, absorbed)
+        yield DamageTaken(player.name, damage, player.hp, player.max_hp)
+        if player.hp <= 0:
+            yield Defeated(player.name)
+
+    # --- Fuite ---
     def run_away(self):
-        """Tente de fuir le combat avec un maximum de 3 tentatives."""
-        if self.run_attempts >= 3:
-            print("\033[93mThe monster took pity on you. He let you go...\033[0m\n")
+        """Tente de fuir le combat avec un maximum de 3 tentatives ; retourne True en cas de succès."""
+        if self.run_attempts >= MAX_RUN_ATTEMPTS:
+            yield Escaped(self.player.name, True)
             return True  # Fuite automatique après 3 essais
 
         # Calcul des chances de fuite en fonction du niveau
-        run_chance = RUN_CHANCE + (self.player.level - self.enemy.level) * 0.05
-        success = random.random() < run_chance
+        success = self.rng.random() < escape_chance(self.player.level, self.enemy.level)
 
         self.run_attempts += 1  # Incrémente le compteur de tentatives
 
         if not success:
-            damage = max(self.enemy.attack - self.player.defense, 1)  # Dégâts reçus si la fuite échoue
-            self.player.take_damage(damage)
-            print(f"\033[91m{self.enemy.name} hits you while you try to escape! You take {damage} damage.\033[0m\n")
-            print(f"Escape attempt {self.run_attempts}/3 failed.\n")
+            damage = escape_damage(self.enemy.attack, self.player.defense)  # Dégâts reçus si la fuite échoue
+            yield from self.damage_player(damage)
+            yield EscapeFailed(self.player.name, self.enemy.name, damage, self.run_attempts, MAX_RUN_ATTEMPTS)
         else:
-            print(f"\033[92mYou successfully escape !\033[0m\n")
-        
+            yield Escaped(self.player.name, False)
+
         return success
 
     # --- Récompenses et état du joueur ---
     def reward_player(self):
         """Récompense le joueur après la victoire dans le combat."""
+        player = self.player
         xp_reward = self.enemy.level * 10
-        self.player.gain_experience(xp_reward)  # Gain d'XP
-        self.player.heal(20)  # Restauration de la santé
-        print(f"\n\033[92m{self.player.name} gained {xp_reward} XP!\033[0m")
-        print(f"Health restored. {self.player.name} healed \033[92m20\033[0m HP.\n")
+        player.add_experience(xp_reward)  # Gain d'XP
+        yield ExperienceGained(player.name, xp_reward, player.experience, player.experience_to_next_level())
+        while player.experience >= player.experience_to_next_level():
+            player.raise_level()
+            yield LevelUp(player.name, player.level, player.max_hp, player._attack, player.defense,
+                          player.points_to_allocate)
+
+        player.hp += VICTORY_HEAL  # Restauration de la santé
+        yield Healed(player.name, VICTORY_HEAL, player.hp, player.max_hp)
+        yield Reward(player.name, xp_reward, VICTORY_HEAL)
 
     def show_health_status(self):
         """Affiche l'état des points de vie des deux combattants."""
         print(f"{self.player.name}: \033[92m{self.player.hp}/{self.player.max_hp}\033[0m HP")
         print(f"{self.enemy.name}: \033[91m{self.enemy.hp}/{self.enemy.max_hp}\033[0m HP\n")
-
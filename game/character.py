@@ -1,21 +1,25 @@
-class Character:
-    def __init__(self, name, level=1):
-        """
-        Initialise un personnage avec des attributs de base.
-        
-        :param name: Nom du personnage.
-        :param level: Niveau initial du personnage (par défaut 1).
-        """
-        self.name = name
-        self._level = level
-        self._max_hp = 100 + (level - 1) * 20  # Les HP max augmentent avec le niveau
-        self._hp = self._max_hp
-        self._attack = 10 + (level - 1) * 3  # L'attaque augmente avec le niveau
-        self._defense = 5 + (level - 1) * 2  # La défense augmente avec le niveau
-        self._experience = 0  # XP initiale
-        self.points_to_allocate = 0  # Points d'amélioration pour stats
-        self._temporary_attack_boost = 0  # Boost temporaire d'attaque
-        self._damage_reduction = 0  # Réduction des dégâts via bouclier
+from game.slots import get_state, set_state
+
+
+def mitigate_damage(amount, damage_reduction, defense):
+    """
+    Dégâts finalement subis : réduction en % du bouclier actif, puis absorption par la défense (minimum 1).
+
+    :param amount: Dégâts reçus.
+    :param damage_reduction: Réduction du bouclier actif en %, 0 s'il n'y en a pas.
+    :param defense: Défense du personnage.
+    """
+    if damage_reduction > 0:
+        amount = amount * (1 - damage_reduction / 100)
+    return max(int(amount - defense), 1)
+
+
+class Combatant:
+    """
+    État et méthodes de combat communs aux personnages et aux ennemis : HP restants, boost d'attaque
+    et bouclier. Les sous-classes fournissent `name`, `_level`, `_max_hp`, `_attack` et `_defense`.
+    """
+    __slots__ = ("_hp", "_temporary_attack_boost", "_damage_reduction")
 
     # --- Propriétés de l'objet ---
     @property
@@ -48,35 +52,29 @@ class Character:
         return self._level
 
     # --- Méthodes de gestion des statistiques ---
+    def apply_damage(self, amount):
+        """
+        Applique des dégâts sans rien afficher et retourne (dégâts subis, réduction du bouclier consommé).
+
+        Réduction via bouclier (si actif) puis via défense, avec un minimum viable de dégâts (1).
+        """
+        final_damage = mitigate_damage(amount, self._damage_reduction, self.defense)
+        absorbed = self._damage_reduction if self._damage_reduction > 0 else 0
+        if absorbed:
+            self._damage_reduction = 0  # Bouclier consommé après cette attaque
+        self.hp -= final_damage
+        return final_damage, absorbed
+
     def take_damage(self, amount):
         """Applique des dégâts après réduction par la défense et le bouclier actif."""
-        
-        # Réduction via bouclier (si actif)
-        if self._damage_reduction > 0:
-            reduced_damage = amount * (1 - self._damage_reduction / 100)
-            print(f"{self.name}'s shield reduces the damage by {self._damage_reduction}%.")
-            
-            # Bouclier consommé après cette attaque
-            self._damage_reduction = 0  
-        else:
-            reduced_damage = amount
-
-        # Réduction via défense
-        reduced_damage -= self.defense  # La défense absorbe directement les dégâts
-        
-        # Ne pas descendre en-dessous d'un minimum viable de dégâts (1)
-        final_damage = max(int(reduced_damage), 1)
-        
-        # Appliquer les dégâts
-        self.hp -= final_damage
+        final_damage, absorbed = self.apply_damage(amount)
+        if absorbed:
+            print(f"{self.name}'s shield reduces the damage by {absorbed}%.")
         print(f"{self.name} takes {final_damage} damage! Remaining HP: {self.hp}/{self.max_hp}")
 
         if self.hp <= 0:
             print(f"{self.name} is defeated!")
 
-
-
-
     def heal(self, amount):
         """Soigne le personnage en ajoutant de la vie."""
         self.hp += amount
@@ -89,10 +87,75 @@ class Character:
         target.take_damage(damage)
         self.reset_attack_boost()  # Réinitialise le boost d'attaque après l'attaque
 
-    # --- Système d'expérience ---
+    # --- Gestion des boosts ---
+    def apply_temporary_attack_boost(self, boost_amount):
+        """Applique un boost temporaire d'attaque."""
+        self._temporary_attack_boost += boost_amount
+        print(f"{self.name} receives a temporary attack boost of {boost_amount}!")
+
+    def reset_attack_boost(self):
+        """Réinitialise le boost temporaire d'attaque."""
+        if self._temporary_attack_boost > 0:
+            print(f"{self.name}'s attack boost of {self._temporary_attack_boost} is reset.")
+        self._temporary_attack_boost = 0
+
+    def activate_shield(self, reduction):
+        """Active un bouclier réduisant les dégâts subis."""
+        self._damage_reduction = reduction
+        print(f"{self.name} activates a shield reducing damage by {reduction}%!")
+
+    def deactivate_shield(self):
+        """Désactive le bouclier."""
+        if self._damage_reduction > 0:
+            print(f"{self.name}'s shield deactivates.")
+        self._damage_reduction = 0
+
+    # --- État du personnage ---
+    def is_alive(self):
+        """Vérifie si le personnage est encore en vie."""
+        return self.hp > 0
+
+    # --- Sauvegarde ---
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
+
+
+class Character(Combatant):
+    __slots__ = ("name", "_level", "_max_hp", "_attack", "_defense", "_experience", "points_to_allocate")
+
+    def __init__(self, name, level=1):
+        """
+        Initialise un personnage avec des attributs de base.
+        
+        :param name: Nom du personnage.
+        :param level: Niveau initial du personnage (par défaut 1).
+        """
+        self.name = name
+        self._level = level
+        self._max_hp = 100 + (level - 1) * 20  # Les HP max augmentent avec le niveau
+        self._hp = self._max_hp
+        self._attack = 10 + (level - 1) * 3  # L'attaque augmente avec le niveau
+        self._defense = 5 + (level - 1) * 2  # La défense augmente avec le niveau
+        self._experience = 0  # XP initiale
+        self.points_to_allocate = 0  # Points d'amélioration pour stats
+        self._temporary_attack_boost = 0  # Boost temporaire d'attaque
+        self._damage_reduction = 0  # Réduction des dégâts via bouclier
+
+    # --- Progression du personnage ---
+    @property
+    def experience(self):
+        return self._experience
+
+    def add_experience(self, xp):
+        """Ajoute de l'XP sans passer de niveau ni rien afficher."""
+        self._experience += xp
+
     def gain_experience(self, xp):
         """Ajoute de l'XP et gère les passages de niveau."""
-        self._experience += xp
+        self.add_experience(xp)
         print(f"{self.name} gained {xp} XP! Current XP: {self._experience}/{self.experience_to_next_level()}")
         
         # Passage au niveau supérieur si suffisamment d'XP
@@ -103,8 +166,8 @@ class Character:
         """Calcule l'XP nécessaire pour passer au niveau suivant."""
         return 100 + (self._level - 1) * 50  # XP nécessaire pour atteindre le niveau suivant
 
-    def level_up(self):
-        """Augmente le niveau et distribue des points d'amélioration."""
+    def raise_level(self):
+        """Augmente le niveau et les statistiques, sans rien afficher."""
         self._level += 1
         self.points_to_allocate += 3  # Distribution des points d'amélioration
         self._max_hp += 20  # Augmente les HP max au niveau supérieur
@@ -112,6 +175,9 @@ class Character:
         self._attack += 5  # Augmente l'attaque
         self._defense += 2  # Augmente la défense
 
+    def level_up(self):
+        """Augmente le niveau et distribue des points d'amélioration."""
+        self.raise_level()
         print(f"{self.name} leveled up to Level {self._level}!")
         print(f"New stats - Max HP: {self._max_hp}, Attack: {self._attack}, Defense: {self._defense}.")
         print(f"Points available to allocate: {self.points_to_allocate}")
@@ -130,34 +196,6 @@ class Character:
         self.points_to_allocate -= total_points
         print(f"{self.name}'s stats updated: Attack: {self._attack}, Defense: {self._defense}, Max HP: {self._max_hp}.")
 
-    # --- Gestion des boosts ---
-    def apply_temporary_attack_boost(self, boost_amount):
-        """Applique un boost temporaire d'attaque."""
-        self._temporary_attack_boost += boost_amount
-        print(f"{self.name} receives a temporary attack boost of {boost_amount}!")
-
-    def reset_attack_boost(self):
-        """Réinitialise le boost temporaire d'attaque."""
-        if self._temporary_attack_boost > 0:
-            print(f"{self.name}'s attack boost of {self._temporary_attack_boost} is reset.")
-        self._temporary_attack_boost = 0
-
-    def activate_shield(self, reduction):
-        """Active un bouclier réduisant les dégâts subis."""
-        self._damage_reduction = reduction
-        print(f"{self.name} activates a shield reducing damage by {reduction}%!")
-
-    def deactivate_shield(self):
-        """Désactive le bouclier."""
-        if self._damage_reduction > 0:
-            print(f"{self.name}'s shield deactivates.")
-        self._damage_reduction = 0
-
-    # --- État du personnage ---
-    def is_alive(self):
-        """Vérifie si le personnage est encore en vie."""
-        return self.hp > 0
-
     def __str__(self):
         """Affiche les statistiques actuelles du personnage sous forme lisible."""
         return (f"{self.name} (Level: {self.level}, HP: {self.hp}/{self.max_hp}, "
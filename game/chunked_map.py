@@ -0,0 +1,298 @@
+import random
+from collections import OrderedDict
+
+from game.enemy import Enemy
+from game.item import Item
+from game.map import GameMap, REGION_DESCRIPTIONS
+from game.spawn_table import get_spawn_table
+from game.tile_grid import TileGrid, TileView, REGION_CODES, FLAVOUR_TEXTS, START_TEMPLATE, BOSS_TEMPLATE, description_template_id
+
+
+class ChunkedTiles:
+    """
+    Accès aux cases d'un monde découpé en chunks, avec la même interface que TileGrid.
+    Chaque chunk est une petite TileGrid générée à la demande par le ChunkedGameMap.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.size = world.size
+
+    def locate(self, position):
+        """Retourne (chunk, indice local) pour une position, ou (None, None) hors de la carte."""
+        x, y = position
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return None, None
+        chunk_size = self.world.chunk_size
+        chunk = self.world.get_chunk((x // chunk_size, y // chunk_size))
+        return chunk, (x % chunk_size) * chunk_size + y % chunk_size
+
+    def enemy_at(self, position):
+        chunk, index = self.locate(position)
+        return None if chunk is None else chunk.enemy_table.get(index)
+
+    def item_at(self, position):
+        chunk, index = self.locate(position)
+        return None if chunk is None else chunk.item_table.get(index)
+
+    def __contains__(self, position):
+        try:
+            x, y = position
+        except (TypeError, ValueError):
+            return False
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def __getitem__(self, position):
+        chunk, index = self.locate(position)
+        if chunk is None:
+            raise KeyError(position)
+        return TileView(chunk, index)
+
+    def get(self, position, default=None):
+        chunk, index = self.locate(position)
+        return default if chunk is None else TileView(chunk, index)
+
+    def __len__(self):
+        return self.size * self.size
+
+    def __iter__(self):
+        for x in range(self.size):
+            for y in range(self.size):
+                yield (x, y)
+
+
+class ChunkedGameMap(GameMap):
+    """
+    Carte générée paresseusement par chunks de taille fixe.
+
+    Un chunk n'est généré que lorsque le joueur (ou une requête) le touche pour la première fois.
+    Les chunks générés sont gardés dans un cache LRU et évincés lorsqu'ils sont loin du joueur.
+    Chaque chunk a sa propre graine dérivée de la graine du monde : un chunk évincé est régénéré
+    à l'identique, seuls les ennemis vaincus, les ennemis modifiés (blessés, ou dont l'état vient du
+    journal de la sauvegarde) et les objets ramassés sont mémorisés.
+    """
+
+    def __init__(self, size=1024, chunk_size=16, world_seed=None, max_chunks=64, keep_radius=2):
+        """
+        Initialise un monde découpé en chunks sans rien générer à l'avance.
+
+        :param size: Taille de la carte (size x size cases).
+        :param chunk_size: Côté d'un chunk en cases.
+        :param world_seed: Graine du monde (tirée au hasard si absente).
+        :param max_chunks: Nombre de chunks gardés en cache avant d'évincer les plus anciens.
+        :param keep_radius: Distance (en chunks) autour du joueur en dessous de laquelle un chunk n'est jamais évincé.
+        """
+        self.size = size
+        self.compact = True
+        self.chunk_size = chunk_size
+        self.world_seed = world_seed if world_seed is not None else random.getrandbits(64)
+        self.max_chunks = max_chunks
+        self.keep_radius = keep_radius
+        self.start_location = (0, 0)  # Emplacement de départ du joueur
+        self.boss_location = (size - 1, size - 1)  # Emplacement du boss
+        self.current_position = (0, 0)  # Position initiale du joueur
+        self.enemy_data = self.load_enemy_data()  # Chargement des données des ennemis
+        self.item_data = self.load_item_data()  # Chargement des données des objets
+        self.cleared_enemies = set()  # Positions des ennemis vaincus
+        self.modified_enemies = {}  # Position -> ennemi modifié d'un chunk évincé (remis à sa régénération)
+        self.picked_items = set()  # Positions des objets ramassés
+        self.chunks = OrderedDict()  # Cache LRU : coordonnées du chunk -> TileGrid
+        self.chunks_generated = 0  # Compteur de générations (régénérations comprises)
+        self.chunks_evicted = 0  # Compteur d'évictions
+        self.locations = ChunkedTiles(self)
+
+        self.region_descriptions = dict(REGION_DESCRIPTIONS)
+
+    # --- Gestion du cache de chunks ---
+    def chunk_seed(self, key):
+        """Graine déterministe d'un chunk, dérivée de la graine du monde."""
+        return f"{self.world_seed}:{key[0]}:{key[1]}"
+
+    def get_chunk(self, key):
+        """Retourne le chunk demandé, en le générant s'il n'est pas en cache."""
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = self.generate_chunk(key)
+        self.chunks[key] = chunk
+        self.chunks_generated += 1
+        if len(self.chunks) > self.max_chunks:
+            self.evict_chunks()
+        return chunk
+
+    def evict_chunks(self):
+        """Évince les chunks les moins récemment utilisés qui sont loin du joueur."""
+        player_cx = self.current_position[0] // self.chunk_size
+        player_cy = self.current_position[1] // self.chunk_size
+        for key in list(self.chunks):
+            if len(self.chunks) <= self.max_chunks:
+                break
+            if max(abs(key[0] - player_cx), abs(key[1] - player_cy)) > self.keep_radius:
+                self.modified_enemies.update(self.chunk_modified_enemies(key, self.chunks.pop(key)))
+                self.chunks_evicted += 1
+
+    def chunk_modified_enemies(self, key, chunk):
+        """(position, ennemi) des ennemis du chunk qui ne sont plus tels que générés : ils ne seraient pas régénérés."""
+        chunk_size = self.chunk_size
+        origin_x, origin_y = key[0] * chunk_size, key[1] * chunk_size
+        for index, enemy in chunk.enemy_table.items():
+            if enemy._hp != enemy.kind.max_hp or enemy._temporary_attack_boost or enemy._damage_reduction:
+                yield (origin_x + index // chunk_size, origin_y + index % chunk_size), enemy
+
+    # --- Génération d'un chunk ---
+    def generate_chunk(self, key):
+        """Génère un chunk avec son propre générateur aléatoire."""
+        rng = random.Random(self.chunk_seed(key))
+        chunk_size = self.chunk_size
+        origin_x, origin_y = key[0] * chunk_size, key[1] * chunk_size
+        chunk = TileGrid(chunk_size)
+        half = self.size // 2
+        region_descriptions = {
+            (0, 0): "forest",
+            (0, 1): "swamp",
+            (1, 0): "plains",
+            (1, 1): "mountain"
+        }
+        flavour_indices = range(len(FLAVOUR_TEXTS))
+
+        # Descriptions et régions des cases
+        index = 0
+        for x in range(origin_x, origin_x + chunk_size):
+            for y in range(origin_y, origin_y + chunk_size):
+                if x < self.size and y < self.size:
+                    chunk.regions[index] = REGION_CODES[self.get_region((x, y))]
+                    if (x, y) == self.start_location:
+                        chunk.descriptions[index] = START_TEMPLATE
+                    elif (x, y) == self.boss_location:
+                        chunk.descriptions[index] = BOSS_TEMPLATE
+                    else:
+                        region_type = region_descriptions.get((x // half, y // half), "unknown")
+                        chunk.descriptions[index] = description_template_id(region_type, rng.choice(flavour_indices))
+                index += 1
+
+        self.spawn_chunk_enemies(chunk, origin_x, origin_y, rng)
+        self.spawn_chunk_items(chunk, origin_x, origin_y, rng)
+
+        boss_x, boss_y = self.boss_location
+        if origin_x <= boss_x < origin_x + chunk_size and origin_y <= boss_y < origin_y + chunk_size:
+            chunk.enemy_table[(boss_x - origin_x) * chunk_size + boss_y - origin_y] = self.create_boss()
+
+        # Le chunk est toujours généré en entier puis les modifications du joueur sont réappliquées,
+        # pour que les tirages aléatoires restent identiques d'une régénération à l'autre
+        for table, removed in ((chunk.enemy_table, self.cleared_enemies), (chunk.item_table, self.picked_items)):
+            for index in [index for index in table if (origin_x + index // chunk_size, origin_y + index % chunk_size) in removed]:
+                del table[index]
+        if self.modified_enemies:
+            for index in list(chunk.enemy_table):
+                enemy = self.modified_enemies.pop((origin_x + index // chunk_size, origin_y + index % chunk_size), None)
+                if enemy is not None:
+                    chunk.enemy_table[index] = enemy
+        return chunk
+
+    def chunk_candidates(self, origin_x, origin_y):
+        """
+        Positions où un ennemi ou un objet peut apparaître dans un chunk.
+        Les bords du chunk sont exclus pour que deux ennemis de chunks voisins ne soient jamais adjacents.
+        """
+        candidates = []
+        for x in range(origin_x + 1, origin_x + self.chunk_size - 1):
+            for y in range(origin_y + 1, origin_y + self.chunk_size - 1):
+                if x >= self.size or y >= self.size:
+                    continue
+                if abs(x - self.start_location[0]) < 2 and abs(y - self.start_location[1]) < 2:
+                    continue  # Trop près du départ du joueur
+                if (x, y) == self.boss_location:
+                    continue
+                candidates.append((x, y))
+        return candidates
+
+    def spawn_chunk_enemies(self, chunk, origin_x, origin_y, rng):
+        """Spawne les ennemis d'un chunk, sans ennemis adjacents entre eux."""
+        chunk_size = self.chunk_size
+        candidates = self.chunk_candidates(origin_x, origin_y)
+        rng.shuffle(candidates)
+        attempts = 0
+
+        for x, y in candidates:
+            if attempts >= chunk_size:
+                break
+            lx, ly = x - origin_x, y - origin_y
+            if any((lx + dx) * chunk_size + ly + dy in chunk.enemy_table for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                continue
+            attempts += 1
+            chosen_enemy = get_spawn_table(self.get_region((x, y))).sample(rng)
+            if chosen_enemy is not None:
+                chunk.enemy_table[lx * chunk_size + ly] = Enemy(
+                    name=chosen_enemy.name,
+                    level=chosen_enemy.level,
+                    enemy_type=chosen_enemy.type
+                )
+
+    def spawn_chunk_items(self, chunk, origin_x, origin_y, rng):
+        """Spawne les objets d'un chunk, loin des ennemis comme dans GameMap.spawn_items."""
+        chunk_size = self.chunk_size
+        if not self.item_data:
+            return
+        candidates = self.chunk_candidates(origin_x, origin_y)
+        rng.shuffle(candidates)
+        placed = 0
+
+        for x, y in candidates:
+            if placed >= chunk_size // 4:
+                break
+            lx, ly = x - origin_x, y - origin_y
+            if any((lx + dx) * chunk_size + ly + dy in chunk.enemy_table for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+                continue
+            chosen_item = rng.choice(self.item_data)
+            placed += 1
+            chunk.item_table[lx * chunk_size + ly] = Item(
+                name=chosen_item.name,
+                effect=chosen_item.effect,
+                power=chosen_item.power,
+                quantity=chosen_item.quantity,
+                level=chosen_item.level
+            )
+
+    def create_boss(self):
+        """Crée le boss final du monde."""
+        return Enemy(name="Goblin Overlord", level=10, enemy_type="boss", spawn_chance=1.0, available_items=[])
+
+    def spawn_boss(self):
+        """Le boss est placé à la génération de son chunk."""
+
+    # --- Accès aux cases ---
+    def set_player_position(self, x, y):
+        """Met à jour la position du joueur et charge le chunk où il se trouve."""
+        super().set_player_position(x, y)
+        self.locations.locate(self.current_position)
+
+    def clear_enemy(self, position):
+        """Supprime l'ennemi et mémorise sa disparition pour les régénérations du chunk."""
+        chunk, index = self.locations.locate(position)
+        if chunk is not None and chunk.enemy_table.pop(index, None) is not None:
+            self.cleared_enemies.add(position)
+
+    def clear_item(self, position):
+        """Supprime l'objet et mémorise son ramassage pour les régénérations du chunk."""
+        chunk, index = self.locations.locate(position)
+        if chunk is not None and chunk.item_table.pop(index, None) is not None:
+            self.picked_items.add(position)
+
+    def __getstate__(self):
+        """
+        Seuls la graine et les modifications sont sauvegardées : les chunks sont régénérés au chargement,
+        et les ennemis modifiés des chunks en cache sont ajoutés à ceux des chunks évincés.
+        """
+        state = self.__dict__.copy()
+        state["chunks"] = OrderedDict()
+        state["modified_enemies"] = dict(self.modified_enemies)
+        for key, chunk in self.chunks.items():
+            state["modified_enemies"].update(self.chunk_modified_enemies(key, chunk))
+        return state
+
+    def __setstate__(self, state):
+        """Relit un monde sauvegardé, y compris avant la mémorisation des ennemis modifiés."""
+        self.__dict__.update(state)
+        self.__dict__.setdefault("modified_enemies", {})
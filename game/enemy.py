@@ -1,9 +1,108 @@
-import json
 import random
+from collections import namedtuple
+from game.assets import get_registry, ENEMIES_PATH
 from game.character import Character
 from game.item import Item  # Classe Item avec gestion des niveaux
+from game.slots import set_state
+
+def drop_chance(enemy_level, item_level):
+    """
+    Probabilité qu'un ennemi d'un niveau donné lâche un objet d'un niveau donné.
+    :param enemy_level: Niveau de l'ennemi.
+    :param item_level: Niveau de l'objet à loot.
+    """
+    level_diff = item_level - enemy_level
+    if level_diff == 0:  # Même niveau
+        chance = 0.7
+    elif level_diff < 0:  # Niveau de l'objet plus bas
+        chance = 0.25
+    elif level_diff > 0:  # Niveau de l'objet plus élevé
+        chance = 0.05
+    else:
+        chance = 0.1  # Valeur par défaut si aucune condition n'est remplie
+    return chance
+
+
+_stats = {}
+
+
+def enemy_stats(enemy_type, level, base_hp=100):
+    """
+    Statistiques (HP max, attaque, défense) d'un ennemi, calculées une seule fois par (type, niveau).
+
+    :param enemy_type: Type de l'ennemi (boss, terrestre, aérien ou autre).
+    :param level: Niveau de l'ennemi.
+    :param base_hp: HP d'un ennemi de niveau 1.
+    """
+    key = (enemy_type, level, base_hp)
+    stats = _stats.get(key)
+    if stats is None:
+        base_attack = 10
+
+        # Si c'est un boss, on lui donne plus de HP que les ennemis classiques
+        if enemy_type == "boss":
+            hp = base_hp + (level - 1) * 50  # Exemple d'augmentation des HP pour un boss
+            attack = 25 + (level - 1) * 2
+        elif enemy_type == "terrestre":
+            hp = base_hp + (level - 1) * 25
+            attack = base_attack + (level - 1) * 2
+        elif enemy_type == "aérien":
+            hp = base_hp + (level - 1) * 15
+            attack = base_attack + (level - 1) * 4
+        else:  # Type par défaut ou "Basic"
+            hp = base_hp + (level - 1) * 20
+            attack = base_attack + (level - 1) * 2
+        stats = _stats[key] = (hp, attack, 5 + (level - 1) * 2)  # Défense de Character
+    return stats
+
+
+class EnemyKind(namedtuple("EnemyKind", ["name", "level", "enemy_type", "spawn_chance", "available_items", "base_hp",
+                                         "max_hp", "attack", "defense"])):
+    """
+    Partie immuable d'un ennemi, partagée par tous les ennemis identiques de toutes les sessions :
+    un Enemy ne garde que ce modèle et son état de combat (HP restants, boosts).
+    """
+    __slots__ = ()
+
+    def arguments(self):
+        """Arguments de enemy_kind qui redonnent ce modèle ; la défense n'y figure que si elle a été modifiée."""
+        default = enemy_stats(self.enemy_type, self.level, self.base_hp)[2]
+        if self.defense == default and type(self.defense) is type(default):
+            return self[:6]
+        return self[:6] + (self.defense,)
+
+    def __reduce__(self):
+        # Sauvegarde relue : le modèle est repris dans le cache partagé au lieu d'être recopié
+        return enemy_kind, self.arguments()
+
+
+_kinds = {}
+
+
+def enemy_kind(name, level=1, enemy_type="Basic", spawn_chance=0.1, available_items=(), base_hp=100, defense=None):
+    """
+    Retourne le modèle partagé (EnemyKind) de ces caractéristiques, créé au premier appel.
+
+    :param defense: Défense modifiée (Enemy.defense = ...), None pour celle calculée par enemy_stats.
+    """
+    if defense is not None:
+        default = enemy_stats(enemy_type, level, base_hp)[2]
+        if defense == default and type(defense) is type(default):
+            defense = None  # Même modèle que sans modification
+    values = (name, level, enemy_type, spawn_chance, tuple(available_items), base_hp, defense)
+    key = (values, tuple(map(type, values)))  # 1 et 1.0 sont égaux mais ne s'affichent pas pareil
+    kind = _kinds.get(key)
+    if kind is None:
+        max_hp, attack, default_defense = enemy_stats(enemy_type, level, base_hp)
+        kind = _kinds[key] = EnemyKind(*values[:6], max_hp, attack, default_defense if defense is None else defense)
+    return kind
+
 
 class Enemy(Character):
+    # Nom, niveau et statistiques de Character sont lus dans le modèle partagé (propriétés ci-dessous) :
+    # ses attributs fixes restent vides et ne sont pas sauvegardés
+    __slots__ = ("kind",)
+
     def __init__(self, name, level=1, enemy_type="Basic", spawn_chance=0.1, available_items=None):
         """
         Initialise un ennemi avec des caractéristiques spécifiques en fonction de son type et niveau.
@@ -14,70 +113,43 @@ class Enemy(Character):
         :param spawn_chance: Chance d'apparition de l'ennemi.
         :param available_items: Liste d'objets possibles à drop par cet ennemi.
         """
-        super().__init__(name, level)  # Appel du constructeur de la classe parente (Character)
-        self._enemy_type = enemy_type
-        self.spawn_chance = spawn_chance
-        self.available_items = available_items if available_items else []  # Liste d'objets possibles à drop
-        self.set_attributes()  # Définir les caractéristiques de l'ennemi
+        # Nom, niveau, type et statistiques sont dans le modèle partagé ; l'instance ne garde que son état de combat
+        self.kind = enemy_kind(name, level, enemy_type, spawn_chance, available_items or ())
+        self._hp = self.kind.max_hp
+        self._temporary_attack_boost = 0
+        self._damage_reduction = 0
 
     def set_attributes(self, base_hp=100):
-        """Définit les caractéristiques de l'ennemi en fonction de son niveau et type."""
-        base_attack = 10
-
-        # Si c'est un boss, on lui donne plus de HP que les ennemis classiques
-        if self._enemy_type == "boss":
-            self._hp = base_hp + (self._level - 1) * 50  # Exemple d'augmentation des HP pour un boss
-            self._attack = 25 + (self._level - 1) * 2
-        elif self._enemy_type == "terrestre":
-            self._hp = base_hp + (self._level - 1) * 25
-            self._attack = base_attack + (self._level - 1) * 2
-        elif self._enemy_type == "aérien":
-            self._hp = base_hp + (self._level - 1) * 15
-            self._attack = base_attack + (self._level - 1) * 4
-        else:  # Type par défaut ou "Basic"
-            self._hp = base_hp + (self._level - 1) * 20
-            self._attack = base_attack + (self._level - 1) * 2
+        """Définit les caractéristiques de l'ennemi en fonction de son niveau et type (HP remis au maximum)."""
+        self.kind = enemy_kind(*self.kind[:5], base_hp, *self.kind.arguments()[6:])  # Défense modifiée gardée
+        self._hp = self.kind.max_hp
 
-        self._max_hp = self._hp  # Mise à jour des HP max
+    def __setstate__(self, state):
+        """Relit un ennemi sauvegardé, y compris avant les modèles partagés (statistiques dans l'instance)."""
+        if "kind" not in state:
+            state = dict(state, kind=enemy_kind(state["name"], state["_level"], state["_enemy_type"],
+                                                state["spawn_chance"], state["available_items"]))
+        set_state(self, state, {"_temporary_attack_boost": 0, "_damage_reduction": 0})
 
 
-    def drop_loot(self):
+    def drop_loot(self, rng=random):
         """
         Détermine quel loot l'ennemi laisse tomber en fonction des objets disponibles et des chances.
         Retourne un à trois objets (Item) obtenus de manière aléatoire.
-        """
-        loot = []
-
-        # Ouvre et charge le fichier JSON contenant les objets à loot
-        try:
-            with open('assets/items_data.json', 'r') as file:
-                items_data = json.load(file)
-        except FileNotFoundError:
-            print("Erreur : Le fichier items_data.json est introuvable.")
-            return None
-        except json.JSONDecodeError:
-            print("Erreur : Le fichier JSON est malformé.")
-            return None
-
-        # Sélectionne entre 1 et 3 objets à loot
-        number_of_items_to_drop = random.randint(2, 4)
 
-        # Filtrer les objets disponibles selon les chances de drop
-        possible_items = []
-        for item_data in items_data:
-            item = Item(**item_data)  # Crée l'objet Item à partir des données JSON
-            item_level = item.level
-            chance = self.calculate_drop_chance(item_level)  # Calcule les chances de drop pour l'objet
-
-            # Si l'objet passe le test de probabilité, l'ajouter à la liste possible
-            if random.random() < chance:
-                possible_items.append(item)
+        :param rng: Générateur aléatoire du tirage (module random par défaut).
+        """
+        from game.loot_table import get_loot_table
 
-        # Choisir entre 1 et 3 objets au hasard parmi les objets possibles
-        if possible_items:
-            chosen_items = random.sample(possible_items, min(len(possible_items), number_of_items_to_drop))
-            loot.extend(chosen_items)
+        # Modèles d'objets déjà chargés par le registre : aucun accès disque pendant le combat
+        registry = get_registry()
+        if not registry.items():
+            print("Erreur : Aucune donnée d'objet disponible.")
+            return None
 
+        # Table précalculée pour ce niveau : seuls les objets réellement lâchés sont créés
+        loot = [Item(**template._asdict()) for template in get_loot_table(self.kind.level, registry).draw(rng)]
+        if loot:
             # Afficher les objets choisis
             print(f"{self.name} dropped: {[item.name for item in loot]}")
             return loot  # Retourne la liste des objets choisis
@@ -92,32 +164,70 @@ class Enemy(Character):
         :param item_level: Niveau de l'objet à loot.
         :return: La probabilité que l'objet soit lâché par l'ennemi.
         """
-        level_diff = item_level - self._level
-        if level_diff == 0:  # Même niveau
-            chance = 0.7
-        elif level_diff < 0:  # Niveau de l'objet plus bas
-            chance = 0.25
-        elif level_diff > 0:  # Niveau de l'objet plus élevé
-            chance = 0.05
-        else:
-            chance = 0.1  # Valeur par défaut si aucune condition n'est remplie
-        return chance
-
-    # --- Propriétés de l'ennemi ---
+        return drop_chance(self.kind.level, item_level)
+
+    # --- Propriétés de l'ennemi (lues dans le modèle partagé) ---
+    @property
+    def name(self):
+        return self.kind.name
+
     @property
     def level(self):
         """Retourne le niveau de l'ennemi."""
-        return self._level
+        return self.kind.level
 
     @property
     def max_hp(self):
         """Retourne les HP max de l'ennemi."""
-        return self._max_hp
+        return self.kind.max_hp
 
     @property
     def enemy_type(self):
         """Retourne le type d'ennemi."""
-        return self._enemy_type
+        return self.kind.enemy_type
+
+    @property
+    def spawn_chance(self):
+        return self.kind.spawn_chance
+
+    @property
+    def available_items(self):
+        return self.kind.available_items
+
+    # Propriétés de combat de Combatant, lues directement dans le modèle (chemin critique des combats)
+    @property
+    def hp(self):
+        return self._hp
+
+    @hp.setter
+    def hp(self, value):
+        self._hp = max(0, min(value, self.kind.max_hp))
+
+    @property
+    def attack(self):
+        return self.kind.attack + self._temporary_attack_boost
+
+    @property
+    def defense(self):
+        return self.kind.defense
+
+    @defense.setter
+    def defense(self, value):
+        # Copie à l'écriture, comme les propriétés de Item : l'ennemi passe seul sur le modèle avec cette défense
+        self.kind = enemy_kind(*self.kind[:6], value)
+
+    # Noms utilisés par Combatant
+    _level = level
+    _max_hp = max_hp
+    _enemy_type = enemy_type
+
+    @property
+    def _attack(self):
+        return self.kind.attack
+
+    @property
+    def _defense(self):
+        return self.kind.defense
 
     # --- Méthodes de gestion de l'état de l'ennemi ---
     def take_damage(self, damage):
@@ -131,50 +241,34 @@ class Enemy(Character):
         return self._hp > 0
 
     @staticmethod
-    def load_enemies(filename, item_pool):
+    def load_enemies(filename=ENEMIES_PATH, item_pool=()):
         """
-        Charge les ennemis depuis un fichier JSON avec des informations sur le type, niveau, chances d'apparition et loot possible.
+        Crée les ennemis décrits dans un fichier JSON avec des informations sur le type, niveau, chances d'apparition et loot possible.
+        Le fichier est lu et validé par le registre des données.
         :param filename: Le nom du fichier contenant les données des ennemis.
         :param item_pool: Liste d'objets disponibles pour être droppés par les ennemis.
         :return: Liste des ennemis chargés.
         """
+        registry = get_registry(enemies_path=filename)
         enemies = []
-        try:
-            with open(filename, 'r') as file:
-                enemies_data = json.load(file)
-                for enemy_info in enemies_data:
-                    try:
-                        name = enemy_info['name']
-                        level = enemy_info.get('level', 1)  # Par défaut, niveau 1
-                        enemy_type = enemy_info.get('type', "Basic")
-                        spawn_chance = enemy_info.get('spawn_chance', 0.1)  # Par défaut, 10% de chance d'apparition
-                        loot_table = enemy_info.get('loot_table', [])  # Liste d'objets possibles à loot
-
-                        # Crée l'ennemi avec des objets à loot basés sur le loot pool
-                        available_items = [
-                            item for item in item_pool if abs(item.level - level) <= 1  # Items avec un niveau +-1 par rapport à l'ennemi
-                        ]
-
-                        enemy = Enemy(
-                            name=name,
-                            level=level,
-                            enemy_type=enemy_type,
-                            spawn_chance=spawn_chance,
-                            available_items=available_items
-                        )
-                        enemies.append(enemy)
-                    except KeyError as e:
-                        print(f"Erreur dans les données de l'ennemi : clé manquante {e}")
-                    except TypeError:
-                        print("Erreur : Format des données de l'ennemi incorrect.")
-        except FileNotFoundError:
-            print("Erreur : Fichier des données des ennemis introuvable.")
-        except json.JSONDecodeError:
-            print("Erreur : Le fichier JSON est malformé.")
-        
+        for template in registry.enemies():
+            # Crée l'ennemi avec des objets à loot basés sur le loot pool
+            available_items = [
+                item for item in item_pool if abs(item.level - template.level) <= 1  # Items avec un niveau +-1 par rapport à l'ennemi
+            ]
+
+            enemy = Enemy(
+                name=template.name,
+                level=template.level,
+                enemy_type=template.type,
+                spawn_chance=template.spawn_chance,
+                available_items=available_items
+            )
+            enemies.append(enemy)
+
         return enemies
 
     def __str__(self):
         """Retourne une représentation sous forme de chaîne de l'ennemi."""
-        return (f"{self.name} (Type: {self._enemy_type}, Level: {self._level}, "
-                f"HP: {self._hp}/{self._max_hp}, Spawn Chance: {self.spawn_chance})")
+        return (f"{self.name} (Type: {self.enemy_type}, Level: {self.level}, "
+                f"HP: {self._hp}/{self.max_hp}, Spawn Chance: {self.spawn_chance})")
@@ -0,0 +1,290 @@
+"""
+Événements typés d'un combat, et sorties (sinks) qui les consomment.
+
+Battle.resolve() est un générateur : il applique les règles du combat sans rien afficher et produit un
+événement par chose qui se passe (attaque, critique, esquive, bouclier, objet, passage de niveau,
+victoire...). Quand il attend le choix du joueur, il produit un ActionRequest et reçoit la réponse par
+send() : "attack", "run", "cancel" (retour au menu, sans riposte) ou ("use", numéro d'objet 1-based).
+
+Les déroulements interactifs (menus, exploration, choix du joueur en combat) sont eux aussi des
+générateurs, qui produisent un Prompt à chaque saisie attendue : run_prompts les déroule au clavier,
+le serveur (game_server.py) avec les lignes reçues de chaque client.
+
+Les événements ne contiennent que des données simples (noms, nombres), pour pouvoir être affichés,
+ignorés ou enregistrés :
+    ConsoleSink   reproduit l'affichage ANSI historique de Battle.start_battle ;
+    NullSink      ignore tout (combats sans interface) ;
+    JsonLinesSink écrit un tableau JSON compact par ligne : ["Attack","Hero","Goblin",12,false].
+"""
+import json
+import sys
+from collections import namedtuple
+
+
+# --- Événements ---
+class Prompt(namedtuple("Prompt", ["text", "bottom", "checkpoint"])):
+    """
+    Le déroulement attend une ligne saisie par le joueur, à renvoyer par send().
+    `bottom` : invite affichée en bas de l'écran, comme ui_manager.get_input.
+    `checkpoint` : état de la partie si elle peut être sauvegardée ici puis reprise à l'identique
+    (main.Checkpoint), None sinon.
+    """
+    __slots__ = ()
+
+    def __new__(cls, text, bottom=False, checkpoint=None):
+        return super().__new__(cls, text, bottom, checkpoint)
+
+
+class HealthStatus(namedtuple("HealthStatus", ["player", "hp", "max_hp", "enemy", "enemy_hp", "enemy_max_hp"])):
+    """Points de vie des deux combattants, au début de chaque tour."""
+    __slots__ = ()
+
+
+class ActionRequest(namedtuple("ActionRequest", ["player", "hp", "max_hp", "enemy_hp"])):
+    """Le combat attend l'action du joueur, à renvoyer par send()."""
+    __slots__ = ()
+
+
+class CriticalHit(namedtuple("CriticalHit", ["attacker"])):
+    """Les dégâts de l'attaque sont doublés (second tirage du critique réussi)."""
+    __slots__ = ()
+
+
+class Attack(namedtuple("Attack", ["attacker", "target", "damage", "critical"])):
+    """Attaque du joueur (ou d'un héros) ; `critical` correspond au premier tirage du critique."""
+    __slots__ = ()
+
+
+class BoostReset(namedtuple("BoostReset", ["player"])):
+    """Le boost d'attaque du combat est retombé après une attaque."""
+    __slots__ = ()
+
+
+class Evade(namedtuple("Evade", ["defender", "attacker"])):
+    """Le joueur (ou un héros) esquive l'attaque d'un ennemi."""
+    __slots__ = ()
+
+
+class ShieldAbsorbed(namedtuple("ShieldAbsorbed", ["defender", "reduction"])):
+    """Le bouclier actif réduit les dégâts de `reduction` % puis est consommé."""
+    __slots__ = ()
+
+
+class DamageTaken(namedtuple("DamageTaken", ["target", "damage", "hp", "max_hp"])):
+    """Dégâts subis par le joueur (ou un héros) après bouclier et défense."""
+    __slots__ = ()
+
+
+class Defeated(namedtuple("Defeated", ["name"])):
+    """Un combattant tombe à 0 HP."""
+    __slots__ = ()
+
+
+class ItemUsed(namedtuple("ItemUsed", ["user", "item", "effect", "power", "boost_applied"])):
+    """Objet utilisé ; `boost_applied` indique si un boost d'attaque s'est ajouté à celui du joueur."""
+    __slots__ = ()
+
+
+class ItemDepleted(namedtuple("ItemDepleted", ["item"])):
+    """Dernier exemplaire d'un objet utilisé, retiré de l'inventaire."""
+    __slots__ = ()
+
+
+class EscapeFailed(namedtuple("EscapeFailed", ["player", "enemy", "damage", "attempt", "max_attempts"])):
+    """Tentative de fuite ratée ; `damage` est le coup reçu avant réduction."""
+    __slots__ = ()
+
+
+class Escaped(namedtuple("Escaped", ["player", "pity"])):
+    """Le joueur s'enfuit ; `pity` quand le monstre le laisse partir après trop d'essais."""
+    __slots__ = ()
+
+
+class Victory(namedtuple("Victory", ["winner", "loser", "player_won"])):
+    """Fin du combat."""
+    __slots__ = ()
+
+
+class ExperienceGained(namedtuple("ExperienceGained", ["name", "xp", "experience", "next_level"])):
+    """XP gagnée en récompense, avant les passages de niveau."""
+    __slots__ = ()
+
+
+class LevelUp(namedtuple("LevelUp", ["name", "level", "max_hp", "attack", "defense", "points"])):
+    """Passage de niveau et nouvelles statistiques."""
+    __slots__ = ()
+
+
+class Healed(namedtuple("Healed", ["name", "amount", "hp", "max_hp"])):
+    """Soin de fin de combat."""
+    __slots__ = ()
+
+
+class Reward(namedtuple("Reward", ["player", "xp", "heal"])):
+    """Récapitulatif de la récompense."""
+    __slots__ = ()
+
+
+EVENT_TYPES = (HealthStatus, ActionRequest, CriticalHit, Attack, BoostReset, Evade, ShieldAbsorbed, DamageTaken,
+               Defeated, ItemUsed, ItemDepleted, EscapeFailed, Escaped, Victory, ExperienceGained, LevelUp,
+               Healed, Reward)
+
+
+# --- Sorties ---
+class NullSink:
+    """Ignore les événements."""
+
+    def emit(self, event):
+        pass
+
+
+class ConsoleSink:
+    """Affiche les événements comme l'affichage historique du combat."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.renderers = {event_type: getattr(self, "render_" + event_type.__name__.lower())
+                          for event_type in EVENT_TYPES if event_type is not ActionRequest}
+
+    def emit(self, event):
+        lines = self.renderers[type(event)](event)
+        print("\n".join(lines), file=self.stream or sys.stdout)
+
+    # Un rendu retourne les lignes à afficher, dans l'ordre des anciens print
+    def render_healthstatus(self, event):
+        return (f"{event.player}: \033[92m{event.hp}/{event.max_hp}\033[0m HP",
+                f"{event.enemy}: \033[91m{event.enemy_hp}/{event.enemy_max_hp}\033[0m HP\n", "")
+
+    def render_criticalhit(self, event):
+        return ("\033[93mCritical hit!\033[0m",)
+
+    def render_attack(self, event):
+        if event.critical:
+            return (f"\033[93mCritical hit!\033[0m {event.attacker} deals \033[91m{event.damage}\033[0m damage "
+                    f"to {event.target}!",)
+        return (f"\n{event.attacker} attacks {event.target} for \033[91m{event.damage}\033[0m damage.\n",)
+
+    def render_boostreset(self, event):
+        return ("\033[94mAttack boost reset.\033[0m\n",)
+
+    def render_evade(self, event):
+        return (f"\n\033[93m{event.defender} evades the attack!\033[0m\n",)
+
+    def render_shieldabsorbed(self, event):
+        return (f"{event.defender}'s shield reduces the damage by {event.reduction}%.",)
+
+    def render_damagetaken(self, event):
+        return (f"{event.target} takes {event.damage} damage! Remaining HP: {event.hp}/{event.max_hp}",)
+
+    def render_defeated(self, event):
+        return (f"{event.name} is defeated!",)
+
+    def render_itemused(self, event):
+        used = f"{event.user} uses {event.item}."
+        if event.effect == "boost_attack":
+            lines = [f"\n\033[94mAttack boosted by {event.power}!\033[0m\n"]
+            if event.boost_applied:
+                lines.append(f"{event.user}'s attack is boosted by {event.power}%!")
+            return lines + [used]
+        if event.effect == "damage":
+            return (f"\nUsing {event.item}! {event.user} uses {event.item} and deals {event.power} damage.", used)
+        if event.effect == "health_boost":
+            return (f"\nUsed \033[94m{event.item}\033[0m to heal \033[92m{event.power}\033[0m HP!", used,
+                    f"{event.user} heals for {event.power} HP!")
+        if event.effect == "boost_shield":
+            return (used, f"{event.user}'s shield increased by {event.power} points!")
+        return (used,)
+
+    def render_itemdepleted(self, event):
+        return (f"\033[91m{event.item} has been used up and removed.\033[0m\n",)
+
+    def render_escapefailed(self, event):
+        return (f"\033[91m{event.enemy} hits you while you try to escape! You take {event.damage} damage.\033[0m\n",
+                f"Escape attempt {event.attempt}/{event.max_attempts} failed.\n",
+                f"\n\033[91m{event.player} failed to escape.\033[0m\n")
+
+    def render_escaped(self, event):
+        if event.pity:
+            first = "\033[93mThe monster took pity on you. He let you go...\033[0m\n"
+        else:
+            first = "\033[92mYou successfully escape !\033[0m\n"
+        return (first, f"\n\033[92m{event.player} escaped!\033[0m\n")
+
+    def render_victory(self, event):
+        color = "\033[92m" if event.player_won else "\033[91m"
+        return (f"\n{color}{event.winner} has defeated {event.loser}!\033[0m\n",)
+
+    def render_experiencegained(self, event):
+        return (f"{event.name} gained {event.xp} XP! Current XP: {event.experience}/{event.next_level}",)
+
+    def render_levelup(self, event):
+        return (f"{event.name} leveled up to Level {event.level}!",
+                f"New stats - Max HP: {event.max_hp}, Attack: {event.attack}, Defense: {event.defense}.",
+                f"Points available to allocate: {event.points}")
+
+    def render_healed(self, event):
+        return (f"{event.name} heals for {event.amount} points. Current HP: {event.hp}/{event.max_hp}",)
+
+    def render_reward(self, event):
+        return (f"\n\033[92m{event.player} gained {event.xp} XP!\033[0m",
+                f"Health restored. {event.player} healed \033[92m{event.heal}\033[0m HP.\n")
+
+
+class JsonLinesSink:
+    """Écrit chaque événement sur une ligne : tableau JSON compact, type puis champs dans l'ordre."""
+
+    def __init__(self, stream):
+        self.write = stream.write
+        self.encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def emit(self, event):
+        self.write(self.encode((type(event).__name__,) + tuple(event)) + "\n")
+
+
+def read_events(lines):
+    """Relit des lignes écrites par JsonLinesSink et retourne les événements typés."""
+    types = {event_type.__name__: event_type for event_type in EVENT_TYPES}
+    events = []
+    for line in lines:
+        if line.strip():
+            name, *fields = json.loads(line)
+            events.append(types[name](*fields))
+    return events
+
+
+# --- Déroulement ---
+def run_events(events, sink, choose_action):
+    """
+    Déroule un générateur d'événements jusqu'au bout et retourne sa valeur de retour.
+
+    :param events: Générateur d'événements, par exemple Battle.resolve().
+    :param sink: Sortie qui reçoit chaque événement (méthode emit), ActionRequest excepté.
+    :param choose_action: Fonction appelée avec chaque ActionRequest, qui retourne l'action du joueur.
+    """
+    emit = sink.emit
+    send = events.send
+    try:
+        event = next(events)
+        while True:
+            if type(event) is ActionRequest:
+                event = send(choose_action(event))
+            else:
+                emit(event)
+                event = send(None)
+    except StopIteration as stop:
+        return stop.value
+
+
+def run_prompts(flow, read_input):
+    """
+    Déroule un générateur qui produit des Prompt et retourne sa valeur de retour.
+
+    :param flow: Générateur de Prompt, par exemple Battle.console_flow().
+    :param read_input: Fonction appelée avec chaque Prompt, qui retourne la ligne saisie.
+    """
+    try:
+        prompt = next(flow)
+        while True:
+            prompt = flow.send(read_input(prompt))
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,322 @@
+"""
+Calcul exact des chances de victoire d'un combat.
+
+La variation uniform(0.9, 1.2) de roll_damage (game/battle.py) donne une loi discrète exacte des dégâts :
+chaque valeur entière int(attaque * variation) correspond à un intervalle de variations. La chance de
+victoire se calcule ensuite par programmation dynamique sur les états (HP du joueur, HP de l'ennemi,
+bouclier actif, boosts actifs, objets restants), avec les mêmes règles que game/simulator.py.
+
+La programmation dynamique est itérative, de bas en haut : pour chaque combinaison d'objets, de bouclier
+et de boosts, une table donne la chance de victoire pour tous les HP du joueur, ligne par ligne des HP de
+l'ennemi (une attaque en retire au moins 1). Les tables sont bornées et partagées entre les requêtes :
+une même combinaison de statistiques ne coûte qu'une fois. La comparaison avec le simulateur est faite
+par tests/test_exact_solver.py.
+
+Stratégies : "attack" (attaque à chaque tour), "heal" (potion de soin sous un seuil, comme
+simulator.heal_below) et "optimal" (meilleure action à chaque tour). La fuite n'est jamais une victoire
+et n'est donc pas considérée.
+
+Usage (depuis la racine du dépôt) :
+    python -m game.exact_solver [--levels 1 10] [--enemy NOM ...] [--boss] [--item NOM ...]
+                                [--policy attack|heal|optimal]
+"""
+import argparse
+from collections import namedtuple
+from functools import lru_cache
+from itertools import accumulate
+
+from game.assets import get_registry
+from game.battle import DAMAGE_VARIATION, critical_chance, evasion_chance
+from game.character import mitigate_damage
+from game.enemy import Enemy
+from game.simulator import PlayerProfile, EnemyProfile
+
+CACHE_SIZE = 2 ** 21  # Nombre maximal d'états (HP du joueur x HP de l'ennemi) gardés dans les tables
+POLICIES = ("attack", "heal", "optimal")
+HEAL_THRESHOLD = 0.3
+
+
+class Matchup(namedtuple("Matchup", ["level", "max_hp", "attack", "defense", "enemy_attack", "policy",
+                                     "heal_threshold"])):
+    """Statistiques fixes d'un combat : clé commune de tous ses états dans le cache."""
+    __slots__ = ()
+
+
+# --- Lois des dégâts ---
+@lru_cache(maxsize=4096)
+def variation_distribution(base):
+    """Loi exacte de int(base * uniform(0.9, 1.2)), sous forme de tuple (valeur, probabilité)."""
+    low, high = DAMAGE_VARIATION
+    if base <= 0:
+        return ((int(base * low), 1.0),)
+    start, end = base * low, base * high
+    width = end - start
+    distribution = []
+    value = int(start)
+    while value < end:
+        covered = min(value + 1, end) - max(value, start)
+        if covered > 0:
+            distribution.append((value, covered / width))
+        value += 1
+    return tuple(distribution)
+
+
+@lru_cache(maxsize=4096)
+def player_damage(attack, crit):
+    """Loi des dégâts d'une attaque du joueur : critique seulement si deux tirages passent sous `crit`."""
+    crit = min(max(crit, 0.0), 1.0)
+    doubled = crit * crit
+    distribution = {}
+    for factor, weight in ((1, 1 - doubled), (2, doubled)):
+        if weight > 0:
+            for value, probability in variation_distribution(attack * factor):
+                damage = max(value, 1)
+                distribution[damage] = distribution.get(damage, 0.0) + weight * probability
+    return tuple(distribution.items())
+
+
+@lru_cache(maxsize=4096)
+def enemy_damage(enemy_attack, defense, shield):
+    """Loi des dégâts subis par le joueur quand l'attaque ennemie n'est pas esquivée."""
+    distribution = {}
+    for value, probability in variation_distribution(enemy_attack):
+        damage = mitigate_damage(max(value, 1), shield, defense)
+        distribution[damage] = distribution.get(damage, 0.0) + probability
+    return tuple(distribution.items())
+
+
+def runs(distribution):
+    """Plages de valeurs consécutives de même probabilité d'une loi : tuple de (première, dernière, probabilité)."""
+    grouped = []
+    for value, probability in sorted(distribution):
+        if grouped and grouped[-1][1] == value - 1 and grouped[-1][2] == probability:
+            grouped[-1][1] = value
+        else:
+            grouped.append([value, value, probability])
+    return tuple(tuple(run) for run in grouped)
+
+
+# --- Programmation dynamique ---
+class StateKey(namedtuple("StateKey", ["items", "shield", "attack_boost", "boosted", "battle_boost"])):
+    """
+    Partie d'un état qui ne dépend pas des HP : objets restants (tuple de (nom, effet, puissance, quantité)),
+    réduction en % du bouclier actif, boost d'attaque du joueur (appliqué une seule fois, jamais remis à
+    zéro en combat), boost déjà appliqué, et boost du combat ajouté à la prochaine attaque seulement.
+    """
+    __slots__ = ()
+
+
+class ValueTable:
+    """
+    Chances de victoire de tous les états d'une StateKey, une ligne par HP de l'ennemi et une colonne par
+    HP du joueur : player[enemy_hp][hp] au début du tour du joueur, enemy[enemy_hp][hp] juste avant la
+    riposte de l'ennemi. La ligne 0 (ennemi vaincu) n'est jamais lue ; enemy_sums[k] est la somme des
+    lignes enemy[1] à enemy[k].
+    """
+    __slots__ = ("player", "enemy", "enemy_sums")
+
+    def __init__(self, width):
+        self.player = [[1.0] * width]
+        self.enemy = [[1.0] * width]
+        self.enemy_sums = [[0.0] * width]
+
+
+_tables = {}
+_stats = {"states": 0, "hits": 0, "misses": 0}
+
+
+def value_table(matchup, key, enemy_hp):
+    """
+    Table de `key` calculée au moins jusqu'à `enemy_hp` HP de l'ennemi.
+
+    Les lignes sont calculées de bas en haut : une attaque retire au moins 1 HP à l'ennemi, et les objets
+    ne mènent qu'à des StateKey avec moins d'objets (ou sans bouclier, ou sans boost du combat), calculées
+    avant. Une table déjà en cache est prolongée si un ennemi plus résistant la demande.
+    """
+    table = _tables.get((matchup, key))
+    if table is None:
+        if _stats["states"] >= CACHE_SIZE:
+            _tables.clear()
+            _stats["states"] = 0
+        table = _tables[(matchup, key)] = ValueTable(matchup.max_hp + 1)
+        _stats["misses"] += 1
+    else:
+        _stats["hits"] += 1
+    if len(table.player) <= enemy_hp:
+        extend(matchup, key, table, enemy_hp)
+    return table
+
+
+def item_transition(matchup, key, action):
+    """
+    Effet de l'objet d'indice `action` : (StateKey suivante, soin, dégâts infligés), avec les mêmes règles
+    que Battle.handle_item_use.
+    """
+    items, shield, attack_boost, boosted, battle_boost = key
+    name, effect, power, quantity = items[action]
+    remaining = items[:action] + ((name, effect, power, quantity - 1),) + items[action + 1:] \
+        if quantity > 1 else items[:action] + items[action + 1:]
+    heal = dealt = 0
+    if effect == "boost_attack":
+        if not boosted:
+            attack_boost, boosted = attack_boost + power, True
+        battle_boost = power
+    elif effect == "damage":
+        dealt = power
+    elif effect == "health_boost":
+        heal = power
+    elif effect == "boost_shield":
+        shield += power
+    return StateKey(remaining, shield, attack_boost, boosted, battle_boost), heal, dealt
+
+
+def actions(matchup, items):
+    """Objets considérés par la stratégie : (indices utilisés sous le seuil de soin, indices utilisés partout)."""
+    if matchup.policy == "heal":
+        for index, item in enumerate(items):
+            if item[1] == "health_boost":
+                return (index,), ()
+        return (), ()
+    if matchup.policy == "optimal":
+        return (), tuple(range(len(items)))
+    return (), ()
+
+
+def extend(matchup, key, table, enemy_hp):
+    """Calcule les lignes manquantes de `table` jusqu'à `enemy_hp` HP de l'ennemi."""
+    first = len(table.player)
+    width = matchup.max_hp + 1
+    items, shield, attack_boost, _, battle_boost = key
+    attack = matchup.attack + attack_boost
+    crit = critical_chance(matchup.level, attack, matchup.enemy_attack)
+    evade = min(max(evasion_chance(matchup.level, attack, matchup.enemy_attack), 0.0), 1.0)
+    # Les dégâts d'une plage sont sommés d'un coup par différence de sommes cumulées
+    dealt = runs(player_damage(attack + battle_boost, crit))
+    taken = [(first, min(last, width - 1), probability * (1 - evade)) for first, last, probability
+             in runs(enemy_damage(matchup.enemy_attack, matchup.defense, shield)) if first < width - 1]
+
+    # Tables dont dépend celle-ci, calculées d'abord : état après l'attaque (boost du combat consommé),
+    # état après un coup reçu (bouclier consommé), et état après chaque objet
+    attacked = table if not battle_boost else value_table(matchup, key._replace(battle_boost=0), enemy_hp - 1)
+    hit = table if not shield else value_table(matchup, key._replace(shield=0), enemy_hp)
+    low_actions, all_actions = actions(matchup, items)
+    used = []
+    for action in low_actions + all_actions:
+        next_key, heal, item_damage = item_transition(matchup, key, action)
+        healed = [min(min(hp + heal, matchup.max_hp) + heal, matchup.max_hp) for hp in range(width)] if heal else None
+        used.append((value_table(matchup, next_key, enemy_hp - item_damage), item_damage, healed))
+    low = sum(hp < matchup.heal_threshold * matchup.max_hp for hp in range(width)) if low_actions else 0
+
+    for enemy_row in range(first, enemy_hp + 1):
+        # Attaque : l'ennemi est vaincu, ou riposte depuis la ligne des HP restants
+        killed = 0.0
+        value = [0.0] * width
+        sums = attacked.enemy_sums
+        for first, last, probability in dealt:
+            if last >= enemy_row:
+                killed += probability * (last - max(first, enemy_row) + 1)
+                last = enemy_row - 1
+            if first <= last:
+                value = [total + probability * (high - low) for total, high, low
+                         in zip(value, sums[enemy_row - first], sums[enemy_row - last - 1])]
+        value = [total + killed for total in value]
+
+        # Objets : riposte depuis l'état suivant, sur la même ligne (ou plus bas après une arme)
+        outcomes = []
+        for next_table, item_damage, healed in used:
+            if item_damage >= enemy_row:
+                outcomes.append([1.0] * width)
+            else:
+                row = next_table.enemy[enemy_row - item_damage]
+                outcomes.append([row[hp] for hp in healed] if healed else row)
+        if low_actions:
+            value = outcomes[0][:low] + value[low:]
+        elif all_actions:
+            value = [max(values) for values in zip(value, *outcomes)]
+        value[0] = 0.0
+        table.player.append(value)
+
+        # Riposte : esquive (même état), ou coup reçu sans tuer le joueur (bouclier consommé)
+        hit_sums = list(accumulate(value if hit is table else hit.player[enemy_row]))
+        riposte = [evade * chance for chance in value]
+        for first, last, probability in taken:
+            riposte = [total + probability * (high - low) for total, high, low
+                       in zip(riposte, [0.0] * first + hit_sums[:width - first],
+                              [0.0] * (last + 1) + hit_sums[:width - last - 1])]
+        riposte[0] = 0.0
+        table.enemy.append(riposte)
+        table.enemy_sums.append([total + chance for total, chance in zip(table.enemy_sums[-1], riposte)])
+    _stats["states"] += (enemy_hp + 1 - first) * width
+
+
+def solve(player, enemy, policy="attack", heal_threshold=HEAL_THRESHOLD):
+    """
+    Chance exacte de victoire du joueur.
+
+    :param player: PlayerProfile du joueur.
+    :param enemy: EnemyProfile de l'ennemi.
+    :param policy: "attack", "heal" ou "optimal".
+    :param heal_threshold: Seuil de la stratégie "heal", en fraction des HP max.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Stratégie inconnue : {policy}")
+    if enemy.hp <= 0:
+        return 1.0
+    if player.hp <= 0:
+        return 0.0
+    matchup = Matchup(player.level, max(player.max_hp, player.hp), player.attack, player.defense, enemy.attack,
+                      policy, heal_threshold)
+    items = tuple(player.items) if policy != "attack" else ()
+    key = StateKey(items, player.shield, player.attack_boost, player.boost_applied, 0)
+    probability = value_table(matchup, key, enemy.hp).player[enemy.hp][player.hp]
+    return min(max(probability, 0.0), 1.0)  # Erreurs d'arrondi des sommes
+
+
+def cache_info():
+    """Statistiques du cache partagé : (tables, états (HP du joueur x HP de l'ennemi), hits, misses)."""
+    return len(_tables), _stats["states"], _stats["hits"], _stats["misses"]
+
+
+# --- Ligne de commande ---
+def main():
+    parser = argparse.ArgumentParser(description="Chances exactes de victoire par niveau du joueur et par ennemi.")
+    parser.add_argument("--levels", type=int, nargs=2, default=[1, 10], metavar=("MIN", "MAX"))
+    parser.add_argument("--enemy", nargs="+", default=None, help="Noms d'ennemis (tous par défaut)")
+    parser.add_argument("--boss", action="store_true", help="Inclure le boss Goblin Overlord")
+    parser.add_argument("--item", nargs="+", default=[], help="Objets du joueur, par nom (répéter pour plusieurs)")
+    parser.add_argument("--policy", choices=POLICIES, default="attack")
+    parser.add_argument("--heal-threshold", type=float, default=HEAL_THRESHOLD)
+    args = parser.parse_args()
+
+    registry = get_registry()
+    templates = registry.enemies()
+    if args.enemy:
+        templates = [template for template in templates if template.name in args.enemy]
+    enemies = [EnemyProfile.from_template(template) for template in templates]
+    if args.boss:
+        enemies.append(EnemyProfile.from_enemy(Enemy("Goblin Overlord", 10, "boss")))
+
+    items = {}
+    for name in args.item:
+        template = registry.item(name)
+        if template is None:
+            print(f"Erreur : Objet inconnu '{name}'.")
+            return
+        key = (template.name, template.effect, template.power)
+        items[key] = items.get(key, 0) + template.quantity
+    items = tuple(key + (quantity,) for key, quantity in items.items())
+
+    levels = range(args.levels[0], args.levels[1] + 1)
+    width = max([len(enemy.name) for enemy in enemies] + [5])
+    print(f"{'enemy':<{width}} " + " ".join(f"{'L' + str(level):>8}" for level in levels))
+    for enemy in enemies:
+        cells = [f"{solve(PlayerProfile.for_level(level, items), enemy, args.policy, args.heal_threshold):.4f}"
+                 for level in levels]
+        print(f"{enemy.name:<{width}} " + " ".join(f"{cell:>8}" for cell in cells))
+
+    tables, states, hits, misses = cache_info()
+    print(f"\nCache : {states} états dans {tables} tables, {hits} hits, {misses} misses.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import random
 import json
 from game.item import Item
+from game.slots import get_state, set_state
 
 class Inventory:
+    __slots__ = ("items",)
+
     def __init__(self):
         """
         Initializes the inventory with starting items.
@@ -84,30 +87,40 @@ class Inventory:
             print("Invalid index. No item found at this position.")
             return None
 
+    def apply_item(self, item_index, player, enemy=None):
+        """
+        Applies an item's effect and consumes one unit, without printing anything.
+
+        :return: The item used, or None if it cannot be used.
+        """
+        item = self.get_item(item_index)
+        if not item or not item.is_usable():
+            return None
+
+        if item.effect == "damage" and enemy:
+            enemy.hp -= item.power  # Appliquer les dégâts à l'ennemi
+        elif item.effect == "health_boost":
+            player.hp = min(player.max_hp, player.hp + item.power)  # Soigner le joueur
+        elif item.effect == "boost_shield":
+            player._damage_reduction += item.power  # Appliquer un boost temporaire au joueur
+
+        item.quantity -= 1
+        if item.quantity <= 0:
+            self.items.remove(item)
+        return item
+
     def use_item(self, item_index, player, enemy=None):
         item = self.get_item(item_index)
         if item and item.is_usable():
             print(f"{player.name} uses {item.name}.")
-            
+            self.apply_item(item_index, player, enemy)
+
             if item.effect == "damage" and enemy:
-                # Appliquer les dégâts à l'ennemi
-                enemy.hp -= item.power
                 print(f"{player.name} deals {item.power:.2f} damage to {enemy.name}!")
-            
             elif item.effect == "health_boost":
-                # Soigner le joueur
-                player.hp = min(player.max_hp, player.hp + item.power)
                 print(f"{player.name} heals for {item.power} HP!")
-            
             elif item.effect == "boost_shield":
-                # Appliquer un boost temporaire au joueur
-                player._damage_reduction += item.power
                 print(f"{player.name}'s shield increased by {item.power} points!")
-
-            item.quantity -= 1
-            if item.quantity <= 0:
-                self.items.remove(item)
-                # print(f"{item.name} has been used up and removed.")
             return True
         else:
             print(f"{item.name} cannot be used right now.")
@@ -128,20 +141,21 @@ class Inventory:
         """
         self.items = [item for item in self.items if item.quantity > 0]
 
-    def drop_loot(self):
+    def drop_loot(self, rng=random):
         """
         Generates random loot from the inventory, with reduced quantities.
         
+        :param rng: Random generator used for the draws (the random module by default).
         :return: List of `Item` objects with reduced quantities.
         """
         loot = []
         if not self.items:
             return loot
 
-        num_items_to_drop = random.choice([1, 2])
+        num_items_to_drop = rng.choice([1, 2])
         for _ in range(num_items_to_drop):
-            item = random.choice(self.items)
-            quantity = random.randint(1, item.quantity)
+            item = rng.choice(self.items)
+            quantity = rng.randint(1, item.quantity)
             loot_item = Item(
                 name=item.name,
                 effect=item.effect,
@@ -195,3 +209,9 @@ class Inventory:
         if not self.items:
             return "Empty inventory."
         return "\n".join(f"{item.name} (Quantity: {item.quantity})" for item in self.items)
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        set_state(self, state)
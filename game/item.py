@@ -1,4 +1,36 @@
+from collections import namedtuple
+
+from game.slots import get_state, set_state
+
+
+class ItemKind(namedtuple("ItemKind", ["name", "effect", "power", "attack_bonus", "level", "boost"])):
+    """
+    Immutable part of an item, shared by every identical item of every session:
+    an Item only keeps this kind and its own quantity.
+    """
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Loaded saves take the kind from the shared cache instead of a private copy
+        return item_kind, tuple(self)
+
+
+_kinds = {}
+
+
+def item_kind(name, effect, power, attack_bonus=0, level=1, boost=0):
+    """Returns the shared ItemKind for these properties, creating it on first use."""
+    values = (name, effect, power, attack_bonus, level, boost)
+    key = (values, tuple(map(type, values)))  # 10 and 10.0 are equal but are not displayed the same way
+    kind = _kinds.get(key)
+    if kind is None:
+        kind = _kinds[key] = ItemKind(*values)
+    return kind
+
+
 class Item:
+    __slots__ = ("kind", "quantity")
+
     def __init__(self, name, effect, power, quantity=1, attack_bonus=0, level=1, boost=0):
         """
         Initializes an item with specific properties.
@@ -11,13 +43,66 @@ class Item:
         :param level: Level of the item (default is 1).
         :param boost: Percentage boost (used for effects like boost_attack) (default is 0).
         """
-        self.name = name
-        self.effect = effect
-        self.power = power
+        self.kind = item_kind(name, effect, power, attack_bonus, level, boost)
         self.quantity = quantity
-        self._attack_bonus = attack_bonus
-        self.level = level
-        self.boost = boost
+
+    def __getstate__(self):
+        return get_state(self)
+
+    def __setstate__(self, state):
+        """
+        Restores a saved item, including items saved before shared kinds (every property in the instance).
+        """
+        if "kind" not in state:
+            state = dict(state, kind=item_kind(state["name"], state["effect"], state["power"],
+                                               state.get("_attack_bonus", 0), state.get("level", 1), state.get("boost", 0)))
+        set_state(self, state, {"quantity": 1})
+
+    # --- Properties read from the shared kind ---
+    # Setting one of them is copy-on-write: the item switches to the kind with the new value, and the shared
+    # kind (and every other item using it) is left untouched
+    def _replace_kind(self, **changes):
+        self.kind = item_kind(*self.kind._replace(**changes))
+
+    @property
+    def name(self):
+        return self.kind.name
+
+    @name.setter
+    def name(self, value):
+        self._replace_kind(name=value)
+
+    @property
+    def effect(self):
+        return self.kind.effect
+
+    @effect.setter
+    def effect(self, value):
+        self._replace_kind(effect=value)
+
+    @property
+    def power(self):
+        return self.kind.power
+
+    @power.setter
+    def power(self, value):
+        self._replace_kind(power=value)
+
+    @property
+    def level(self):
+        return self.kind.level
+
+    @level.setter
+    def level(self, value):
+        self._replace_kind(level=value)
+
+    @property
+    def boost(self):
+        return self.kind.boost
+
+    @boost.setter
+    def boost(self, value):
+        self._replace_kind(boost=value)
 
     def use(self, player, enemy=None):
         """
@@ -76,7 +161,7 @@ class Item:
 
         :return: The attack bonus of the item.
         """
-        return self._attack_bonus
+        return self.kind.attack_bonus
 
     def __str__(self):
         """
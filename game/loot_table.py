@@ -0,0 +1,96 @@
+"""
+Tables de loot précalculées par niveau d'ennemi.
+
+Le tirage historique de Enemy.drop_loot crée un Item pour chaque objet du catalogue, tire un nombre
+aléatoire par objet contre drop_chance, puis choisit de 2 à 4 objets parmi les survivants.
+Les objets qui ont la même chance de loot sont interchangeables : il suffit donc de tirer, pour
+chaque classe de probabilité, le nombre de survivants dans une loi binomiale (fonction de répartition
+précalculée), puis de choisir les objets gardés uniformément. La loi du loot est exactement la même,
+pour un nombre de tirages aléatoires proportionnel au nombre d'objets lâchés et non au catalogue.
+"""
+import random
+from bisect import bisect_right
+from math import comb
+
+from game.assets import get_registry
+from game.enemy import drop_chance
+
+MIN_DROPS = 2  # Bornes du nombre d'objets gardés parmi les survivants (random.randint(2, 4))
+MAX_DROPS = 4
+
+
+def binomial_cdf(count, probability):
+    """Fonction de répartition de la loi binomiale B(count, probability), pour 0..count-1 succès."""
+    cdf = []
+    total = 0.0
+    for successes in range(count):
+        total += comb(count, successes) * probability ** successes * (1 - probability) ** (count - successes)
+        cdf.append(total)
+    return cdf
+
+
+class LootTable:
+    """Loi de loot d'un niveau d'ennemi : objets regroupés par chance de loot."""
+
+    def __init__(self, templates, chances):
+        """
+        :param templates: Modèles d'objets du catalogue.
+        :param chances: Chance de loot de chaque modèle, dans le même ordre.
+        """
+        groups = {}
+        for template, chance in zip(templates, chances):
+            groups.setdefault(chance, []).append(template)
+        # (modèles de la classe, fonction de répartition du nombre de survivants)
+        self.classes = [
+            (tuple(group), binomial_cdf(len(group), chance))
+            for chance, group in sorted(groups.items(), reverse=True)
+            if chance > 0
+        ]
+        self.size = len(templates)
+
+    def draw(self, rng=random):
+        """Tire le loot d'un ennemi et retourne la liste des modèles d'objets lâchés (éventuellement vide)."""
+        counts = [bisect_right(cdf, rng.random()) for _, cdf in self.classes]
+        survivors = sum(counts)
+        if not survivors:
+            return []
+
+        # Rangs des objets gardés parmi les survivants, puis classe de chaque rang
+        ranks = rng.sample(range(survivors), min(survivors, rng.randint(MIN_DROPS, MAX_DROPS)))
+        kept = [0] * len(counts)
+        owners = []
+        for rank in ranks:
+            group = 0
+            while rank >= counts[group]:
+                rank -= counts[group]
+                group += 1
+            kept[group] += 1
+            owners.append(group)
+
+        # Les survivants d'une classe sont uniformes : on choisit directement les objets gardés
+        picks = [iter(rng.sample(templates, number)) if number else None
+                 for (templates, _), number in zip(self.classes, kept)]
+        return [next(picks[group]) for group in owners]
+
+
+_tables = {}
+_tables_generation = None
+
+
+def get_loot_table(level, registry=None):
+    """Retourne la table de loot d'un niveau d'ennemi, recalculée si les données du jeu ont changé."""
+    global _tables_generation
+    registry = registry or get_registry()
+    templates = registry.items()
+    if _tables_generation != (id(registry), registry.generation):
+        _tables.clear()
+        _tables_generation = (id(registry), registry.generation)
+
+    table = _tables.get(level)
+    if table is None:
+        # Chances précalculées dans le paquet binaire si disponible, sinon calculées ici
+        chances = registry.bundle.drop_chances(level) if registry.bundle is not None else None
+        if chances is None:
+            chances = [drop_chance(level, template.level) for template in templates]
+        table = _tables[level] = LootTable(templates, list(chances))
+    return table
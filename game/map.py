@@ -1,30 +1,51 @@
 import random
-import json
+import sys
+from game.assets import get_registry
 from game.enemy import Enemy
 from game.item import Item
+from game.renderer import MapRenderer
+from game.spawn_planner import SpawnPlanner
+from game.spawn_table import get_spawn_table
+from game.tile_grid import (TileGrid, REGION_CODES, FLAVOUR_TEXTS, DESCRIPTION_TEMPLATES, START_TEMPLATE, BOSS_TEMPLATE,
+                            description_template_id)
+
+# Textes affichés à l'entrée d'une région
+REGION_DESCRIPTIONS = {
+    "forest": "You are surrounded by ancient trees. The air smells of moss and damp earth.",
+    "mountain": "Rocky cliffs loom overhead. The path is steep and treacherous.",
+    "swamp": "The ground squelches beneath your feet. You hear the distant croak of frogs.",
+    "plains": "Open fields stretch as far as the eye can see. The wind whispers through the grass."
+}
 
 
 class GameMap:
-    def __init__(self, size=12):
-        """Initialisation du jeu avec une carte de taille définie et les différents éléments du jeu."""
+    compact = False  # Valeur des cartes sauvegardées (pickle) avant le stockage compact
+
+    def __init__(self, size=12, compact=False, rng=random):
+        """
+        Initialisation du jeu avec une carte de taille définie et les différents éléments du jeu.
+
+        :param size: Taille de la carte (size x size cases).
+        :param compact: Utilise le stockage compact TileGrid au lieu d'un dictionnaire de cases,
+                        recommandé pour les très grandes cartes.
+        :param rng: Générateur aléatoire de la génération (module random par défaut), par exemple
+                    le flux "world" d'une SessionRng pour une carte reproductible.
+        """
         self.size = size
+        self.compact = compact
         self.start_location = (0, 0)  # Emplacement de départ du joueur
         self.boss_location = (size - 1, size - 1)  # Emplacement du boss
-        self.locations = self.generate_map()  # Génération de la carte
+        self.locations = self.generate_map(rng)  # Génération de la carte
         self.enemy_data = self.load_enemy_data()  # Chargement des données des ennemis
         self.item_data = self.load_item_data()  # Chargement des données des objets
-        self.spawn_enemies()  # Spawning des ennemis sur la carte
-        self.spawn_items()  # Spawning des objets sur la carte
+        planner = SpawnPlanner(size, self.start_location, rng)  # Bitmap d'exclusion partagée par les spawns
+        self.spawn_enemies(planner, rng)  # Spawning des ennemis sur la carte
+        self.spawn_items(planner, rng)  # Spawning des objets sur la carte
         self.spawn_boss()  # Spawning du boss
         self.current_position = (0, 0)  # Position initiale du joueur
         
         # Initialize the region descriptions as an instance attribute
-        self.region_descriptions = {
-                "forest": "You are surrounded by ancient trees. The air smells of moss and damp earth.",
-                "mountain": "Rocky cliffs loom overhead. The path is steep and treacherous.",
-                "swamp": "The ground squelches beneath your feet. You hear the distant croak of frogs.",
-                "plains": "Open fields stretch as far as the eye can see. The wind whispers through the grass."
-            }
+        self.region_descriptions = dict(REGION_DESCRIPTIONS)
 
     def get_player_position(self):
         """Retourne la position actuelle du joueur."""
@@ -55,74 +76,62 @@ class GameMap:
         )
 
     def load_item_data(self):
-        """Charge les données des objets depuis un fichier JSON."""
-        try:
-            item_file_path = "assets/items_data.json"
-            with open(item_file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("Erreur : Fichier de données des objets introuvable.")
-        except json.JSONDecodeError as e:
-            print(f"Erreur : Problème de format JSON dans le fichier des objets. {e}")
-        return []
-
-    def spawn_items(self):
-        """Spawne un nombre limité d'objets sur la carte avec une densité contrôlée."""
+        """Retourne les modèles d'objets (ItemTemplate) du registre des données."""
+        return list(get_registry().items())
+
+    def spawn_items(self, planner=None, rng=random):
+        """
+        Spawne un nombre limité d'objets sur la carte avec une densité contrôlée.
+
+        :param planner: SpawnPlanner partagé avec spawn_enemies ; reconstruit à partir des ennemis présents s'il est absent.
+        :param rng: Générateur aléatoire (module random par défaut).
+        """
         total_max_items = self.size
         items_placed = 0
         max_items_per_region = round(total_max_items / 4)  # Limite d'objets par région
 
-        # Définition des régions de la carte
-        regions = [
-            [(x, y) for x in range(0, self.size // 2) for y in range(0, self.size // 2)],
-            [(x, y) for x in range(0, self.size // 2) for y in range(self.size // 2, self.size)],
-            [(x, y) for x in range(self.size // 2, self.size) for y in range(0, self.size // 2)],
-            [(x, y) for x in range(self.size // 2, self.size) for y in range(self.size // 2, self.size)],
-        ]
+        if planner is None:
+            planner = self.create_spawn_planner(rng)
+        regions = planner.region_pools()  # Réserves mélangées des quatre régions de la carte
 
-        item_types = self.load_item_data()
+        item_types = self.item_data
 
         # Assurer que chaque type d'objet apparaît au moins une fois
         for item in item_types:
             if items_placed >= total_max_items:
                 break
 
-            region_index = random.choice(range(len(regions)))
-            region = regions[region_index]
-
-            while region:
-                position = random.choice(region)
-                if self.is_valid_spawn_location(position):
-                    new_item = Item(
-                        name=item['name'],
-                        effect=item['effect'],
-                        power=item['power'],
-                        quantity=item['quantity'],
-                        level=item['level']
-                    )
-                    self.place_item(position[0], position[1], new_item)
-                    region.remove(position)  # Retirer la position de la région
-                    items_placed += 1
-                    break  # Passer à l'objet suivant
+            region = rng.choice(regions)  # Choix d'une région aléatoire
+            position = planner.draw_free(region)  # Tirage sans remise d'une position valide
+            if position is not None:
+                new_item = Item(
+                    name=item.name,
+                    effect=item.effect,
+                    power=item.power,
+                    quantity=item.quantity,
+                    level=item.level
+                )
+                self.place_item(position[0], position[1], new_item)
+                items_placed += 1
 
         # Compléter les régions avec des objets jusqu'à la limite maximale
         for region in regions:
             region_items = 0
-            while region and region_items < max_items_per_region and items_placed < total_max_items:
-                position = random.choice(region)
-                if self.is_valid_spawn_location(position):
-                    chosen_item = random.choice(item_types)
-                    item = Item(
-                        name=chosen_item["name"],
-                        effect=chosen_item["effect"],
-                        power=chosen_item["power"],
-                        quantity=chosen_item["quantity"],
-                        level=chosen_item["level"]
-                    )
-                    self.place_item(position[0], position[1], item)
-                    region.remove(position)
-                    region_items += 1
-                    items_placed += 1
+            while region_items < max_items_per_region and items_placed < total_max_items:
+                position = planner.draw_free(region)
+                if position is None:
+                    break  # Plus aucune position valide dans cette région
+                chosen_item = rng.choice(item_types)
+                item = Item(
+                    name=chosen_item.name,
+                    effect=chosen_item.effect,
+                    power=chosen_item.power,
+                    quantity=chosen_item.quantity,
+                    level=chosen_item.level
+                )
+                self.place_item(position[0], position[1], item)
+                region_items += 1
+                items_placed += 1
 
     def place_item(self, x, y, item):
         """Place un objet sur une case spécifique de la carte."""
@@ -132,29 +141,33 @@ class GameMap:
 
     def is_item_at(self, position):
         """Vérifie s'il y a un objet à la position donnée."""
+        if self.compact:
+            return self.locations.item_at(position) is not None
         return self.locations.get(position, {}).get("item") is not None
 
     def get_item(self, position):
         """Retourne l'objet à la position donnée."""
+        if self.compact:
+            return self.locations.item_at(position)
         return self.locations.get(position, {}).get("item")
 
     def clear_item(self, position):
         """Supprime l'objet de la position donnée après qu'il ait été récupéré."""
+        if self.compact:
+            self.locations.item_table.pop(self.locations.index(position), None)
+            return
         if position in self.locations:
             self.locations[position]["item"] = None
 
     def load_enemy_data(self):
-        """Charge les données des ennemis depuis un fichier JSON."""
-        try:
-            enemy_file_path = "assets/enemies_data.json"
-            with open(enemy_file_path, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("Erreur : Fichier de données des ennemis introuvable.")
-            return []
-
-    def generate_map(self):
+        """Retourne les modèles d'ennemis (EnemyTemplate) du registre des données."""
+        return list(get_registry().enemies())
+
+    def generate_map(self, rng=random):
         """Génère la carte avec des descriptions de régions et initialise les cases."""
+        if self.compact:
+            return self.generate_compact_map(rng)
+
         map_grid = {}
         region_descriptions = {
             (0, 0): "forest",
@@ -172,7 +185,7 @@ class GameMap:
                 elif (x, y) == self.boss_location:
                     description = "This is the lair of the final boss!"
                 else:
-                    description = f"The area is a {region_type}. " + random.choice([
+                    description = f"The area is a {region_type}. " + rng.choice([
                         "You hear faint noises.",
                         "The path ahead looks challenging.",
                         "It's eerily quiet."
@@ -181,71 +194,141 @@ class GameMap:
 
         return map_grid
 
-
-
-    def spawn_enemies(self):
-        """Spawne les ennemis sur la carte avec une densité contrôlée et garantit que chaque type d'ennemi apparaît au moins une fois."""
-        max_enemies_per_region = round(self.size / 2)  # Nombre maximum d'ennemis par région
-        enemies_per_region = {
-            (0, 0): 0,  # Comptage des ennemis dans chaque région
-            (0, 1): 0,
-            (1, 0): 0,
-            (1, 1): 0
+    def generate_compact_map(self, rng=random):
+        """Génère la carte dans une TileGrid, avec les mêmes tirages aléatoires que generate_map."""
+        grid = TileGrid(self.size)
+        half = self.size // 2
+        region_descriptions = {
+            (0, 0): "forest",
+            (0, 1): "swamp",
+            (1, 0): "plains",
+            (1, 1): "mountain"
         }
+        flavour_indices = range(len(FLAVOUR_TEXTS))
+        first_template = {region: description_template_id(region, 0) for region in ("forest", "swamp", "plains", "mountain", "unknown")}
+        regions = grid.regions
+        descriptions = grid.descriptions
 
-        # Définition des régions de la carte
-        regions = [
-            [(x, y) for x in range(0, self.size // 2) for y in range(0, self.size // 2)],  # Région 1 (Haut-Gauche)
-            [(x, y) for x in range(0, self.size // 2) for y in range(self.size // 2, self.size)],  # Région 2 (Haut-Droite)
-            [(x, y) for x in range(self.size // 2, self.size) for y in range(0, self.size // 2)],  # Région 3 (Bas-Gauche)
-            [(x, y) for x in range(self.size // 2, self.size) for y in range(self.size // 2, self.size)],  # Région 4 (Bas-Droite)
-        ]
+        index = 0
+        for x in range(self.size):
+            for y in range(self.size):
+                regions[index] = REGION_CODES[self.get_region((x, y))]
+                if (x, y) == self.start_location:
+                    descriptions[index] = START_TEMPLATE
+                elif (x, y) == self.boss_location:
+                    descriptions[index] = BOSS_TEMPLATE
+                else:
+                    region_type = region_descriptions.get((x // half, y // half), "unknown")
+                    # Même consommation du générateur que random.choice sur les trois phrases
+                    descriptions[index] = first_template[region_type] + rng.choice(flavour_indices)
+                index += 1
+
+        return grid
+
+    def make_compact(self):
+        """
+        Passe une carte en dictionnaire de cases au stockage compact TileGrid, sans changer son contenu
+        (même description, ennemi et objet sur chaque case).
+
+        :return: True si la carte est compacte, False si une description ne correspond à aucun modèle.
+        """
+        if self.compact:
+            return True
+        grid = TileGrid(self.size)
+        template_ids = {text: template for template, text in enumerate(DESCRIPTION_TEMPLATES)}
+        for position, cell in self.locations.items():
+            template = template_ids.get(cell["description"])
+            if template is None:
+                return False
+            index = grid.index(position)
+            grid.regions[index] = REGION_CODES[self.get_region(position)]
+            grid.descriptions[index] = template
+            grid.set_enemy_index(index, cell["enemy"])
+            grid.set_item_index(index, cell["item"])
+        self.locations = grid
+        self.compact = True
+        return True
+
+    def create_spawn_planner(self, rng=random):
+        """Crée un SpawnPlanner dont la bitmap d'exclusion tient compte des ennemis déjà présents."""
+        planner = SpawnPlanner(self.size, self.start_location, rng)
+        for position in self.locations:
+            if self.is_enemy_at(position):
+                planner.block_around(position)
+        return planner
+
+    def spawn_enemies(self, planner=None, rng=random):
+        """
+        Spawne les ennemis sur la carte avec une densité contrôlée et garantit que chaque type d'ennemi apparaît au moins une fois
+        (tant que sa région tirée au hasard a encore une position valide).
+
+        :param planner: SpawnPlanner à utiliser ; un nouveau est créé s'il est absent.
+        :param rng: Générateur aléatoire (module random par défaut).
+        """
+        max_enemies_per_region = round(self.size / 2)  # Nombre maximum d'ennemis par région
 
-        # Liste de tous les types d'ennemis
-        enemy_types = [enemy for enemy in self.enemy_data]
+        if planner is None:
+            planner = self.create_spawn_planner(rng)
+        regions = planner.region_pools()  # Réserves mélangées des quatre régions de la carte
 
         # Assurer que chaque type d'ennemi apparaît au moins une fois dans une position valide
-        for enemy in enemy_types:
-            region_index = random.choice(range(len(regions)))  # Choix d'une région aléatoire
-            region = regions[region_index]
-            
-            while region:
-                position = random.choice(region)  # Choix d'une position aléatoire dans la région
-                if self.is_valid_spawn_location(position):  # Vérifier la validité de la position
-                    # Création et ajout de l'ennemi à la position
-                    self.locations[position]['enemy'] = Enemy(
-                        name=enemy['name'],
-                        level=enemy['level'],
-                        enemy_type=enemy['type']
-                    )
-                    region.remove(position)  # Retirer la position de la région
-                    break  # Passer à l'ennemi suivant
+        for enemy in self.enemy_data:
+            region = rng.choice(regions)  # Choix d'une région aléatoire
+            position = planner.draw_free(region)  # Tirage sans remise d'une position valide
+            if position is not None:
+                # Création et ajout de l'ennemi à la position
+                self.locations[position]['enemy'] = Enemy(
+                    name=enemy.name,
+                    level=enemy.level,
+                    enemy_type=enemy.type
+                )
+                planner.block_around(position)  # Exclure le voisinage de l'ennemi
 
         # Remplir la carte avec des ennemis supplémentaires selon les contraintes
         for region in regions:
-            for _ in range(max_enemies_per_region):  # Limite d'ennemis par région
-                if not region:
-                    continue  # Passer à la région suivante si la région est vide
-
-                position = random.choice(region)  # Choisir une position aléatoire
-                if self.is_valid_spawn_location(position):  # Vérifier si la position est valide
-                    self.place_enemy(*position)  # Placer l'ennemi
-                    region.remove(position)  # Retirer la position de la région
-
-    def place_enemy(self, x, y):
-        """Place un ennemi à une position donnée selon la probabilité de spawn de chaque ennemi."""
-        # Liste des ennemis qui peuvent apparaître à la position actuelle en fonction de la probabilité de spawn
-        possible_enemies = [enemy for enemy in self.enemy_data if random.random() < enemy["spawn_chance"]]
-        
-        if possible_enemies:  # Si des ennemis peuvent apparaître
-            chosen_enemy = random.choice(possible_enemies)  # Choisir un ennemi aléatoirement
+            self.fill_region(region, planner, max_enemies_per_region, rng)  # Limite d'ennemis par région
+
+    def fill_region(self, pool, planner, attempts, rng=random):
+        """
+        Remplit une région en tirant d'un coup les ennemis de toutes ses tentatives, et retourne le nombre d'ennemis placés.
+
+        :param pool: Réserve mélangée (ShuffledPool) des cases de la région.
+        :param planner: SpawnPlanner qui tient la bitmap d'exclusion.
+        :param attempts: Nombre de tentatives ; chacune consomme une position, valide ou non.
+        :param rng: Générateur aléatoire des tirages d'ennemis (module random par défaut).
+        """
+        region = self.get_region((pool.x_range.start, pool.y_range.start))
+        placed = 0
+        for chosen_enemy in get_spawn_table(region).sample_many(attempts, rng):
+            position = pool.draw()
+            if position is None:
+                break  # La région est vide
+
+            if chosen_enemy is not None and planner.is_free(position):
+                self.locations[position]['enemy'] = Enemy(
+                    name=chosen_enemy.name,
+                    level=chosen_enemy.level,
+                    enemy_type=chosen_enemy.type
+                )
+                planner.block_around(position)
+                placed += 1
+        return placed
+
+    def place_enemy(self, x, y, rng=random):
+        """Place un ennemi à une position donnée selon la probabilité de spawn de chaque ennemi et le retourne (None si aucun n'apparaît)."""
+        # Tirage en O(1) dans la table de spawn de la région (même loi que le tirage type par type)
+        chosen_enemy = get_spawn_table(self.get_region((x, y))).sample(rng)
+
+        if chosen_enemy is not None:  # Si un ennemi apparaît
             # Création et ajout de l'ennemi à la carte
             enemy = Enemy(
-                name=chosen_enemy["name"],
-                level=chosen_enemy["level"],
-                enemy_type=chosen_enemy["type"]
+                name=chosen_enemy.name,
+                level=chosen_enemy.level,
+                enemy_type=chosen_enemy.type
             )
             self.locations[(x, y)]['enemy'] = enemy  # Ajout de l'ennemi à la position
+            return enemy
+        return None
 
     def is_valid_spawn_location(self, position):
         """Vérifie si la position est valide pour l'apparition d'un ennemi.
@@ -271,14 +354,21 @@ class GameMap:
 
     def is_enemy_at(self, position):
         """Vérifie s'il y a un ennemi à la position spécifiée."""
+        if self.compact:
+            return self.locations.enemy_at(position) is not None
         return self.locations.get(position, {}).get("enemy") is not None
 
     def get_enemy(self, position):
         """Retourne l'ennemi présent à la position spécifiée."""
+        if self.compact:
+            return self.locations.enemy_at(position)
         return self.locations.get(position, {}).get("enemy")
 
     def clear_enemy(self, position):
         """Supprime l'ennemi de la position spécifiée après qu'il a été vaincu."""
+        if self.compact:
+            self.locations.enemy_table.pop(self.locations.index(position), None)
+            return
         if position in self.locations:
             self.locations[position]["enemy"] = None  # Suppression de l'ennemi
 
@@ -330,50 +420,8 @@ class GameMap:
             return current_position
 
     def print_map(self, player_position):
-        """Displays the map with the player's position and enemies, using emojis according to their level."""
-
-         # Explanation legend
-        print("\nLegend for enemies by level:")
-        print("👺 Level 1 |👹 Level 2 | 🧌 Level 3 |🐉 Level 4 | 🦖 Level 5")
-
-        print("\nEnemies are huge, so you can spot them from far away, but the items are tiny!")
-        print("To find items, you will need to explore every corner of the map.")
-
-        for x in range(self.size):
-            for y in range(self.size):
-                if (x, y) == player_position:
-                    print("🧑", end=" ")  # Player representation
-                elif (x, y) == self.boss_location:
-                    print("👑", end=" ")  # Boss representation
-                elif self.locations[(x, y)]['enemy'] is not None:
-                    enemy = self.locations[(x, y)]['enemy']
-                    # Choose emoji based on the enemy's level
-                    if enemy.level == 3:
-                        print("👺", end=" ")  # Level 3
-                    elif enemy.level == 4:
-                        print("👹", end=" ")  # Level 4
-                    elif enemy.level == 5:
-                        print("🧌", end=" ")  # Level 5
-                    elif enemy.level == 6:
-                        print("🐉", end=" ")  # Level 6
-                    elif enemy.level == 7:
-                        print("🦖", end=" ")  # Level 7 (for example, a dinosaur for a strong enemy)
-                    else:
-                        print("❓", end=" ")  # Unknown or undefined enemy level
-                else:
-                    # Display regions of the map
-                    if x < self.size // 2 and y < self.size // 2:
-                        print("🟩", end=" ")  # Forest
-                    elif x < self.size // 2 and y >= self.size // 2:
-                        print("🟧", end=" ")  # Swamp
-                    elif x >= self.size // 2 and y < self.size // 2:
-                        print("🟪", end=" ")  # Plains
-                    else:
-                        print("🟦", end=" ")  # Mountains
-            print()  # New line after each row of the map
-        print()  # New line after each row of the map
-
-
-
-
-
+        """Displays the map with the player's position and enemies, using emojis according to their level.
+        The whole frame is built in one buffer and written with a single call."""
+        renderer = MapRenderer(self)
+        sys.stdout.write(renderer.frame_text(renderer.build_frame(player_position)))
+        sys.stdout.flush()
@@ -0,0 +1,155 @@
+"""
+Estimation Monte-Carlo vectorisée des chances de victoire, pour toute la grille niveau du joueur x ennemi.
+
+Toutes les parties de toutes les combinaisons avancent ensemble, tour par tour, dans des tableaux NumPy :
+variation uniform(0.9, 1.2) de roll_damage, critique de critical_chance (deux tirages pour doubler les
+dégâts, comme dans Battle.player_turn), esquive de evasion_chance (game/battle.py) et défense soustraite
+par Character.take_damage. Les parties terminées sont retirées des tableaux à chaque tour.
+
+Le joueur attaque à chaque tour, et boit une potion de soin (soignant deux fois, comme dans
+Battle.handle_item_use) quand ses HP passent sous le seuil et qu'il lui en reste.
+
+Nécessite NumPy, dépendance optionnelle (pip install -r requirements-extra.txt) ; le jeu lui-même n'en
+dépend pas. Les chances de victoire sont comparées à celles de game/simulator.py par tests/test_montecarlo.py.
+
+Usage (depuis la racine du dépôt) :
+    python -m game.montecarlo [--battles 10000] [--levels 1 10] [--potions 2] [--boss]
+"""
+import argparse
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : seul l'estimateur en a besoin
+    np = None
+
+from game.assets import get_registry
+from game.battle import DAMAGE_VARIATION, critical_chance, evasion_chance
+from game.enemy import Enemy
+from game.simulator import PlayerProfile, EnemyProfile
+
+MAX_TURNS = 500  # Au-delà, une partie est comptée comme non résolue
+POTION_POWER = 20  # Minor Health Potion
+HEAL_THRESHOLD = 0.3  # Fraction des HP max sous laquelle le joueur boit une potion
+
+
+class MonteCarloResult(namedtuple("MonteCarloResult", ["levels", "enemies", "battles", "win_rate", "turns"])):
+    """
+    Résultats de l'estimation :
+    win_rate[i, j] est la chance de victoire du niveau levels[i] contre enemies[j], et
+    turns[i, j, t] le nombre de victoires obtenues en t tours (distribution du nombre de tours pour tuer).
+    """
+    __slots__ = ()
+
+    def mean_turns(self):
+        """Nombre moyen de tours des victoires, NaN pour les combinaisons sans victoire."""
+        counts = self.turns.sum(axis=2)
+        total = (self.turns * np.arange(self.turns.shape[2])).sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, total / counts, np.nan)
+
+
+def estimate(levels, enemies, battles=10000, potions=0, potion_power=POTION_POWER,
+             heal_threshold=HEAL_THRESHOLD, seed=None):
+    """
+    Estime les chances de victoire pour chaque couple (niveau, ennemi).
+
+    :param levels: Niveaux du joueur.
+    :param enemies: EnemyProfile des adversaires.
+    :param battles: Nombre de parties simulées par couple.
+    :param potions: Nombre de potions de soin du joueur.
+    :param potion_power: Soin d'une potion.
+    :param heal_threshold: Fraction des HP max sous laquelle le joueur boit une potion.
+    :param seed: Graine du générateur NumPy.
+    :return: MonteCarloResult.
+    """
+    if np is None:
+        raise RuntimeError("game.montecarlo nécessite NumPy (pip install -r requirements-extra.txt)")
+    rng = np.random.default_rng(seed)
+    low, high = DAMAGE_VARIATION
+    players = [PlayerProfile.for_level(level) for level in levels]
+    cells = len(players) * len(enemies)
+
+    # Statistiques de chaque couple, puis une ligne par partie
+    cell_stats = np.array([
+        (player.hp, player.max_hp, player.attack, player.defense, enemy.hp, enemy.attack,
+         critical_chance(player.level, player.attack, enemy.attack),
+         evasion_chance(player.level, player.attack, enemy.attack))
+        for player in players for enemy in enemies
+    ], dtype=np.float64).reshape(cells, 8)
+    cell = np.repeat(np.arange(cells), battles)
+    hp, max_hp, attack, defense, enemy_hp, enemy_attack, crit, evade = (cell_stats[cell, k] for k in range(8))
+    potions_left = np.full(cell.size, potions, dtype=np.int64)
+
+    wins = np.zeros(cells, dtype=np.int64)
+    turns = np.zeros((cells, MAX_TURNS + 1), dtype=np.int64)
+
+    for turn in range(1, MAX_TURNS + 1):
+        # Action du joueur : potion sous le seuil s'il en reste, attaque sinon
+        drinks = (potions_left > 0) & (hp < heal_threshold * max_hp)
+        hp = np.where(drinks, np.minimum(np.minimum(hp + potion_power, max_hp) + potion_power, max_hp), hp)
+        potions_left -= drinks
+
+        is_crit = rng.random(cell.size) < crit
+        variation = low + (high - low) * rng.random(cell.size)
+        doubled = is_crit & (rng.random(cell.size) < crit)
+        damage = np.maximum(np.trunc(attack * np.where(doubled, 2, 1) * variation), 1)
+        enemy_hp = np.where(drinks, enemy_hp, enemy_hp - damage)
+
+        # Riposte de l'ennemi s'il est encore en vie, sauf esquive
+        hit = (enemy_hp > 0) & (rng.random(cell.size) >= evade)
+        enemy_damage = np.maximum(np.trunc(enemy_attack * (low + (high - low) * rng.random(cell.size))), 1)
+        hp = np.where(hit, hp - np.maximum(enemy_damage - defense, 1), hp)
+
+        # Parties terminées : enregistrer les victoires puis les retirer des tableaux
+        won = enemy_hp <= 0
+        finished = won | (hp <= 0)
+        if finished.any():
+            winners = cell[won]
+            wins += np.bincount(winners, minlength=cells)
+            turns[:, turn] += np.bincount(winners, minlength=cells)
+            live = ~finished
+            cell, hp, max_hp, attack, defense = cell[live], hp[live], max_hp[live], attack[live], defense[live]
+            enemy_hp, enemy_attack, crit, evade = enemy_hp[live], enemy_attack[live], crit[live], evade[live]
+            potions_left = potions_left[live]
+        if not cell.size:
+            break
+
+    shape = (len(players), len(enemies))
+    return MonteCarloResult(tuple(levels), tuple(enemy.name for enemy in enemies), battles,
+                            (wins / battles).reshape(shape), turns.reshape(shape + (MAX_TURNS + 1,)))
+
+
+def registry_enemies(include_boss=False):
+    """Profils de tous les ennemis du registre, et du boss de GameMap.spawn_boss si demandé."""
+    enemies = [EnemyProfile.from_template(template) for template in get_registry().enemies()]
+    if include_boss:
+        enemies.append(EnemyProfile.from_enemy(Enemy("Goblin Overlord", 10, "boss")))
+    return enemies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chances de victoire par niveau du joueur et par ennemi.")
+    parser.add_argument("--battles", type=int, default=10000, help="Parties simulées par couple")
+    parser.add_argument("--levels", type=int, nargs=2, default=[1, 10], metavar=("MIN", "MAX"))
+    parser.add_argument("--potions", type=int, default=0, help="Potions de soin du joueur")
+    parser.add_argument("--potion-power", type=int, default=POTION_POWER)
+    parser.add_argument("--boss", action="store_true", help="Inclure le boss Goblin Overlord")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    levels = range(args.levels[0], args.levels[1] + 1)
+    result = estimate(levels, registry_enemies(args.boss), args.battles, args.potions, args.potion_power,
+                      seed=args.seed)
+    mean_turns = result.mean_turns()
+
+    width = max(len(name) for name in result.enemies)
+    print(f"{'enemy':<{width}} " + " ".join(f"{'L' + str(level):>11}" for level in result.levels))
+    for j, name in enumerate(result.enemies):
+        cells = (f"{result.win_rate[i, j]:>5.1%} {mean_turns[i, j]:>5.1f}" for i in range(len(result.levels)))
+        print(f"{name:<{width}} " + " ".join(f"{text:>11}" for text in cells))
+    print("\nChaque case : chance de victoire, puis nombre moyen de tours des victoires.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,11 @@ import random
 from game.character import Character
 from game.inventory import Inventory
 from game.item import Item
+from game.slots import set_state
 
 class Player(Character):
+    __slots__ = ("inventory", "attack_boost_active", "has_boosted_attack", "has_used_attack_boost", "shield_active")
+
     def __init__(self, name, level=1):
         """
         Initialise le joueur avec un inventaire et des boosts temporaires.
@@ -19,6 +22,10 @@ class Player(Character):
         self.attack_boost_active = False  # Statut du boost d'attaque
         self.has_boosted_attack = False  # Vérifie si un boost d'attaque a déjà été appliqué
         self.has_used_attack_boost = False  # Empêche l'utilisation répétée du boost d'attaque dans un même tour
+        self.shield_active = False  # Bouclier activé par activate_shield
+
+    def __setstate__(self, state):
+        set_state(self, state, {"shield_active": False})  # Absent des sauvegardes sans bouclier activé
 
     def add_starter_items(self):
         """
@@ -67,19 +74,26 @@ class Player(Character):
         # Réinitialise le boost temporaire après l'attaque
         self.reset_attack_boost()
 
-    def calculate_attack_power(self):
+    def calculate_attack_power(self, rng=random):
         """
         Calcule la puissance d'attaque avec un facteur aléatoire.
         
+        :param rng: Générateur aléatoire (module random par défaut).
         :return: Puissance d'attaque calculée.
         """
-        return (self.attack + self._temporary_attack_boost) * random.uniform(0.9, 1.1)
+        return (self.attack + self._temporary_attack_boost) * rng.uniform(0.9, 1.1)
+
+    def boost_attack(self, boost_percentage):
+        """Applique le boost d'attaque sans rien afficher ; retourne False s'il a déjà été appliqué."""
+        if self.has_boosted_attack:
+            return False
+        self._temporary_attack_boost += boost_percentage
+        self.has_boosted_attack = True  # Le boost a été appliqué une seule fois
+        return True
 
     def apply_temporary_attack_boost(self, boost_percentage):
         """Applique un boost temporaire à l'attaque du joueur."""
-        if not self.has_boosted_attack:
-            self._temporary_attack_boost += boost_percentage
-            self.has_boosted_attack = True  # Le boost a été appliqué une seule fois
+        if self.boost_attack(boost_percentage):
             print(f"{self.name}'s attack is boosted by {boost_percentage}%!")
 
     def reset_attack_boost(self):
@@ -0,0 +1,255 @@
+import shutil
+import sys
+
+# Emojis des ennemis selon leur niveau
+ENEMY_EMOJIS = {
+    3: "👺",  # Level 3
+    4: "👹",  # Level 4
+    5: "🧌",  # Level 5
+    6: "🐉",  # Level 6
+    7: "🦖",  # Level 7 (for example, a dinosaur for a strong enemy)
+}
+UNKNOWN_ENEMY_EMOJI = "❓"  # Unknown or undefined enemy level
+PLAYER_EMOJI = "🧑"
+BOSS_EMOJI = "👑"
+
+# Couleur de chaque région de la carte
+REGION_EMOJIS = {
+    "forest": "🟩",
+    "swamp": "🟧",
+    "plains": "🟪",
+    "mountain": "🟦",
+}
+
+LEGEND_LINES = [
+    "",
+    "Legend for enemies by level:",
+    "👺 Level 1 |👹 Level 2 | 🧌 Level 3 |🐉 Level 4 | 🦖 Level 5",
+    "",
+    "Enemies are huge, so you can spot them from far away, but the items are tiny!",
+    "To find items, you will need to explore every corner of the map.",
+]
+
+CELL_WIDTH = 3  # Un emoji (2 colonnes) suivi d'un espace
+LOG_LINES = 12  # Lignes gardées sous la carte pour les messages, les infos du joueur et l'invite
+MINIMAP_SIZE = 8  # Côté de la minicarte en cases
+MINIMAP_SEPARATOR = "  "  # Case vide entre la vue et la minicarte
+
+
+class Viewport:
+    """
+    Fenêtre de cases affichée autour du joueur.
+    La fenêtre ne défile que lorsque le joueur s'approche à moins de `margin` cases d'un bord.
+    """
+
+    def __init__(self, rows, columns, margin=3):
+        """
+        :param rows: Nombre de lignes de cases visibles.
+        :param columns: Nombre de colonnes de cases visibles.
+        :param margin: Marge de défilement, en cases.
+        """
+        self.rows = rows
+        self.columns = columns
+        self.margin = margin
+        self.top = 0  # Première ligne visible
+        self.left = 0  # Première colonne visible
+
+    def resize(self, rows, columns):
+        """Adapte la fenêtre à une nouvelle taille de terminal."""
+        self.rows = rows
+        self.columns = columns
+
+    def follow(self, position, map_size):
+        """Fait défiler la fenêtre pour garder le joueur hors des marges."""
+        self.top = self._scroll(self.top, position[0], self.rows, map_size)
+        self.left = self._scroll(self.left, position[1], self.columns, map_size)
+
+    def _scroll(self, start, coordinate, length, map_size):
+        margin = min(self.margin, (length - 1) // 2)
+        if coordinate < start + margin:
+            start = coordinate - margin
+        elif coordinate > start + length - 1 - margin:
+            start = coordinate - length + 1 + margin
+        return max(0, min(start, map_size - length))
+
+    def row_range(self, map_size):
+        return range(self.top, min(self.top + self.rows, map_size))
+
+    def column_range(self, map_size):
+        return range(self.left, min(self.left + self.columns, map_size))
+
+
+class MapRenderer:
+    """
+    Affiche la carte en construisant chaque image dans un seul tampon, écrit en une fois.
+
+    La dernière image est conservée : les tours suivants n'envoient que les cases modifiées
+    (déplacement du joueur, ennemi vaincu...) via des positionnements de curseur ANSI.
+    La carte reste fixe en haut de l'écran grâce à une zone de défilement qui couvre les lignes
+    situées en dessous ; les messages du jeu défilent dans cette zone.
+
+    En mode vue (viewport), seules les cases autour du joueur sont dessinées, dans une fenêtre
+    dimensionnée d'après le terminal : le coût d'une image dépend alors de la taille du terminal
+    et non de celle de la carte. Une minicarte des régions peut être affichée à droite.
+    """
+
+    def __init__(self, game_map, stream=None, viewport=None, minimap=False, margin=3):
+        """
+        :param game_map: Carte à afficher.
+        :param stream: Flux de sortie (sys.stdout par défaut).
+        :param viewport: True pour n'afficher qu'une fenêtre autour du joueur, False pour toute la carte,
+                         None pour choisir automatiquement selon la taille du terminal.
+        :param minimap: Affiche une minicarte des régions à droite de la vue.
+        :param margin: Marge de défilement de la vue, en cases.
+        """
+        self.game_map = game_map
+        self.stream = stream if stream is not None else sys.stdout
+        self.viewport_mode = viewport
+        self.minimap = minimap
+        self.viewport = Viewport(game_map.size, game_map.size, margin)
+        self._minimap_regions = None
+        self.last_frame = None  # Cases de la dernière image affichée, ligne par ligne
+        self.map_top = len(LEGEND_LINES) + 1  # Ligne d'écran (1-based) de la première ligne de la carte
+        self.bytes_written = 0
+        self.frames = 0
+        self._region_rows = None
+
+    # --- Construction des images ---
+    def region_rows(self):
+        """Couleurs des régions, calculées une seule fois par carte."""
+        if self._region_rows is None:
+            game_map = self.game_map
+            self._region_rows = [
+                [REGION_EMOJIS[game_map.get_region((x, y))] for y in range(game_map.size)]
+                for x in range(game_map.size)
+            ]
+        return self._region_rows
+
+    def tile(self, position, player_position, region_emoji):
+        """Retourne l'emoji d'une case."""
+        if position == player_position:
+            return PLAYER_EMOJI
+        if position == self.game_map.boss_location:
+            return BOSS_EMOJI
+        enemy = self.game_map.get_enemy(position)
+        if enemy is not None:
+            return ENEMY_EMOJIS.get(enemy.level, UNKNOWN_ENEMY_EMOJI)
+        return region_emoji
+
+    def build_frame(self, player_position):
+        """Construit l'image complète de la carte sous forme de liste de lignes de cases."""
+        tile = self.tile
+        return [
+            [tile((x, y), player_position, region) for y, region in enumerate(row)]
+            for x, row in enumerate(self.region_rows())
+        ]
+
+    def build_view_frame(self, player_position):
+        """Construit l'image de la fenêtre autour du joueur, avec la minicarte éventuelle."""
+        game_map = self.game_map
+        tile = self.tile
+        get_region = game_map.get_region
+        self.viewport.follow(player_position, game_map.size)
+        columns = self.viewport.column_range(game_map.size)
+        frame = [
+            [tile((x, y), player_position, REGION_EMOJIS[get_region((x, y))]) for y in columns]
+            for x in self.viewport.row_range(game_map.size)
+        ]
+        if self.minimap:
+            for row, minimap_row in zip(frame, self.build_minimap(player_position)):
+                row.append(MINIMAP_SEPARATOR)
+                row.extend(minimap_row)
+        return frame
+
+    def build_minimap(self, player_position):
+        """Minicarte des régions sous-échantillonnée, avec le joueur et le boss."""
+        game_map = self.game_map
+        side = min(MINIMAP_SIZE, game_map.size)
+        step = game_map.size / side
+        if self._minimap_regions is None:
+            self._minimap_regions = [
+                [REGION_EMOJIS[game_map.get_region((int((i + 0.5) * step), int((j + 0.5) * step)))] for j in range(side)]
+                for i in range(side)
+            ]
+        minimap = [list(row) for row in self._minimap_regions]
+        boss_x, boss_y = game_map.boss_location
+        minimap[min(int(boss_x / step), side - 1)][min(int(boss_y / step), side - 1)] = BOSS_EMOJI
+        minimap[min(int(player_position[0] / step), side - 1)][min(int(player_position[1] / step), side - 1)] = PLAYER_EMOJI
+        return minimap
+
+    def uses_viewport(self, terminal):
+        """Indique si la carte doit être affichée dans une fenêtre plutôt qu'en entier."""
+        if self.viewport_mode is not None:
+            return self.viewport_mode
+        size = self.game_map.size
+        return size > terminal.lines - self.map_top - LOG_LINES or size * CELL_WIDTH > terminal.columns
+
+    def frame_text(self, frame):
+        """Texte de la carte et de sa légende, identique à l'affichage de GameMap.print_map."""
+        lines = LEGEND_LINES + ["".join(cell + " " for cell in row) for row in frame]
+        return "\n".join(lines) + "\n\n"
+
+    # --- Écriture à l'écran ---
+    def write(self, text):
+        """Écrit le texte en un seul appel et retourne le nombre d'octets envoyés."""
+        self.stream.write(text)
+        self.stream.flush()
+        written = len(text.encode("utf-8"))
+        self.bytes_written += written
+        self.frames += 1
+        return written
+
+    def terminal_size(self):
+        return shutil.get_terminal_size()
+
+    def render(self, player_position):
+        """Affiche la carte : image complète la première fois, puis uniquement les cases modifiées."""
+        terminal = self.terminal_size()
+        if self.uses_viewport(terminal):
+            minimap_columns = MINIMAP_SIZE + 1 if self.minimap else 0
+            self.viewport.resize(max(3, terminal.lines - self.map_top - LOG_LINES),
+                                 max(3, terminal.columns // CELL_WIDTH - minimap_columns))
+            frame = self.build_view_frame(player_position)
+        else:
+            frame = self.build_frame(player_position)
+        bottom = terminal.lines
+        log_top = self.map_top + len(frame) + 1
+
+        if (self.last_frame is None or log_top >= bottom or len(frame) != len(self.last_frame)
+                or any(len(row) != len(previous) for row, previous in zip(frame, self.last_frame))):
+            # Image complète : effacer l'écran, dessiner la carte puis réserver la zone de messages
+            text = "\033[r\033[H\033[2J" + self.frame_text(frame)
+            if log_top < bottom:
+                text += f"\033[{log_top};{bottom}r\033[{log_top};1H"
+                self.last_frame = frame
+            else:
+                self.last_frame = None  # Terminal trop petit : pas de zone fixe, donc pas de diff possible
+            return self.write(text)
+
+        parts = []
+        for x, (row, previous) in enumerate(zip(frame, self.last_frame)):
+            for y, cell in enumerate(row):
+                if cell != previous[y]:
+                    parts.append(f"\033[{self.map_top + x};{y * CELL_WIDTH + 1}H{cell}")
+        self.last_frame = frame
+        if not parts:
+            return 0
+        # Sauvegarder et restaurer le curseur pour ne pas perturber la zone de messages
+        return self.write("\0337" + "".join(parts) + "\0338")
+
+    def invalidate(self):
+        """Force une image complète au prochain rendu (après un effacement de l'écran par exemple)."""
+        self.last_frame = None
+
+    def clear_log(self):
+        """Efface la zone de messages sous la carte sans toucher à la carte."""
+        if self.last_frame is None:
+            return
+        self.stream.write(f"\033[{self.map_top + len(self.last_frame) + 1};1H\033[J")
+        self.stream.flush()
+
+    def close(self):
+        """Rend tout l'écran au défilement normal."""
+        self.stream.write("\033[r")
+        self.stream.flush()
+        self.last_frame = None
@@ -0,0 +1,30 @@
+"""
+Flux aléatoires déterministes d'une session de jeu.
+
+Chaque session a une graine. La génération de la carte et chaque combat tirent dans leur propre
+random.Random, dérivé de la graine et d'une étiquette (comme les graines de chunks de ChunkedGameMap) :
+un combat ne dépend ni des tirages des combats précédents, ni du module random global partagé par les
+autres sessions. Deux sessions peuvent donc tourner dans des threads différents, et une session rejouée
+avec les mêmes commandes (replay.py) refait exactement les mêmes tirages.
+"""
+import random
+
+
+class SessionRng:
+    def __init__(self, seed=None, battles=0):
+        """
+        :param seed: Graine de la session (tirée au hasard si absente).
+        :param battles: Flux de combat déjà distribués, pour poursuivre une session reprise d'une sauvegarde.
+        """
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.battles = battles  # Nombre de flux de combat déjà distribués
+        self.world = self.stream("world")  # Génération de la carte
+
+    def stream(self, *labels):
+        """Flux indépendant et reproductible, identifié par ses étiquettes."""
+        return random.Random(":".join(str(label) for label in (self.seed,) + labels))
+
+    def battle_stream(self):
+        """Flux du prochain combat de la session."""
+        self.battles += 1
+        return self.stream("battle", self.battles)
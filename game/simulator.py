@@ -0,0 +1,302 @@
+"""
+Simulateur de combats sans interface.
+
+Rejoue les règles de Battle.start_battle (mêmes fonctions de dégâts, de critique, d'esquive, de fuite
+et de réduction des dégâts) sans input() ni print : les choix du joueur sont faits par une stratégie
+(policy) et chaque combat retourne un BattleOutcome. Avec le même générateur aléatoire, un combat
+simulé consomme les mêmes tirages que le combat interactif et se termine de la même façon
+(vérifié par tests/test_simulator.py).
+
+Une stratégie est appelée à chaque tour avec (hp, max_hp, enemy_hp, items), où items est la liste des
+objets restants sous la forme [nom, effet, puissance, quantité]. Elle retourne ATTACK, RUN ou l'indice
+(0-based) de l'objet à utiliser. Les stratégies fournies sont des ThresholdPolicy : leur choix ne dépend
+que des objets restants et du passage des HP sous un seuil, et le simulateur ne le recalcule que
+lorsque l'un des deux change.
+
+Les dégâts sont lus dans des tables exactes (battle.damage_table) construites avec les fonctions de
+Battle : tirage par tirage, le résultat est celui de roll_damage et de mitigate_damage.
+"""
+import random
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import repeat
+
+from game.battle import (MAX_RUN_ATTEMPTS, critical_chance, evasion_chance, escape_chance, escape_damage, damage_variation,
+                         scaled_damage, damage_table)
+from game.character import mitigate_damage
+from game.enemy import Enemy
+
+ATTACK = "attack"
+RUN = "run"
+PLAYER_WINS = "player"
+ENEMY_WINS = "enemy"
+ESCAPED = "escaped"
+TABLE_CACHE_SIZE = 4096  # Tables de dégâts gardées (une par attaque, et par attaque et défense pour les ripostes)
+
+
+class BattleOutcome(namedtuple("BattleOutcome", ["winner", "turns", "player_hp", "enemy_hp", "items_consumed"])):
+    """Résultat d'un combat simulé : vainqueur (ou fuite), nombre de tours, HP restants et objets utilisés."""
+    __slots__ = ()
+
+
+class PlayerProfile(namedtuple("PlayerProfile", ["level", "hp", "max_hp", "attack", "defense", "attack_boost",
+                                                 "boost_applied", "shield", "items"])):
+    """État du joueur au début d'un combat ; `items` contient des tuples (nom, effet, puissance, quantité)."""
+    __slots__ = ()
+
+    @classmethod
+    def from_player(cls, player):
+        return cls(player.level, player.hp, player.max_hp, player._attack, player.defense,
+                   player._temporary_attack_boost, player.has_boosted_attack, player._damage_reduction,
+                   tuple((item.name, item.effect, item.power, item.quantity) for item in player.inventory.items))
+
+    @classmethod
+    def for_level(cls, level, items=()):
+        """Joueur neuf d'un niveau donné, avec les statistiques de Character."""
+        max_hp = 100 + (level - 1) * 20
+        return cls(level, max_hp, max_hp, 10 + (level - 1) * 3, 5 + (level - 1) * 2, 0, False, 0, tuple(items))
+
+
+class EnemyProfile(namedtuple("EnemyProfile", ["name", "level", "hp", "attack"])):
+    """État d'un ennemi au début d'un combat."""
+    __slots__ = ()
+
+    @classmethod
+    def from_enemy(cls, enemy):
+        return cls(enemy.name, enemy.level, enemy.hp, enemy.attack)
+
+    @classmethod
+    def from_template(cls, template):
+        """Ennemi neuf décrit par un EnemyTemplate du registre."""
+        return cls.from_enemy(Enemy(name=template.name, level=template.level, enemy_type=template.type))
+
+
+# --- Stratégies du joueur ---
+class ThresholdPolicy:
+    """
+    Stratégie dont le choix ne dépend que des objets restants et du passage des HP sous
+    `threshold` x HP max : plan(items) retourne (action sous le seuil, action au-dessus).
+    """
+    __slots__ = ("threshold", "plan")
+
+    def __init__(self, threshold, plan):
+        self.threshold = threshold
+        self.plan = plan
+
+    def __call__(self, hp, max_hp, enemy_hp, items):
+        low, high = self.plan(items)
+        return low if hp < self.threshold * max_hp else high
+
+
+# Attaque à chaque tour
+always_attack = ThresholdPolicy(0, lambda items: (ATTACK, ATTACK))
+
+# Tente de fuir à chaque tour
+always_run = ThresholdPolicy(0, lambda items: (RUN, RUN))
+
+
+def heal_below(threshold=0.3):
+    """Stratégie qui boit une potion de soin quand les HP passent sous `threshold` (fraction des HP max), et attaque sinon."""
+    def plan(items):
+        for index, item in enumerate(items):
+            if item[1] == "health_boost":
+                return index, ATTACK
+        return ATTACK, ATTACK
+    return ThresholdPolicy(threshold, plan)
+
+
+def best_item(heal_threshold=0.3):
+    """
+    Stratégie qui se soigne sous `heal_threshold`, utilise un bouclier avant un coup quand elle en a,
+    puis l'arme la plus puissante ; elle attaque quand il ne reste rien d'utile.
+    """
+    def plan(items):
+        low = high = None  # Premier soin ou bouclier sous le seuil, premier bouclier au-dessus
+        best, best_power = None, 0
+        for index, (_, effect, power, _) in enumerate(items):
+            if effect == "boost_shield":
+                low = index if low is None else low
+                high = index if high is None else high
+            elif effect == "health_boost" and low is None:
+                low = index
+            elif effect == "damage" and power > best_power:
+                best, best_power = index, power
+        otherwise = ATTACK if best is None else best
+        return otherwise if low is None else low, otherwise if high is None else high
+    return ThresholdPolicy(heal_threshold, plan)
+
+
+# --- Combat ---
+_tables = {}
+
+
+def dealt_table(attack, doubled=False):
+    """Table exacte (seuils, dégâts) d'une attaque du joueur : dégâts de roll_damage pour chaque tirage de la variation."""
+    key = (attack, doubled)
+    table = _tables.get(key)
+    if table is None:
+        if len(_tables) >= TABLE_CACHE_SIZE:
+            _tables.clear()
+        table = _tables[key] = damage_table(lambda roll: scaled_damage(attack, damage_variation(roll), doubled))
+    return table
+
+
+def taken_table(enemy_attack, defense):
+    """Table exacte (seuils, dégâts subis) d'une riposte sans bouclier : roll_damage puis mitigate_damage."""
+    key = (enemy_attack, "defense", defense)
+    table = _tables.get(key)
+    if table is None:
+        if len(_tables) >= TABLE_CACHE_SIZE:
+            _tables.clear()
+        table = _tables[key] = damage_table(
+            lambda roll: mitigate_damage(scaled_damage(enemy_attack, damage_variation(roll)), 0, defense))
+    return table
+
+
+def simulate(player, enemy, policy=always_attack, rng=random):
+    """
+    Simule un combat et retourne son BattleOutcome, sans rien afficher.
+
+    :param player: PlayerProfile du joueur.
+    :param enemy: EnemyProfile de l'ennemi.
+    :param policy: Stratégie du joueur.
+    :param rng: Générateur aléatoire (module random par défaut, comme Battle).
+    """
+    return simulate_many(player, enemy, 1, policy, rng)[0]
+
+
+def simulate_many(player, enemy, count, policy=always_attack, rng=random):
+    """
+    Simule `count` combats indépendants et retourne la liste de leurs BattleOutcome (les mêmes, tirage
+    par tirage, que `count` appels à simulate). Tout ce qui ne dépend que des profils est calculé une
+    fois pour le lot.
+    """
+    roll = rng.random
+    level, max_hp, base_attack, defense = player.level, player.max_hp, player.attack, player.defense
+    enemy_attack = enemy.attack
+    escape = escape_chance(level, enemy.level)
+    fled_hit = escape_damage(enemy_attack, defense)
+    hit_bounds, hits = dealt_table(enemy_attack)  # Riposte avec bouclier : dégâts avant mitigate_damage
+    taken_bounds, taken = taken_table(enemy_attack, defense)  # Riposte sans bouclier
+    planned = isinstance(policy, ThresholdPolicy)
+    if planned:
+        plan, limit = policy.plan, policy.threshold * max_hp
+        first_plan = plan(player.items)  # Les stratégies fournies lisent les objets sans les modifier
+    start_attack = base_attack + player.attack_boost
+    start_crit = critical_chance(level, start_attack, enemy_attack)
+    start_evade = evasion_chance(level, start_attack, enemy_attack)
+    start_tables = dealt_table(start_attack) + dealt_table(start_attack, True)
+    new_outcome = tuple.__new__
+    outcomes = []
+
+    for _ in range(count):
+        hp, boost_applied, shield = player.hp, player.boost_applied, player.shield
+        attack, crit, evade = start_attack, start_crit, start_evade
+        bounds, dealt, crit_bounds, crit_dealt = start_tables
+        enemy_hp = enemy.hp
+        items = player.items if planned else [list(item) for item in player.items]
+        copied = not planned  # Objets copiés (listes modifiables) au premier objet utilisé
+        consumed = []
+        battle_boost = 0  # Battle.temp_attack_boost, remis à zéro après chaque attaque
+        run_attempts = 0
+        turns = 0
+        escaped = False
+        if planned:
+            when_low, when_high = first_plan
+
+        while hp > 0 and enemy_hp > 0:
+            action = (when_low if hp < limit else when_high) if planned else policy(hp, max_hp, enemy_hp, items)
+
+            if action == ATTACK:
+                if battle_boost:  # Attaque boostée pour ce tour seulement
+                    tables = dealt_table(attack + battle_boost) + dealt_table(attack + battle_boost, True)
+                    turn_bounds, turn_dealt, turn_crit_bounds, turn_crit_dealt = tables
+                    battle_boost = 0
+                    streak = (None,)
+                else:
+                    turn_bounds, turn_dealt, turn_crit_bounds, turn_crit_dealt = bounds, dealt, crit_bounds, crit_dealt
+                    # Série d'attaques : avec une ThresholdPolicy, le choix ne change que si les HP passent sous le seuil
+                    streak = repeat(None) if planned else (None,)
+                stop = limit if planned and when_low != ATTACK and hp >= limit else 1
+                for _ in streak:
+                    turns += 1
+                    if roll() < crit:  # Deux tirages sous la chance de critique pour doubler (Battle.player_turn)
+                        variation_roll = roll()
+                        if roll() < crit:
+                            enemy_hp -= turn_crit_dealt[bisect_right(turn_crit_bounds, variation_roll)]
+                        else:
+                            enemy_hp -= turn_dealt[bisect_right(turn_bounds, variation_roll)]
+                    else:
+                        enemy_hp -= turn_dealt[bisect_right(turn_bounds, roll())]
+                        roll()  # Tirage du critique de roll_damage, raté avec une chance de 0
+                    if enemy_hp <= 0:
+                        break
+                    if roll() >= evade:  # Riposte de l'ennemi (Battle.enemy_turn puis Character.apply_damage)
+                        if shield:
+                            hp -= mitigate_damage(hits[bisect_right(hit_bounds, roll())], shield, defense)
+                            shield = 0
+                        else:
+                            hp -= taken[bisect_right(taken_bounds, roll())]
+                        roll()  # Tirage du critique de roll_damage, toujours raté pour l'ennemi (chance 0)
+                        if hp < stop:
+                            break
+                continue
+
+            turns += 1
+            if action == RUN:
+                if run_attempts >= MAX_RUN_ATTEMPTS:
+                    escaped = True
+                    break
+                success = roll() < escape
+                run_attempts += 1
+                if success:
+                    escaped = True
+                    break
+                # Le coup reçu pendant la fuite est déjà réduit par la défense, puis take_damage la soustrait encore
+                hp -= mitigate_damage(fled_hit, shield, defense)
+                shield = 0
+            else:
+                if not copied:
+                    items, copied = [list(item) for item in items], True
+                item = items[action]
+                name, effect, power, _ = item
+                if effect == "boost_attack":
+                    if not boost_applied:  # Le boost du joueur n'est appliqué qu'une fois et n'est jamais remis à zéro
+                        attack += power
+                        boost_applied = True
+                        crit = critical_chance(level, attack, enemy_attack)
+                        evade = evasion_chance(level, attack, enemy_attack)
+                        bounds, dealt, crit_bounds, crit_dealt = dealt_table(attack) + dealt_table(attack, True)
+                    battle_boost = power
+                elif effect == "damage":
+                    enemy_hp -= power
+                elif effect == "health_boost":
+                    # Soin appliqué par Battle.handle_item_use puis par Inventory.use_item
+                    hp = min(min(hp + power, max_hp) + power, max_hp)
+                elif effect == "boost_shield":
+                    shield += power
+                consumed.append(name)
+                item[3] -= 1
+                if item[3] <= 0:
+                    del items[action]
+                if planned:
+                    when_low, when_high = plan(items)
+
+            # L'ennemi riposte s'il est encore en vie, comme après une attaque
+            if enemy_hp > 0 and roll() >= evade:
+                if shield:
+                    hp -= mitigate_damage(hits[bisect_right(hit_bounds, roll())], shield, defense)
+                    shield = 0
+                else:
+                    hp -= taken[bisect_right(taken_bounds, roll())]
+                roll()
+
+        # Les HP restent positifs ou nuls, comme avec les setters de Character et Enemy
+        if escaped:
+            outcome = (ESCAPED, turns, hp, enemy_hp, tuple(consumed))
+        elif hp > 0:
+            outcome = (PLAYER_WINS, turns, hp, 0, tuple(consumed))
+        else:
+            outcome = (ENEMY_WINS, turns, 0, enemy_hp if enemy_hp > 0 else 0, tuple(consumed))
+        outcomes.append(new_outcome(BattleOutcome, outcome))
+    return outcomes
@@ -0,0 +1,268 @@
+"""
+Combats à plusieurs : un groupe de héros contre une meute d'ennemis.
+
+Les combattants agissent dans l'ordre d'une file de priorité (heapq) : chacun a une vitesse, et son
+prochain tour tombe 1 / vitesse après le précédent. À vitesse égale, les héros passent avant les
+ennemis, puis chacun dans son ordre d'arrivée : un combat 1 contre 1 alterne donc strictement joueur
+puis ennemi. Battle en est un cas particulier : ses échanges attaque/riposte sont des actions (strike)
+d'un Skirmish à 1 contre 1 (mêmes tirages dans le même ordre, vérifié par tests/test_skirmish.py).
+
+Les règles sont celles de game/battle.py : un héros frappe avec la chance de critique de critical_chance
+(deux tirages pour doubler les dégâts, roll_damage) et les ennemis ignorent la défense ; un ennemi frappe
+sans critique, le héros visé peut l'esquiver (evasion_chance), et son bouclier puis sa défense réduisent
+les dégâts (apply_damage du héros). Les objets et la fuite restent propres au combat interactif.
+
+Les statistiques sont gardées dans une table compacte, une colonne array par statistique.
+
+Usage (depuis la racine du dépôt) :
+    python -m game.skirmish [--heroes 50] [--level 5] [--pack 50] [--enemy NOM ...] [--seed 1]
+"""
+import argparse
+import heapq
+import random
+import time
+from array import array
+from collections import namedtuple
+
+from game.assets import get_registry
+from game.battle import critical_chance, evasion_chance, roll_damage
+from game.character import Character
+from game.enemy import Enemy
+from game.events import CriticalHit, Attack, Evade, ShieldAbsorbed, DamageTaken, Defeated, Victory
+
+HEROES = 0
+MONSTERS = 1
+SIDE_NAMES = ("heroes", "monsters")
+MAX_ACTIONS = 1000000  # Au-delà, le combat est arrêté sans vainqueur
+
+
+class CombatantStatus(namedtuple("CombatantStatus", ["name", "side", "level", "hp", "max_hp", "attack", "defense",
+                                                     "speed"])):
+    """Ligne de la table des combattants."""
+    __slots__ = ()
+
+
+class SkirmishOutcome(namedtuple("SkirmishOutcome", ["winner", "actions", "survivors"])):
+    """Résultat d'un combat : camp vainqueur (None si interrompu), nombre d'actions et indices des survivants."""
+    __slots__ = ()
+
+
+class CombatantTable:
+    """Statistiques de tous les combattants, une colonne array par statistique."""
+
+    def __init__(self):
+        self.names = []
+        self.side = array("b")
+        self.level = array("l")
+        self.hp = array("l")
+        self.max_hp = array("l")
+        self.attack = array("l")
+        self.defense = array("l")
+        self.speed = array("d")
+
+    def add(self, name, side, level, hp, max_hp, attack, defense, speed=1.0):
+        """Ajoute un combattant et retourne son indice."""
+        self.names.append(name)
+        self.side.append(side)
+        self.level.append(level)
+        self.hp.append(hp)
+        self.max_hp.append(max_hp)
+        self.attack.append(attack)
+        self.defense.append(defense)
+        self.speed.append(speed)
+        return len(self.names) - 1
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, index):
+        """État d'un combattant."""
+        return CombatantStatus(self.names[index], self.side[index], self.level[index], self.hp[index],
+                               self.max_hp[index], self.attack[index], self.defense[index], self.speed[index])
+
+    def alive(self, side):
+        """Indices des combattants encore en vie d'un camp."""
+        hp = self.hp
+        return [index for index, member in enumerate(self.side) if member == side and hp[index] > 0]
+
+
+# --- Choix de la cible ---
+# Une stratégie de ciblage reçoit (table, candidats en vie du camp adverse, attaquant, rng) et retourne un candidat.
+def target_first(table, candidates, attacker, rng):
+    """Toujours le premier adversaire encore en vie."""
+    return candidates[0]
+
+
+def target_weakest(table, candidates, attacker, rng):
+    """L'adversaire qui a le moins de HP."""
+    return min(candidates, key=table.hp.__getitem__)
+
+
+def target_random(table, candidates, attacker, rng):
+    """Un adversaire au hasard."""
+    return candidates[int(rng.random() * len(candidates))]
+
+
+class Skirmish:
+    def __init__(self, rng=random, targeting=target_first):
+        """
+        :param rng: Générateur aléatoire du combat (module random par défaut).
+        :param targeting: Stratégie de choix de la cible, commune à tous les combattants.
+        """
+        self.table = CombatantTable()
+        self.sources = []  # Personnage d'origine de chaque combattant (pour sync)
+        self.rng = rng
+        self.targeting = targeting
+
+    def add_hero(self, character, speed=1.0):
+        """Ajoute un héros (Player ou Character) ; retourne son indice."""
+        self.sources.append(character)
+        return self.table.add(character.name, HEROES, character.level, character.hp, character.max_hp,
+                              character.attack, character.defense, speed)
+
+    def add_monster(self, enemy, speed=1.0):
+        """Ajoute un ennemi (Enemy) ; retourne son indice."""
+        self.sources.append(enemy)
+        return self.table.add(enemy.name, MONSTERS, enemy.level, enemy.hp, enemy.max_hp, enemy.attack,
+                              enemy.defense, speed)
+
+    def resolve(self, sink=None, max_actions=MAX_ACTIONS):
+        """
+        Joue le combat jusqu'à ce qu'un camp n'ait plus de combattant en vie.
+
+        :param sink: Sortie des événements (voir game/events.py) ; aucun événement n'est créé sans sortie.
+        :param max_actions: Nombre maximal d'actions avant d'interrompre le combat.
+        :return: SkirmishOutcome.
+        """
+        table, rng, targeting, strike = self.table, self.rng, self.targeting, self.strike
+        emit = sink.emit if sink is not None else None
+        names, side, hp, speed = table.names, table.side, table.hp, table.speed
+        alive = (table.alive(HEROES), table.alive(MONSTERS))
+
+        # File des prochains tours : (instant, camp, indice) ; à instant égal les héros passent d'abord
+        schedule = [(1.0 / speed[index], side[index], index) for index in alive[HEROES] + alive[MONSTERS]]
+        heapq.heapify(schedule)
+        actions = 0
+
+        while alive[HEROES] and alive[MONSTERS] and actions < max_actions:
+            moment, attacker_side, attacker = heapq.heappop(schedule)
+            if hp[attacker] <= 0:
+                continue  # Tombé avant son tour : retiré de la file
+            actions += 1
+            candidates = alive[1 - attacker_side]
+            target = targeting(table, candidates, attacker, rng)
+            strike(attacker, target, emit)
+            if hp[target] <= 0:
+                candidates.remove(target)
+                if emit:
+                    emit(Defeated(names[target]))
+            heapq.heappush(schedule, (moment + 1.0 / speed[attacker], attacker_side, attacker))
+
+        if alive[HEROES] and alive[MONSTERS]:
+            winner = None
+        else:
+            winner = HEROES if alive[HEROES] else MONSTERS
+            if emit:
+                emit(Victory(SIDE_NAMES[winner], SIDE_NAMES[1 - winner], winner == HEROES))
+        return SkirmishOutcome(winner, actions, tuple(alive[HEROES] + alive[MONSTERS]))
+
+    def strike(self, attacker, target, emit=None, bonus=0):
+        """
+        Action de `attacker` contre `target` : un héros frappe (Battle.player_turn), un ennemi frappe et le
+        héros visé peut l'esquiver (Battle.enemy_turn). Les dégâts subis par un héros passent par son
+        apply_damage (bouclier puis défense) ; l'événement Defeated est laissé à l'appelant.
+
+        :param emit: Fonction qui reçoit chaque événement (None : aucun événement n'est créé).
+        :param bonus: Attaque ajoutée aux dégâts d'un héros, sans changer sa chance de critique (boost
+            d'attaque de Battle).
+        """
+        table, rng = self.table, self.rng
+        names, hp, attack = table.names, table.hp, table.attack
+        if table.side[attacker] == HEROES:
+            crit = critical_chance(table.level[attacker], attack[attacker], attack[target])
+            is_crit = rng.random() < crit
+            damage, doubled = roll_damage(attack[attacker] + bonus, crit if is_crit else 0, rng)
+            hp[target] = hp[target] - damage if hp[target] > damage else 0
+            if emit:
+                if doubled:
+                    emit(CriticalHit(names[attacker]))
+                emit(Attack(names[attacker], names[target], damage, is_crit))
+        elif rng.random() < evasion_chance(table.level[target], attack[target], attack[attacker]):
+            if emit:
+                emit(Evade(names[target], names[attacker]))
+        else:
+            hero = self.sources[target]  # HP du héros et de la table changent ensemble, ici seulement
+            damage, absorbed = hero.apply_damage(roll_damage(attack[attacker], rng=rng)[0])
+            hp[target] = hero.hp
+            if emit:
+                if absorbed:
+                    emit(ShieldAbsorbed(names[target], absorbed))
+                emit(DamageTaken(names[target], damage, hp[target], table.max_hp[target]))
+
+    def refresh(self):
+        """Relit les statistiques des personnages d'origine, modifiées hors du combat (objets utilisés dans Battle)."""
+        table = self.table
+        for index, character in enumerate(self.sources):
+            table.level[index], table.hp[index], table.max_hp[index] = character.level, character.hp, character.max_hp
+            table.attack[index], table.defense[index] = character.attack, character.defense
+
+    def sync(self):
+        """Reporte les HP de la table sur les personnages d'origine."""
+        for index, character in enumerate(self.sources):
+            character.hp = self.table.hp[index]
+
+
+def duel(player, enemy, rng=random):
+    """
+    Combat 1 contre 1 où le joueur attaque à chaque tour ; les HP restants sont reportés sur le joueur et
+    l'ennemi. Retourne le SkirmishOutcome.
+    """
+    skirmish = Skirmish(rng)
+    skirmish.add_hero(player)
+    skirmish.add_monster(enemy)
+    outcome = skirmish.resolve()
+    skirmish.sync()
+    return outcome
+
+
+def make_pack(templates, count, rng=random):
+    """Meute de `count` ennemis tirés uniformément parmi les modèles (EnemyTemplate)."""
+    return [Enemy(name=template.name, level=template.level, enemy_type=template.type)
+            for template in (templates[int(rng.random() * len(templates))] for _ in range(count))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Combat headless d'un groupe de héros contre une meute.")
+    parser.add_argument("--heroes", type=int, default=50)
+    parser.add_argument("--level", type=int, default=5, help="Niveau des héros")
+    parser.add_argument("--pack", type=int, default=50, help="Nombre d'ennemis")
+    parser.add_argument("--enemy", nargs="+", default=None, help="Noms des ennemis de la meute (tous par défaut)")
+    parser.add_argument("--targeting", choices=("first", "weakest", "random"), default="first")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    templates = get_registry().enemies()
+    if args.enemy:
+        templates = [template for template in templates if template.name in args.enemy]
+    if not templates:
+        print("Erreur : Aucun ennemi ne correspond.")
+        return
+
+    rng = random.Random(args.seed)
+    targeting = {"first": target_first, "weakest": target_weakest, "random": target_random}[args.targeting]
+    skirmish = Skirmish(rng, targeting)
+    for number in range(args.heroes):
+        skirmish.add_hero(Character(f"Hero {number + 1}", args.level))
+    for enemy in make_pack(templates, args.pack, rng):
+        skirmish.add_monster(enemy)
+
+    start = time.perf_counter()
+    outcome = skirmish.resolve()
+    elapsed = time.perf_counter() - start
+    winner = "aucun (interrompu)" if outcome.winner is None else SIDE_NAMES[outcome.winner]
+    print(f"{args.heroes} héros (niveau {args.level}) contre {args.pack} ennemis : vainqueur {winner}, "
+          f"{outcome.actions} actions, {len(outcome.survivors)} survivants, {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Sauvegarde (pickle) des objets du jeu à attributs fixes (__slots__).
+
+L'état d'un objet est le dictionnaire de ses attributs, comme le __dict__ des anciennes versions de
+ces classes : une sauvegarde écrite avant le passage à __slots__ se relit avec le même set_state.
+"""
+_names = {}
+
+
+def slot_names(cls):
+    """
+    Noms de tous les attributs fixes de la classe et de ses classes parentes. Un attribut masqué par une
+    propriété d'une sous-classe (Enemy lit ses statistiques dans son modèle) n'est ni sauvegardé ni relu.
+    """
+    names = _names.get(cls)
+    if names is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            names.extend(name for name in ((slots,) if isinstance(slots, str) else slots)
+                         if getattr(cls, name, None) is klass.__dict__.get(name))
+        names = _names[cls] = tuple(names)
+    return names
+
+
+def get_state(obj):
+    """Dictionnaire des attributs fixes définis de l'objet."""
+    state = {}
+    for name in slot_names(type(obj)):
+        try:
+            state[name] = getattr(obj, name)
+        except AttributeError:
+            pass  # Attribut jamais défini
+    return state
+
+
+def set_state(obj, state, defaults=None):
+    """
+    Restaure les attributs d'un objet à partir de son état sauvegardé.
+
+    :param state: Dictionnaire des attributs (get_state, ou __dict__ d'une ancienne sauvegarde).
+    :param defaults: Valeurs des attributs absents des anciennes sauvegardes.
+    """
+    names = slot_names(type(obj))
+    for name, value in (defaults or {}).items():
+        if name not in state:
+            setattr(obj, name, value)
+    for name, value in state.items():
+        if name in names:  # Les anciens attributs qui n'existent plus sont ignorés
+            setattr(obj, name, value)
@@ -0,0 +1,97 @@
+import random
+
+
+class ShuffledPool:
+    """
+    Tirage sans remise des cases d'une région rectangulaire.
+
+    Utilise un mélange de Fisher-Yates paresseux : seules les cases déplacées sont mémorisées,
+    donc chaque tirage coûte O(1) sans jamais construire la liste complète des positions.
+    """
+
+    def __init__(self, x_range, y_range, rng=random):
+        """
+        :param x_range: Plage des lignes de la région (range).
+        :param y_range: Plage des colonnes de la région (range).
+        :param rng: Générateur aléatoire utilisé pour les tirages.
+        """
+        self.x_range = x_range
+        self.y_range = y_range
+        self.rng = rng
+        self.remaining = len(x_range) * len(y_range)
+        self._swapped = {}  # Indice virtuel -> indice réel après échange
+
+    def __len__(self):
+        return self.remaining
+
+    def draw(self):
+        """Tire une position (x, y) encore jamais tirée, ou None si la région est épuisée."""
+        if self.remaining <= 0:
+            return None
+        pick = self.rng.randrange(self.remaining)
+        last = self.remaining - 1
+        value = self._swapped.get(pick, pick)
+        self._swapped[pick] = self._swapped.pop(last, last)
+        self.remaining = last
+        if pick == last:
+            self._swapped.pop(pick, None)
+        x_offset, y_offset = divmod(value, len(self.y_range))
+        return self.x_range[x_offset], self.y_range[y_offset]
+
+
+class SpawnPlanner:
+    """
+    Planificateur de spawn : une carte d'exclusion (bitmap) et des réserves mélangées par région.
+
+    Une case est exclue si elle est trop proche du départ du joueur ou voisine d'un ennemi.
+    Placer un ennemi exclut son voisinage 3x3 en O(1), et le test de validité d'une case est
+    une simple lecture dans la bitmap.
+    """
+
+    def __init__(self, size, start_location=(0, 0), rng=random):
+        """
+        :param size: Taille de la carte.
+        :param start_location: Position de départ du joueur, protégée des ennemis.
+        :param rng: Générateur aléatoire utilisé pour les tirages.
+        """
+        self.size = size
+        self.rng = rng
+        self.blocked = bytearray(size * size)  # 1 si la case ne peut pas accueillir de spawn
+        start_x, start_y = start_location
+        for x in range(start_x - 1, start_x + 2):
+            for y in range(start_y - 1, start_y + 2):
+                if 0 <= x < size and 0 <= y < size:
+                    self.blocked[x * size + y] = 1
+
+    def region_pools(self):
+        """Retourne une réserve mélangée pour chacune des quatre régions de la carte."""
+        half = self.size // 2
+        return [
+            ShuffledPool(range(0, half), range(0, half), self.rng),  # Région 1 (Haut-Gauche)
+            ShuffledPool(range(0, half), range(half, self.size), self.rng),  # Région 2 (Haut-Droite)
+            ShuffledPool(range(half, self.size), range(0, half), self.rng),  # Région 3 (Bas-Gauche)
+            ShuffledPool(range(half, self.size), range(half, self.size), self.rng),  # Région 4 (Bas-Droite)
+        ]
+
+    def is_free(self, position):
+        """Vérifie que la case n'est pas exclue."""
+        x, y = position
+        return not self.blocked[x * self.size + y]
+
+    def draw_free(self, pool):
+        """Tire des cases de la réserve jusqu'à en trouver une libre ; None si la réserve est épuisée."""
+        while True:
+            position = pool.draw()
+            if position is None or self.is_free(position):
+                return position
+
+    def block_around(self, position):
+        """Exclut la case et ses 8 voisines après le placement d'un ennemi."""
+        x, y = position
+        size = self.size
+        for nx in (x - 1, x, x + 1):
+            if 0 <= nx < size:
+                row = nx * size
+                for ny in (y - 1, y, y + 1):
+                    if 0 <= ny < size:
+                        self.blocked[row + ny] = 1
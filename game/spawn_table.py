@@ -0,0 +1,180 @@
+"""
+Tables de spawn des ennemis par région.
+
+Le tirage historique de GameMap.place_enemy teste `random.random() < spawn_chance` pour chaque type
+d'ennemi, puis choisit uniformément parmi les types retenus. La probabilité effective de chaque type
+(et celle qu'aucun ennemi n'apparaisse) se calcule exactement à partir de la loi du nombre de types
+retenus (loi binomiale de Poisson) ; elle est calculée une fois par chargement des données, puis
+chaque case est tirée en O(1) avec la méthode des alias (Vose).
+
+Avec NumPy (dépendance optionnelle, requirements-extra.txt), sample_many fait les comparaisons et les
+alias de tout un lot dans des tableaux ; sans NumPy, une boucle Python donne exactement les mêmes tirages.
+"""
+import random
+
+try:
+    import numpy as np
+except ImportError:  # Dépendance optionnelle : tirage par lots en Python
+    np = None
+
+from game.assets import get_registry
+
+# Multiplicateurs de spawn_chance par région puis par type d'ennemi, par exemple
+# {"mountain": {"aérien": 2.0}} pour plus d'ennemis volants en montagne.
+# Vide par défaut : toutes les régions gardent la loi historique.
+REGION_SPAWN_WEIGHTS = {}
+NUMPY_BATCH_MIN = 256  # En dessous, la boucle Python est plus rapide que la création des tableaux
+
+
+def poisson_binomial(chances):
+    """Loi du nombre de succès d'épreuves de Bernoulli indépendantes de probabilités `chances`."""
+    distribution = [1.0]
+    for chance in chances:
+        following = [0.0] * (len(distribution) + 1)
+        for successes, probability in enumerate(distribution):
+            following[successes] += probability * (1 - chance)
+            following[successes + 1] += probability * chance
+        distribution = following
+    return distribution
+
+
+def remove_trial(distribution, chance):
+    """Retire une épreuve de probabilité `chance` d'une loi binomiale de Poisson (déconvolution stable)."""
+    count = len(distribution) - 1
+    others = [0.0] * count
+    if chance <= 0.5:
+        previous = 0.0
+        for successes in range(count):
+            previous = others[successes] = (distribution[successes] - chance * previous) / (1 - chance)
+    else:
+        following = 0.0
+        for successes in range(count - 1, -1, -1):
+            following = others[successes] = (distribution[successes + 1] - (1 - chance) * following) / chance
+    return [max(0.0, probability) for probability in others]
+
+
+def effective_probabilities(chances):
+    """
+    Probabilité exacte que chaque type soit choisi par le tirage historique, et probabilité qu'aucun ne le soit.
+
+    Un type de chance s est choisi s'il est retenu puis tiré parmi les k autres types retenus :
+    P = s * E[1 / (1 + k)], où k suit la loi binomiale de Poisson des autres types.
+    """
+    distribution = poisson_binomial(chances)
+    by_chance = {}  # Les types de même chance ont la même probabilité effective
+    probabilities = []
+    for chance in chances:
+        if chance not in by_chance:
+            if chance <= 0:
+                by_chance[chance] = 0.0
+            else:
+                others = remove_trial(distribution, chance)
+                by_chance[chance] = chance * sum(probability / (k + 1) for k, probability in enumerate(others))
+        probabilities.append(by_chance[chance])
+    return probabilities, distribution[0]
+
+
+class SpawnTable:
+    """Loi de spawn d'une région, tirée en O(1) par case avec la méthode des alias."""
+
+    def __init__(self, templates, chances):
+        """
+        :param templates: Modèles d'ennemis (EnemyTemplate).
+        :param chances: Chance de spawn de chaque modèle, dans le même ordre.
+        """
+        self.templates = tuple(templates)
+        probabilities, self.nothing = effective_probabilities([min(1.0, max(0.0, chance)) for chance in chances])
+        # Issues du tirage : chaque modèle, puis None (aucun ennemi)
+        self.outcomes = self.templates + (None,)
+        self.probabilities = tuple(probabilities) + (self.nothing,)
+        self.accept, self.alias = self.build_alias(self.probabilities)
+        if np is not None:
+            self.accept_array = np.array(self.accept)
+            self.alias_array = np.array(self.alias, dtype=np.intp)
+            self.outcome_array = np.empty(len(self.outcomes), dtype=object)
+            self.outcome_array[:] = self.outcomes
+
+    @staticmethod
+    def build_alias(probabilities):
+        """Construit les tables d'acceptation et d'alias de Vose."""
+        count = len(probabilities)
+        total = sum(probabilities)
+        scaled = [probability * count / total for probability in probabilities]
+        accept = [1.0] * count
+        alias = list(range(count))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            accept[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        return accept, alias  # Les restes (erreurs d'arrondi) gardent une acceptation de 1
+
+    def probability(self, template):
+        """Probabilité effective qu'une case reçoive ce modèle (None : aucun ennemi)."""
+        return self.probabilities[self.outcomes.index(template)]
+
+    def sample(self, rng=random):
+        """Tire le modèle d'ennemi d'une case, ou None si aucun ennemi n'apparaît."""
+        position = rng.random() * len(self.outcomes)
+        column = int(position)
+        return self.outcomes[column if position - column < self.accept[column] else self.alias[column]]
+
+    def sample_many(self, count, rng=random):
+        """
+        Tire d'un coup les modèles de `count` cases (None pour les cases sans ennemi).
+
+        :param rng: Générateur aléatoire (module random par défaut), ou numpy.random.Generator : les
+            nombres du lot sont alors tirés en un seul appel. Avec un générateur Python, les tirages (et
+            la consommation du générateur) sont ceux de `count` appels à sample.
+        """
+        if np is not None and (count >= NUMPY_BATCH_MIN or isinstance(rng, np.random.Generator)):
+            return self.sample_array(count, rng).tolist()
+        outcomes, accept, alias = self.outcomes, self.accept, self.alias
+        width = len(outcomes)
+        uniform = rng.random
+        drawn = []
+        append = drawn.append
+        for _ in range(count):
+            position = uniform() * width
+            column = int(position)
+            append(outcomes[column if position - column < accept[column] else alias[column]])
+        return drawn
+
+    def sample_array(self, count, rng=random):
+        """sample_many dans un tableau NumPy d'objets (nécessite NumPy)."""
+        if isinstance(rng, np.random.Generator):
+            uniform = rng.random(count)
+        else:
+            uniform = np.fromiter((rng.random() for _ in range(count)), dtype=float, count=count)
+        position = uniform * len(self.outcomes)
+        column = position.astype(np.intp)
+        chosen = np.where(position - column < self.accept_array[column], column, self.alias_array[column])
+        return self.outcome_array[chosen]
+
+
+def region_chances(templates, region):
+    """Chances de spawn des modèles dans une région, après application de REGION_SPAWN_WEIGHTS."""
+    weights = REGION_SPAWN_WEIGHTS.get(region, {})
+    return [template.spawn_chance * weights.get(template.type, 1.0) for template in templates]
+
+
+_tables = {}
+_tables_generation = None
+
+
+def get_spawn_table(region, registry=None):
+    """Retourne la table de spawn d'une région, recalculée si les données du jeu ont changé."""
+    global _tables_generation
+    registry = registry or get_registry()
+    templates = registry.enemies()
+    if _tables_generation != (id(registry), registry.generation):
+        _tables.clear()
+        _tables_generation = (id(registry), registry.generation)
+
+    table = _tables.get(region)
+    if table is None:
+        table = _tables[region] = SpawnTable(templates, region_chances(templates, region))
+    return table
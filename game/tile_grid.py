@@ -0,0 +1,222 @@
+from array import array
+
+# Codes de région, dans l'ordre des quadrants (x // moitié, y // moitié)
+REGION_NAMES = ("forest", "swamp", "plains", "mountain")
+REGION_CODES = {name: code for code, name in enumerate(REGION_NAMES)}
+
+# Les descriptions des cases hors quadrant (cartes de taille impaire) parlent d'une zone "unknown"
+DESCRIPTION_REGIONS = REGION_NAMES + ("unknown",)
+
+# Phrases d'ambiance tirées au hasard pour les cases ordinaires
+FLAVOUR_TEXTS = (
+    "You hear faint noises.",
+    "The path ahead looks challenging.",
+    "It's eerily quiet."
+)
+
+START_DESCRIPTION = "You are at the entrance of a dark forest."
+BOSS_DESCRIPTION = "This is the lair of the final boss!"
+
+# Table des descriptions : chaque case ne stocke que l'indice de son modèle
+DESCRIPTION_TEMPLATES = (START_DESCRIPTION, BOSS_DESCRIPTION) + tuple(
+    f"The area is a {region}. {flavour}"
+    for region in DESCRIPTION_REGIONS
+    for flavour in FLAVOUR_TEXTS
+)
+START_TEMPLATE = 0
+BOSS_TEMPLATE = 1
+
+
+def description_template_id(region_name, flavour_index):
+    """Retourne l'indice du modèle de description pour une région et une phrase d'ambiance."""
+    return 2 + DESCRIPTION_REGIONS.index(region_name) * len(FLAVOUR_TEXTS) + flavour_index
+
+
+class TileView:
+    """Vue légère sur une case de la grille, compatible avec l'ancien dictionnaire de case."""
+    __slots__ = ("_grid", "_index")
+
+    KEYS = ("description", "enemy", "item")
+
+    def __init__(self, grid, index):
+        self._grid = grid
+        self._index = index
+
+    def __getitem__(self, key):
+        if key == "enemy":
+            return self._grid.enemy_table.get(self._index)
+        if key == "item":
+            return self._grid.item_table.get(self._index)
+        if key == "description":
+            return DESCRIPTION_TEMPLATES[self._grid.descriptions[self._index]]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == "enemy":
+            self._grid.set_enemy_index(self._index, value)
+        elif key == "item":
+            self._grid.set_item_index(self._index, value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        """Équivalent de dict.get pour une case."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.KEYS
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+
+class TileGrid:
+    """
+    Stockage compact de la carte : codes de région et de description dans des tableaux typés,
+    ennemis et objets dans des tables creuses indexées par numéro de case.
+
+    Se comporte comme le dictionnaire `{(x, y): {"description", "enemy", "item"}}` utilisé par
+    GameMap, ce qui permet de conserver le reste du code de la carte inchangé.
+    """
+
+    def __init__(self, size):
+        """
+        Initialise une grille vide de `size x size` cases.
+
+        :param size: Taille de la carte.
+        """
+        self.size = size
+        self.regions = array("B", bytes(size * size))  # Code de région par case
+        self.descriptions = array("B", bytes(size * size))  # Indice du modèle de description par case
+        self.enemy_table = {}  # Indice de case -> Enemy
+        self.item_table = {}  # Indice de case -> Item
+
+    # --- Conversion des positions ---
+    def index(self, position):
+        """Convertit une position (x, y) en indice de case, ou None si elle est hors de la carte."""
+        x, y = position
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return x * self.size + y
+        return None
+
+    def position(self, index):
+        """Convertit un indice de case en position (x, y)."""
+        return divmod(index, self.size)
+
+    # --- Accès rapides ---
+    def region_at(self, position):
+        """Retourne le nom de la région de la case."""
+        return REGION_NAMES[self.regions[self.index(position)]]
+
+    def description_at(self, position):
+        """Retourne la description de la case."""
+        return DESCRIPTION_TEMPLATES[self.descriptions[self.index(position)]]
+
+    def enemy_at(self, position):
+        """Retourne l'ennemi de la case, ou None."""
+        index = self.index(position)
+        return None if index is None else self.enemy_table.get(index)
+
+    def item_at(self, position):
+        """Retourne l'objet de la case, ou None."""
+        index = self.index(position)
+        return None if index is None else self.item_table.get(index)
+
+    def set_enemy_index(self, index, enemy):
+        """Place (ou retire avec None) un ennemi sur la case d'indice donné."""
+        if enemy is None:
+            self.enemy_table.pop(index, None)
+        else:
+            self.enemy_table[index] = enemy
+
+    def set_item_index(self, index, item):
+        """Place (ou retire avec None) un objet sur la case d'indice donné."""
+        if item is None:
+            self.item_table.pop(index, None)
+        else:
+            self.item_table[index] = item
+
+    # --- Interface compatible avec un dictionnaire de cases ---
+    def __contains__(self, position):
+        try:
+            return self.index(position) is not None
+        except (TypeError, ValueError):
+            return False
+
+    def __getitem__(self, position):
+        index = self.index(position)
+        if index is None:
+            raise KeyError(position)
+        return TileView(self, index)
+
+    def __setitem__(self, position, cell):
+        index = self.index(position)
+        if index is None:
+            raise KeyError(position)
+        self.set_enemy_index(index, cell.get("enemy"))
+        self.set_item_index(index, cell.get("item"))
+
+    def get(self, position, default=None):
+        """Équivalent de dict.get : retourne la vue de la case ou `default`."""
+        if position in self:
+            return TileView(self, self.index(position))
+        return default
+
+    def __len__(self):
+        return self.size * self.size
+
+    def __iter__(self):
+        for index in range(self.size * self.size):
+            yield divmod(index, self.size)
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        for index in range(self.size * self.size):
+            yield TileView(self, index)
+
+    def items(self):
+        """Itère sur les couples (position, vue de case)."""
+        for index in range(self.size * self.size):
+            yield divmod(index, self.size), TileView(self, index)
+
+
+class MappedTileGrid(TileGrid):
+    """
+    TileGrid d'une sauvegarde binaire (save_format.py) : les codes de région et de description sont
+    lus dans le fichier projeté en mémoire (memoryview) au lieu d'être copiés dans des tableaux.
+    """
+
+    def __init__(self, size, regions, descriptions, enemy_table, item_table):
+        """
+        :param regions: Vue sur les codes de région des cases (un octet par case).
+        :param descriptions: Vue sur les indices de modèle de description des cases.
+        :param enemy_table: Indice de case -> Enemy.
+        :param item_table: Indice de case -> Item.
+        """
+        self.size = size
+        self.regions = regions
+        self.descriptions = descriptions
+        self.enemy_table = enemy_table
+        self.item_table = item_table
+
+    def __reduce__(self):
+        # Une memoryview ne se sauvegarde pas : la grille est recopiée dans une TileGrid
+        return restore_grid, (self.size, bytes(self.regions), bytes(self.descriptions), self.enemy_table, self.item_table)
+
+
+def restore_grid(size, regions, descriptions, enemy_table, item_table):
+    """Recrée une TileGrid à partir de ses codes de cases et de ses tables (sauvegarde d'une MappedTileGrid)."""
+    grid = TileGrid(size)
+    grid.regions = array("B", regions)
+    grid.descriptions = array("B", descriptions)
+    grid.enemy_table = enemy_table
+    grid.item_table = item_table
+    return grid
@@ -0,0 +1,335 @@
+"""
+Serveur de jeu asyncio : plusieurs joueurs dans un seul processus, un par connexion TCP (telnet, nc).
+
+Chaque connexion est une coroutine qui déroule le même menu, la même exploration et les mêmes combats
+que le terminal : main.main_menu_flow() produit un Prompt à chaque saisie attendue (voir
+game/events.py), et la session y répond avec la ligne suivante du client au lieu d'input(). Entre
+deux saisies, le jeu tourne sans jamais bloquer la boucle : une session qui attend son joueur ne
+coûte qu'une coroutine en pause et l'état de sa partie. Chaque partie tire dans ses propres flux
+aléatoires (game/rng.py), indépendants des autres sessions.
+
+Les print() du jeu vont dans la session en cours : sys.stdout est remplacé par SessionOutput, qui
+écrit dans le tampon de la session courante (contextvars, une copie du contexte par tâche asyncio).
+Le tampon est envoyé au client avant chaque saisie, suivi d'un IAC GA telnet (« à vous ») qui marque
+la fin de l'invite pour les clients automatiques (bot_client.py).
+
+Limites :
+    - idle timeout : une session sans saisie pendant --idle-timeout secondes est fermée (la partie
+      est déjà sauvegardée à chaque déplacement) ;
+    - backpressure : l'envoi attend que le client ait lu ce qui est en attente au-delà de
+      WRITE_BUFFER_LIMIT octets, et la session est fermée si le client ne lit plus pendant
+      WRITE_TIMEOUT secondes ;
+    - --max-sessions : les connexions au-delà sont refusées avec un message ;
+    - mise en veille : une partie sans commande depuis --hibernate-after secondes, ou au-delà du
+      budget --memory-budget, est sauvegardée et libérée puis reprise à la commande suivante
+      (session_manager.py).
+
+Plusieurs milliers de connexions demandent une limite de descripteurs suffisante (ulimit -n).
+
+Usage (depuis la racine du dépôt) :
+    python game_server.py [--host 127.0.0.1] [--port 4000] [--idle-timeout 300] [--max-sessions 5000]
+                          [--database saves.db]
+Puis : telnet 127.0.0.1 4000
+"""
+import argparse
+import asyncio
+import contextvars
+import os
+import re
+import sys
+import time
+from collections import deque
+
+import main
+import save_load
+import ui_manager
+from session_manager import HIBERNATE_AFTER, MEMORY_BUDGET, SessionManager
+from sqlite_store import SQLiteStore
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4000
+IDLE_TIMEOUT = 300.0  # Secondes sans saisie avant de fermer une session
+WRITE_TIMEOUT = 30.0  # Secondes laissées au client pour lire l'affichage en attente
+WRITE_BUFFER_LIMIT = 64 * 1024  # Octets en attente d'envoi au-delà desquels la session attend le client
+MAX_LINE = 1024  # Longueur maximale d'une ligne saisie
+MAX_SESSIONS = 5000
+LISTEN_BACKLOG = 1024  # Connexions en attente d'acceptation (asyncio n'en garde que 100 par défaut)
+TERMINAL_SIZE = (80, 24)  # Taille d'écran supposée des clients (colonnes, lignes)
+TURN_WINDOW = 1000  # Derniers tours gardés pour les percentiles de latence
+
+GO_AHEAD = b"\xff\xf9"  # IAC GA : fin de l'invite, le serveur attend une ligne
+TELNET_COMMAND = re.compile(rb"\xff[\xfb-\xfe].|\xff[\xf0-\xfa]", re.DOTALL)  # Négociations envoyées par telnet
+
+current_output = contextvars.ContextVar("current_output", default=None)
+current_session = contextvars.ContextVar("current_session", default=None)
+
+
+class SessionOutput:
+    """Remplace sys.stdout : écrit dans le tampon de la session courante, ou dans le vrai flux hors session."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        buffer = current_output.get()
+        if buffer is None:
+            return self.stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def flush(self):
+        if current_output.get() is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class ClientSession:
+    def __init__(self, server, reader, writer, number):
+        """
+        Une connexion : son tampon d'affichage et le déroulement de sa partie.
+
+        :param server: GameServer qui héberge la session.
+        :param number: Numéro de la session (journal du serveur).
+        """
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.number = number
+        self.output = []  # Affichage en attente d'envoi
+        self.save_name = None  # Sauvegarde de la partie en cours, connue à sa première écriture
+        self.context = None  # Contexte de la session (affichage, sauvegardes), pour la mise en veille
+        self.flow = None  # Déroulement en cours (None si la session est en veille)
+        self.prompt = None  # Invite à laquelle le joueur doit répondre
+        self.hibernation = None  # État de la session en veille (session_manager.Hibernation)
+
+    async def send(self, go_ahead=False):
+        """Envoie l'affichage en attente ; attend le client si son tampon d'envoi est plein."""
+        text = "".join(self.output)
+        self.output.clear()
+        data = text.replace("\n", "\r\n").encode("utf-8")  # Fins de ligne telnet
+        if go_ahead and self.server.go_ahead:
+            data += GO_AHEAD
+        self.writer.write(data)
+        await asyncio.wait_for(self.writer.drain(), WRITE_TIMEOUT)
+
+    async def read_line(self):
+        """Attend la prochaine ligne du client ; EOFError si la connexion est fermée ou la ligne trop longue."""
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.server.idle_timeout)
+        except ValueError:
+            raise EOFError  # Ligne plus longue que la limite du flux : client défaillant
+        if not line:
+            raise EOFError
+        return TELNET_COMMAND.sub(b"", line[:MAX_LINE]).decode("utf-8", errors="replace").strip("\r\n")
+
+    async def run(self, save_name=None, restored=False):
+        """
+        Déroule le menu principal jusqu'à ce que le joueur quitte ou que la connexion se termine.
+
+        :param save_name: Partie à reprendre à sa dernière sauvegarde avant le menu principal.
+        :param restored: La session reprend après la panne du processus qui l'hébergeait.
+        """
+        current_output.set(self.output)  # Contexte propre à la tâche : les print() vont dans cette session
+        current_session.set(self)
+        self.context = contextvars.copy_context()
+        self.save_name = save_name
+        manager = self.server.manager
+        if restored:
+            print("\n\nThe server restarted. Your game resumes from its last save." if save_name
+                  else "\n\nThe server restarted.")
+        self.flow = main.resume_game_flow(save_name) if save_name else main.main_menu_flow()
+        try:
+            try:
+                self.prompt = next(self.flow)
+                while True:
+                    if self.prompt.bottom:
+                        ui_manager.move_cursor_to_bottom()
+                    self.output.append(self.prompt.text)
+                    await self.send(go_ahead=True)
+                    manager.parked(self)  # Peut être mise en veille pendant l'attente (session_manager.py)
+                    try:
+                        line = await self.read_line()
+                    except asyncio.TimeoutError:
+                        self.output.append("\n\nDisconnected after being idle for too long.\n")
+                        self.server.timeouts += 1
+                        break
+                    started = time.perf_counter()
+                    await manager.command(self)  # Reprise si la session est en veille
+                    self.prompt = self.flow.send(line)
+                    self.server.record_turn(time.perf_counter() - started)
+            except StopIteration:
+                pass  # Le joueur a quitté le jeu depuis le menu
+            await self.send()
+        except (EOFError, asyncio.TimeoutError, ConnectionError):
+            pass  # Client parti ou qui ne lit plus : rien à lui envoyer
+        except Exception as error:
+            current_output.set(None)  # Le message va dans le journal du serveur, pas au client
+            print(f"Erreur : Session {self.number} interrompue ({error!r}).")
+            self.server.errors += 1
+        finally:
+            manager.forget(self)
+            if self.flow is not None:
+                self.flow.close()
+            self.writer.close()
+
+
+class GameServer:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS, go_ahead=True, manager=None):
+        """
+        :param idle_timeout: Secondes sans saisie avant de fermer une session.
+        :param max_sessions: Nombre maximal de sessions simultanées.
+        :param go_ahead: Marquer la fin de chaque invite par IAC GA.
+        :param manager: SessionManager qui met en veille les sessions inactives (réglages par défaut si absent).
+        """
+        self.manager = manager or SessionManager()
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.go_ahead = go_ahead
+        self.sessions = set()
+        self.opened = 0  # Sessions ouvertes depuis le démarrage
+        self.peak = 0
+        self.refused = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.turns = 0
+        self.turn_time = 0.0  # Temps passé à dérouler le jeu entre deux saisies
+        self.turn_max = 0.0
+        self.recent_turns = deque(maxlen=TURN_WINDOW)
+
+    def record_turn(self, elapsed):
+        self.turns += 1
+        self.turn_time += elapsed
+        self.recent_turns.append(elapsed)
+        if elapsed > self.turn_max:
+            self.turn_max = elapsed
+
+    async def handle_client(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            self.refused += 1
+            writer.write(b"Server full, please try again later.\r\n")
+            writer.close()
+            return
+        self.opened += 1
+        await self.host(reader, writer, self.opened)
+
+    async def host(self, reader, writer, number, save_name=None, restored=False):
+        """Héberge une session jusqu'à sa fin (voir ClientSession.run)."""
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+        session = ClientSession(self, reader, writer, number)
+        self.sessions.add(session)
+        self.peak = max(self.peak, len(self.sessions))
+        try:
+            await session.run(save_name, restored)
+        finally:
+            self.sessions.discard(session)
+            self.session_closed(session)
+
+    # --- Points d'extension (supervisor.py) ---
+    def session_saved(self, session):
+        """La session a écrit sa première sauvegarde, ou en a changé."""
+
+    def session_closed(self, session):
+        """La session est terminée et sa connexion fermée."""
+
+    def turn_stats(self):
+        """Latence des tours en millisecondes : moyenne depuis le démarrage, p50 et p99 des derniers tours, maximum."""
+        recent = sorted(self.recent_turns)
+        def percentile(fraction):
+            return recent[min(int(len(recent) * fraction), len(recent) - 1)] * 1000 if recent else 0.0
+        return {"turns": self.turns, "mean_ms": self.turn_time / self.turns * 1000 if self.turns else 0.0,
+                "p50_ms": percentile(0.5), "p99_ms": percentile(0.99), "max_ms": self.turn_max * 1000}
+
+    def stats(self):
+        """Résumé de l'activité du serveur."""
+        turns = self.turn_stats()
+        return (f"{len(self.sessions)} session(s) active(s), pic {self.peak}, {self.opened} ouverte(s), "
+                f"{self.refused} refusée(s), {self.timeouts} inactive(s) fermée(s), {self.errors} en erreur ; "
+                f"{turns['turns']} tours, {turns['mean_ms']:.2f} ms en moyenne, p99 {turns['p99_ms']:.1f} ms, "
+                f"{turns['max_ms']:.1f} ms au plus\n" + manager_summary(self.manager.stats()) + "\n"
+                + writer_summary(save_load.writer.stats()))
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats(), flush=True)
+
+    async def serve(self, host, port, stats_interval=None):
+        server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE * 4,
+                                            backlog=LISTEN_BACKLOG)
+        print(f"Game server listening on {host}:{port}", flush=True)
+        tasks = [asyncio.create_task(self.manager.run())]
+        if stats_interval:
+            tasks.append(asyncio.create_task(self.report(stats_interval)))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def manager_summary(stats):
+    """Résumé des compteurs d'un SessionManager."""
+    return (f"Mise en veille : {stats['hot']} session(s) en jeu en mémoire ({stats['memory'] / 2 ** 20:.1f} Mio estimés), "
+            f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions ; reprise p50 "
+            f"{stats['resume_p50_ms']:.1f} ms, p99 {stats['resume_p99_ms']:.1f} ms, max {stats['resume_max_ms']:.1f} ms")
+
+
+def writer_summary(stats):
+    """Résumé des compteurs du SaveWriter de save_load."""
+    return (f"Sauvegardes : {stats['pending']} en attente (pic {stats['max_pending']}), {stats['writes']} écrites, "
+            f"{stats['coalesced']} regroupées, {stats['commits']} lots, {stats['failed']} en échec ; écriture p50 "
+            f"{stats['write_p50_ms']:.1f} ms, p99 {stats['write_p99_ms']:.1f} ms, max {stats['write_max_ms']:.1f} ms ; "
+            f"validation des lots p99 {stats['commit_p99_ms']:.1f} ms")
+
+
+def record_save(save_name):
+    """save_load.save_hook : retient la sauvegarde de la session courante."""
+    session = current_session.get()
+    if session is not None and session.save_name != save_name:
+        session.save_name = save_name
+        session.server.session_saved(session)
+
+
+def install():
+    """Prépare le jeu pour plusieurs sessions dans le processus : affichage par session, écran effacé par ANSI."""
+    if not isinstance(sys.stdout, SessionOutput):
+        sys.stdout = SessionOutput(sys.stdout)
+    ui_manager.ansi_clear = True
+    save_load.save_hook = record_save
+    columns, lines = TERMINAL_SIZE
+    os.environ.setdefault("COLUMNS", str(columns))  # Taille d'écran des clients, pas celle du serveur
+    os.environ.setdefault("LINES", str(lines))
+
+
+def main_server():
+    parser = argparse.ArgumentParser(description="Serveur de jeu multi-sessions (telnet).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="Secondes sans saisie")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    parser.add_argument("--no-go-ahead", action="store_true", help="Ne pas marquer les invites par IAC GA (nc)")
+    parser.add_argument("--stats", type=float, default=None, help="Afficher l'activité toutes les N secondes")
+    parser.add_argument("--memory-budget", type=float, default=MEMORY_BUDGET / 2 ** 20,
+                        help="Mémoire des sessions en jeu gardées en mémoire (Mio)")
+    parser.add_argument("--hibernate-after", type=float, default=HIBERNATE_AFTER,
+                        help="Secondes sans commande avant la mise en veille d'une session")
+    parser.add_argument("--database", default=None, help="Sauvegardes dans cette base SQLite (sqlite_store.py) au lieu de fichiers")
+    args = parser.parse_args()
+
+    install()
+    if args.database:
+        save_load.store = SQLiteStore(args.database)
+    manager = SessionManager(int(args.memory_budget * 2 ** 20), args.hibernate_after)
+    server = GameServer(args.idle_timeout, args.max_sessions, not args.no_go_ahead, manager)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.stats))
+    except KeyboardInterrupt:
+        pass
+    print(server.stats())
+
+
+if __name__ == "__main__":
+    main_server()
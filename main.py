@@ -1,50 +1,65 @@
 import sys
-import os
+from collections import namedtuple
 from game.player import Player
 from game.enemy import Enemy
 from game.map import GameMap
 from game.battle import Battle
+from game.events import Prompt, run_prompts
+from game.renderer import MapRenderer
+from game.rng import SessionRng
 import ui_manager  # Importer le module UI
 import save_load  # Importer le module de sauvegarde/chargement
+import replay  # Enregistrement des sessions pour les rejouer
 
 # --------- Fonction principale de gestion du menu ---------
+# Les menus et la boucle de jeu sont des générateurs qui produisent un Prompt à chaque saisie attendue
+# (voir game/events.py) : le terminal y répond au clavier, game_server.py avec les lignes de chaque client.
 def main_menu():
     """Affiche le menu principal et gère les choix de l'utilisateur."""
+    run_prompts(main_menu_flow(), ui_manager.answer_prompt)
+    sys.exit()
+
+def main_menu_flow():
+    """Déroulement du menu principal ; se termine quand le joueur quitte le jeu."""
     while True:
         ui_manager.display_menu()  # Affiche le menu principal
-        choice = ui_manager.get_input("> ")  # Demande à l'utilisateur son choix
+        choice = yield Prompt("> ", bottom=True)  # Demande à l'utilisateur son choix
 
         if choice == "1":
-            start_new_game()  # Démarrer une nouvelle partie
+            yield from start_new_game_flow()  # Démarrer une nouvelle partie
         elif choice == "2":
-            player, game_map, current_position, save_name = save_load.load_game()  # Charger une partie sauvegardée
+            player, game_map, current_position, save_name = yield from save_load.load_game_flow()  # Charger une partie sauvegardée
             if player and game_map:
-                game_loop(player, game_map, current_position, save_name)  # Lancer la boucle de jeu
+                yield from game_loop_flow(player, game_map, current_position, save_name)  # Lancer la boucle de jeu
             else:
                 print("No saved game found or failed to load.")  # Si la sauvegarde échoue
         elif choice == "3":
-            ui_manager.display_about()  # Afficher des informations sur le jeu
+            ui_manager.show_about()  # Afficher des informations sur le jeu
+            yield Prompt(ui_manager.ABOUT_PROMPT, bottom=True)
         elif choice == "4":
             print("Thank you for playing! See you soon.")  # Quitter le jeu
-            sys.exit()
+            return
         else:
             print("Invalid option. Please choose a valid option.")  # Choix invalide
 
 # --------- Fonction pour démarrer une nouvelle partie ---------
 def start_new_game():
     """Démarre une nouvelle partie et sauvegarde immédiatement, en vérifiant si le nom de la sauvegarde existe déjà."""
+    run_prompts(start_new_game_flow(), ui_manager.answer_prompt)
+
+def start_new_game_flow():
+    """Déroulement de start_new_game."""
     ui_manager.clear_screen()
-    player_name = ui_manager.get_input("Enter your character's name: ")  # Demander le nom du joueur
-    player = Player(player_name)  # Créer un joueur
-    game_map = GameMap()  # Créer une carte de jeu
+    player_name = yield Prompt("Enter your character's name: ", bottom=True)  # Demander le nom du joueur
+    session = SessionRng()  # Graine de la session : carte et combats reproductibles
+    player, game_map = create_world(player_name, session)
     current_position = game_map.start_location  # Position initiale du joueur
 
     while True:
-        save_name = ui_manager.get_input("Enter a name for your save file: ")  # Demander un nom pour la sauvegarde
-        save_file_path = os.path.join(save_load.SAVE_DIRECTORY, f"{save_name}.pkl")  # Vérifier si le fichier existe
-        if os.path.exists(save_file_path):
+        save_name = yield Prompt("Enter a name for your save file: ", bottom=True)  # Demander un nom pour la sauvegarde
+        if save_load.save_exists(save_name):  # Vérifier si la sauvegarde existe (instantané binaire ou pickle)
             # Si le fichier existe déjà, demander à l'utilisateur s'il veut écraser
-            overwrite = ui_manager.get_input(f"Save file '{save_name}' already exists. Do you want to overwrite it? (y/n): ").strip().lower()
+            overwrite = (yield Prompt(f"Save file '{save_name}' already exists. Do you want to overwrite it? (y/n): ", bottom=True)).strip().lower()
             if overwrite == 'y':
                 save_load.save_game(player, game_map, save_name)  # Sauvegarder la partie
                 break
@@ -56,14 +71,65 @@ def start_new_game():
 
     ui_manager.clear_screen()
     print(f"Welcome, {player.name}! You find yourself in a mysterious forest.")
-    game_loop(player, game_map, current_position, save_name)  # Lancer la boucle de jeu
+
+    # Les commandes de la partie sont enregistrées avec la graine pour pouvoir la rejouer
+    recorder = replay.SessionRecorder(replay.record_path(save_name), session.seed, player.name, game_map.size)
+    try:
+        current_position = yield from recorder.recorded(game_loop_flow(player, game_map, current_position, save_name, session))  # Lancer la boucle de jeu
+        recorder.finish(replay.session_summary(player, current_position))
+    finally:
+        recorder.close()
+
+def resume_game_flow(save_name, seed=None, battles=0, record_path=None):
+    """
+    Reprend la partie `save_name` à sa dernière sauvegarde, puis revient au menu principal.
+
+    :param seed: Graine de la session à poursuivre (nouvelle graine si absente).
+    :param battles: Nombre de combats déjà joués avec cette graine.
+    :param record_path: Enregistrement de la session à compléter (voir replay.py), ou None.
+    """
+    state = save_load.read_save(save_name)
+    if state is not None:
+        player, game_map, current_position = state
+        flow = game_loop_flow(player, game_map, current_position, save_name, SessionRng(seed, battles))
+        if record_path:
+            recorder = replay.SessionRecorder(record_path, append=True)
+            try:
+                current_position = yield from recorder.recorded(flow)
+                recorder.finish(replay.session_summary(player, current_position))
+            finally:
+                recorder.close()
+        else:
+            yield from flow
+    yield from main_menu_flow()
+
+def create_world(player_name, session):
+    """Crée le joueur et la carte d'une nouvelle session."""
+    player = Player(player_name)  # Créer un joueur
+    game_map = GameMap(rng=session.world)  # Créer une carte de jeu
+    return player, game_map
 
 # --------- Boucle principale du jeu ---------
-def game_loop(player, game_map, current_position, save_name):
-    """Boucle principale du jeu."""
+class Checkpoint(namedtuple("Checkpoint", ["player", "game_map", "position", "save_name", "session", "record_path"])):
+    """État d'une partie à l'invite d'exploration : de quoi la sauvegarder puis la reprendre à l'identique (resume_game_flow)."""
+    __slots__ = ()
+
+def game_loop(player, game_map, current_position, save_name, session=None):
+    """
+    Boucle principale du jeu ; retourne la position finale du joueur.
+
+    :param save_name: Nom de la sauvegarde automatique (None : aucune sauvegarde, pour les rejeux).
+    :param session: SessionRng qui fournit un flux aléatoire à chaque combat (nouvelle graine si absente).
+    """
+    return run_prompts(game_loop_flow(player, game_map, current_position, save_name, session), ui_manager.answer_prompt)
+
+def game_loop_flow(player, game_map, current_position, save_name, session=None):
+    """Déroulement de game_loop."""
+    session = session or SessionRng()
+    renderer = MapRenderer(game_map, minimap=True)  # La carte reste en haut de l'écran, seules les cases modifiées sont redessinées
     while player.is_alive():
         # Afficher la carte et les informations du joueur
-        game_map.print_map(current_position)
+        renderer.render(current_position)
         ui_manager.player_info(player)
 
         # Gérer les rencontres avec des ennemis
@@ -72,8 +138,8 @@ def game_loop(player, game_map, current_position, save_name):
             print(f"A wild {enemy.name} (Level {enemy.level}) appears!")
             print(f"{enemy.name}'s HP: {enemy.hp}/{enemy.max_hp}")
 
-            battle = Battle(player, enemy)
-            battle.start_battle()
+            battle = Battle(player, enemy, rng=session.battle_stream())
+            yield from battle.console_flow()
 
             if not player.is_alive():
                 break  # Fin de jeu si le joueur est mort
@@ -88,8 +154,9 @@ def game_loop(player, game_map, current_position, save_name):
                 break
 
         # Demander et exécuter l'action du joueur
-        action = get_player_action()
-        ui_manager.clear_screen()
+        checkpoint = Checkpoint(player, game_map, current_position, save_name, session, None)
+        action = yield from get_player_action_flow(renderer, checkpoint)
+        renderer.clear_log()  # Effacer les messages sous la carte
 
         if action == 'quit':
             print("Exiting the game.")
@@ -104,20 +171,34 @@ def game_loop(player, game_map, current_position, save_name):
             current_position = game_map.move_player(current_position, 'east')
 
         # Sauvegarder automatiquement avec le nom de la sauvegarde en cours
-        save_load.save_game(player, game_map, save_name)
+        if save_name:
+            save_load.save_game(player, game_map, save_name)
 
+    renderer.close()
     if not player.is_alive():
-        ui_manager.display_game_over()  # Afficher l'écran de fin de jeu
-        save_load.save_game(player, game_map, save_name)
+        ui_manager.show_game_over()  # Afficher l'écran de fin de jeu
+        yield Prompt(ui_manager.GAME_OVER_PROMPT, bottom=True)
+        if save_name:
+            save_load.save_game(player, game_map, save_name)
+    if save_name:
+        save_load.flush_saves(save_name)  # Partie quittée ou terminée : sauvegardes écrites sur le disque
+    return current_position
 
 # --------- Gestion des actions du joueur ---------
-def get_player_action():
+def get_player_action(renderer=None):
     """Demande l'action du joueur et gère les entrées invalides."""
+    return run_prompts(get_player_action_flow(renderer), ui_manager.answer_prompt)
+
+def get_player_action_flow(renderer=None, checkpoint=None):
+    """Déroulement de get_player_action ; `checkpoint` accompagne chaque invite (voir Checkpoint)."""
     while True:
-        action = ui_manager.get_input("What would you like to do? (Type 'help' for options): ").strip().lower()
+        action = (yield Prompt("What would you like to do? (Type 'help' for options): ", bottom=True,
+                               checkpoint=checkpoint)).strip().lower()
 
         if action == 'help':
             ui_manager.display_help()
+            if renderer:
+                renderer.invalidate()  # L'aide a effacé l'écran : la carte sera redessinée en entier
         elif action in ['z', 'go north']:
             return 'go north'
         elif action in ['s', 'go south']:
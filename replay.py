@@ -0,0 +1,193 @@
+"""
+Enregistrement et rejeu des sessions de jeu.
+
+Une session enregistrée est un fichier JSON lines du dossier replays/ :
+    {"version": 1, "seed": ..., "player": "Hero", "map_size": 12}   en-tête
+    "go east"                                                         une ligne par commande saisie
+    {"end": {"level": 2, "hp": 87, "experience": 40, "position": [3, 5]}}   état final (partie terminée)
+Le fichier est écrit au fil de la partie : une session interrompue par un plantage se rejoue jusqu'à
+sa dernière commande.
+
+Le rejeu recrée la carte et les combats avec la graine de la session (game/rng.py), fournit les
+commandes enregistrées à la place du clavier et écrit l'affichage dans os.devnull : il tourne à pleine
+vitesse, sans terminal et sans sauvegarde. Avec --verify, l'état final est comparé à celui enregistré.
+
+Usage (depuis la racine du dépôt) :
+    python replay.py replays/NOM.jsonl [--verify] [--repeat 5] [--output FICHIER]
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from collections import namedtuple
+
+import ui_manager
+from game.events import run_prompts
+from game.rng import SessionRng
+
+RECORD_DIRECTORY = "replays"  # Dossier des sessions enregistrées
+FORMAT_VERSION = 1
+
+
+class SessionRecord(namedtuple("SessionRecord", ["seed", "player", "map_size", "commands", "end"])):
+    """Session enregistrée : graine, nom du joueur, taille de la carte, commandes et état final (ou None)."""
+    __slots__ = ()
+
+
+class ReplayResult(namedtuple("ReplayResult", ["player", "game_map", "position", "commands_used", "summary"])):
+    """État atteint par un rejeu."""
+    __slots__ = ()
+
+
+def record_path(save_name):
+    """Chemin de l'enregistrement associé à une sauvegarde."""
+    return os.path.join(RECORD_DIRECTORY, f"{save_name}.jsonl")
+
+
+def session_summary(player, position):
+    """État final comparé entre la session et son rejeu."""
+    return {"level": player.level, "hp": player.hp, "experience": player.experience, "position": list(position)}
+
+
+class SessionRecorder:
+    """Écrit la graine puis chaque commande saisie, au fil de la partie."""
+
+    def __init__(self, path, seed=None, player_name=None, map_size=None, append=False):
+        """
+        :param append: Compléter un enregistrement existant (partie reprise), sans réécrire l'en-tête.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)  # Créer le dossier des enregistrements si nécessaire
+        self.path = path
+        self.file = open(path, "a" if append else "w", encoding="utf-8")
+        if not append:
+            self.write({"version": FORMAT_VERSION, "seed": seed, "player": player_name, "map_size": map_size})
+
+    def write(self, value):
+        self.file.write(json.dumps(value, ensure_ascii=False) + "\n")
+        self.file.flush()  # Garder les commandes même si la partie plante
+
+    def recorded(self, flow):
+        """
+        Déroule un générateur de Prompt (voir game/events.py) en enregistrant chaque réponse ; retourne sa valeur.
+        Les points de reprise (Prompt.checkpoint) indiquent l'enregistrement à compléter si la partie est reprise.
+        """
+        try:
+            prompt = next(flow)
+            while True:
+                if prompt.checkpoint is not None:
+                    prompt = prompt._replace(checkpoint=prompt.checkpoint._replace(record_path=self.path))
+                command = yield prompt
+                self.write(command)
+                prompt = flow.send(command)
+        except StopIteration as stop:
+            return stop.value
+
+    def finish(self, summary):
+        """Enregistre l'état final de la session."""
+        self.write({"end": summary})
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def load_record(path):
+    """Lit une session enregistrée ; retourne None si le fichier est absent ou invalide."""
+    try:
+        with open(path, encoding="utf-8") as file:
+            lines = [json.loads(line) for line in file if line.strip()]
+    except FileNotFoundError:
+        print(f"Erreur : Le fichier '{path}' est introuvable.")
+        return None
+    except json.JSONDecodeError as error:
+        print(f"Erreur : Le fichier '{path}' est mal formé ({error}).")
+        return None
+
+    if not lines or not isinstance(lines[0], dict) or lines[0].get("version") != FORMAT_VERSION:
+        print(f"Erreur : '{path}' n'est pas une session enregistrée (version {FORMAT_VERSION}).")
+        return None
+    header = lines[0]
+    commands = [line for line in lines[1:] if isinstance(line, str)]
+    end = next((line["end"] for line in lines[1:] if isinstance(line, dict) and "end" in line), None)
+    return SessionRecord(header["seed"], header["player"], header["map_size"], commands, end)
+
+
+def replay(record, output=None):
+    """
+    Rejoue une session enregistrée sans terminal et retourne un ReplayResult.
+
+    :param record: SessionRecord à rejouer.
+    :param output: Flux qui reçoit l'affichage (os.devnull par défaut).
+    """
+    import main  # main importe ce module pour enregistrer les sessions
+
+    commands = iter(record.commands)
+    used = 0
+
+    def recorded_input(prompt):
+        nonlocal used
+        command = next(commands, None)
+        if command is None:
+            raise EOFError  # Session interrompue : plus de commandes, comme input() en fin de flux
+        used += 1
+        return command
+
+    session = SessionRng(record.seed)
+    player, game_map = main.create_world(record.player, session)
+    position = game_map.start_location
+    was_headless = ui_manager.headless
+    ui_manager.headless = True
+    try:
+        with contextlib.ExitStack() as stack:
+            stream = output or stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(stream))
+            try:
+                position = run_prompts(main.game_loop_flow(player, game_map, position, None, session), recorded_input)
+            except EOFError:
+                position = game_map.get_player_position()
+    finally:
+        ui_manager.headless = was_headless
+    return ReplayResult(player, game_map, position, used, session_summary(player, position))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue une session enregistrée, sans terminal.")
+    parser.add_argument("path", help="Fichier .jsonl du dossier replays/")
+    parser.add_argument("--verify", action="store_true", help="Comparer l'état final à celui enregistré")
+    parser.add_argument("--repeat", type=int, default=1, help="Nombre de rejeux (mesure de performance)")
+    parser.add_argument("--output", default=None, help="Écrire l'affichage du dernier rejeu dans ce fichier")
+    args = parser.parse_args()
+
+    record = load_record(args.path)
+    if record is None:
+        return 1
+
+    timings = []
+    for run in range(args.repeat):
+        last = run == args.repeat - 1
+        with contextlib.ExitStack() as stack:
+            output = stack.enter_context(open(args.output, "w", encoding="utf-8")) if args.output and last else None
+            start = time.perf_counter()
+            result = replay(record, output)
+            timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"Session {record.player} (graine {record.seed}) : {result.commands_used}/{len(record.commands)} "
+          f"commandes rejouées en {best * 1000:.1f} ms ({result.commands_used / best:.0f} commandes/s)")
+    print(f"État final : {result.summary}")
+    if args.verify:
+        if record.end is None:
+            print("Erreur : La session n'a pas d'état final enregistré (partie interrompue).")
+            return 1
+        if record.end != result.summary:
+            print(f"Écart : état enregistré {record.end}")
+            return 1
+        print("Rejeu identique à la session enregistrée.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
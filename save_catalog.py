@@ -0,0 +1,329 @@
+"""
+Catalogue des sauvegardes (`catalog.index` dans le dossier des sauvegardes) : un résumé par partie (nom
+du joueur, niveau, PV, taille de la carte, date de la dernière partie), pour lister, trier et filtrer
+des milliers de sauvegardes sans les lire.
+
+Le fichier commence par une marque de format, suivie d'enregistrements (longueur, CRC32, JSON) :
+["all", lignes] (catalogue complet), ["set", ligne] (résumé d'une partie) ou ["del", nom]. Le résumé
+d'une partie est ajouté par le thread du SaveWriter juste après l'écriture de la sauvegarde qu'il
+décrit, en une seule écriture : un ajout interrompu est ignoré à la lecture et retiré par l'ajout
+suivant. Le catalogue est réécrit d'un bloc (fichier temporaire, fsync, renommage) quand il contient
+plus du double d'enregistrements que de parties.
+
+Les processus qui partagent le dossier (supervisor.py) ajoutent sous un verrou (fcntl.flock sur
+`catalog.lock`) et relisent à chaque consultation les enregistrements ajoutés depuis leur dernière
+lecture. Un catalogue absent ou illisible est reconstruit à partir des sauvegardes elles-mêmes. Quand
+la date de modification du dossier a changé, ses parties sont comparées à celles du catalogue : les
+sauvegardes écrites sans lui (copiées, écrites par une autre version du jeu, ou dont l'ajout au
+catalogue a échoué) sont résumées et ajoutées une à une, les sauvegardes supprimées hors du jeu
+retirées. Une sauvegarde dont l'écriture est en attente n'est pas résumée : son résumé suit l'écriture.
+"""
+import contextlib
+import heapq
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de fork (supervisor.py), un seul processus par dossier
+    fcntl = None
+
+from save_writer import publish, sync_directory
+
+CATALOG_FILE = "catalog.index"
+LOCK_FILE = "catalog.lock"
+MAGIC = b"RPGCTLG1"
+RECORD_HEADER = struct.Struct("<II")  # Longueur et CRC32 d'un enregistrement
+TOUCH_INTERVAL = 60  # Secondes : sans autre changement, la date de dernière partie est mise à jour au plus une fois par minute
+COMPACT_MIN = 1000  # Enregistrements au-delà desquels le catalogue peut être réécrit
+
+# Clés de tri de query : plus récentes d'abord, plus hauts niveaux d'abord, ou ordre alphabétique
+SORT_KEYS = {
+    "played": lambda summary: (-summary.played, summary.name),
+    "level": lambda summary: (-summary.level, summary.name),
+    "player": lambda summary: (summary.player.lower(), summary.name),
+    "name": lambda summary: summary.name,
+}
+
+
+class SaveSummary(namedtuple("SaveSummary", ["name", "player", "level", "hp", "max_hp", "size", "played"])):
+    """Résumé d'une sauvegarde : nom de la sauvegarde et du joueur, niveau, PV, taille de la carte, date (secondes depuis l'epoch)."""
+    __slots__ = ()
+
+
+def summarize(save_name, player, game_map, played=None):
+    """Résumé de la partie `save_name` (date de dernière partie : maintenant si `played` est absent)."""
+    return SaveSummary(save_name, player.name, player.level, player.hp, player.max_hp,
+                       getattr(game_map, "size", None), int(time.time() if played is None else played))
+
+
+def outdated(known, summary):
+    """Vrai si `summary` est à écrire à la place du résumé `known` (None : partie absente) : valeurs changées, ou date écrite il y a plus de TOUCH_INTERVAL."""
+    return known is None or known[:-1] != summary[:-1] or summary.played - known.played >= TOUCH_INTERVAL
+
+
+def encode(record):
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class SaveCatalog:
+    def __init__(self, directory, scan, list_saves, pending=set):
+        """
+        Catalogue d'un dossier de sauvegardes, lu à la première consultation.
+
+        :param directory: Dossier des sauvegardes.
+        :param scan: Appelée sans argument pour reconstruire le catalogue : résumés (SaveSummary) de toutes
+            les sauvegardes du dossier ; ou avec une liste de noms : résumés de ces sauvegardes.
+        :param list_saves: Appelée sans argument pour vérifier que le catalogue est à jour : noms des
+            sauvegardes du dossier.
+        :param pending: Appelée sans argument : noms des sauvegardes dont l'écriture (et l'ajout de leur
+            résumé) est en attente.
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, CATALOG_FILE)
+        self.lock_path = os.path.join(directory, LOCK_FILE)
+        self.scan = scan
+        self.list_saves = list_saves
+        self.pending = pending
+        self.lock = threading.RLock()
+        self.entries = {}  # Nom de sauvegarde -> SaveSummary
+        self.identity = None  # (st_dev, st_ino) du fichier lu : un autre fichier a remplacé le catalogue
+        self.offset = 0  # Fin du dernier enregistrement complet lu
+        self.records = 0  # Enregistrements dans le fichier
+        self.rebuilds = 0
+        self.checked = None  # Date de modification (st_mtime_ns) du dossier à la dernière comparaison
+        self.unreadable = set()  # Sauvegardes du dossier qui n'ont pas pu être résumées
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.after_fork)
+
+    # --- Lecture ---
+    def read_new(self):
+        """
+        Applique les enregistrements ajoutés depuis la dernière lecture (tout le fichier s'il a été
+        remplacé) ; retourne False si le catalogue est absent ou illisible. Appelée avec self.lock.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                status = os.fstat(file.fileno())
+                identity = (status.st_dev, status.st_ino)
+                if identity != self.identity or status.st_size < self.offset:
+                    self.entries, self.identity, self.offset, self.records = {}, identity, 0, 0
+                file.seek(self.offset)
+                data = file.read()
+        except OSError:
+            return False
+        position = 0
+        if self.offset == 0:
+            if data[:len(MAGIC)] != MAGIC:
+                return False
+            position = len(MAGIC)
+        while position + RECORD_HEADER.size <= len(data):
+            length, checksum = RECORD_HEADER.unpack_from(data, position)
+            end = position + RECORD_HEADER.size + length
+            # Le premier enregistrement (catalogue complet) est écrit d'un bloc : il ne peut pas être incomplet
+            appended = self.offset + position > len(MAGIC)
+            if end > len(data) and appended:
+                break  # Ajout en cours d'un autre processus, ou interrompu
+            payload = data[position + RECORD_HEADER.size:end]
+            if zlib.crc32(payload) != checksum:
+                if end == len(data) and appended:
+                    break  # Dernier ajout incomplet : retiré par l'ajout suivant
+                return False
+            try:
+                self.apply(json.loads(payload))
+            except (ValueError, TypeError, IndexError):
+                return False
+            position = end
+            self.records += 1
+        self.offset += position
+        return True
+
+    def apply(self, record):
+        """Applique un enregistrement au catalogue en mémoire."""
+        kind, value = record
+        if kind == "all":
+            self.entries = {row[0]: SaveSummary(*row) for row in value}
+        elif kind == "set":
+            summary = SaveSummary(*value)
+            self.entries[summary.name] = summary
+        elif kind == "del":
+            self.entries.pop(value, None)
+        else:
+            raise ValueError(f"enregistrement inconnu : {kind}")
+
+    def differences(self):
+        """
+        (sauvegardes du dossier absentes du catalogue, parties du catalogue sans sauvegarde), comparées
+        seulement quand la date de modification du dossier a changé depuis la dernière comparaison ; None
+        s'il n'y a rien à faire. Appelée avec self.lock.
+        """
+        try:
+            modified = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return None  # Pas encore de dossier
+        if modified == self.checked:
+            return None
+        names = set(self.list_saves())
+        self.unreadable &= names
+        missing = names - self.entries.keys() - self.unreadable
+        waiting = missing & self.pending()
+        if not waiting:
+            self.checked = modified  # Sinon, comparées de nouveau à la consultation suivante
+        missing -= waiting
+        gone = self.entries.keys() - names
+        return (missing, gone) if missing or gone else None
+
+    def refresh(self):
+        """
+        Met à jour le catalogue en mémoire (ajouts des autres processus, sauvegardes écrites ou supprimées sans
+        lui) ; le reconstruit s'il est absent ou illisible.
+        """
+        with self.lock:
+            valid = self.read_new()
+            changes = self.differences() if valid else None
+        if not valid:
+            self.rebuild()
+        elif changes:
+            self.reconcile(*changes)
+
+    def reconcile(self, missing, gone):
+        """Ajoute au catalogue le résumé des sauvegardes `missing` et retire les parties `gone` ; seules ces sauvegardes sont lues."""
+        summaries = list(self.scan(sorted(missing))) if missing else []  # Sans verrou, comme rebuild
+        with self.lock:
+            self.unreadable |= missing - {summary.name for summary in summaries}
+        for summary in summaries:
+            if summary.name not in self.entries:  # Sinon, ajouté entre-temps par le processus qui l'a écrite
+                self.append(["set", list(summary)], sync=True)
+        if gone:
+            gone -= set(self.list_saves())  # Sauvegarde écrite de nouveau entre-temps
+        for save_name in gone:
+            self.append(["del", save_name], sync=True)
+
+    def rebuild(self):
+        """Reconstruit le catalogue à partir des sauvegardes du dossier ; retourne le nombre de parties."""
+        try:
+            modified = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            modified = None
+        names = set(self.list_saves())
+        summaries = list(self.scan())  # Sans verrou : scan attend les écritures en attente des parties qu'il lit
+        with self.locked():
+            self.entries = {summary.name: summary for summary in summaries}
+            self.unreadable = names - self.entries.keys()
+            self.checked = modified
+            if os.path.isdir(self.directory):
+                self.write_all()
+            self.rebuilds += 1
+        return len(self.entries)
+
+    # --- Écriture ---
+    @contextlib.contextmanager
+    def locked(self):
+        """Verrou du catalogue, entre les threads du processus et entre les processus qui partagent le dossier."""
+        with self.lock:
+            if fcntl is None or not os.path.isdir(self.directory):
+                yield
+                return
+            descriptor = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+                yield
+            finally:
+                os.close(descriptor)  # Libère le verrou
+
+    def write_all(self):
+        """Remplace le fichier par le catalogue en mémoire, d'un bloc. Appelée avec le verrou."""
+        data = MAGIC + encode(["all", [list(summary) for summary in self.entries.values()]])
+        publish(self.path, data)
+        sync_directory(self.path)
+        status = os.stat(self.path)
+        self.identity, self.offset, self.records = (status.st_dev, status.st_ino), len(data), 1
+
+    def append(self, record, sync=False):
+        """
+        Ajoute un enregistrement au catalogue ; retourne False s'il n'a pas été écrit (catalogue absent ou
+        illisible : il sera reconstruit à la prochaine consultation, à partir des sauvegardes).
+
+        :param sync: fsync après l'ajout (nouvelle partie ou partie retirée).
+        """
+        try:
+            with self.locked():
+                if not self.read_new():
+                    return False
+                with open(self.path, "r+b") as file:
+                    file.truncate(self.offset)  # Sans effet, sauf après un ajout interrompu
+                    file.seek(self.offset)
+                    data = encode(record)
+                    file.write(data)
+                    file.flush()
+                    if sync:
+                        os.fsync(file.fileno())
+                self.apply(record)
+                self.offset += len(data)
+                self.records += 1
+                if self.records > max(COMPACT_MIN, 2 * len(self.entries)):
+                    self.write_all()
+        except OSError as e:
+            print(f"Erreur : Impossible de mettre à jour le catalogue des sauvegardes ({e}).")
+            return False
+        return True
+
+    def needs_update(self, summary):
+        """Vrai si le résumé est à écrire (voir outdated)."""
+        return outdated(self.entries.get(summary.name), summary)
+
+    def record(self, summary):
+        """Écrit le résumé d'une partie (après l'écriture de sa sauvegarde)."""
+        return self.append(["set", list(summary)], sync=summary.name not in self.entries)
+
+    def remove(self, save_name):
+        """Retire une partie du catalogue (sauvegarde supprimée hors du jeu)."""
+        return self.append(["del", save_name], sync=True)
+
+    # --- Consultation ---
+    def get(self, save_name):
+        """Résumé de la partie, ou None si elle n'est pas dans le catalogue."""
+        self.refresh()
+        return self.entries.get(save_name)
+
+    def __contains__(self, save_name):
+        return self.get(save_name) is not None
+
+    def __len__(self):
+        self.refresh()
+        return len(self.entries)
+
+    def query(self, player=None, min_level=None, max_level=None, since=None, sort="played", page=0, page_size=10):
+        """
+        Page de la liste des parties, filtrée et triée ; retourne (résumés de la page, nombre de parties
+        qui correspondent aux filtres).
+
+        :param player: Partie du nom du joueur (sans tenir compte des majuscules).
+        :param since: Parties jouées depuis cette date (secondes depuis l'epoch).
+        :param sort: Clé de SORT_KEYS : "played" (plus récentes d'abord), "level", "player" ou "name".
+        :param page: Numéro de la page, à partir de 0.
+        """
+        self.refresh()
+        rows = self.entries.values()
+        if player:
+            player = player.lower()
+            rows = [summary for summary in rows if player in summary.player.lower()]
+        if min_level is not None:
+            rows = [summary for summary in rows if summary.level >= min_level]
+        if max_level is not None:
+            rows = [summary for summary in rows if summary.level <= max_level]
+        if since is not None:
+            rows = [summary for summary in rows if summary.played >= since]
+        # Seules les premières lignes sont triées (tas) : quelques millisecondes pour des milliers de parties
+        start = page * page_size
+        return heapq.nsmallest(start + page_size, rows, key=SORT_KEYS[sort])[start:], len(rows)
+
+    def after_fork(self):
+        """Dans un processus créé par fork, le verrou a pu être pris par un thread qui n'existe plus."""
+        self.lock = threading.RLock()
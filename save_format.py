@@ -0,0 +1,311 @@
+"""
+Format binaire des sauvegardes (NOM.save), indépendant de la disposition des classes du jeu.
+
+Un fichier commence par un en-tête de taille fixe (HEADER) : marque du format, version du schéma,
+drapeaux, taille de la carte, identifiant de l'instantané (journal de save_load), positions de départ,
+du boss et du joueur, puis la table des sections (décalage et longueur de chacune, dans l'ordre de
+SECTIONS) :
+
+- tables : JSON (nom du joueur, modèles d'ennemis et d'objets référencés par numéro) ;
+- regions, descriptions : un octet par case (code de région, indice dans DESCRIPTION_TEMPLATES) ;
+- enemies, items : un enregistrement de taille fixe par ennemi / objet de la carte ;
+- player, inventory : l'état du joueur, puis un enregistrement par objet de l'inventaire.
+
+Les nombres sont des flottants 64 bits avec un masque des valeurs qui étaient des flottants (les
+entiers, jusqu'à 2**53, sont relus en int). Aucun code n'est exécuté au chargement.
+
+Au chargement, les codes des cases ne sont pas copiés : la carte (compacte, MappedTileGrid) les lit
+dans le fichier projeté en mémoire (mmap) ; seuls les ennemis, les objets et le joueur sont créés.
+
+Quand le schéma change, SCHEMA_VERSION augmente et une fonction de MIGRATIONS convertit le document
+lu d'une version à la suivante (voir migration).
+
+Conversion des sauvegardes pickle existantes (depuis la racine du dépôt) :
+    python save_format.py [--directory saves | --database saves.db] [NOM ...]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+
+from game.enemy import Enemy, enemy_kind
+from game.inventory import Inventory
+from game.item import Item, item_kind
+from game.map import GameMap, REGION_DESCRIPTIONS
+from game.player import Player
+from game.tile_grid import MappedTileGrid, TileGrid, DESCRIPTION_TEMPLATES, REGION_CODES
+
+MAGIC = b"RPGSAVE\x00"
+SCHEMA_VERSION = 1
+MAP_SAVES = os.name != "nt"  # Windows ne remplace pas un fichier projeté en mémoire : cases copiées
+
+SECTIONS = ("tables", "regions", "descriptions", "enemies", "items", "player", "inventory")
+# Marque, version, drapeaux, taille, identifiant de l'instantané, positions de départ, du boss et du joueur,
+# puis décalage et longueur de chaque section
+HEADER = struct.Struct("<8sHHIQ6i" + "QQ" * len(SECTIONS))
+HAS_JOURNAL_ID = 1  # Drapeau : l'identifiant de l'instantané est présent
+
+ENEMY = struct.Struct("<II3dB")  # Case, modèle, HP, boost d'attaque, réduction des dégâts, masque des flottants
+ITEM = struct.Struct("<IIdB")  # Case, modèle, quantité, masque
+INVENTORY_ITEM = struct.Struct("<IdB")  # Modèle, quantité, masque
+PLAYER = struct.Struct("<9dHB")  # Statistiques (PLAYER_NUMBERS), masque des flottants, drapeaux (PLAYER_FLAGS)
+PLAYER_NUMBERS = ("_hp", "_temporary_attack_boost", "_damage_reduction", "_level", "_max_hp", "_attack", "_defense",
+                  "_experience", "points_to_allocate")
+PLAYER_FLAGS = ("attack_boost_active", "has_boosted_attack", "has_used_attack_boost", "shield_active")
+
+MAX_EXACT = 2 ** 53  # Plus grand entier exact en flottant 64 bits
+
+
+# --- Nombres ---
+def pack_numbers(values):
+    """Retourne (masque des flottants, valeurs en flottants) ; lève ValueError pour une valeur non représentable."""
+    mask = 0
+    for bit, value in enumerate(values):
+        if type(value) is float:
+            mask |= 1 << bit
+        elif type(value) is not int or abs(value) > MAX_EXACT:
+            raise ValueError(f"valeur non enregistrable : {value!r}")
+    return mask, [float(value) for value in values]
+
+
+def unpack_numbers(mask, values):
+    """Inverse de pack_numbers."""
+    return [value if mask >> bit & 1 else int(value) for bit, value in enumerate(values)]
+
+
+# --- Écriture ---
+class KindTable:
+    """Numéros des modèles (EnemyKind, ItemKind) référencés par les enregistrements, dans l'ordre d'apparition."""
+
+    def __init__(self):
+        self.numbers = {}
+        self.kinds = []
+
+    def number(self, kind):
+        key = (tuple(kind), tuple(map(type, kind)))  # 1 et 1.0 sont deux modèles différents
+        number = self.numbers.get(key)
+        if number is None:
+            number = self.numbers[key] = len(self.kinds)
+            self.kinds.append(kind)
+        return number
+
+
+def map_tables(game_map):
+    """
+    Codes de région et de description de toutes les cases, et ennemis et objets par indice de case :
+    (regions, descriptions, enemies, items), ou None si la carte n'est pas une grille complète de cases
+    décrites par DESCRIPTION_TEMPLATES.
+    """
+    grid = game_map.locations
+    if game_map.compact:
+        if not isinstance(grid, TileGrid):
+            return None  # Carte par chunks (cases générées à la demande)
+        return bytes(grid.regions), bytes(grid.descriptions), grid.enemy_table, grid.item_table
+    size = game_map.size
+    if len(grid) != size * size:
+        return None
+    template_ids = {text: template for template, text in enumerate(DESCRIPTION_TEMPLATES)}
+    regions, descriptions, enemies, items = bytearray(size * size), bytearray(size * size), {}, {}
+    for (x, y), cell in grid.items():
+        template = template_ids.get(cell["description"])
+        if template is None:
+            return None
+        index = x * size + y
+        regions[index] = REGION_CODES[game_map.get_region((x, y))]
+        descriptions[index] = template
+        if cell.get("enemy") is not None:
+            enemies[index] = cell["enemy"]
+        if cell.get("item") is not None:
+            items[index] = cell["item"]
+    return bytes(regions), bytes(descriptions), enemies, items
+
+
+def encode(player, game_map):
+    """
+    Sauvegarde binaire de la partie ; retourne None si la carte ne peut pas être enregistrée dans ce format
+    (carte par chunks, description de case hors modèle) : save_load écrit alors un pickle.
+    """
+    tables = map_tables(game_map)
+    if tables is None:
+        return None
+    regions, descriptions, enemy_table, item_table = tables
+    enemy_kinds, item_kinds = KindTable(), KindTable()
+    enemies = b"".join(pack_enemy(index, enemy_table[index], enemy_kinds) for index in sorted(enemy_table))
+    items = b"".join(pack_item(index, item_table[index], item_kinds) for index in sorted(item_table))
+
+    mask, numbers = pack_numbers([getattr(player, name) for name in PLAYER_NUMBERS])
+    flags = sum(1 << bit for bit, name in enumerate(PLAYER_FLAGS) if getattr(player, name))
+    inventory = bytearray()
+    for item in player.inventory.items:
+        quantity_mask, (quantity,) = pack_numbers([item.quantity])
+        inventory += INVENTORY_ITEM.pack(item_kinds.number(item.kind), quantity, quantity_mask)
+
+    kinds = json.dumps({"name": player.name, "enemy_kinds": [list(kind.arguments()) for kind in enemy_kinds.kinds],
+                        "item_kinds": [list(kind) for kind in item_kinds.kinds]}, ensure_ascii=False).encode("utf-8")
+    sections = (kinds, regions, descriptions, enemies, items, PLAYER.pack(*numbers, mask, flags), bytes(inventory))
+    table, offset = [], HEADER.size
+    for data in sections:
+        table += (offset, len(data))
+        offset += len(data)
+    journal_id = getattr(game_map, "journal_id", None)
+    header_flags = HAS_JOURNAL_ID if journal_id is not None else 0
+    header = HEADER.pack(MAGIC, SCHEMA_VERSION, header_flags, game_map.size, journal_id or 0, *game_map.start_location,
+                         *game_map.boss_location, *game_map.get_player_position(), *table)
+    return b"".join((header,) + sections)
+
+
+def pack_enemy(index, enemy, kinds):
+    mask, numbers = pack_numbers([enemy._hp, enemy._temporary_attack_boost, enemy._damage_reduction])
+    return ENEMY.pack(index, kinds.number(enemy.kind), *numbers, mask)
+
+
+def pack_item(index, item, kinds):
+    mask, (quantity,) = pack_numbers([item.quantity])
+    return ITEM.pack(index, kinds.number(item.kind), quantity, mask)
+
+
+# --- Lecture ---
+MIGRATIONS = {}  # Version du schéma -> fonction qui convertit un document de cette version vers la suivante
+
+
+def migration(version):
+    """
+    Décorateur d'une migration du schéma `version` vers `version + 1` : la fonction reçoit le document
+    lu (dictionnaire, voir read_document) et retourne le document au schéma suivant.
+    """
+    def register(function):
+        MIGRATIONS[version] = function
+        return function
+    return register
+
+
+def is_binary(data):
+    """Vrai si les octets (bytes, mmap ou memoryview) sont une sauvegarde de ce format."""
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def read_document(buffer):
+    """
+    Lit l'en-tête et les sections d'une sauvegarde ; retourne le document à la version SCHEMA_VERSION.
+
+    Les sections `regions` et `descriptions` restent des vues (memoryview) sur `buffer`.
+    """
+    if len(buffer) < HEADER.size or bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("ce fichier n'est pas une sauvegarde binaire")
+    fields = HEADER.unpack_from(buffer)
+    magic, version, flags, size, journal_id = fields[:5]
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"sauvegarde d'une version plus récente du jeu (schéma {version})")
+    sections = {}
+    view = memoryview(buffer)
+    for number, name in enumerate(SECTIONS):
+        offset, length = fields[11 + 2 * number:13 + 2 * number]
+        if offset + length > len(buffer):
+            raise ValueError("sauvegarde tronquée")
+        sections[name] = view[offset:offset + length]
+    document = {"version": version, "size": size, "journal_id": journal_id if flags & HAS_JOURNAL_ID else None,
+                "start": tuple(fields[5:7]), "boss": tuple(fields[7:9]), "position": tuple(fields[9:11]),
+                "tables": json.loads(bytes(sections.pop("tables")).decode("utf-8"))}
+    document.update(sections)
+    while document["version"] < SCHEMA_VERSION:
+        document = MIGRATIONS[document["version"]](document)
+    return document
+
+
+def build_game(document):
+    """Crée le joueur et la carte décrits par le document ; retourne (player, game_map, current_position)."""
+    tables, size = document["tables"], document["size"]
+    if len(document["regions"]) != size * size or len(document["descriptions"]) != size * size:
+        raise ValueError("sauvegarde tronquée")
+    enemy_kinds = [enemy_kind(*arguments) for arguments in tables["enemy_kinds"]]  # Défense ajoutée si modifiée
+    item_kinds = [item_kind(*values) for values in tables["item_kinds"]]
+
+    enemies = {}
+    for index, kind, hp, boost, reduction, mask in ENEMY.iter_unpack(document["enemies"]):
+        # Attributs posés directement (Enemy.__setstate__ gère les anciens états, inutile ici) : des milliers d'ennemis
+        enemy = enemies[index] = Enemy.__new__(Enemy)
+        enemy.kind = enemy_kinds[kind]
+        if mask:
+            hp, boost, reduction = unpack_numbers(mask, (hp, boost, reduction))
+            enemy._hp, enemy._temporary_attack_boost, enemy._damage_reduction = hp, boost, reduction
+        else:
+            enemy._hp, enemy._temporary_attack_boost, enemy._damage_reduction = int(hp), int(boost), int(reduction)
+    items = {index: restore_item(item_kinds[kind], quantity, mask)
+             for index, kind, quantity, mask in ITEM.iter_unpack(document["items"])}
+
+    game_map = GameMap.__new__(GameMap)
+    game_map.size = size
+    game_map.compact = True
+    game_map.start_location = document["start"]
+    game_map.boss_location = document["boss"]
+    game_map.locations = MappedTileGrid(size, document["regions"], document["descriptions"], enemies, items)
+    game_map.enemy_data = game_map.load_enemy_data()
+    game_map.item_data = game_map.load_item_data()
+    game_map.current_position = document["position"]
+    game_map.region_descriptions = dict(REGION_DESCRIPTIONS)
+    if document["journal_id"] is not None:
+        game_map.journal_id = document["journal_id"]
+
+    *numbers, mask, flags = PLAYER.unpack(document["player"])
+    state = dict(zip(PLAYER_NUMBERS, unpack_numbers(mask, numbers)))
+    state.update((name, bool(flags >> bit & 1)) for bit, name in enumerate(PLAYER_FLAGS))
+    inventory = Inventory.__new__(Inventory)
+    inventory.__setstate__({"items": [restore_item(item_kinds[kind], quantity, mask)
+                                      for kind, quantity, mask in INVENTORY_ITEM.iter_unpack(document["inventory"])]})
+    player = Player.__new__(Player)
+    player.__setstate__(dict(state, name=tables["name"], inventory=inventory))
+    return player, game_map, game_map.current_position
+
+
+def restore_item(kind, quantity, mask):
+    item = Item.__new__(Item)
+    item.kind = kind
+    item.quantity = quantity if mask else int(quantity)
+    return item
+
+
+def decode(data):
+    """Lit une sauvegarde binaire en mémoire ; retourne (player, game_map, current_position)."""
+    return build_game(read_document(data))
+
+
+def read_buffer(path):
+    """Contenu d'un fichier de sauvegarde, projeté en mémoire (lu en entier sous Windows)."""
+    with open(path, "rb") as file:
+        if not MAP_SAVES:
+            return file.read()
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("ce fichier n'est pas une sauvegarde binaire") from None  # Fichier vide
+
+
+def load(path):
+    """
+    Lit une sauvegarde binaire ; retourne (player, game_map, current_position). Les codes des cases restent
+    dans le fichier projeté en mémoire, qui reste ouvert tant que la carte existe.
+    """
+    return decode(read_buffer(path))
+
+
+# --- Conversion des sauvegardes pickle ---
+def main():
+    parser = argparse.ArgumentParser(description="Convertit les sauvegardes pickle (NOM.pkl) au format binaire.")
+    parser.add_argument("names", nargs="*", help="Sauvegardes à convertir (toutes par défaut)")
+    parser.add_argument("--directory", default=None, help="Dossier des sauvegardes (save_load.SAVE_DIRECTORY)")
+    parser.add_argument("--database", default=None, help="Base SQLite des sauvegardes (sqlite_store.py)")
+    args = parser.parse_args()
+
+    import save_load  # save_load importe ce module
+    if args.directory:
+        save_load.SAVE_DIRECTORY = args.directory
+    if args.database:
+        from sqlite_store import SQLiteStore
+        save_load.store = SQLiteStore(args.database)
+    converted = save_load.convert_saves(args.names or None)
+    print(f"{converted} sauvegarde(s) convertie(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,402 @@
+import atexit
+import io
 import pickle
 import os
+import struct
+import time
+import zlib
+from collections import deque
 
+import save_catalog
+import save_format
 import ui_manager  # Importer le module UI
+from game.events import Prompt, run_prompts
+from game.slots import get_state
+from save_store import FileStore
+from save_writer import JournalWrite, SaveWriter, SnapshotWrite
 
 
 SAVE_DIRECTORY = "saves"  # Dossier pour stocker les sauvegardes
+store = None  # Stockage des sauvegardes (save_store.py) ; None : fichiers de SAVE_DIRECTORY
+save_hook = None  # Appelée avec le nom de chaque sauvegarde écrite (le serveur suit ainsi la partie de chaque session)
+journal_saves = True  # Sauvegardes journalisées (False : instantané complet à chaque sauvegarde)
+SNAPSHOT_EVERY = 500  # Enregistrements du journal avant un nouvel instantané complet
+binary_saves = True  # Instantanés au format binaire (save_format.py, NOM.save) ; False : pickle (NOM.pkl)
 
-def save_game(player, game_map, save_name):
-    """Sauvegarde l'état du joueur, de la carte et de la position actuelle dans un fichier pickle."""
-    if not os.path.exists(SAVE_DIRECTORY):
-        os.makedirs(SAVE_DIRECTORY)  # Créer le dossier de sauvegarde si nécessaire
+JOURNAL_MAGIC = b"RPGJRNL1"
+JOURNAL_HEADER = struct.Struct("<8sQ")  # Marque du format, identifiant de l'instantané prolongé
+RECORD_HEADER = struct.Struct("<II")  # Longueur et CRC32 d'un enregistrement
+_journals = {}  # Nom de sauvegarde -> SaveJournal de la partie en cours (modifié seulement par la boucle de jeu)
+_failed_journals = deque()  # Sauvegardes dont une écriture a échoué, signalées par le thread d'écriture
+_file_stores = {}  # Dossier -> FileStore
 
-    save_file = os.path.join(SAVE_DIRECTORY, f"{save_name}.pkl")
-    data = {
-        "player": player,
-        "game_map": game_map,
-        "current_position": game_map.get_player_position(),  # Sauvegarder la position actuelle
-    }
+def forget_journal(save_name):
+    """
+    Après une écriture échouée, la prochaine sauvegarde de la partie sera un instantané complet. Appelée par le
+    thread d'écriture : la sauvegarde est mise en file, et son journal retiré par forget_failed_journals.
+    """
+    _failed_journals.append(save_name)
 
+def forget_failed_journals():
+    """Retire de _journals les journaux dont une écriture a échoué, dans la boucle de jeu."""
+    while _failed_journals:
+        _journals.pop(_failed_journals.popleft(), None)
+
+# Écritures faites sur un thread dédié, par lots (writer.background = False : dans la boucle de jeu)
+writer = SaveWriter(on_failure=forget_journal)
+atexit.register(writer.flush)  # Sauvegardes en attente écrites avant la fin du programme
+
+def file_store(directory=None):
+    """Stockage par fichiers du dossier (SAVE_DIRECTORY par défaut)."""
+    directory = SAVE_DIRECTORY if directory is None else directory
+    files = _file_stores.get(directory)
+    if files is None:
+        files = _file_stores[directory] = FileStore(directory, summarize_save, pending_saves)
+    return files
+
+def current_store():
+    """Stockage des sauvegardes : `store`, ou les fichiers de SAVE_DIRECTORY."""
+    return store if store is not None else file_store()
+
+def flush_saves(save_name=None):
+    """Attend l'écriture des sauvegardes en attente (d'une partie, ou toutes) ; retourne False si l'une a échoué."""
+    return writer.flush(save_name)
+
+def save_game(player, game_map, save_name, snapshot=False):
+    """
+    Sauvegarde l'état du joueur, de la carte et de la position actuelle ; retourne True si la sauvegarde est
+    transmise à `writer` (flush_saves attend qu'elle soit écrite).
+
+    Avec `journal_saves`, seules les modifications depuis la sauvegarde précédente sont ajoutées au journal de la
+    partie (quelques dizaines d'octets par tour) ; un instantané complet (NOM.save) est écrit à la première
+    sauvegarde, tous les SNAPSHOT_EVERY enregistrements, ou si `snapshot` est vrai. Le résumé de la partie
+    (liste des sauvegardes) est mis à jour avec l'écriture s'il a changé.
+    """
+    saves = current_store()
+    summary = save_catalog.summarize(save_name, player, game_map)
+    if not saves.needs_update(summary):
+        summary = None
+    forget_failed_journals()
+    journal = _journals.get(save_name)
+    if (journal_saves and not snapshot and journal is not None and journal.store is saves
+            and journal.records < SNAPSHOT_EVERY and getattr(game_map, "journal_id", None) == journal.snapshot_id):
+        if not journal.append(player, game_map, summary):
+            del _journals[save_name]  # Journal incomplet : la prochaine sauvegarde sera un instantané
+            return False
+    elif not write_snapshot(player, game_map, save_name, summary):
+        return False
+    if save_hook is not None:
+        save_hook(save_name)
+    return True
+
+def write_snapshot(player, game_map, save_name, summary=None):
+    """
+    Prépare l'instantané complet de la partie (remplacé d'un bloc), puis un journal vide qui le prolonge.
+
+    :param summary: Résumé de la partie à écrire avec l'instantané (None : inchangé).
+    """
+    saves = current_store()
+    game_map.journal_id = int.from_bytes(os.urandom(8), "little")  # Relie l'instantané à son journal
     try:
-        with open(save_file, "wb") as file:
-            pickle.dump(data, file)  # Sauvegarder les données dans le fichier
+        saves.create()
+        # Sérialisé ici, pendant que la partie ne change pas ; écrit ensuite par `writer`
+        payload = save_format.encode(player, game_map) if binary_saves else None
+        binary = payload is not None
+        if not binary:  # Format pickle demandé, ou carte que le format binaire ne décrit pas (chunks)
+            data = {
+                "player": player,
+                "game_map": game_map,
+                "current_position": game_map.get_player_position(),  # Sauvegarder la position actuelle
+            }
+            payload = pickle.dumps(data)
     except Exception as e:
         print(f"Failed to save the game: {e}")  # Gestion des erreurs lors de la sauvegarde
+        _journals.pop(save_name, None)
+        return False
+    # Un journal d'un autre instantané (interruption entre ces deux écritures) est ignoré au chargement
+    header = JOURNAL_HEADER.pack(JOURNAL_MAGIC, game_map.journal_id) if journal_saves else None
+    if not writer.submit(save_name, SnapshotWrite(saves, payload, binary, header, game_map.journal_id, summary)):
+        return False
+    if journal_saves:
+        _journals[save_name] = SaveJournal(save_name, saves, game_map.journal_id, player, game_map)
+    return True
+
+def save_exists(save_name):
+    """Vrai si une sauvegarde porte ce nom (y compris une sauvegarde encore en attente d'écriture), d'après la liste des parties."""
+    writer.flush(save_name)
+    return current_store().exists(save_name)
+
+def summarize_save(saves, save_name):
+    """
+    Résumé d'une sauvegarde relue dans le stockage (journal compris), ou None si elle est illisible. Relecture
+    seule : le journal, peut-être en cours d'ajout par un autre processus, n'est ni tronqué ni repris.
+    """
+    state = read_save(save_name, saves, resume=False)
+    if state is None:
+        return None
+    return save_catalog.summarize(save_name, state[0], state[1])
+
+def pending_saves():
+    """Sauvegardes dont une écriture est en attente ou en cours sur le thread d'écriture."""
+    return writer.pending_saves()
+
+# --------- Journal des sauvegardes ---------
+# Le journal (`NOM.journal`, ou la table deltas de SQLiteStore) commence par l'identifiant de l'instantané (NOM.save ou NOM.pkl) qu'il prolonge, suivi
+# d'enregistrements (longueur, CRC32, pickle d'un dictionnaire de modifications). Au chargement, ils sont
+# appliqués à l'instantané jusqu'au premier enregistrement incomplet ou invalide (écriture interrompue),
+# qui est retiré du stockage. Les modifications de la carte ne se font qu'à la position du joueur : le
+# journal ne compare que la case de la sauvegarde précédente et celle de la position actuelle.
+# Les enregistrements sont relus par JournalUnpickler, qui ne crée que des ennemis et des objets ; les
+# instantanés pickle (NOM.pkl, cartes par chunks, lignes binary = 0 de SQLiteStore) par SnapshotUnpickler,
+# qui n'accepte en plus que les classes du modèle de jeu.
+
+JOURNAL_GLOBALS = {("game.enemy", "Enemy"), ("game.enemy", "enemy_kind"), ("game.item", "Item"), ("game.item", "item_kind")}
+SNAPSHOT_GLOBALS = JOURNAL_GLOBALS | {
+    ("game.player", "Player"), ("game.inventory", "Inventory"),
+    ("game.map", "GameMap"), ("game.tile_grid", "TileGrid"), ("game.tile_grid", "restore_grid"),
+    ("game.chunked_map", "ChunkedGameMap"), ("game.chunked_map", "ChunkedTiles"),
+    ("game.assets", "EnemyTemplate"), ("game.assets", "ItemTemplate"),
+    ("array", "array"), ("array", "_array_reconstructor"), ("collections", "OrderedDict"),
+}
+
+class JournalUnpickler(pickle.Unpickler):
+    """Unpickler des enregistrements du journal : refuse toute autre classe ou fonction que celles de JOURNAL_GLOBALS."""
+    allowed, kind = JOURNAL_GLOBALS, "journal"
+
+    def find_class(self, module, name):
+        if (module, name) not in self.allowed:
+            raise pickle.UnpicklingError(f"{self.kind} invalide : {module}.{name} n'est pas autorisé")
+        return super().find_class(module, name)
+
+class SnapshotUnpickler(JournalUnpickler):
+    """Unpickler des instantanés pickle : refuse toute autre classe ou fonction que celles de SNAPSHOT_GLOBALS."""
+    allowed, kind = SNAPSHOT_GLOBALS, "instantané"
+
+def player_state(player):
+    """État du joueur comparé entre deux sauvegardes : (attributs sans l'inventaire, état des objets de l'inventaire)."""
+    state = get_state(player)
+    inventory = state.pop("inventory")
+    return state, [get_state(item) for item in inventory.items]
+
+def tile_state(game_map, position):
+    """(ennemi, objet) de la case et leur état, comparé entre deux sauvegardes."""
+    enemy, item = game_map.get_enemy(position), game_map.get_item(position)
+    state = (enemy and get_state(enemy), item and get_state(item))
+    return (enemy, item), state
+
+class SaveJournal:
+    def __init__(self, save_name, saves, snapshot_id, player, game_map, records=0):
+        """
+        Journal d'une partie en cours, avec l'état déjà enregistré (instantané et journal) auquel comparer
+        la prochaine sauvegarde.
+
+        :param saves: Stockage de l'instantané et du journal.
+        :param snapshot_id: Identifiant de l'instantané prolongé par le journal (GameMap.journal_id).
+        :param records: Enregistrements déjà dans le journal.
+        """
+        self.save_name = save_name
+        self.store = saves
+        self.snapshot_id = snapshot_id
+        self.records = records
+        self.player, self.inventory = player_state(player)
+        self.position = game_map.get_player_position()
+        self.tile = tile_state(game_map, self.position)[1]
+
+    def changes(self, player, game_map):
+        """Modifications depuis l'état enregistré (dictionnaire vide s'il n'y en a pas) ; l'état enregistré est mis à jour."""
+        record = {}
+        fields, inventory = player_state(player)
+        changed = {name: value for name, value in fields.items() if name not in self.player or self.player[name] != value}
+        if changed:
+            record["player"] = changed  # HP, XP, niveau, boosts...
+        if inventory != self.inventory:
+            record["inventory"] = list(player.inventory.items)
+        contents, state = tile_state(game_map, self.position)
+        if state != self.tile:
+            record["tiles"] = {self.position: contents}  # Ennemi vaincu ou blessé, objet ramassé
+        position = game_map.get_player_position()
+        if position != self.position:
+            record["position"] = position
+            state = tile_state(game_map, position)[1]
+        self.player, self.inventory, self.position, self.tile = fields, inventory, position, state
+        return record
+
+    def append(self, player, game_map, summary=None):
+        """
+        Transmet les modifications à ajouter au journal ; retourne False si l'écriture a échoué.
+
+        :param summary: Résumé de la partie à écrire avec l'ajout (None : inchangé).
+        """
+        record = self.changes(player, game_map)
+        if not record:
+            return True
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        if not writer.submit(self.save_name, JournalWrite(self.store,  # Une seule écriture
+                                                          RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload,
+                                                          self.snapshot_id, summary)):
+            return False
+        self.records += 1
+        return True
+
+def apply_record(record, player, game_map):
+    """Applique un enregistrement du journal à la partie."""
+    for name, value in record.get("player", {}).items():
+        setattr(player, name, value)
+    if "inventory" in record:
+        player.inventory.items = record["inventory"]
+    for position, (enemy, item) in record.get("tiles", {}).items():
+        if enemy is None:
+            game_map.clear_enemy(position)
+        else:
+            game_map.locations[position]["enemy"] = enemy
+        if item is None:
+            game_map.clear_item(position)
+        else:
+            game_map.locations[position]["item"] = item
+    if "position" in record:
+        game_map.set_player_position(*record["position"])
+
+def replay_journal(saves, save_name, data, player, game_map, resume=True):
+    """
+    Applique à l'instantané chargé les enregistrements valides de son journal (`data`), retire du stockage une
+    fin incomplète, et prépare le journal pour les sauvegardes suivantes ; retourne le nombre d'enregistrements appliqués.
+
+    :param resume: False : relecture seule, sans toucher au stockage ni à _journals.
+    """
+    snapshot_id = getattr(game_map, "journal_id", None)
+    if snapshot_id is None or data[:JOURNAL_HEADER.size] != JOURNAL_HEADER.pack(JOURNAL_MAGIC, snapshot_id):
+        if resume:
+            _journals.pop(save_name, None)  # Journal absent ou d'un autre instantané : la prochaine sauvegarde sera un instantané
+        return 0
+
+    offset, records = JOURNAL_HEADER.size, 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        payload = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break  # Écriture interrompue : la partie reprend au dernier enregistrement complet
+        apply_record(JournalUnpickler(io.BytesIO(payload)).load(), player, game_map)
+        offset += RECORD_HEADER.size + length
+        records += 1
+    if not resume:
+        return records
+    try:
+        if offset < len(data):
+            saves.truncate_journal(save_name, offset)  # Les enregistrements suivants s'ajouteront après le dernier complet
+        _journals[save_name] = SaveJournal(save_name, saves, snapshot_id, player, game_map, records)
+    except OSError:
+        _journals.pop(save_name, None)
+    return records
+
+def load_state(save_name, saves=None, resume=True):
+    """
+    Lit l'instantané (binaire ou pickle) de la partie et lui applique son journal ; retourne (player, game_map,
+    current_position).
+
+    :param saves: Stockage de la sauvegarde (current_store() par défaut).
+    :param resume: False : relecture seule (voir replay_journal), par exemple pour résumer la partie.
+    """
+    saves = saves or current_store()
+    writer.flush(save_name)  # Sauvegardes de la partie encore en attente
+    forget_failed_journals()
+    snapshot, journal = saves.read(save_name)
+    if save_format.is_binary(snapshot):
+        player, game_map, current_position = save_format.decode(snapshot)
+    else:
+        data = SnapshotUnpickler(io.BytesIO(snapshot)).load()
+        player, game_map, current_position = data["player"], data["game_map"], data["current_position"]
+    if replay_journal(saves, save_name, journal, player, game_map, resume):
+        return player, game_map, game_map.get_player_position()
+    return player, game_map, current_position
+
+def read_save(save_name, saves=None, resume=True):
+    """Lit une sauvegarde par son nom ; retourne (player, game_map, current_position), ou None si elle est illisible."""
+    try:
+        return load_state(save_name, saves, resume)
+    except Exception as e:
+        print(f"Erreur : Impossible de lire la sauvegarde '{save_name}' ({e}).")
+        return None
+
+def convert_saves(save_names=None):
+    """
+    Réécrit au format binaire les sauvegardes pickle (toutes celles du stockage, ou `save_names`), journal
+    compris ; retourne le nombre de sauvegardes converties.
+    """
+    writer.flush()
+    saves = current_store()
+    if save_names is None:
+        save_names = saves.pickle_saves()
+    rewritten = []
+    for save_name in save_names:
+        state = read_save(save_name)
+        if state is not None and save_game(state[0], state[1], save_name, snapshot=True) and writer.flush(save_name):
+            rewritten.append(save_name)
+    remaining = set(saves.pickle_saves())  # Cartes par chunks : restent en pickle
+    return sum(save_name not in remaining for save_name in rewritten)
+
+RETURN_PROMPT = "\nPress Enter to return to the main menu..."
+PAGE_SIZE = 10  # Sauvegardes par page de la liste de load_game
+
+def describe_save(summary):
+    """Ligne d'une sauvegarde dans la liste de load_game."""
+    size = f"{summary.size}x{summary.size}" if summary.size else "?"
+    played = time.strftime("%Y-%m-%d %H:%M", time.localtime(summary.played))
+    return (f"{summary.name} - {summary.player}, level {summary.level}, HP {summary.hp}/{summary.max_hp}, "
+            f"map {size}, last played {played}")
 
 def load_game():
-    """Charge l'état du joueur, de la carte et de la position actuelle à partir d'un fichier pickle."""
-    if not os.path.exists(SAVE_DIRECTORY):
-        print("\nNo saved games found.")
-        input("\nPress Enter to return to the main menu...")
-        return None, None, None, None
+    """Charge l'état du joueur, de la carte et de la position actuelle à partir d'une sauvegarde."""
+    return run_prompts(load_game_flow(), ui_manager.answer_prompt)
 
-    save_files = [f for f in os.listdir(SAVE_DIRECTORY) if f.endswith(".pkl")]
-    if not save_files:
-        print("\nNo saved games found.")
-        input("\nPress Enter to return to the main menu...")
-        return None, None, None, None
+def load_game_flow():
+    """
+    Déroulement de load_game : produit un Prompt à chaque saisie (voir game/events.py). La liste vient des
+    résumés des parties du stockage, par pages, les plus récentes d'abord, filtrable par nom de joueur.
+    """
+    writer.flush()  # Les parties dont la première sauvegarde est en attente apparaissent dans la liste
+    saves = current_store()
+    page, player_name = 0, None
+    while True:
+        summaries, total = saves.query(player=player_name, page=page, page_size=PAGE_SIZE)
+        if not total and player_name:
+            print(f"\nNo saved games found for '{player_name}'.")
+            page, player_name = 0, None
+            continue
+        if not total:
+            print("\nNo saved games found.")
+            yield Prompt(RETURN_PROMPT)
+            return None, None, None, None
 
-    print("\nSelect a saved game:")
-    for idx, save_file in enumerate(save_files, start=1):
-        print(f"{idx}. {save_file[:-4]}")  # Affiche le nom de la sauvegarde sans l'extension
+        pages = -(-total // PAGE_SIZE)
+        print(f"\nSelect a saved game (page {page + 1}/{pages}, most recent first):")
+        for idx, summary in enumerate(summaries, start=page * PAGE_SIZE + 1):
+            print(f"{idx}. {describe_save(summary)}")
+
+        answer = (yield Prompt("\nEnter the number of the game to load (n/p: next/previous page, /name: filter by player): ")).strip()
+        if answer in ("n", "p"):
+            page = min(max(page + (1 if answer == "n" else -1), 0), pages - 1)
+        elif answer.startswith("/"):
+            page, player_name = 0, answer[1:].strip() or None
+        else:
+            break
 
     try:
-        choice = int(input("\nEnter the number of the game to load: "))
-        if 1 <= choice <= len(save_files):
-            selected_file = save_files[choice - 1]
-            save_path = os.path.join(SAVE_DIRECTORY, selected_file)
-
-            with open(save_path, "rb") as file:
-                data = pickle.load(file)  # Charger les données du fichier
-                print(f"\nGame loaded successfully from {selected_file}!")
-                ui_manager.clear_screen()
-                save_name = os.path.splitext(selected_file)[0]  # Récupérer le nom sans extension
-                return data["player"], data["game_map"], data["current_position"], save_name
+        choice = int(answer) - page * PAGE_SIZE
+        if 1 <= choice <= len(summaries):
+            save_name = summaries[choice - 1].name
+            try:
+                player, game_map, current_position = load_state(save_name, saves)  # Instantané et journal
+            except FileNotFoundError:
+                saves.forget(save_name)  # Sauvegarde supprimée hors du jeu
+                raise
+            print(f"\nGame loaded successfully from {saves.describe(save_name)}!")
+            ui_manager.clear_screen()
+            return player, game_map, current_position, save_name
         else:
             print("\nInvalid choice.")
-            input("\nPress Enter to return to the main menu...")
+            yield Prompt(RETURN_PROMPT)
             return None, None, None, None
     except Exception as e:
         print(f"\nFailed to load the game: {e}")
-        input("\nPress Enter to return to the main menu...")
+        yield Prompt(RETURN_PROMPT)
         return None, None, None, None
@@ -0,0 +1,155 @@
+"""
+Stockage des sauvegardes (save_load.store) : où sont écrits et relus les instantanés, les journaux et
+les résumés des parties. save_load prépare les données (octets) ; le stockage les écrit sur le thread du
+SaveWriter et les relit au chargement.
+
+Un stockage fournit :
+- write(save_name, write) : écrit une SnapshotWrite ou une JournalWrite (thread du SaveWriter), résumé de
+  la partie compris ; lève une exception si l'écriture échoue ;
+- commit() : termine un lot d'écritures (toutes les parties en attente sur le thread) ;
+- create() : prépare le stockage avant un instantané ;
+- read(save_name) : (instantané, journal) de la partie ; FileNotFoundError si elle n'existe pas ;
+- truncate_journal(save_name, size) : retire la fin invalide du journal ;
+- exists, query, needs_update et forget : liste des parties (résumés, voir save_catalog.py) ;
+- describe(save_name) : nom affiché au chargement ; pickle_saves() : parties à convertir au format binaire.
+
+FileStore (par défaut) écrit un fichier par instantané et par journal ; SQLiteStore (sqlite_store.py)
+une base partagée par les processus du serveur.
+"""
+import errno
+import os
+
+import save_catalog
+import save_format
+from save_writer import SnapshotWrite, publish, sync_directory
+
+BINARY_EXTENSION = ".save"
+PICKLE_EXTENSION = ".pkl"
+JOURNAL_EXTENSION = ".journal"
+
+
+class FileStore:
+    def __init__(self, directory, summarize, pending=set):
+        """
+        Sauvegardes dans un dossier : NOM.save (ou NOM.pkl), NOM.journal et le catalogue (catalog.index).
+
+        :param directory: Dossier des sauvegardes.
+        :param summarize: Appelée avec (stockage, nom) pour reconstruire le catalogue : SaveSummary de la
+            sauvegarde lue, ou None si elle est illisible.
+        :param pending: Appelée sans argument : noms des sauvegardes dont une écriture est en attente (leur
+            résumé sera ajouté au catalogue par l'écriture).
+        """
+        self.directory = directory
+        self.summarize = summarize
+        self.catalog = save_catalog.SaveCatalog(directory, self.scan, self.save_names, pending)
+
+    # --- Fichiers ---
+    def snapshot_paths(self, save_name):
+        """Chemins de l'instantané de la partie : (format binaire, format pickle)."""
+        path = os.path.join(self.directory, save_name)
+        return path + BINARY_EXTENSION, path + PICKLE_EXTENSION
+
+    def find_save(self, save_name):
+        """Chemin de l'instantané de la partie, ou None s'il n'existe pas (le plus récent des deux formats)."""
+        existing = []
+        for path in self.snapshot_paths(save_name):
+            try:
+                existing.append((os.stat(path).st_mtime_ns, path))
+            except OSError:
+                pass
+        return max(existing)[1] if existing else None
+
+    def journal_path(self, save_name):
+        return os.path.join(self.directory, save_name + JOURNAL_EXTENSION)
+
+    def save_names(self, extensions=(BINARY_EXTENSION, PICKLE_EXTENSION)):
+        """Noms des parties du dossier (un seul instantané par partie), dans l'ordre du dossier."""
+        if not os.path.isdir(self.directory):
+            return []
+        return list(dict.fromkeys(name for name, extension in map(os.path.splitext, os.listdir(self.directory))
+                                  if extension in extensions))
+
+    # --- Écriture ---
+    def create(self):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)  # Créer le dossier de sauvegarde si nécessaire
+            self.catalog.rebuild()  # Catalogue vide, complété à chaque sauvegarde
+
+    def write(self, save_name, write):
+        """
+        Instantané publié d'un bloc (fichier temporaire, fsync, renommage) avec le journal vide qui le
+        prolonge, ou enregistrements ajoutés au journal ; puis résumé ajouté au catalogue.
+        """
+        if isinstance(write, SnapshotWrite):
+            binary_file, pickle_file = self.snapshot_paths(save_name)
+            path, obsolete = (binary_file, pickle_file) if write.binary else (pickle_file, binary_file)
+            publish(path, write.data)
+            if write.journal_data is not None:
+                publish(self.journal_path(save_name), write.journal_data)
+            try:
+                os.remove(obsolete)  # Instantané de l'autre format
+            except FileNotFoundError:
+                pass
+            sync_directory(path)
+        else:
+            with open(self.journal_path(save_name), "ab") as file:
+                file.write(write.data)
+                file.flush()
+                os.fsync(file.fileno())
+        if write.summary is not None:
+            self.catalog.record(write.summary)
+
+    def commit(self):
+        pass  # Chaque écriture est déjà sur le disque
+
+    # --- Lecture ---
+    def read(self, save_name):
+        """(instantané, journal) : instantané binaire projeté en mémoire (save_format.read_buffer), journal en octets."""
+        path = self.find_save(save_name)
+        if path is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), self.snapshot_paths(save_name)[0])
+        if path.endswith(BINARY_EXTENSION):
+            snapshot = save_format.read_buffer(path)
+        else:
+            with open(path, "rb") as file:
+                snapshot = file.read()
+        try:
+            with open(self.journal_path(save_name), "rb") as file:
+                journal = file.read()
+        except OSError:
+            journal = b""  # Sauvegarde sans journal
+        return snapshot, journal
+
+    def truncate_journal(self, save_name, size):
+        os.truncate(self.journal_path(save_name), size)
+
+    def describe(self, save_name):
+        path = self.find_save(save_name)
+        return os.path.basename(path) if path else save_name
+
+    def pickle_saves(self):
+        return sorted(self.save_names((PICKLE_EXTENSION,)))
+
+    # --- Catalogue ---
+    def exists(self, save_name):
+        return save_name in self.catalog
+
+    def query(self, **filters):
+        """Page de la liste des parties (voir SaveCatalog.query)."""
+        return self.catalog.query(**filters)
+
+    def needs_update(self, summary):
+        return self.catalog.needs_update(summary)
+
+    def forget(self, save_name):
+        """Retire du catalogue une partie dont la sauvegarde a été supprimée hors du jeu."""
+        self.catalog.remove(save_name)
+
+    def scan(self, save_names=None):
+        """Résumés des sauvegardes `save_names` (toutes celles du dossier par défaut), datés de leur dernière écriture."""
+        for save_name in self.save_names() if save_names is None else save_names:
+            summary = self.summarize(self, save_name)
+            if summary is not None:
+                paths = (self.find_save(save_name), self.journal_path(save_name))
+                played = max(os.path.getmtime(path) for path in paths if path is not None and os.path.exists(path))
+                yield summary._replace(played=int(played))
@@ -0,0 +1,228 @@
+"""
+Écriture des sauvegardes sur un thread dédié (save_load.writer).
+
+La boucle de jeu ne fait que sérialiser l'état de la partie (pickle, qui doit voir un état cohérent) ;
+l'écriture se fait sur le thread du SaveWriter, par le stockage de chaque écriture (save_store.py),
+dans l'ordre des sauvegardes de chaque partie. Quand le joueur va plus vite que le disque, un nouvel
+instantané remplace tout ce qui attendait encore pour cette partie, et les ajouts au journal en
+attente sont écrits d'un seul bloc. Le thread écrit par lots : toutes les parties en attente, puis
+commit() de chaque stockage utilisé (une transaction par lot pour SQLiteStore).
+
+Si une écriture échoue, les ajouts au journal qui en dépendent sont abandonnés et `on_failure(nom)`
+est appelée, sur le thread d'écriture (save_load met l'échec en file et écrit un instantané à la
+sauvegarde suivante).
+
+Compteurs (stats) : profondeur de la file (écritures en attente), écritures faites, écritures
+regroupées ou remplacées (coalesced), lots validés (commits), échecs et latence des écritures.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+
+LATENCY_WINDOW = 1000  # Dernières écritures gardées pour les percentiles de latence
+
+
+class SnapshotWrite(namedtuple("SnapshotWrite", ["store", "data", "binary", "journal_data", "snapshot_id", "summary"])):
+    """
+    Instantané complet (format binaire de save_format.py, ou pickle), début du journal vide qui le prolonge
+    (None sans journal) et résumé de la partie pour la liste des sauvegardes (None : inchangé).
+    """
+    __slots__ = ()
+
+
+class JournalWrite(namedtuple("JournalWrite", ["store", "data", "snapshot_id", "summary"])):
+    """Enregistrements à ajouter au journal de l'instantané `snapshot_id`, et résumé de la partie (None : inchangé)."""
+    __slots__ = ()
+
+
+def publish(path, data):
+    """Remplace le fichier d'un bloc : fichier temporaire, fsync, puis renommage."""
+    with open(path + ".tmp", "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def sync_directory(path):
+    """fsync du dossier, pour que les renommages survivent à une panne (sans effet hors POSIX)."""
+    try:
+        descriptor = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class SaveWriter:
+    def __init__(self, background=True, on_failure=None):
+        """
+        :param background: Écrit sur le thread dédié ; False : écrit tout de suite, dans l'appelant.
+        :param on_failure: Appelée avec le nom de la sauvegarde quand une écriture échoue.
+        """
+        self.background = background
+        self.on_failure = on_failure
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()  # Nom de sauvegarde -> écritures en attente, dans l'ordre
+        self.writing = set()  # Sauvegardes du lot en cours d'écriture sur le thread
+        self.broken = {}  # Nom de sauvegarde -> instantané dont le journal a perdu une écriture
+        self.thread = None
+        self.depth = 0
+        self.max_depth = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.commits = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.commit_latencies = deque(maxlen=LATENCY_WINDOW)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.after_fork)
+
+    def submit(self, save_name, write):
+        """Ajoute une écriture (SnapshotWrite ou JournalWrite) ; retourne False si elle a déjà échoué (sans thread)."""
+        if not self.background:
+            return self.write_batch([(save_name, [write])])
+        with self.condition:
+            queued = self.pending.setdefault(save_name, [])
+            if isinstance(write, SnapshotWrite):
+                # L'instantané contient tout ce qui attendait encore pour cette partie
+                self.coalesced += len(queued)
+                self.depth -= len(queued)
+                queued.clear()
+            queued.append(write)
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="save-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+        return True
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                batch = list(self.pending.items())  # Toutes les parties en attente
+                self.pending.clear()
+                self.depth -= sum(len(writes) for _, writes in batch)
+                self.writing = {save_name for save_name, _ in batch}
+            try:
+                self.write_batch(batch)
+            finally:
+                with self.condition:
+                    self.writing = set()
+                    self.condition.notify_all()
+
+    def write_batch(self, batch):
+        """
+        Écrit les écritures de plusieurs parties, puis valide le lot dans chaque stockage utilisé ; retourne
+        True si tout est écrit.
+        """
+        written = {}  # Stockage -> {nom de sauvegarde: instantané de la dernière écriture}
+        success = True
+        for save_name, writes in batch:
+            success &= self.write_all(save_name, writes, written)
+        for store, snapshots in written.items():
+            start = time.perf_counter()
+            try:
+                store.commit()
+            except Exception as e:
+                print(f"Failed to save the game: {e}")
+                for save_name, snapshot_id in snapshots.items():
+                    self.fail(save_name, snapshot_id)
+                success = False
+                continue
+            self.commits += 1
+            self.commit_latencies.append(time.perf_counter() - start)
+        return success
+
+    def write_all(self, save_name, writes, written):
+        """Écrit les écritures d'une partie, les ajouts consécutifs au journal en un seul bloc ; retourne True si tout est écrit."""
+        index = 0
+        while index < len(writes):
+            write = writes[index]
+            if isinstance(write, JournalWrite):
+                # Ajouts suivants du même journal : regroupés dans la même écriture
+                end = index + 1
+                while end < len(writes) and isinstance(writes[end], JournalWrite) and writes[end].store is write.store:
+                    end += 1
+                self.coalesced += end - index - 1
+                summaries = [item.summary for item in writes[index:end] if item.summary is not None]
+                write = write._replace(data=b"".join(item.data for item in writes[index:end]),
+                                       summary=summaries[-1] if summaries else None)
+                index = end
+            else:
+                index += 1
+            if not self.write_one(save_name, write):
+                return False
+            written.setdefault(write.store, {})[save_name] = write.snapshot_id
+        return True
+
+    def write_one(self, save_name, write):
+        if isinstance(write, JournalWrite) and self.broken.get(save_name) == write.snapshot_id:
+            return False  # Un enregistrement précédent manque : ceux-ci ne se reliraient pas correctement
+        start = time.perf_counter()
+        try:
+            write.store.write(save_name, write)
+        except Exception as e:
+            print(f"Failed to save the game: {e}")
+            self.fail(save_name, write.snapshot_id)
+            return False
+        if isinstance(write, SnapshotWrite):
+            self.broken.pop(save_name, None)
+        self.writes += 1
+        self.latencies.append(time.perf_counter() - start)
+        return True
+
+    def fail(self, save_name, snapshot_id):
+        """Écriture perdue : les ajouts suivants au journal de cet instantané sont abandonnés."""
+        self.failed += 1
+        self.broken[save_name] = snapshot_id
+        if self.on_failure is not None:
+            self.on_failure(save_name)
+
+    def flush(self, save_name=None, timeout=None):
+        """
+        Attend que les écritures en attente soient faites (celles d'une partie, ou toutes) ;
+        retourne False si une écriture de cette partie (ou de n'importe quelle partie) a échoué.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while (self.pending if save_name is None else save_name in self.pending) or \
+                    (self.writing if save_name is None else save_name in self.writing):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return not self.broken if save_name is None else save_name not in self.broken
+
+    def pending_saves(self):
+        """Sauvegardes dont des écritures attendent ou sont en cours sur le thread."""
+        with self.condition:
+            return set(self.pending) | self.writing
+
+    def after_fork(self):
+        """Dans un processus créé par fork, le thread d'écriture n'existe plus : il sera relancé à la prochaine sauvegarde."""
+        self.condition = threading.Condition()
+        self.thread = None
+        self.writing = set()
+
+    def stats(self):
+        """
+        Compteurs et latences en millisecondes : écritures (p50 et p99 des dernières, maximum) et validation
+        des lots (p99).
+        """
+        recent = sorted(self.latencies)
+        def percentile(values, fraction):
+            return values[min(int(len(values) * fraction), len(values) - 1)] * 1000 if values else 0.0
+        return {"pending": self.depth, "max_pending": self.max_depth, "writes": self.writes,
+                "coalesced": self.coalesced, "commits": self.commits, "failed": self.failed,
+                "write_p50_ms": percentile(recent, 0.5), "write_p99_ms": percentile(recent, 0.99),
+                "write_max_ms": recent[-1] * 1000 if recent else 0.0,
+                "commit_p99_ms": percentile(sorted(self.commit_latencies), 0.99)}
@@ -0,0 +1,167 @@
+"""
+Mise en veille des sessions inactives du serveur de jeu (game_server.py).
+
+Une session en jeu garde toute sa carte (GameMap) et son joueur en mémoire, même quand le joueur ne
+joue plus. Le SessionManager suit les sessions en jeu dans l'ordre de leur dernière commande (LRU),
+avec une estimation de leur taille. Une session est mise en veille quand elle est inactive depuis
+`hibernate_after` secondes, ou dès que le budget mémoire est dépassé, la moins récemment utilisée
+d'abord. La mise en veille sauvegarde la partie dans le dossier des sauvegardes et ne garde que son
+nom, la graine de la session, le nombre de combats joués et l'enregistrement en cours : la commande
+suivante du joueur reprend la partie depuis la sauvegarde (main.resume_game_flow), dans le même
+état et avec les mêmes tirages aléatoires qu'une session restée en mémoire.
+
+Seules les sessions arrêtées à l'invite d'exploration (Prompt.checkpoint) sont mises en veille : les
+menus ne gardent presque rien en mémoire et un combat dure peu. Avant la sauvegarde, une carte en
+dictionnaire de cases passe au stockage compact TileGrid (GameMap.make_compact) : la reprise d'une
+carte 256x256 lit alors 0,2 Mo au lieu de 4,5 Mo.
+
+La mise en veille est une tâche asyncio : la partie est sérialisée dans la boucle (l'état doit être
+cohérent), puis l'écriture est attendue hors de la boucle (asyncio.to_thread, les fsync ne bloquent pas
+les autres sessions) avant de libérer le déroulement. Une commande qui arrive pendant ce temps attend la
+fin de la mise en veille, puis reprend la session.
+
+Compteurs (stats) : hits (commande d'une session en mémoire), misses (commande d'une session en
+veille, qui est reprise), evictions (mises en veille) et latence des reprises.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import main
+import save_load
+
+HIBERNATE_AFTER = 120.0  # Secondes sans commande avant la mise en veille
+MEMORY_BUDGET = 256 * 1024 * 1024  # Mémoire estimée des sessions en jeu gardées en mémoire (octets)
+SWEEP_INTERVAL = 5.0  # Secondes entre deux recherches de sessions inactives
+RESUME_WINDOW = 1000  # Dernières reprises gardées pour les percentiles de latence
+
+# Estimation de la mémoire d'une session en jeu, mesurée avec tracemalloc
+SESSION_BYTES = 20000  # Joueur, affichage de la carte et déroulement de la partie
+DICT_TILE_BYTES = 360  # Case d'une carte en dictionnaire (dict de case et description)
+COMPACT_TILE_BYTES = 13  # Case d'une TileGrid, ennemis et objets compris
+
+
+class Hibernation(namedtuple("Hibernation", ["save_name", "seed", "battles", "record_path"])):
+    """Ce qui reste en mémoire d'une session en veille : les arguments de main.resume_game_flow."""
+    __slots__ = ()
+
+
+def session_footprint(checkpoint):
+    """Mémoire estimée d'une session arrêtée à un point de reprise (octets)."""
+    game_map = checkpoint.game_map
+    tile_bytes = COMPACT_TILE_BYTES if game_map.compact else DICT_TILE_BYTES
+    return SESSION_BYTES + game_map.size * game_map.size * tile_bytes
+
+
+class SessionManager:
+    def __init__(self, memory_budget=MEMORY_BUDGET, hibernate_after=HIBERNATE_AFTER):
+        """
+        Suit les sessions d'un GameServer : chaque ClientSession expose `flow` (déroulement en cours),
+        `prompt` (dernière invite), `hibernation` (None si la session est en mémoire) et `context`
+        (contexte contextvars de la session, pour que sa sauvegarde s'affiche chez elle).
+
+        :param memory_budget: Mémoire estimée des sessions en jeu au-delà de laquelle les plus anciennes sont mises en veille.
+        :param hibernate_after: Secondes sans commande avant la mise en veille (None : jamais).
+        """
+        self.memory_budget = memory_budget
+        self.hibernate_after = hibernate_after
+        self.hot = OrderedDict()  # Session en jeu -> (taille estimée, instant de la dernière commande), la plus ancienne en tête
+        self.hibernating = {}  # Session -> tâche de sa mise en veille en cours
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.resume_times = deque(maxlen=RESUME_WINDOW)
+
+    async def command(self, session):
+        """Une commande arrive pour la session : la reprend si elle est (ou passe) en veille."""
+        task = self.hibernating.get(session)
+        if task is not None:
+            await task  # Mise en veille en cours : son déroulement ne doit pas changer avant la fin
+        if session.hibernation is not None:
+            self.misses += 1
+            self.resume(session)
+        elif session in self.hot:
+            self.hits += 1
+            self.forget(session)  # La session quitte le point de reprise : plus de mise en veille avant le prochain
+
+    def parked(self, session):
+        """La session attend une commande : elle compte dans le budget si elle est à un point de reprise."""
+        self.forget(session)
+        checkpoint = session.prompt.checkpoint
+        if checkpoint is None or checkpoint.save_name is None:
+            return
+        footprint = session_footprint(checkpoint)
+        self.hot[session] = (footprint, time.monotonic())
+        self.memory += footprint
+        while self.memory > self.memory_budget and len(self.hot) > 1:
+            self.evict(next(iter(self.hot)))  # La moins récemment utilisée (jamais la session courante, en fin)
+
+    def forget(self, session):
+        """Retire la session du suivi (elle a quitté le point de reprise, ou s'est terminée)."""
+        entry = self.hot.pop(session, None)
+        if entry is not None:
+            self.memory -= entry[0]
+
+    def evict(self, session):
+        """Lance la mise en veille de la session (tâche asyncio) ; elle ne compte plus dans le budget. Retourne la tâche."""
+        self.forget(session)
+        task = asyncio.get_running_loop().create_task(self.hibernate(session))
+        self.hibernating[session] = task
+        task.add_done_callback(lambda _: self.hibernating.pop(session, None))
+        return task
+
+    async def hibernate(self, session):
+        """Sauvegarde la partie de la session et libère son déroulement ; retourne True si elle est en veille."""
+        self.forget(session)
+        checkpoint = session.prompt.checkpoint
+        if not (session.context.run(self.save, checkpoint)
+                and await asyncio.to_thread(save_load.flush_saves, checkpoint.save_name)):
+            return False  # Sauvegarde impossible : la session reste en mémoire
+        session.hibernation = Hibernation(checkpoint.save_name, checkpoint.session.seed, checkpoint.session.battles,
+                                          checkpoint.record_path)
+        session.flow.close()
+        session.flow = session.prompt = None
+        self.evictions += 1
+        return True
+
+    @staticmethod
+    def save(checkpoint):
+        """Sérialise la partie (dans la boucle, dans le contexte de la session) ; l'écriture se fait sur le thread du SaveWriter."""
+        checkpoint.game_map.make_compact()  # Reprise plus rapide et session plus légère une fois reprise (instantané complet, sans journal)
+        return save_load.save_game(checkpoint.player, checkpoint.game_map, checkpoint.save_name, snapshot=True)
+
+    def resume(self, session):
+        """Reprend une session en veille depuis sa sauvegarde, jusqu'à l'invite d'exploration."""
+        started = time.perf_counter()
+        hibernation, session.hibernation = session.hibernation, None
+        session.flow = main.resume_game_flow(*hibernation)
+        session.prompt = next(session.flow)
+        self.resume_times.append(time.perf_counter() - started)
+
+    def sweep(self, now=None):
+        """Lance la mise en veille des sessions inactives depuis plus de `hibernate_after` secondes ; retourne leurs tâches."""
+        if self.hibernate_after is None:
+            return []
+        limit = (now if now is not None else time.monotonic()) - self.hibernate_after
+        tasks = []
+        while self.hot:
+            session, (footprint, last_command) = next(iter(self.hot.items()))
+            if last_command > limit:
+                break
+            tasks.append(self.evict(session))
+        return tasks
+
+    async def run(self, interval=SWEEP_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def stats(self):
+        """Compteurs et latence des reprises en millisecondes (p50 et p99 des dernières reprises, maximum)."""
+        recent = sorted(self.resume_times)
+        def percentile(fraction):
+            return recent[min(int(len(recent) * fraction), len(recent) - 1)] * 1000 if recent else 0.0
+        return {"hot": len(self.hot), "memory": self.memory, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "resume_p50_ms": percentile(0.5), "resume_p99_ms": percentile(0.99),
+                "resume_max_ms": recent[-1] * 1000 if recent else 0.0}
@@ -0,0 +1,275 @@
+"""
+Stockage des sauvegardes dans une base SQLite (`python game_server.py --database saves.db`, ou
+`save_load.store = SQLiteStore(chemin)`), pour les serveurs qui hébergent beaucoup de parties : une
+base au lieu de milliers de fichiers, partagée sans risque par les processus de supervisor.py.
+
+- Mode WAL : chargements et listes des sauvegardes ne bloquent pas les écritures, ni l'inverse.
+- Petit pool de connexions (ConnectionPool) partagé par les sessions du processus : le thread du
+  SaveWriter et la boucle du serveur prennent une connexion libre au lieu d'en ouvrir une à chaque fois.
+- Écritures par lots : toutes les sauvegardes en attente sur le thread du SaveWriter sont écrites dans
+  une seule transaction, validée par commit() (un fsync par lot au lieu d'un par sauvegarde). Chaque
+  écriture a son point de sauvegarde (SAVEPOINT) : une écriture qui échoue n'annule pas les autres.
+- Tables séparées : `snapshots` (état complet de la partie : joueur et carte, au format de save_format.py
+  ou pickle), `deltas` (journal de l'instantané : modifications du joueur et des cases à chaque tour) et
+  `metadata` (résumé de la partie pour la liste des sauvegardes, voir save_catalog.py).
+"""
+import contextlib
+import os
+import sqlite3
+import threading
+
+import save_catalog
+from save_writer import SnapshotWrite
+
+POOL_SIZE = 4  # Connexions ouvertes au plus par processus
+BUSY_TIMEOUT = 10.0  # Secondes d'attente quand un autre processus écrit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY, snapshot_id INTEGER NOT NULL, binary INTEGER NOT NULL, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS deltas (
+    name TEXT NOT NULL, seq INTEGER NOT NULL, data BLOB NOT NULL, PRIMARY KEY (name, seq)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metadata (
+    name TEXT PRIMARY KEY, player TEXT NOT NULL, level INTEGER NOT NULL, hp, max_hp, size INTEGER,
+    played INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS metadata_played ON metadata (played);
+CREATE INDEX IF NOT EXISTS metadata_level ON metadata (level);
+"""
+
+# Ordre des résumés pour chaque clé de tri de query (mêmes ordres que save_catalog.SORT_KEYS)
+ORDER_BY = {
+    "played": "played DESC, name",
+    "level": "level DESC, name",
+    "player": "fold(player), name",
+    "name": "name",
+}
+
+
+def signed(snapshot_id):
+    """Identifiant d'instantané (64 bits non signés) dans un entier SQLite (64 bits signés)."""
+    return snapshot_id - 2 ** 64 if snapshot_id >= 2 ** 63 else snapshot_id
+
+
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE):
+        """
+        Connexions à la base partagées entre les threads du processus : ouvertes à la demande, au plus
+        `size`, rendues au pool après usage.
+        """
+        self.path = path
+        self.size = size
+        self.condition = threading.Condition()
+        self.idle = []  # Connexions libres (la plus récente en dernier)
+        self.opened = 0
+        self.inherited = []  # Connexions du processus parent (fork) : jamais utilisées ni fermées
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.after_fork)
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=FULL")  # Lot validé = sur le disque, comme les fichiers (fsync)
+        connection.create_function("fold", 1, str.lower, deterministic=True)  # Minuscules Unicode, comme SaveCatalog
+        connection.executescript(SCHEMA)
+        return connection
+
+    def acquire(self):
+        """Prend une connexion libre (en ouvre une si le pool n'est pas plein, sinon attend qu'une se libère)."""
+        with self.condition:
+            while not self.idle and self.opened >= self.size:
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.opened += 1
+        try:
+            return self.connect()
+        except Exception:
+            with self.condition:
+                self.opened -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection):
+        with self.condition:
+            self.idle.append(connection)
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def after_fork(self):
+        """Une connexion SQLite ne se partage pas entre processus : le processus créé par fork ouvre les siennes."""
+        self.inherited.extend(self.idle)
+        self.condition = threading.Condition()
+        self.idle = []
+        self.opened = 0
+
+
+@contextlib.contextmanager
+def transaction(connection, mode=""):
+    """Transaction explicite (les connexions du pool sont en mode autocommit)."""
+    connection.execute(f"BEGIN {mode}")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+class SQLiteStore:
+    def __init__(self, path, pool_size=POOL_SIZE):
+        """
+        :param path: Fichier de la base (créé s'il n'existe pas).
+        :param pool_size: Connexions ouvertes au plus par processus.
+        """
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        self.batch = None  # Connexion de la transaction du lot en cours (thread du SaveWriter)
+        self.written = []  # Résumés écrits dans le lot en cours
+        self.summaries = None  # Nom de sauvegarde -> dernier résumé validé (needs_update sans requête), lu au premier usage
+        self.commits = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.after_fork)
+
+    # --- Écriture (lots) ---
+    def create(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def write(self, save_name, write):
+        """Écrit une sauvegarde dans la transaction du lot (ouverte à la première écriture du lot)."""
+        if self.batch is None:
+            connection = self.pool.acquire()
+            try:
+                connection.execute("BEGIN IMMEDIATE")  # Verrou d'écriture pris une fois pour tout le lot
+            except Exception:
+                self.pool.release(connection)
+                raise
+            self.batch = connection
+        connection = self.batch
+        connection.execute("SAVEPOINT write")
+        try:
+            if isinstance(write, SnapshotWrite):
+                connection.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                                   (save_name, signed(write.snapshot_id), write.binary, write.data))
+                connection.execute("DELETE FROM deltas WHERE name = ?", (save_name,))
+                if write.journal_data is not None:
+                    connection.execute("INSERT INTO deltas VALUES (?, 0, ?)", (save_name, write.journal_data))
+            else:
+                row = connection.execute("SELECT snapshot_id FROM snapshots WHERE name = ?", (save_name,)).fetchone()
+                if row is None or row[0] != signed(write.snapshot_id):
+                    raise ValueError(f"l'instantané de '{save_name}' a été remplacé")
+                connection.execute("INSERT INTO deltas SELECT ?, coalesce(max(seq), 0) + 1, ? FROM deltas WHERE name = ?",
+                                   (save_name, write.data, save_name))
+            if write.summary is not None:
+                connection.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?)", tuple(write.summary))
+        except BaseException:
+            connection.execute("ROLLBACK TO write")
+            connection.execute("RELEASE write")
+            raise
+        connection.execute("RELEASE write")
+        if write.summary is not None:
+            self.written.append(write.summary)
+
+    def commit(self):
+        """Valide la transaction du lot ; en cas d'échec, aucune écriture du lot n'est gardée."""
+        if self.batch is None:
+            return
+        connection, written = self.batch, self.written
+        self.batch, self.written = None, []
+        try:
+            connection.execute("COMMIT")
+        except BaseException:
+            with contextlib.suppress(sqlite3.Error):
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            self.pool.release(connection)
+        self.commits += 1
+        if self.summaries is not None:  # Sinon, relus avec ce lot dans la table metadata
+            for summary in written:
+                self.summaries[summary.name] = summary
+
+    # --- Lecture ---
+    def read(self, save_name):
+        """(instantané, journal) : le journal est la suite des lignes de `deltas`, dans l'ordre."""
+        with self.pool.connection() as connection, transaction(connection):
+            row = connection.execute("SELECT data FROM snapshots WHERE name = ?", (save_name,)).fetchone()
+            if row is None:
+                raise FileNotFoundError(f"aucune sauvegarde '{save_name}' dans {self.path}")
+            deltas = connection.execute("SELECT data FROM deltas WHERE name = ? ORDER BY seq", (save_name,)).fetchall()
+        return row[0], b"".join(data for data, in deltas)
+
+    def truncate_journal(self, save_name, size):
+        with self.pool.connection() as connection, transaction(connection, "IMMEDIATE"):
+            deltas = connection.execute("SELECT data FROM deltas WHERE name = ? ORDER BY seq", (save_name,)).fetchall()
+            connection.execute("DELETE FROM deltas WHERE name = ?", (save_name,))
+            connection.execute("INSERT INTO deltas VALUES (?, 0, ?)", (save_name, b"".join(data for data, in deltas)[:size]))
+
+    def describe(self, save_name):
+        return f"{save_name} ({os.path.basename(self.path)})"
+
+    def pickle_saves(self):
+        with self.pool.connection() as connection:
+            return [name for name, in connection.execute("SELECT name FROM snapshots WHERE binary = 0 ORDER BY name")]
+
+    # --- Liste des parties (table metadata) ---
+    def exists(self, save_name):
+        with self.pool.connection() as connection:
+            return connection.execute("SELECT 1 FROM snapshots WHERE name = ?", (save_name,)).fetchone() is not None
+
+    def query(self, player=None, min_level=None, max_level=None, since=None, sort="played", page=0, page_size=10):
+        """Page de la liste des parties, filtrée et triée par SQLite (mêmes paramètres que SaveCatalog.query)."""
+        clauses, parameters = [], []
+        if player:
+            clauses.append("instr(fold(player), ?) > 0")
+            parameters.append(player.lower())
+        if min_level is not None:
+            clauses.append("level >= ?")
+            parameters.append(min_level)
+        if max_level is not None:
+            clauses.append("level <= ?")
+            parameters.append(max_level)
+        if since is not None:
+            clauses.append("played >= ?")
+            parameters.append(since)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        with self.pool.connection() as connection, transaction(connection):
+            total, = connection.execute(f"SELECT count(*) FROM metadata{where}", parameters).fetchone()
+            rows = connection.execute(f"SELECT * FROM metadata{where} ORDER BY {ORDER_BY[sort]} LIMIT ? OFFSET ?",
+                                      parameters + [page_size, page * page_size]).fetchall()
+        return [save_catalog.SaveSummary(*row) for row in rows], total
+
+    def known_summaries(self):
+        """
+        Derniers résumés validés, lus dans la table metadata au premier usage : un processus qui démarre (ou
+        créé par fork) connaît les résumés écrits avant lui et ne les réécrit pas à sa première sauvegarde.
+        """
+        if self.summaries is None:
+            with self.pool.connection() as connection:
+                self.summaries = {row[0]: save_catalog.SaveSummary(*row) for row in connection.execute("SELECT * FROM metadata")}
+        return self.summaries
+
+    def needs_update(self, summary):
+        return save_catalog.outdated(self.known_summaries().get(summary.name), summary)
+
+    def forget(self, save_name):
+        with self.pool.connection() as connection, transaction(connection, "IMMEDIATE"):
+            for table in ("snapshots", "deltas", "metadata"):
+                connection.execute(f"DELETE FROM {table} WHERE name = ?", (save_name,))
+        if self.summaries is not None:
+            self.summaries.pop(save_name, None)
+
+    def after_fork(self):
+        """La transaction d'un lot en cours appartient au processus parent ; ses résumés sont relus dans la base."""
+        if self.batch is not None:
+            self.pool.inherited.append(self.batch)
+        self.batch, self.written = None, []
+        self.summaries = None
@@ -0,0 +1,378 @@
+"""
+Superviseur multi-processus du serveur de jeu : répartit les sessions sur plusieurs cœurs.
+
+Le superviseur charge d'abord tout ce que les sessions lisent sans le modifier (registre des modèles
+d'objets et d'ennemis, tables de spawn et de loot, textes de ascii_art.py importés avec le jeu), gèle
+le ramasse-miettes (gc.freeze) puis crée N processus de travail par fork : ces pages sont partagées
+par copie sur écriture au lieu d'être chargées N fois.
+
+Il accepte ensuite les connexions et confie chacune au processus qui héberge le moins de sessions, en
+lui passant le socket (socket.send_fds) ; la session reste sur ce processus jusqu'à sa fin. Chaque
+processus fait tourner un GameServer (game_server.py) et signale au superviseur la sauvegarde de
+chaque session et sa fin.
+
+Le superviseur garde une copie de chaque socket client : si un processus s'arrête, il en crée un autre
+au même rang et lui confie à nouveau ses connexions. Les joueurs restent connectés et reprennent leur
+partie à sa dernière sauvegarde, ou au menu principal si elle n'a pas encore été sauvegardée.
+
+Rapport (--stats N secondes, et à l'arrêt) : pour chaque processus, sessions, mémoire résidente et
+partagée (Linux, /proc), latence des tours, redémarrages et mises en veille des sessions (hits, misses,
+evictions : session_manager.py) et sauvegardes en attente d'écriture, regroupées et latence d'écriture
+(save_writer.py).
+
+Usage (depuis la racine du dépôt, Unix) :
+    python supervisor.py [--workers 4] [--host 127.0.0.1] [--port 4000] [--stats 10] [--database saves.db]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+import traceback
+
+import game_server
+import save_load
+from game.assets import get_registry
+from game.loot_table import get_loot_table
+from game.spawn_table import get_spawn_table
+from game.tile_grid import REGION_NAMES
+from sqlite_store import SQLiteStore
+
+MESSAGE_SIZE = 4096  # Taille maximale d'un message de contrôle
+CONTROL_TIMEOUT = 5.0  # Secondes pour transmettre une session à un processus avant de le considérer bloqué
+REPORT_WAIT = 1.0  # Secondes d'attente des statistiques des processus à l'arrêt
+
+
+def preload():
+    """Charge avant le fork les données partagées en lecture seule par tous les processus."""
+    registry = get_registry()
+    for region in REGION_NAMES:
+        get_spawn_table(region, registry)
+    for level in range(1, max(template.level for template in registry.enemies()) + 1):
+        get_loot_table(level, registry)
+    gc.collect()
+    gc.freeze()  # Objets ignorés par le ramasse-miettes : leurs pages ne sont pas recopiées dans chaque processus
+
+
+def memory_usage(pid):
+    """Mémoire résidente et partagée d'un processus en kio (Linux) ; (None, None) si indisponible."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            for line in file:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Shared_Clean", "Shared_Dirty"):
+                    fields[name] = int(value.split()[0])
+    except OSError:
+        return None, None
+    return fields.get("Rss"), fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+
+
+# --- Processus de travail ---
+class WorkerServer(game_server.GameServer):
+    def __init__(self, control):
+        """
+        GameServer d'un processus de travail : reçoit ses sessions du superviseur.
+
+        :param control: Socket de contrôle (AF_UNIX, SOCK_SEQPACKET) relié au superviseur.
+        """
+        super().__init__(max_sessions=sys.maxsize)  # Le nombre de sessions est limité par le superviseur
+        self.control = control
+        self.stopped = None
+
+    def notify(self, message):
+        self.control.send(json.dumps(message).encode("utf-8"))
+
+    def session_saved(self, session):
+        self.notify({"saved": session.number, "save": session.save_name})
+
+    def session_closed(self, session):
+        self.notify({"closed": session.number})
+
+    def receive(self):
+        """Message du superviseur : une session à héberger (avec son socket) ou une demande de statistiques."""
+        data, fds, flags, address = socket.recv_fds(self.control, MESSAGE_SIZE, 1)
+        if not data:
+            self.stopped.set()  # Superviseur arrêté
+            return
+        message = json.loads(data)
+        if "report" in message:
+            self.notify({"stats": dict(self.turn_stats(), **self.manager.stats(), **save_load.writer.stats()),
+                         "sessions": len(self.sessions)})
+        elif fds:
+            asyncio.create_task(self.adopt(socket.socket(fileno=fds[0]), message))
+
+    async def adopt(self, sock, message):
+        sock.setblocking(False)
+        reader, writer = await asyncio.open_connection(sock=sock, limit=game_server.MAX_LINE * 4)
+        await self.host(reader, writer, message["session"], message["save"], message["restored"])
+
+    async def serve_control(self):
+        self.stopped = asyncio.Event()
+        asyncio.get_running_loop().add_reader(self.control.fileno(), self.receive)
+        sweeper = asyncio.create_task(self.manager.run())
+        await self.stopped.wait()
+        sweeper.cancel()
+
+
+def terminate_worker(signum, frame):
+    """SIGTERM (arrêt du superviseur) : les sauvegardes en attente sont écrites avant la fin du processus."""
+    save_load.flush_saves()
+    os._exit(0)
+
+
+def run_worker(control):
+    """Corps d'un processus de travail, après le fork."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C arrête le superviseur, qui arrête les processus
+    signal.signal(signal.SIGTERM, terminate_worker)
+    game_server.install()
+    asyncio.run(WorkerServer(control).serve_control())
+
+
+# --- Superviseur ---
+class WorkerSlot:
+    def __init__(self, index, pid, control):
+        """Un processus de travail vu du superviseur."""
+        self.index = index
+        self.pid = pid
+        self.control = control
+        self.sessions = set()  # Numéros des sessions hébergées
+        self.stats = None  # Dernières statistiques reçues
+        self.restarts = 0
+
+
+class ClientRecord:
+    def __init__(self, sock, worker):
+        """Une connexion : copie du socket gardée par le superviseur, processus hôte et sauvegarde connue."""
+        self.socket = sock
+        self.worker = worker
+        self.save_name = None
+
+
+class Supervisor:
+    def __init__(self, workers, max_sessions=game_server.MAX_SESSIONS):
+        """
+        :param workers: Nombre de processus de travail.
+        :param max_sessions: Nombre maximal de sessions simultanées, tous processus confondus.
+        """
+        self.slots = [None] * workers
+        self.max_sessions = max_sessions
+        self.clients = {}  # Numéro de session -> ClientRecord
+        self.selector = selectors.DefaultSelector()
+        self.listener = None
+        self.opened = 0
+        self.refused = 0
+        self.awaiting_stats = set()  # Processus dont on attend les statistiques
+
+    def spawn(self, index):
+        """Crée le processus de travail de rang `index`."""
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        sys.stdout.flush()  # Ne pas dupliquer l'affichage en attente dans le processus créé
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            self.close_inherited()
+            code = 0
+            try:
+                run_worker(child_end)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                save_load.flush_saves()  # os._exit n'appelle pas les fonctions atexit
+                os._exit(code)
+        child_end.close()
+        parent_end.settimeout(CONTROL_TIMEOUT)
+        slot = self.slots[index] = WorkerSlot(index, pid, parent_end)
+        self.selector.register(parent_end, selectors.EVENT_READ, slot)
+        return slot
+
+    def close_inherited(self):
+        """Dans un processus de travail : ferme les sockets du superviseur hérités du fork."""
+        self.selector.close()
+        if self.listener is not None:
+            self.listener.close()
+        for slot in self.slots:
+            if slot is not None:
+                slot.control.close()
+        for client in self.clients.values():
+            client.socket.close()  # Sinon une connexion ne se fermerait qu'à l'arrêt de tous les processus
+
+    def hand_over(self, slot, number, restored=False):
+        """Confie la session `number` (son socket) au processus `slot`."""
+        client = self.clients[number]
+        message = {"session": number, "save": client.save_name, "restored": restored}
+        try:
+            socket.send_fds(slot.control, [json.dumps(message).encode("utf-8")], [client.socket.fileno()])
+        except OSError as error:
+            print(f"Erreur : Le processus {slot.index} ne répond pas ({error}) ; arrêt forcé.")
+            os.kill(slot.pid, signal.SIGKILL)  # Redémarré à la lecture de la fin de son socket de contrôle
+
+    def accept(self):
+        while True:
+            try:
+                sock, address = self.listener.accept()
+            except BlockingIOError:
+                return
+            if len(self.clients) >= self.max_sessions:
+                self.refused += 1
+                sock.sendall(b"Server full, please try again later.\r\n")
+                sock.close()
+                continue
+            self.opened += 1
+            slot = min(self.slots, key=lambda slot: len(slot.sessions))  # Le processus le moins chargé
+            self.clients[self.opened] = ClientRecord(sock, slot.index)
+            slot.sessions.add(self.opened)
+            self.hand_over(slot, self.opened)
+
+    def receive(self, slot):
+        """Message d'un processus de travail ; la fin de son socket de contrôle signifie qu'il s'est arrêté."""
+        try:
+            data = slot.control.recv(MESSAGE_SIZE)
+        except OSError:
+            data = b""
+        if not data:
+            self.restart(slot)
+            return
+        message = json.loads(data)
+        if "saved" in message:
+            client = self.clients.get(message["saved"])
+            if client is not None:
+                client.save_name = message["save"]
+        elif "closed" in message:
+            client = self.clients.pop(message["closed"], None)
+            slot.sessions.discard(message["closed"])
+            if client is not None:
+                client.socket.close()  # Dernière copie du socket : la connexion se ferme
+        elif "stats" in message:
+            slot.stats = message["stats"]
+            self.awaiting_stats.discard(slot.index)
+            if not self.awaiting_stats:
+                self.report()
+
+    def restart(self, slot):
+        """Remplace un processus arrêté et lui confie à nouveau les sessions de l'ancien."""
+        self.selector.unregister(slot.control)
+        slot.control.close()
+        pid, status = os.waitpid(slot.pid, 0)
+        if os.WIFSIGNALED(status):
+            cause = f"signal {os.WTERMSIG(status)}"
+        else:
+            cause = f"code {os.waitstatus_to_exitcode(status)}"
+        print(f"Erreur : Le processus {slot.index} (pid {pid}) s'est arrêté ({cause}) ; "
+              f"redémarrage avec {len(slot.sessions)} session(s).", flush=True)
+        self.awaiting_stats.discard(slot.index)
+        replacement = self.spawn(slot.index)
+        replacement.sessions = slot.sessions
+        replacement.restarts = slot.restarts + 1
+        for number in sorted(replacement.sessions):
+            self.hand_over(replacement, number, restored=True)
+
+    def request_stats(self):
+        """Demande leurs statistiques aux processus ; le rapport s'affiche quand tous ont répondu."""
+        self.awaiting_stats = {slot.index for slot in self.slots if slot is not None}
+        for slot in self.slots:
+            if slot is None:
+                continue
+            try:
+                slot.control.send(b'{"report": true}')
+            except OSError:
+                self.awaiting_stats.discard(slot.index)  # Processus arrêté : redémarré à la prochaine lecture
+
+    def report(self):
+        print(f"{'worker':>6} {'pid':>7} {'sessions':>8} {'rss MiB':>8} {'shared':>7} {'turns':>8} {'mean ms':>8} "
+              f"{'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'restarts':>8} {'hits':>7} {'misses':>7} {'evicted':>7} "
+              f"{'pending':>7} {'coalesced':>9} {'save p99':>8}")
+        for slot in filter(None, self.slots):
+            rss, shared = memory_usage(slot.pid)
+            stats = slot.stats or {"turns": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0,
+                                   "hits": 0, "misses": 0, "evictions": 0, "pending": 0, "coalesced": 0,
+                                   "write_p99_ms": 0.0}
+            memory = f"{rss / 1024:>8.1f} {shared / 1024:>7.1f}" if rss is not None else f"{'?':>8} {'?':>7}"
+            print(f"{slot.index:>6} {slot.pid:>7} {len(slot.sessions):>8} {memory} {stats['turns']:>8} "
+                  f"{stats['mean_ms']:>8.2f} {stats['p50_ms']:>7.2f} {stats['p99_ms']:>7.2f} {stats['max_ms']:>7.1f} "
+                  f"{slot.restarts:>8} {stats['hits']:>7} {stats['misses']:>7} {stats['evictions']:>7} "
+                  f"{stats['pending']:>7} {stats['coalesced']:>9} {stats['write_p99_ms']:>8.1f}")
+        print(f"{len(self.clients)} session(s) active(s), {self.opened} ouverte(s), {self.refused} refusée(s)",
+              flush=True)
+
+    def poll(self, timeout):
+        for key, events in self.selector.select(timeout):
+            if key.data is None:
+                self.accept()
+            else:
+                self.receive(key.data)
+
+    def serve(self, host, port, stats_interval=None):
+        preload()
+        self.listener = socket.create_server((host, port), backlog=game_server.LISTEN_BACKLOG)
+        self.listener.setblocking(False)
+        for index in range(len(self.slots)):
+            self.spawn(index)
+        self.selector.register(self.listener, selectors.EVENT_READ, None)
+        print(f"Game supervisor listening on {host}:{port} with {len(self.slots)} worker(s)", flush=True)
+
+        next_report = time.monotonic() + stats_interval if stats_interval else None
+        while True:
+            self.poll(max(0.0, next_report - time.monotonic()) if next_report else None)
+            if next_report and time.monotonic() >= next_report:
+                self.request_stats()
+                next_report += stats_interval
+
+    def stop(self):
+        """Rapport final puis arrêt des processus et des connexions."""
+        if self.listener is not None:
+            self.selector.unregister(self.listener)
+            self.listener.close()
+        self.request_stats()
+        deadline = time.monotonic() + REPORT_WAIT
+        while self.awaiting_stats and time.monotonic() < deadline:
+            self.poll(deadline - time.monotonic())
+        if self.awaiting_stats:
+            self.report()
+        for slot in filter(None, self.slots):
+            self.selector.unregister(slot.control)
+            slot.control.close()
+            os.kill(slot.pid, signal.SIGTERM)
+            os.waitpid(slot.pid, 0)
+        for client in self.clients.values():
+            client.socket.close()
+
+
+def interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de jeu réparti sur plusieurs processus (telnet).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default=game_server.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=game_server.DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=game_server.MAX_SESSIONS)
+    parser.add_argument("--stats", type=float, default=None, help="Afficher le rapport toutes les N secondes")
+    parser.add_argument("--database", default=None, help="Sauvegardes dans cette base SQLite partagée par les processus")
+    args = parser.parse_args()
+
+    if not hasattr(os, "fork") or not hasattr(socket, "send_fds"):
+        print("Erreur : Le superviseur demande fork et le passage de sockets (Unix) ; utiliser game_server.py.")
+        return 1
+    signal.signal(signal.SIGTERM, interrupt)
+    if args.database:
+        save_load.store = SQLiteStore(args.database)  # Connexions ouvertes par chaque processus après le fork
+    supervisor = Supervisor(args.workers, args.max_sessions)
+    try:
+        supervisor.serve(args.host, args.port, args.stats)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
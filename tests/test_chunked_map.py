@@ -0,0 +1,87 @@
+"""
+Monde par chunks (game/chunked_map.py) : un ennemi blessé, ou dont l'état vient du journal de la
+sauvegarde, garde cet état quand son chunk est évincé puis régénéré, et dans l'instantané pickle.
+"""
+import pickle
+import random
+from collections import deque
+
+import pytest
+
+import save_load
+from game.chunked_map import ChunkedGameMap
+from game.player import Player
+from save_writer import SaveWriter
+
+FAR = (60, 60)  # Position dont le chunk évince celui de l'origine (max_chunks=1, keep_radius=0)
+
+
+@pytest.fixture
+def saves(tmp_path, monkeypatch):
+    """Stockage par fichiers dans un dossier temporaire, écritures faites tout de suite (sans thread)."""
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    files = save_load.file_store(str(tmp_path / "saves"))
+    monkeypatch.setattr(save_load, "store", files)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(background=False, on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+    monkeypatch.setattr(save_load, "_failed_journals", deque())
+    return files
+
+
+def world():
+    return ChunkedGameMap(64, chunk_size=16, world_seed=7, max_chunks=1, keep_radius=0)
+
+
+def first_enemy(game_map):
+    """Position du premier ennemi du chunk de l'origine."""
+    return next(position for position in game_map.locations if position[0] < 16 and position[1] < 16
+                and game_map.is_enemy_at(position))
+
+
+def enemy_states(game_map, positions):
+    return [(enemy.name, enemy.hp) for enemy in map(game_map.get_enemy, positions)]
+
+
+def test_damaged_enemy_survives_eviction():
+    game_map = world()
+    wounded, untouched = [position for position in game_map.locations if position[0] < 16 and position[1] < 16
+                          and game_map.is_enemy_at(position)][:2]
+    game_map.get_enemy(wounded).hp -= 30
+    expected = enemy_states(game_map, [wounded, untouched])
+
+    game_map.set_player_position(*FAR)
+    assert game_map.chunks_evicted and (0, 0) not in game_map.chunks
+    assert list(game_map.modified_enemies) == [wounded]
+    game_map.set_player_position(0, 0)
+    assert enemy_states(game_map, [wounded, untouched]) == expected
+    assert not game_map.modified_enemies  # Ennemi rendu à son chunk régénéré
+
+
+def test_modified_enemies_are_pickled():
+    game_map = world()
+    position = first_enemy(game_map)
+    game_map.get_enemy(position).hp = 1
+    copied = pickle.loads(pickle.dumps(game_map))  # Chunk en cache : ennemi pris dans le chunk
+    assert copied.get_enemy(position).hp == 1
+
+    game_map.set_player_position(*FAR)
+    copied = pickle.loads(pickle.dumps(game_map))  # Chunk évincé : ennemi pris dans modified_enemies
+    copied.set_player_position(0, 0)
+    assert copied.get_enemy(position).hp == 1
+
+
+def test_journal_state_survives_eviction(saves):
+    player, game_map = Player("Test"), world()
+    position = first_enemy(game_map)
+    game_map.set_player_position(*position)
+    assert save_load.save_game(player, game_map, "chunked")
+    game_map.get_enemy(position).hp -= 40
+    hp = game_map.get_enemy(position).hp
+    assert save_load.save_game(player, game_map, "chunked")  # Ennemi blessé dans le journal
+
+    save_load._journals.clear()
+    _, loaded, current = save_load.load_state("chunked", saves)
+    assert current == position and loaded.get_enemy(position).hp == hp
+    loaded.set_player_position(*FAR)
+    loaded.set_player_position(*position)
+    assert loaded.get_enemy(position).hp == hp
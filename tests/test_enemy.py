@@ -0,0 +1,43 @@
+"""
+Ennemis à modèle partagé (game/enemy.py) : toujours des Character, et défense modifiable par copie à
+l'écriture sur le modèle de l'ennemi seul, gardée par les sauvegardes.
+"""
+import pickle
+import random
+
+import save_format
+from game.character import Character
+from game.enemy import Enemy
+from game.map import GameMap
+from game.player import Player
+
+
+def test_enemy_is_a_character():
+    enemy = Enemy("Goblin Warrior", 4, "terrestre")
+    assert isinstance(enemy, Character)
+    assert "name" not in enemy.__getstate__() and "_defense" not in enemy.__getstate__()
+
+
+def test_defense_setter_copy_on_write():
+    enemy, other = Enemy("Goblin Warrior", 4, "terrestre"), Enemy("Goblin Warrior", 4, "terrestre")
+    default = other.defense
+    enemy.defense = default + 7
+    assert enemy.defense == default + 7 and other.defense == default
+    enemy.apply_damage(50)
+    assert enemy.hp == enemy.max_hp - (50 - default - 7)
+    enemy.set_attributes()
+    assert enemy.defense == default + 7  # Gardée quand les statistiques sont recalculées
+    enemy.defense = default
+    assert enemy.kind is other.kind
+
+
+def test_modified_defense_is_saved():
+    enemy = Enemy("Orc Brute", 5, "terrestre")
+    enemy.defense = 40
+    assert pickle.loads(pickle.dumps(enemy)).defense == 40
+
+    game_map = GameMap(6, rng=random.Random(3))
+    game_map.locations[(0, 0)]["enemy"] = enemy
+    _, loaded, _ = save_format.decode(save_format.encode(Player("Test"), game_map))
+    assert loaded.locations[(0, 0)]["enemy"].defense == 40
+    assert loaded.locations[(0, 0)]["enemy"].kind is enemy.kind
@@ -0,0 +1,63 @@
+"""
+Chances exactes de victoire (game/exact_solver.py) comparées au taux de victoire de simulate_many
+(game/simulator.py, lui-même vérifié contre Battle par tests/test_simulator.py) sur de petits combats.
+"""
+import random
+import sys
+from math import sqrt
+
+import pytest
+
+from game.assets import get_registry
+from game.enemy import Enemy
+from game.exact_solver import solve
+from game.simulator import PLAYER_WINS, EnemyProfile, PlayerProfile, always_attack, heal_below, simulate_many
+
+BATTLES = 20000
+MAX_Z = 5.0  # Écart réduit toléré entre la chance exacte et le taux simulé (tirages à graine fixe)
+POTIONS = (("Minor Health Potion", "health_boost", 20, 2),)
+
+# (niveau, ennemi, objets, stratégie) à l'issue incertaine
+MATCHUPS = [
+    (2, "Goblin Warrior", (), "attack"),
+    (3, "Troll Berserker", (), "attack"),
+    (4, "Thunder Drake", (), "attack"),
+    (1, "Harpy Scout", POTIONS, "heal"),
+    (2, "Harpy Queen", POTIONS, "heal"),
+    (3, "Stone Troll", POTIONS, "heal"),
+]
+
+
+def enemy_profile(name):
+    return next(EnemyProfile.from_template(template) for template in get_registry().enemies() if template.name == name)
+
+
+@pytest.mark.parametrize("level, name, items, policy", MATCHUPS)
+def test_exact_matches_simulator(level, name, items, policy):
+    player, enemy = PlayerProfile.for_level(level, items), enemy_profile(name)
+    exact = solve(player, enemy, policy)
+    strategy = always_attack if policy == "attack" else heal_below()
+    outcomes = simulate_many(player, enemy, BATTLES, strategy, random.Random(level))
+    observed = sum(outcome.winner == PLAYER_WINS for outcome in outcomes) / BATTLES
+    assert 0.01 < exact < 0.99
+    assert abs(observed - exact) / sqrt(exact * (1 - exact) / BATTLES) < MAX_Z, (exact, observed)
+
+
+def test_long_battles_need_no_recursion():
+    limit = sys.getrecursionlimit()
+    boss = EnemyProfile.from_enemy(Enemy("Goblin Overlord", 10, "boss"))
+    assert 0.5 < solve(PlayerProfile.for_level(10), boss) < 1.0
+    assert sys.getrecursionlimit() == limit
+
+
+def test_optimal_policy_is_at_least_as_good():
+    items = POTIONS + (("Wooden Shield", "boost_shield", 15, 1), ("Iron Sword", "damage", 30, 1))
+    player, enemy = PlayerProfile.for_level(1, items), enemy_profile("Harpy Scout")
+    attack, heal, optimal = (solve(player, enemy, policy) for policy in ("attack", "heal", "optimal"))
+    assert attack <= heal <= optimal <= 1.0
+    assert optimal > heal
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        solve(PlayerProfile.for_level(1), enemy_profile("Harpy Scout"), "run")
@@ -0,0 +1,27 @@
+"""
+Objets à modèle partagé (game/item.py) : les propriétés restent modifiables, par copie à l'écriture
+sur le modèle de l'objet seul.
+"""
+import pickle
+
+from game.item import Item
+
+
+def test_setters_copy_on_write():
+    first, second = Item("Iron Sword", "damage", 30, level=2), Item("Iron Sword", "damage", 30, level=2)
+    assert first.kind is second.kind
+    first.power = 45
+    first.name = "Sharp Iron Sword"
+    first.level, first.boost, first.effect = 3, 10, "boost_attack"
+    assert (first.name, first.effect, first.power, first.level, first.boost) == \
+        ("Sharp Iron Sword", "boost_attack", 45, 3, 10)
+    assert (second.name, second.effect, second.power, second.level, second.boost) == ("Iron Sword", "damage", 30, 2, 0)
+    assert second.kind is Item("Iron Sword", "damage", 30, level=2).kind
+
+
+def test_modified_item_is_saved():
+    item = Item("Minor Health Potion", "heal", 20, quantity=3)
+    item.power = 25
+    loaded = pickle.loads(pickle.dumps(item))
+    assert (loaded.name, loaded.power, loaded.quantity) == ("Minor Health Potion", 25, 3)
+    assert loaded.kind is item.kind
@@ -0,0 +1,86 @@
+"""
+Tirage de loot par tables (game/loot_table.py) comparé au tirage historique de Enemy.drop_loot : un
+tirage de Bernoulli indépendant par objet du catalogue, puis 2 à 4 objets choisis parmi les survivants.
+"""
+import random
+from math import sqrt
+
+from game.assets import ItemTemplate
+from game.enemy import drop_chance
+from game.loot_table import MAX_DROPS, LootTable, binomial_cdf
+
+ENEMY_LEVEL = 3
+SAMPLES = 40000
+MAX_Z = 5.0  # Écart réduit toléré entre les deux fréquences d'un objet (tirages à graine fixe)
+
+
+def catalog():
+    """Objets de niveaux 1 à 5 : les trois classes de chance (plus bas, même niveau, plus haut) pour un ennemi de niveau 3."""
+    return tuple(ItemTemplate(f"item-{index}", "heal", 10, 1, 1 + index % 5, 0) for index in range(20))
+
+
+def legacy_drop(templates, rng):
+    """Copie de l'ancien Enemy.drop_loot, sans les affichages ni la création des Item."""
+    number_of_items_to_drop = rng.randint(2, 4)
+    possible_items = [template for template in templates if rng.random() < drop_chance(ENEMY_LEVEL, template.level)]
+    if possible_items:
+        return rng.sample(possible_items, min(len(possible_items), number_of_items_to_drop))
+    return []
+
+
+def frequencies(drop, templates):
+    """Nombre d'apparitions de chaque objet et histogramme du nombre d'objets lâchés, sur SAMPLES tirages."""
+    counts = dict.fromkeys((template.name for template in templates), 0)
+    sizes = [0] * (MAX_DROPS + 1)
+    for _ in range(SAMPLES):
+        loot = drop()
+        sizes[len(loot)] += 1
+        for template in loot:
+            counts[template.name] += 1
+    return counts, sizes
+
+
+def z_score(first, second):
+    """Écart réduit entre deux fréquences observées sur SAMPLES tirages chacune."""
+    p, q = first / SAMPLES, second / SAMPLES
+    pooled = (p + q) / 2
+    deviation = sqrt(2 * pooled * (1 - pooled) / SAMPLES)
+    return abs(p - q) / deviation if deviation else 0.0
+
+
+def test_binomial_cdf_sums_to_one():
+    cdf = binomial_cdf(6, 0.25)
+    assert len(cdf) == 6
+    assert all(a <= b for a, b in zip(cdf, cdf[1:]))
+    assert abs(cdf[-1] + 0.25 ** 6 - 1.0) < 1e-12  # Il ne manque que P(6 succès)
+
+
+def test_draw_matches_independent_bernoulli_loop():
+    templates = catalog()
+    table = LootTable(templates, [drop_chance(ENEMY_LEVEL, template.level) for template in templates])
+    legacy_rng, table_rng = random.Random(1), random.Random(2)
+    legacy_counts, legacy_sizes = frequencies(lambda: legacy_drop(templates, legacy_rng), templates)
+    table_counts, table_sizes = frequencies(lambda: table.draw(table_rng), templates)
+
+    for name in legacy_counts:
+        assert z_score(legacy_counts[name], table_counts[name]) < MAX_Z, name
+    for legacy, drawn in zip(legacy_sizes, table_sizes):
+        assert z_score(legacy, drawn) < MAX_Z
+
+
+def test_draw_returns_distinct_items_within_bounds():
+    templates = catalog()
+    table = LootTable(templates, [1.0] * len(templates))  # Tous les objets survivent
+    rng = random.Random(3)
+    for _ in range(1000):
+        loot = table.draw(rng)
+        assert 2 <= len(loot) <= MAX_DROPS
+        assert len(set(loot)) == len(loot)
+
+
+def test_zero_chance_items_never_drop():
+    templates = catalog()
+    table = LootTable(templates, [0.0 if template.level == 5 else 0.5 for template in templates])
+    rng = random.Random(4)
+    for _ in range(2000):
+        assert all(template.level != 5 for template in table.draw(rng))
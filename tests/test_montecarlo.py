@@ -0,0 +1,69 @@
+"""
+Estimateur Monte-Carlo vectorisé (game/montecarlo.py) comparé au simulateur combat par combat
+(game/simulator.py, lui-même vérifié contre Battle) : mêmes chances de victoire et même nombre moyen
+de tours, aux fluctuations d'échantillonnage près. Nécessite NumPy.
+"""
+import random
+from math import sqrt
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game.montecarlo import HEAL_THRESHOLD, POTION_POWER, estimate, registry_enemies
+from game.simulator import PLAYER_WINS, PlayerProfile, heal_below, simulate_many
+
+BATTLES = 20000
+MIN_WINS = 100  # Victoires nécessaires pour comparer le nombre moyen de tours
+MAX_Z = 5.0  # Écart réduit toléré entre les deux estimations (tirages à graine fixe)
+
+# Couples (niveau, ennemi) à l'issue incertaine (chances de victoire entre 2 % et 95 %), selon le nombre de potions
+MATCHUPS = {
+    0: [(2, "Goblin Warrior"), (2, "Orc Shaman"), (3, "Troll Berserker"), (3, "Sky Serpent"), (4, "Thunder Drake")],
+    2: [(1, "Harpy Scout"), (1, "Orc Shaman"), (2, "Harpy Queen"), (2, "Orc Brute"), (3, "Stone Troll")],
+}
+
+
+def enemy_profiles():
+    return {enemy.name: enemy for enemy in registry_enemies()}
+
+
+def simulated(level, enemy, potions):
+    """Nombre de tours de chaque victoire sur BATTLES combats simulés avec game/simulator.py."""
+    items = [("Minor Health Potion", "health_boost", POTION_POWER, potions)] if potions else []
+    outcomes = simulate_many(PlayerProfile.for_level(level, items), enemy, BATTLES, heal_below(HEAL_THRESHOLD),
+                             random.Random(level))
+    return [outcome.turns for outcome in outcomes if outcome.winner == PLAYER_WINS]
+
+
+@pytest.mark.parametrize("potions", sorted(MATCHUPS))
+def test_win_rate_matches_simulator(potions):
+    enemies = enemy_profiles()
+    matchups = MATCHUPS[potions]
+    levels = sorted({level for level, _ in matchups})
+    names = sorted({name for _, name in matchups})
+    result = estimate(levels, [enemies[name] for name in names], BATTLES, potions, seed=potions)
+    mean_turns = result.mean_turns()
+    for level, name in matchups:
+        i, j = levels.index(level), names.index(name)
+        won = simulated(level, enemies[name], potions)
+        rate, expected = result.win_rate[i, j], len(won) / BATTLES
+        pooled = (rate + expected) / 2
+        error = sqrt(max(pooled * (1 - pooled), 1 / BATTLES) * 2 / BATTLES)
+        assert abs(rate - expected) / error < MAX_Z, (level, name, rate, expected)
+
+        if min(len(won), result.turns[i, j].sum()) < MIN_WINS:
+            continue
+        expected_turns = sum(won) / len(won)
+        spread = sqrt(sum((turns - expected_turns) ** 2 for turns in won) / len(won))
+        error = spread * sqrt(1 / len(won) + 1 / result.turns[i, j].sum())
+        assert abs(mean_turns[i, j] - expected_turns) <= MAX_Z * error + 1e-9, (level, name)
+
+
+def test_hopeless_and_certain_matchups():
+    enemies = registry_enemies(include_boss=True)
+    result = estimate([1, 10], enemies, 2000, seed=0)
+    boss = len(enemies) - 1
+    assert result.win_rate[0, boss] == 0.0  # Goblin Overlord contre un joueur de niveau 1
+    assert result.win_rate[1, :boss].min() > 0.99  # Tous les ennemis du registre contre un joueur de niveau 10
+    assert (result.turns.sum(axis=2) == np.rint(result.win_rate * 2000)).all()
@@ -0,0 +1,141 @@
+"""
+Catalogue des sauvegardes (save_catalog.py) : les sauvegardes écrites ou supprimées sans lui (autre
+processus, copie, ajout au catalogue en échec) sont prises en compte à la consultation suivante, sans
+relire les autres sauvegardes ni toucher à leur journal, et sans attendre une écriture en cours.
+"""
+import os
+import random
+import shutil
+import threading
+from collections import deque
+
+import pytest
+
+import save_load
+import save_store
+from game.map import GameMap
+from game.player import Player
+from save_writer import SaveWriter
+
+
+@pytest.fixture
+def saves(tmp_path, monkeypatch):
+    """Stockage par fichiers dans un dossier temporaire, écritures faites tout de suite (sans thread)."""
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    files = save_load.file_store(str(tmp_path / "saves"))
+    monkeypatch.setattr(save_load, "store", files)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(background=False, on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+    monkeypatch.setattr(save_load, "_failed_journals", deque())
+    return files
+
+
+@pytest.fixture
+def summarized(saves, monkeypatch):
+    """Noms des sauvegardes lues pour être résumées."""
+    names, summarize = [], saves.summarize
+
+    def recorded(files, save_name):
+        names.append(save_name)
+        return summarize(files, save_name)
+
+    monkeypatch.setattr(saves, "summarize", recorded)
+    return names
+
+
+def new_game(saves, save_name, name="Test", level=3):
+    assert save_load.save_game(Player(name, level=level), GameMap(6, rng=random.Random(level)), save_name)
+
+
+def listed(saves):
+    summaries, total = saves.query(sort="name", page_size=100)
+    assert total == len(summaries)
+    return [(summary.name, summary.player, summary.level) for summary in summaries]
+
+
+def test_saves_written_by_the_game_need_no_rebuild(saves):
+    new_game(saves, "first")
+    new_game(saves, "second", "Autre", 5)
+    assert listed(saves) == [("first", "Test", 3), ("second", "Autre", 5)]
+    rebuilds = saves.catalog.rebuilds
+    assert listed(saves) == [("first", "Test", 3), ("second", "Autre", 5)]
+    assert saves.catalog.rebuilds == rebuilds
+
+
+def test_save_copied_into_the_directory_appears(saves, summarized):
+    new_game(saves, "first")
+    new_game(saves, "second", "Autre", 5)
+    assert len(listed(saves)) == 2
+    rebuilds = saves.catalog.rebuilds
+    shutil.copy(saves.snapshot_paths("first")[0], saves.snapshot_paths("copy")[0])  # Autre processus, sans le catalogue
+    assert listed(saves) == [("copy", "Test", 3), ("first", "Test", 3), ("second", "Autre", 5)]
+    assert saves.exists("copy")
+    assert summarized == ["copy"] and saves.catalog.rebuilds == rebuilds  # Seule la nouvelle sauvegarde est lue
+
+
+def test_save_missing_from_catalog_appears(saves, monkeypatch):
+    new_game(saves, "first")
+    assert listed(saves) == [("first", "Test", 3)]
+    monkeypatch.setattr(saves.catalog, "record", lambda summary: False)  # Ajout au catalogue en échec
+    new_game(saves, "second", "Autre", 5)
+    monkeypatch.undo()
+    assert listed(saves) == [("first", "Test", 3), ("second", "Autre", 5)]
+
+
+def test_save_removed_outside_the_game_disappears(saves):
+    new_game(saves, "first")
+    new_game(saves, "second", "Autre", 5)
+    assert len(listed(saves)) == 2
+    for path in (saves.find_save("second"), saves.journal_path("second")):
+        os.remove(path)
+    assert listed(saves) == [("first", "Test", 3)]
+
+
+def test_unreadable_save_is_read_once(saves, summarized):
+    new_game(saves, "first")
+    with open(saves.snapshot_paths("broken")[1], "wb") as file:
+        file.write(b"pas une sauvegarde")
+    assert listed(saves) == [("first", "Test", 3)]
+    new_game(saves, "second", "Autre", 5)
+    assert listed(saves) == [("first", "Test", 3), ("second", "Autre", 5)]
+    assert summarized == ["broken"]
+
+
+def test_pending_write_is_not_read(saves, summarized, monkeypatch):
+    new_game(saves, "first")
+    assert listed(saves) == [("first", "Test", 3)]
+    rebuilds, written, release = saves.catalog.rebuilds, threading.Event(), threading.Event()
+
+    def slow_sync(path):
+        written.set()  # Instantané publié, résumé pas encore ajouté au catalogue
+        release.wait(10)
+
+    monkeypatch.setattr(save_store, "sync_directory", slow_sync)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(on_failure=save_load.forget_journal))  # Thread d'écriture
+    new_game(saves, "second", "Autre", 5)
+    try:
+        assert written.wait(10) and os.path.exists(saves.snapshot_paths("second")[0])
+        assert listed(saves) == [("first", "Test", 3)]
+    finally:
+        release.set()
+    assert save_load.flush_saves()
+    assert listed(saves) == [("first", "Test", 3), ("second", "Autre", 5)]
+    assert not summarized and saves.catalog.rebuilds == rebuilds
+
+
+def test_summary_leaves_journal_alone(saves):
+    new_game(saves, "first")
+    player, game_map = save_load.load_state("first", saves)[:2]
+    player.hp -= 10
+    assert save_load.save_game(player, game_map, "first")  # Enregistrement du journal
+    assert listed(saves) == [("first", "Test", 3)]
+    for extension in (save_store.BINARY_EXTENSION, save_store.JOURNAL_EXTENSION):
+        shutil.copy(os.path.join(saves.directory, "first" + extension), os.path.join(saves.directory, "copy" + extension))
+    journal = saves.journal_path("copy")
+    with open(journal, "ab") as file:
+        file.write(save_load.RECORD_HEADER.pack(100, 0) + b"ajout en cours")  # Autre processus en train d'ajouter
+    size = os.path.getsize(journal)
+
+    summary = saves.catalog.get("copy")
+    assert (summary.player, summary.hp) == ("Test", player.hp)  # Journal appliqué
+    assert os.path.getsize(journal) == size and "copy" not in save_load._journals
@@ -0,0 +1,206 @@
+"""
+Format binaire des sauvegardes (save_format.py) : encode puis decode redonne la même carte, les
+sauvegardes des anciens formats se relisent (pickle d'avant les modèles partagés, schéma 1), et un
+document d'un ancien schéma passe par les MIGRATIONS. Les instantanés pickle (cartes par chunks,
+binary_saves = False, fichiers .pkl ou lignes binary = 0 de SQLiteStore) se relisent sans accepter
+d'autres classes que celles du modèle de jeu.
+"""
+import os
+import pickle
+import random
+import shutil
+from collections import deque
+
+import pytest
+
+import save_format
+import save_load
+from game.chunked_map import ChunkedGameMap
+from game.item import Item
+from game.map import GameMap
+from game.player import Player
+from game.slots import get_state
+from game.tile_grid import MappedTileGrid, TileGrid
+from save_writer import SaveWriter
+from sqlite_store import SQLiteStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+calls = []
+
+
+def record_call():
+    calls.append(True)
+
+
+class Exploit:
+    """Objet dont la relecture appellerait record_call, comme un pickle malveillant appellerait os.system."""
+    def __reduce__(self):
+        return record_call, ()
+
+
+def grid_state(game_map):
+    """Tout ce que la carte décrit, case par case : description, ennemi et objet avec leur état."""
+    cells = []
+    for x in range(game_map.size):
+        for y in range(game_map.size):
+            enemy, item = game_map.get_enemy((x, y)), game_map.get_item((x, y))
+            cells.append((game_map.locations[(x, y)]["description"],
+                          enemy and (enemy.kind, get_state(enemy)), item and (item.kind, get_state(item))))
+    return cells
+
+
+def game_state(player, game_map):
+    player_state = get_state(player)
+    inventory = [(item.kind, item.quantity) for item in player_state.pop("inventory").items]
+    return (player_state, inventory, game_map.size, game_map.start_location, game_map.boss_location,
+            game_map.get_player_position(), grid_state(game_map))
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_encode_decode_gives_same_grid(compact):
+    game_map, player = GameMap(10, compact=compact, rng=random.Random(8)), Player("Test", level=4)
+    enemy = next(game_map.get_enemy((x, y)) for x in range(10) for y in range(10) if game_map.is_enemy_at((x, y)))
+    enemy._hp = 7.5  # Valeur non entière : masque des flottants
+    game_map.set_player_position(3, 4)
+    game_map.journal_id = 99
+    data = save_format.encode(player, game_map)
+
+    loaded_player, loaded_map, position = save_format.decode(data)
+    assert isinstance(loaded_map.locations, MappedTileGrid)
+    assert position == (3, 4) and loaded_map.journal_id == 99
+    assert game_state(loaded_player, loaded_map) == game_state(player, game_map)
+    assert save_format.map_tables(loaded_map)[:2] == save_format.map_tables(game_map)[:2]  # Codes des cases
+    assert save_format.encode(loaded_player, loaded_map) == data
+
+    # Une grille projetée se sauvegarde en pickle comme une TileGrid identique
+    copied = pickle.loads(pickle.dumps(loaded_map))
+    assert type(copied.locations) is TileGrid
+    assert grid_state(copied) == grid_state(game_map)
+
+
+def test_schema1_fixture_loads():
+    with open(os.path.join(FIXTURES, "schema1.save"), "rb") as file:
+        player, game_map, position = save_format.decode(file.read())
+    assert (player.name, player.level, player.hp, player._damage_reduction) == ("Binaire", 2, 111, 30)
+    assert [item.name for item in player.inventory.items] == ["Noob's Dagger", "Minor Health Potion", "Wooden Shield"]
+    assert (position, game_map.size, game_map.start_location, game_map.boss_location) == ((1, 2), 8, (0, 0), (7, 7))
+    assert game_map.journal_id == 0x1234
+    enemy = game_map.get_enemy((0, 5))
+    assert (enemy.name, enemy.level, enemy.hp, enemy.max_hp) == ("Stone Troll", 7, 12.5, 250)
+    assert type(enemy.hp) is float
+    item = game_map.get_item((3, 3))
+    assert (item.name, item.power, item.quantity, item.level) == ("Iron Sword", 30, 2, 2)
+    assert game_map.locations[(0, 5)]["description"] == "The area is a swamp. The path ahead looks challenging."
+
+
+def test_old_schema_is_migrated(monkeypatch):
+    with open(os.path.join(FIXTURES, "schema1.save"), "rb") as file:
+        data = file.read()
+    calls = []
+
+    def rename_player(document):
+        calls.append(document["version"])
+        document["tables"]["name"] = document["tables"]["name"].upper()
+        return dict(document, version=2)
+
+    monkeypatch.setattr(save_format, "SCHEMA_VERSION", 2)
+    monkeypatch.setitem(save_format.MIGRATIONS, 1, rename_player)
+    player, _, _ = save_format.decode(data)
+    assert calls == [1] and player.name == "BINAIRE"
+
+
+def test_newer_schema_is_refused(monkeypatch):
+    game_map = GameMap(6, rng=random.Random(1))
+    monkeypatch.setattr(save_format, "SCHEMA_VERSION", 2)
+    data = save_format.encode(Player("Test"), game_map)
+    monkeypatch.setattr(save_format, "SCHEMA_VERSION", 1)
+    with pytest.raises(ValueError):
+        save_format.decode(data)
+
+
+def test_legacy_pickle_save_loads_and_converts(tmp_path, monkeypatch):
+    """
+    legacy.pkl a été écrit par le jeu avant les modèles partagés, les __slots__ et le format binaire
+    (attributs des ennemis et des objets dans leur __dict__).
+    """
+    directory = tmp_path / "saves"
+    directory.mkdir()
+    shutil.copy(os.path.join(FIXTURES, "legacy.pkl"), directory)
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    monkeypatch.setattr(save_load, "store", save_load.file_store(str(directory)))
+    monkeypatch.setattr(save_load, "writer", SaveWriter(background=False, on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+
+    player, game_map, position = save_load.read_save("legacy")
+    assert (player.name, player.level, player.hp, player.max_hp, player.experience) == ("Ancien", 3, 123, 140, 40)
+    assert player._damage_reduction == 15
+    assert [item.name for item in player.inventory.items] == ["Noob's Dagger", "Minor Health Potion", "Wooden Shield"]
+    assert position == (2, 3) and game_map.boss_location == (11, 11)
+    enemy = game_map.get_enemy((0, 4))
+    assert (enemy.name, enemy.level, enemy.hp, enemy.max_hp, enemy.attack, enemy.defense) == \
+        ("Orc Brute", 5, 177, 200, 18, 13)
+    assert sum(game_map.is_enemy_at((x, y)) for x in range(12) for y in range(12)) == 18
+    item = game_map.get_item((0, 8))
+    assert isinstance(item, Item) and (item.name, item.effect, item.power, item.level) == \
+        ("Major Attack Potion", "boost_attack", 30, 2)
+
+    # Conversion au format binaire : même partie relue ; les ennemis d'avant les __slots__ avaient en plus
+    # l'expérience de Character, que le format binaire ne garde pas
+    for x, y in game_map.locations:
+        if game_map.is_enemy_at((x, y)):
+            enemy = game_map.get_enemy((x, y))
+            assert (enemy._experience, enemy.points_to_allocate) == (0, 0)
+            del enemy._experience, enemy.points_to_allocate
+    expected = game_state(player, game_map)
+    assert save_load.convert_saves() == 1
+    assert {"legacy.save", "legacy.journal"} <= set(os.listdir(directory)) and not (directory / "legacy.pkl").exists()
+    save_load._journals.clear()
+    assert game_state(*save_load.read_save("legacy")[:2]) == expected
+
+
+@pytest.fixture(params=["files", "sqlite"])
+def saves(request, tmp_path, monkeypatch):
+    """Stockage par fichiers ou SQLite dans un dossier temporaire, écritures faites tout de suite (sans thread)."""
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    if request.param == "sqlite":
+        store = SQLiteStore(str(tmp_path / "saves.db"))
+    else:
+        store = save_load.file_store(str(tmp_path / "saves"))
+    monkeypatch.setattr(save_load, "store", store)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(background=False, on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+    monkeypatch.setattr(save_load, "_failed_journals", deque())
+    return store
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_pickle_snapshot_loads(saves, monkeypatch, chunked):
+    if chunked:  # Carte que le format binaire ne décrit pas : instantané pickle quel que soit binary_saves
+        game_map = ChunkedGameMap(32, chunk_size=8, world_seed=4)
+    else:
+        monkeypatch.setattr(save_load, "binary_saves", False)
+        game_map = GameMap(8, rng=random.Random(4))
+    player = Player("Test", level=3)
+    player.inventory.add_item(Item("Iron Sword", "damage", 30))
+    game_map.set_player_position(2, 3)
+    assert save_load.save_game(player, game_map, "pickled")
+    assert saves.pickle_saves() == ["pickled"]
+
+    save_load._journals.clear()
+    loaded_player, loaded_map, position = save_load.load_state("pickled", saves)
+    assert type(loaded_map) is type(game_map) and position == (2, 3)
+    assert game_state(loaded_player, loaded_map) == game_state(player, game_map)
+
+
+def test_pickle_snapshot_refuses_other_globals(saves):
+    payload = pickle.dumps({"player": Exploit(), "game_map": GameMap(6, rng=random.Random(1)), "current_position": (0, 0)})
+    if isinstance(saves, SQLiteStore):
+        with saves.pool.connection() as connection:
+            connection.execute("INSERT INTO snapshots VALUES ('exploit', 0, 0, ?)", (payload,))
+    else:
+        saves.create()
+        with open(saves.snapshot_paths("exploit")[1], "wb") as file:
+            file.write(payload)
+    calls.clear()
+    assert save_load.read_save("exploit") is None
+    assert not calls
@@ -0,0 +1,167 @@
+"""
+Journal des sauvegardes (save_load.py) : relecture jusqu'au dernier enregistrement dont le CRC est bon
+après une écriture interrompue, et refus de tout global hors de JOURNAL_GLOBALS au chargement.
+"""
+import io
+import pickle
+import random
+import zlib
+from collections import deque
+
+import pytest
+
+import save_load
+from game.enemy import Enemy
+from game.item import Item
+from game.map import GameMap
+from game.player import Player
+from save_writer import JournalWrite, SaveWriter
+
+SAVE_NAME = "journal-test"
+calls = []
+
+
+def record_call():
+    calls.append(True)
+
+
+class Exploit:
+    """Objet dont la relecture appellerait record_call, comme un pickle malveillant appellerait os.system."""
+    def __reduce__(self):
+        return record_call, ()
+
+
+@pytest.fixture
+def saves(tmp_path, monkeypatch):
+    """Stockage par fichiers dans un dossier temporaire, écritures faites tout de suite (sans thread)."""
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    files = save_load.file_store(str(tmp_path / "saves"))
+    monkeypatch.setattr(save_load, "store", files)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(background=False, on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+    monkeypatch.setattr(save_load, "_failed_journals", deque())
+    return files
+
+
+def record_ends(data):
+    """Fin de chaque enregistrement du journal, après l'en-tête."""
+    offset, ends = save_load.JOURNAL_HEADER.size, []
+    while offset < len(data):
+        length, _ = save_load.RECORD_HEADER.unpack_from(data, offset)
+        offset += save_load.RECORD_HEADER.size + length
+        ends.append(offset)
+    return ends
+
+
+def played_game(saves):
+    """Partie sauvegardée (instantané), puis deux tours journalisés ; retourne (joueur, HP après chaque tour)."""
+    player, game_map = Player("Test", level=3), GameMap(8, rng=random.Random(5))
+    assert save_load.save_game(player, game_map, SAVE_NAME)
+    hp = []
+    for damage, xp in ((15, 30), (20, 40)):
+        player.hp -= damage
+        player.add_experience(xp)
+        assert save_load.save_game(player, game_map, SAVE_NAME)
+        hp.append(player.hp)
+    return player, hp
+
+
+def reload(saves):
+    """Relit la partie comme un nouveau processus (aucun journal en mémoire)."""
+    save_load._journals.clear()
+    return save_load.load_state(SAVE_NAME, saves)[:2]
+
+
+def test_full_journal_is_replayed(saves):
+    _, hp = played_game(saves)
+    loaded, _ = reload(saves)
+    assert (loaded.hp, loaded.experience) == (hp[-1], 70)
+
+
+@pytest.mark.parametrize("cut", [1, save_load.RECORD_HEADER.size - 1, save_load.RECORD_HEADER.size + 3, -1])
+def test_cut_record_stops_at_last_good_crc(saves, cut):
+    _, hp = played_game(saves)
+    path = saves.journal_path(SAVE_NAME)
+    with open(path, "rb") as file:
+        data = file.read()
+    first_end, second_end = record_ends(data)
+    with open(path, "wb") as file:
+        file.write(data[:first_end + cut if cut > 0 else second_end + cut])  # Écriture interrompue au 2e enregistrement
+
+    loaded, game_map = reload(saves)
+    assert (loaded.hp, loaded.experience) == (hp[0], 30)
+    with open(path, "rb") as file:
+        assert file.read() == data[:first_end]  # Fin incomplète retirée
+
+    # La sauvegarde suivante s'ajoute après le dernier enregistrement complet
+    loaded.hp -= 5
+    assert save_load.save_game(loaded, game_map, SAVE_NAME)
+    assert reload(saves)[0].hp == hp[0] - 5
+
+
+def test_corrupted_record_stops_at_last_good_crc(saves):
+    _, hp = played_game(saves)
+    path = saves.journal_path(SAVE_NAME)
+    with open(path, "rb") as file:
+        data = bytearray(file.read())
+    data[record_ends(bytes(data))[0] + save_load.RECORD_HEADER.size + 2] ^= 0xFF  # Octet du 2e enregistrement
+    with open(path, "wb") as file:
+        file.write(data)
+    loaded, _ = reload(saves)
+    assert (loaded.hp, loaded.experience) == (hp[0], 30)
+
+
+def journal_record(record):
+    payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+    return save_load.RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def test_unpickler_accepts_journal_globals():
+    enemy, item = Enemy("Goblin Warrior", 4, "terrestre"), Item("Iron Sword", "damage", 30)
+    payload = pickle.dumps({"tiles": {(1, 2): (enemy, item)}}, protocol=pickle.HIGHEST_PROTOCOL)
+    loaded_enemy, loaded_item = save_load.JournalUnpickler(io.BytesIO(payload)).load()["tiles"][(1, 2)]
+    assert loaded_enemy.kind is enemy.kind and loaded_item.kind is item.kind
+
+
+def test_unpickler_rejects_other_globals():
+    payload = pickle.dumps({"player": {"_hp": Exploit()}})
+    with pytest.raises(pickle.UnpicklingError):
+        save_load.JournalUnpickler(io.BytesIO(payload)).load()
+    assert not calls
+
+
+def test_loading_journal_with_forbidden_global_raises(saves):
+    played_game(saves)
+    with open(saves.journal_path(SAVE_NAME), "ab") as file:
+        file.write(journal_record({"player": {"_hp": Exploit()}}))  # CRC valide : seul le contenu est refusé
+    save_load._journals.clear()
+    with pytest.raises(pickle.UnpicklingError):
+        save_load.load_state(SAVE_NAME, saves)
+    assert save_load.read_save(SAVE_NAME, saves) is None
+    assert not calls
+
+
+def test_failed_write_is_forgotten_on_game_thread(saves, monkeypatch):
+    player, game_map = Player("Test", level=3), GameMap(8, rng=random.Random(5))
+    assert save_load.save_game(player, game_map, SAVE_NAME)
+    write, written = saves.write, []
+
+    def failing_write(save_name, item):
+        written.append(type(item).__name__)
+        if isinstance(item, JournalWrite):
+            raise OSError("disque plein")
+        write(save_name, item)
+
+    monkeypatch.setattr(saves, "write", failing_write)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(on_failure=save_load.forget_journal))  # Thread d'écriture
+    player.hp -= 15
+    assert save_load.save_game(player, game_map, SAVE_NAME)
+    assert not save_load.flush_saves(SAVE_NAME)
+    # Le thread d'écriture n'a fait que signaler l'échec : le journal est retiré par la sauvegarde suivante
+    assert SAVE_NAME in save_load._journals and list(save_load._failed_journals) == [SAVE_NAME]
+
+    player.hp -= 5
+    assert save_load.save_game(player, game_map, SAVE_NAME)
+    assert save_load.flush_saves(SAVE_NAME)
+    assert written == ["JournalWrite", "SnapshotWrite"] and not save_load._failed_journals
+    assert reload(saves)[0].hp == player.hp
@@ -0,0 +1,153 @@
+"""
+Mise en veille des sessions (session_manager.py) : compteurs hits, misses et evictions, ordre de mise en
+veille quand le budget mémoire est dépassé (la moins récemment utilisée d'abord), mise en veille des
+sessions inactives, écriture attendue hors de la boucle asyncio et commande arrivée pendant la mise en veille.
+"""
+import asyncio
+import contextvars
+import random
+import threading
+from collections import deque
+
+import pytest
+
+import save_load
+import ui_manager
+from game.map import GameMap
+from game.player import Player
+from game.rng import SessionRng
+from main import game_loop_flow
+from save_writer import SaveWriter
+from session_manager import SessionManager, session_footprint
+
+
+class StubSession:
+    """Session minimale vue par le SessionManager : déroulement d'une partie arrêté à l'invite d'exploration."""
+
+    def __init__(self, name):
+        player, game_map = Player(name), GameMap(6, rng=random.Random(len(name)))
+        self.flow = game_loop_flow(player, game_map, game_map.start_location, name, SessionRng(len(name)))
+        self.prompt = next(self.flow)
+        self.hibernation = None
+        self.context = contextvars.copy_context()
+
+
+@pytest.fixture(autouse=True)
+def saves(tmp_path, monkeypatch):
+    """Sauvegardes dans un dossier temporaire, écrites par le thread du SaveWriter."""
+    monkeypatch.setattr(ui_manager, "headless", True)
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    monkeypatch.setattr(save_load, "store", save_load.file_store(str(tmp_path / "saves")))
+    monkeypatch.setattr(save_load, "writer", SaveWriter(on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+    monkeypatch.setattr(save_load, "_failed_journals", deque())
+
+
+def sessions(*names):
+    return [StubSession(name) for name in names]
+
+
+def footprint():
+    return session_footprint(StubSession("size").prompt.checkpoint)
+
+
+def test_budget_evicts_least_recently_used():
+    async def scenario():
+        manager = SessionManager(memory_budget=2 * footprint() + 1, hibernate_after=None)
+        first, second, third, fourth = sessions("first", "second", "third", "fourth")
+        manager.parked(first)
+        manager.parked(second)
+        assert not manager.hibernating
+        manager.parked(third)  # Budget dépassé : la plus ancienne
+        assert list(manager.hibernating) == [first] and list(manager.hot) == [second, third]
+
+        await manager.command(second)  # Commande de second, qui revient au point de reprise
+        manager.parked(second)
+        manager.parked(fourth)
+        assert list(manager.hot) == [second, fourth]
+        await asyncio.gather(*manager.hibernating.values())
+
+        assert [session.hibernation is not None for session in (first, second, third, fourth)] == [True, False, True, False]
+        assert first.flow is None and third.prompt is None
+        assert manager.stats()["evictions"] == 2 and manager.stats()["hits"] == 1
+        assert manager.memory == sum(size for size, _ in manager.hot.values())
+
+    asyncio.run(scenario())
+
+
+def test_hits_misses_and_resume():
+    async def scenario():
+        manager = SessionManager(hibernate_after=None)
+        session, = sessions("player")
+        position = session.prompt.checkpoint.position
+        manager.parked(session)
+        await manager.command(session)
+        assert manager.stats()["hits"] == 1
+
+        manager.parked(session)
+        assert await manager.evict(session)
+        assert session.hibernation is not None and session.flow is None and not manager.hot
+        await manager.command(session)
+        stats = manager.stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+        assert session.hibernation is None and session.prompt.checkpoint.position == position
+        assert stats["resume_max_ms"] > 0
+        session.flow.close()
+
+    asyncio.run(scenario())
+
+
+def test_sweep_evicts_idle_sessions_off_loop(monkeypatch):
+    flushed_on = []
+    flush_saves = save_load.flush_saves
+
+    def recorded_flush(save_name=None):
+        flushed_on.append((save_name, threading.current_thread() is threading.main_thread()))
+        return flush_saves(save_name)
+
+    monkeypatch.setattr(save_load, "flush_saves", recorded_flush)
+
+    async def scenario():
+        manager = SessionManager(hibernate_after=60)
+        idle, busy = sessions("idle", "busy")
+        manager.parked(idle)
+        manager.parked(busy)
+        now = manager.hot[busy][1]
+        manager.hot[idle] = (manager.hot[idle][0], now - 61)
+        tasks = manager.sweep(now)
+        assert len(tasks) == 1 and list(manager.hot) == [busy]
+        assert await tasks[0]
+        assert idle.hibernation is not None and busy.hibernation is None
+        assert not manager.hibernating
+
+    asyncio.run(scenario())
+    assert flushed_on == [("idle", False)]  # Écriture attendue sur un thread, pas dans la boucle
+
+
+def test_command_during_hibernation_waits_then_resumes(monkeypatch):
+    release = threading.Event()
+    flush_saves = save_load.flush_saves
+
+    def slow_flush(save_name=None):
+        release.wait(10)
+        return flush_saves(save_name)
+
+    monkeypatch.setattr(save_load, "flush_saves", slow_flush)
+
+    async def scenario():
+        manager = SessionManager(hibernate_after=None)
+        session, = sessions("player")
+        manager.parked(session)
+        task = manager.evict(session)
+        await asyncio.sleep(0)  # Partie sérialisée, écriture en attente
+        assert session.flow is not None and not task.done()
+        command = asyncio.ensure_future(manager.command(session))
+        await asyncio.sleep(0.01)
+        assert not command.done()  # La commande attend la fin de la mise en veille
+        release.set()
+        await command
+        assert manager.stats()["misses"] == 1 and manager.stats()["evictions"] == 1
+        assert session.hibernation is None and session.prompt.checkpoint is not None
+        session.flow.close()
+
+    asyncio.run(scenario())
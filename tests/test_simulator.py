@@ -0,0 +1,84 @@
+"""
+Simulateur de combats (game/simulator.py) comparé à Battle.resolve : avec le même générateur, chaque
+stratégie (attaque, soin, objets, fuite) donne le même vainqueur, le même nombre de tours, les mêmes HP
+et les mêmes objets utilisés, combat par combat (simulate) comme pour une suite de combats (simulate_many).
+"""
+import random
+
+import pytest
+
+from game.assets import get_registry
+from game.battle import Battle
+from game.enemy import Enemy
+from game.events import ItemUsed, Victory, run_events
+from game.item import Item
+from game.player import Player
+from game.simulator import (ATTACK, RUN, EnemyProfile, PlayerProfile, always_attack, always_run, best_item,
+                            heal_below, simulate, simulate_many)
+
+POLICIES = {
+    "attack": always_attack,
+    "heal": heal_below(0.4),
+    "items": best_item(),
+    "escape": always_run,
+}
+SEEDS = range(60)
+
+
+class Recorder:
+    """HP du joueur et de l'ennemi à la fin du combat (avant la récompense), et objets utilisés."""
+
+    def __init__(self, player, enemy):
+        self.player, self.enemy = player, enemy
+        self.hp, self.used = None, []
+
+    def emit(self, event):
+        if type(event) is ItemUsed:
+            self.used.append(event.item)
+        elif type(event) is Victory and self.hp is None:
+            self.hp = (self.player.hp, self.enemy.hp)
+
+
+def fighters(seed):
+    """Joueur (objets de départ et une épée) et ennemi du registre, selon la graine."""
+    templates = get_registry().enemies()
+    template = templates[seed % len(templates)]
+    player = Player("Hero", 1 + seed % 6)
+    player.inventory.add_item(Item("Iron Sword", "damage", 30))
+    return player, Enemy(name=template.name, level=template.level, enemy_type=template.type)
+
+
+def battle(player, enemy, policy, rng):
+    """Battle.resolve avec les actions de la stratégie ; retourne (vainqueur, tours, HP du joueur et de l'ennemi, objets utilisés)."""
+    turns = 0
+
+    def choose_action(request):
+        nonlocal turns
+        turns += 1
+        items = [[item.name, item.effect, item.power, item.quantity] for item in player.inventory.items]
+        action = policy(player.hp, player.max_hp, enemy.hp, items)
+        return action if action in (ATTACK, RUN) else ("use", action + 1)  # Numéro d'objet 1-based
+
+    recorder = Recorder(player, enemy)
+    winner = run_events(Battle(player, enemy, rng).resolve(), recorder, choose_action)
+    hp = recorder.hp or (player.hp, enemy.hp)
+    return winner, turns, hp[0], hp[1], tuple(recorder.used)
+
+
+@pytest.mark.parametrize("policy", sorted(POLICIES))
+def test_simulate_matches_battle(policy):
+    for seed in SEEDS:
+        player, enemy = fighters(seed)
+        profile, enemy_profile = PlayerProfile.from_player(player), EnemyProfile.from_enemy(enemy)
+        expected = battle(player, enemy, POLICIES[policy], random.Random(seed))
+        assert tuple(simulate(profile, enemy_profile, POLICIES[policy], random.Random(seed))) == expected, seed
+
+
+@pytest.mark.parametrize("policy", sorted(POLICIES))
+def test_simulate_many_matches_battles(policy):
+    player, enemy = fighters(7)
+    profile, enemy_profile = PlayerProfile.from_player(player), EnemyProfile.from_enemy(enemy)
+    rng = random.Random(7)
+    expected = [battle(*fighters(7), POLICIES[policy], rng) for _ in range(50)]  # Tirages à la suite
+    outcomes = simulate_many(profile, enemy_profile, 50, POLICIES[policy], random.Random(7))
+    assert [tuple(outcome) for outcome in outcomes] == expected
@@ -0,0 +1,70 @@
+"""
+Combats à plusieurs (game/skirmish.py) : un duel est un combat de Battle où le joueur attaque à chaque
+tour (mêmes tirages, mêmes événements, même fin), bouclier du joueur compris.
+"""
+import random
+
+import pytest
+
+from game.assets import get_registry
+from game.battle import Battle
+from game.enemy import Enemy
+from game.events import Attack, CriticalHit, DamageTaken, Evade, ShieldAbsorbed, Victory, run_events
+from game.player import Player
+from game.skirmish import HEROES, MONSTERS, Skirmish, duel
+
+EXCHANGE_EVENTS = (CriticalHit, Attack, Evade, ShieldAbsorbed, DamageTaken)  # Événements des échanges attaque/riposte
+SEEDS = range(40)
+
+
+class Recorder:
+    """Événements des échanges, et HP du joueur et de l'ennemi à la fin du combat (avant la récompense)."""
+
+    def __init__(self, player, enemy):
+        self.player, self.enemy = player, enemy
+        self.events, self.hp = [], None
+
+    def emit(self, event):
+        if type(event) in EXCHANGE_EVENTS:
+            self.events.append(event)
+        elif type(event) is Victory and self.hp is None:
+            self.hp = (self.player.hp, self.enemy.hp)
+
+
+def fighters(seed, shield):
+    template = get_registry().enemies()[seed % len(get_registry().enemies())]
+    player = Player("Hero", 1 + seed % 8)
+    if shield:
+        player.activate_shield(40)
+    return player, Enemy(name=template.name, level=template.level, enemy_type=template.type)
+
+
+@pytest.mark.parametrize("shield", [False, True])
+def test_duel_is_battle(shield):
+    absorbed = False
+    for seed in SEEDS:
+        hero, enemy = fighters(seed, shield)
+        duel_events = Recorder(hero, enemy)
+        skirmish = Skirmish(random.Random(seed))
+        skirmish.add_hero(hero)
+        skirmish.add_monster(enemy)
+        outcome = skirmish.resolve(duel_events)
+        skirmish.sync()
+
+        player, opponent = fighters(seed, shield)
+        battle_events = Recorder(player, opponent)
+        winner = run_events(Battle(player, opponent, random.Random(seed)).resolve(), battle_events,
+                            lambda request: "attack")
+
+        assert (outcome.winner == HEROES) == (winner == "player"), seed
+        assert (hero.hp, enemy.hp) == battle_events.hp, seed
+        assert duel_events.events == battle_events.events, seed
+        absorbed |= ShieldAbsorbed in map(type, duel_events.events)
+    assert absorbed == shield
+
+
+def test_duel_reports_hp():
+    hero, enemy = fighters(3, False)
+    outcome = duel(hero, enemy, random.Random(3))
+    assert outcome.winner in (HEROES, MONSTERS)
+    assert (hero.hp > 0, enemy.hp > 0) == (outcome.winner == HEROES, outcome.winner == MONSTERS)
@@ -0,0 +1,131 @@
+"""
+Stockage SQLite (sqlite_store.py) : une partie écrite puis relue (instantané et journal) est la même, une
+écriture en échec n'annule que son point de sauvegarde et le reste du lot est validé, truncate_journal
+coupe le journal, query donne les mêmes lignes dans le même ordre que SaveCatalog.query, et un nouveau
+processus connaît les résumés déjà écrits dans la table metadata.
+"""
+import random
+import types
+from collections import deque
+
+import pytest
+
+import save_catalog
+import save_load
+from game.map import GameMap
+from game.player import Player
+from save_writer import JournalWrite, SaveWriter, SnapshotWrite
+from sqlite_store import SQLiteStore
+
+# (sauvegarde, joueur, niveau, date) : niveaux, dates et noms de joueur (majuscules, accents) à égalité
+GAMES = [
+    ("alpha", "Zoé", 3, 100),
+    ("bravo", "alice", 7, 300),
+    ("charlie", "Émile", 3, 300),
+    ("delta", "Bob", 12, 200),
+    ("echo", "bob", 7, 100),
+    ("foxtrot", "ÉLODIE", 1, 250),
+    ("golf", "Alice", 7, 250),
+]
+QUERIES = [{}, {"player": "bo"}, {"player": "é"}, {"min_level": 3, "max_level": 7}, {"since": 250}]
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Stockage SQLite dans un dossier temporaire, écritures faites tout de suite (sans thread)."""
+    store = SQLiteStore(str(tmp_path / "saves.db"))
+    monkeypatch.setattr(save_load, "_file_stores", {})
+    monkeypatch.setattr(save_load, "store", store)
+    monkeypatch.setattr(save_load, "writer", SaveWriter(background=False, on_failure=save_load.forget_journal))
+    monkeypatch.setattr(save_load, "_journals", {})
+    monkeypatch.setattr(save_load, "_failed_journals", deque())
+    return store
+
+
+def summary(name, level=3, played=100):
+    return save_catalog.SaveSummary(name, "Test", level, 100, 100, 6, played)
+
+
+def play(monkeypatch, games=GAMES):
+    """Sauvegarde les parties de `games` dans le stockage courant, chacune à sa date."""
+    with monkeypatch.context() as patch:
+        for save_name, name, level, played in games:
+            patch.setattr(save_catalog, "time", types.SimpleNamespace(time=lambda: played))
+            assert save_load.save_game(Player(name, level=level), GameMap(6, rng=random.Random(level)), save_name)
+
+
+def test_game_round_trip(database):
+    player, game_map = Player("Test", level=4), GameMap(8, rng=random.Random(2))
+    assert save_load.save_game(player, game_map, "round-trip")
+    player.hp -= 25
+    game_map.set_player_position(1, 0)
+    assert save_load.save_game(player, game_map, "round-trip")  # Enregistrement du journal
+    snapshot, journal = database.read("round-trip")
+    assert snapshot and len(journal) > save_load.JOURNAL_HEADER.size
+
+    save_load._journals.clear()
+    loaded_player, loaded_map, position = save_load.load_state("round-trip", database)
+    assert position == (1, 0) and save_load.player_state(loaded_player) == save_load.player_state(player)
+    assert (loaded_player.name, loaded_player.level, loaded_map.size) == ("Test", 4, 8)
+    assert database.exists("round-trip") and not database.exists("other")
+
+
+def test_failed_write_rolls_back_its_savepoint_only(database):
+    database.write("second", SnapshotWrite(database, b"snapshot 2", True, b"journal 2:", 2, summary("second")))
+    database.commit()
+
+    database.write("first", SnapshotWrite(database, b"snapshot 1", True, b"journal 1:", 1, summary("first")))
+    with pytest.raises(ValueError):  # Journal d'un instantané remplacé
+        database.write("second", JournalWrite(database, b" perdu", 3, summary("second", level=9)))
+    database.write("second", JournalWrite(database, b" garde", 2, summary("second", level=5)))
+    database.commit()
+
+    assert database.read("first") == (b"snapshot 1", b"journal 1:")
+    assert database.read("second") == (b"snapshot 2", b"journal 2: garde")
+    summaries, total = database.query(sort="name")
+    assert total == 2 and [(row.name, row.level) for row in summaries] == [("first", 3), ("second", 5)]
+    assert not database.needs_update(summary("second", level=5))
+
+
+def test_truncate_journal(database):
+    database.write("game", SnapshotWrite(database, b"snapshot", True, b"header", 1, None))
+    for data in (b"aaa", b"bbb"):
+        database.write("game", JournalWrite(database, data, 1, None))
+    database.commit()
+    assert database.read("game")[1] == b"headeraaabbb"
+
+    database.truncate_journal("game", len(b"headeraa"))
+    assert database.read("game")[1] == b"headeraa"
+    database.write("game", JournalWrite(database, b"ccc", 1, None))  # Le journal continue après la coupure
+    database.commit()
+    assert database.read("game")[1] == b"headeraaccc"
+
+
+@pytest.mark.parametrize("sort", sorted(save_catalog.SORT_KEYS))
+def test_query_matches_save_catalog(database, tmp_path, monkeypatch, sort):
+    play(monkeypatch)
+    files = save_load.file_store(str(tmp_path / "saves"))
+    monkeypatch.setattr(save_load, "store", files)
+    play(monkeypatch)
+
+    for filters in QUERIES:
+        for page in range(3):
+            expected = files.query(sort=sort, page=page, page_size=3, **filters)
+            assert database.query(sort=sort, page=page, page_size=3, **filters) == expected, (filters, page)
+    assert database.query(sort=sort, page_size=10)[1] == len(GAMES)
+
+
+def test_summaries_are_read_from_metadata(database, monkeypatch):
+    play(monkeypatch, GAMES[:2])
+    known = database.query(sort="name")[0]
+
+    worker = SQLiteStore(database.path)  # Nouveau processus sur la même base
+    assert all(not worker.needs_update(row) for row in known)
+    assert worker.needs_update(known[0]._replace(hp=1))
+    assert worker.needs_update(known[0]._replace(played=known[0].played + save_catalog.TOUCH_INTERVAL))
+    assert worker.needs_update(summary("new"))
+
+    database.write("new", SnapshotWrite(database, b"snapshot", True, None, 1, summary("new")))
+    database.commit()
+    worker.after_fork()  # Processus créé par fork : les résumés validés depuis sont relus
+    assert not worker.needs_update(summary("new"))
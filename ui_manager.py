@@ -1,4 +1,5 @@
 import os
+import shutil
 import sys
 from ascii_art import game_title, game_over, about  # Import des ASCII arts
 
@@ -6,8 +7,39 @@ from ascii_art import game_title, game_over, about  # Import des ASCII arts
 # Fonctions utilitaires
 # -------------------------
 
+headless = False  # Sans terminal (rejeu d'une session) : l'écran n'est jamais effacé
+ansi_clear = False  # Effacer l'écran par séquence ANSI dans sys.stdout (sessions du serveur) plutôt que par le système
+input_hook = None  # Remplace input() : saisie fournie par programme (None : clavier)
+
+def set_input_hook(hook):
+    """Installe une fonction de saisie à la place d'input() (None pour revenir au clavier) et retourne l'ancienne."""
+    global input_hook
+    previous, input_hook = input_hook, hook
+    return previous
+
+def read_input(prompt=""):
+    """Lit une commande du joueur, au clavier ou depuis le hook installé."""
+    if input_hook is not None:
+        return input_hook(prompt)
+    return input(prompt)
+
+def answer_prompt(prompt):
+    """Répond à un Prompt (voir game/events.py) au clavier : en bas de l'écran si l'invite le demande."""
+    if prompt.bottom:
+        return get_input(prompt.text)
+    return read_input(prompt.text)
+
+def terminal_size():
+    """Taille du terminal, ou 80x24 sans terminal."""
+    return shutil.get_terminal_size()
+
 def clear_screen():
     """Efface l'écran du terminal, compatible avec Windows et Unix/Linux/Mac."""
+    if headless:
+        return
+    if ansi_clear:
+        sys.stdout.write("\033[2J\033[H")  # Effacer l'écran du client et replacer le curseur en haut
+        return
     os_system = os.name
     if os_system == 'nt':  # Si c'est Windows
         os.system('cls')
@@ -16,14 +48,14 @@ def clear_screen():
 
 def move_cursor_to_bottom():
     """Positionne le curseur sur la dernière ligne du terminal."""
-    terminal_height = os.get_terminal_size().lines
+    terminal_height = terminal_size().lines
     sys.stdout.write(f"\033[{terminal_height};1H")  # Positionne le curseur sur la dernière ligne
     sys.stdout.flush()
 
 def get_input(prompt):
     """Affiche une invite en bas de l'écran et retourne l'entrée de l'utilisateur."""
     move_cursor_to_bottom()  # Déplacer le curseur avant de demander l'entrée
-    return input(prompt)
+    return read_input(prompt)
 
 # -------------------------
 # Fonctions de centrage du texte
@@ -31,8 +63,8 @@ def get_input(prompt):
 
 def center_text(text):
     """Centre le texte sur l'écran en fonction de la taille du terminal."""
-    terminal_width = os.get_terminal_size().columns
-    terminal_height = os.get_terminal_size().lines
+    terminal_width = terminal_size().columns
+    terminal_height = terminal_size().lines
     lines = text.split('\n')
     centered_lines = [line.center(terminal_width) for line in lines]
     
@@ -52,8 +84,8 @@ def center_text_above(art, text_box):
     text_box : str
         Le texte encadré qui sera centré en dessous.
     """
-    terminal_width = os.get_terminal_size().columns
-    terminal_height = os.get_terminal_size().lines
+    terminal_width = terminal_size().columns
+    terminal_height = terminal_size().lines
 
     # Calcul des hauteurs des éléments
     art_lines = art.split('\n')
@@ -115,22 +147,33 @@ Game Help:
     clear_screen()
     print(center_text(draw_box(help_text)))
 
-def display_game_over():
-    """Affiche un message de fin de jeu encadré."""
+GAME_OVER_PROMPT = "\nPress Enter to exit..."
+ABOUT_PROMPT = "\nPress Enter to return..."
+
+def show_game_over():
+    """Affiche le message de fin de jeu encadré, sans attendre le joueur."""
     clear_screen()
     
     game_over_box = draw_box(game_over())
     print(center_text(game_over_box))  # ASCII art juste au-dessus
-    get_input("\nPress Enter to exit...")
 
-def display_about():
-    """Affiche les informations 'About' encadrées."""
+def display_game_over():
+    """Affiche un message de fin de jeu encadré."""
+    show_game_over()
+    get_input(GAME_OVER_PROMPT)
+
+def show_about():
+    """Affiche les informations 'About' encadrées, sans attendre le joueur."""
     clear_screen()
 
     about_box = draw_box(about())
     
     print(center_text(about_box))  # ASCII art juste au-dessus
-    get_input("\nPress Enter to return...")
+
+def display_about():
+    """Affiche les informations 'About' encadrées."""
+    show_about()
+    get_input(ABOUT_PROMPT)
 
 def player_info(player):
     """Affiche les informations du joueur dans un format stylisé."""